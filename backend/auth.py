@@ -5,8 +5,10 @@ import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+from backend.config import settings
 from backend.database import get_db
 from backend.models import User
+from backend.utils.cache_manager import auth_user_key, auth_user_namespace, cache_manager
 import os
 from dotenv import load_dotenv
 
@@ -47,8 +49,50 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    """Mevcut kullanıcıyı token'dan al (Multi-Company)"""
+# Yetkilendirme ve sık kullanılan profil alanları (hashed_password cache'e yazılmaz)
+USER_SNAPSHOT_FIELDS = (
+    "id", "company_id", "username", "role", "is_active", "is_verified",
+    "full_name", "company_name", "email", "phone", "vkn_tckn", "tax_number",
+    "tax_office", "address", "ilk_giris_tamamlandi", "created_at",
+)
+
+class CurrentUser:
+    """
+    get_current_user sonucu: kullanıcı snapshot'ı
+    
+    Snapshot alanları sorgusuz okunur. Diğer alanlar, ilişkiler (company vb.)
+    veya yazma işlemi ilk erişimde User ORM nesnesini request session'ına
+    yükler; sonrasında tüm erişimler ORM nesnesine gider.
+    """
+    
+    def __init__(self, snapshot: dict, db: Session, user: Optional[User] = None):
+        object.__setattr__(self, "_snapshot", snapshot)
+        object.__setattr__(self, "_db", db)
+        object.__setattr__(self, "_user", user)
+    
+    @property
+    def orm(self) -> User:
+        """Tam User nesnesi (gerekirse primary key ile yüklenir)"""
+        if self._user is None:
+            user = self._db.get(User, self._snapshot["id"])
+            if user is None:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Kimlik doğrulama başarısız")
+            object.__setattr__(self, "_user", user)
+        return self._user
+    
+    def __getattr__(self, name):
+        if self._user is None and name in self._snapshot:
+            return self._snapshot[name]
+        return getattr(self.orm, name)
+    
+    def __setattr__(self, name, value):
+        setattr(self.orm, name, value)
+    
+    def __repr__(self):
+        return f"<CurrentUser {self._snapshot['username']} (company {self._snapshot['company_id']})>"
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> CurrentUser:
+    """Mevcut kullanıcıyı token'dan al (Multi-Company, kısa TTL'li snapshot cache ile)"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Kimlik doğrulama başarısız",
@@ -65,19 +109,36 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except JWTError:
         raise credentials_exception
     
-    # Kullanıcıyı username + company_id ile bul (aynı username farklı şirketlerde olabilir)
-    user = db.query(User).filter(
-        User.username == username,
-        User.company_id == company_id
-    ).first()
-    
-    if user is None:
-        raise credentials_exception
+    # Snapshot cache'de ise sorgu yok (değişiklikte cache_invalidation.track_user_changes
+    # generation'ı artırır; generation SELECT'ten önce okunur)
+    generation = cache_manager.get_generation(auth_user_namespace(username, company_id))
+    cache_key = auth_user_key(username, company_id, generation)
+    snapshot = cache_manager.get(cache_key)
+    if snapshot is not None:
+        current_user = CurrentUser(snapshot, db)
+    else:
+        # Kullanıcıyı username + company_id ile bul (aynı username farklı şirketlerde olabilir)
+        user = db.query(User).filter(
+            User.username == username,
+            User.company_id == company_id
+        ).first()
+        
+        if user is None:
+            raise credentials_exception
+        
+        snapshot = {field: getattr(user, field) for field in USER_SNAPSHOT_FIELDS}
+        if user.is_active:
+            cache_manager.set(cache_key, snapshot, settings.CACHE_TTL_AUTH_USER)
+        current_user = CurrentUser(snapshot, db, user)
     
-    if not user.is_active:
+    if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Kullanıcı aktif değil")
     
-    return user
+    return current_user
+
+def get_current_user_model(current_user: CurrentUser = Depends(get_current_user)) -> User:
+    """User ORM nesnesi gereken (güncelleme, db.refresh vb.) endpoint'ler için"""
+    return current_user.orm
 
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Aktif kullanıcıyı al"""
@@ -3,8 +3,13 @@ Celery Application Configuration
 Background job processing için
 """
 from celery import Celery
+from celery.signals import setup_logging, worker_process_init
 from backend.config import settings
+from backend.logging_config import configure_logging
 import os
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Celery app oluştur
 celery_app = Celery(
@@ -15,7 +20,8 @@ celery_app = Celery(
         "backend.tasks.pdf_tasks",
         "backend.tasks.sms_tasks",
         "backend.tasks.excel_tasks",
-        "backend.tasks.email_tasks"
+        "backend.tasks.email_tasks",
+        "backend.tasks.enrichment_tasks"
     ]
 )
 
@@ -49,6 +55,7 @@ celery_app.conf.update(
         "backend.tasks.sms_tasks.*": {"queue": "sms"},
         "backend.tasks.excel_tasks.*": {"queue": "excel"},
         "backend.tasks.email_tasks.*": {"queue": "email"},
+        "backend.tasks.enrichment_tasks.*": {"queue": "maintenance"},
     },
     
     # Task priority
@@ -76,10 +83,27 @@ celery_app.conf.beat_schedule = {
         "schedule": 604800.0,  # 7 days
         "options": {"queue": "maintenance"}
     },
+    # Her dakika ISP bilgisi bekleyen log kayıtlarını doldur
+    "enrich-pending-ips": {
+        "task": "backend.tasks.enrichment_tasks.enrich_pending_ips",
+        "schedule": 60.0,  # 1 minute
+        "options": {"queue": "maintenance"}
+    },
 }
 
+@setup_logging.connect
+def use_app_logging(**kwargs):
+    """Celery root logger'ı kendi handler'larıyla ezmesin, API ile aynı pipeline kullanılsın"""
+    configure_logging()
+
+@worker_process_init.connect
+def reset_db_pool(**kwargs):
+    """Fork sonrası parent'tan kalan DB bağlantılarını child process'te kullanma"""
+    from backend.database import engine
+    engine.dispose(close=False)
+
 @celery_app.task(bind=True)
 def debug_task(self):
     """Debug task"""
-    print(f"Request: {self.request!r}")
+    logger.debug(f"Request: {self.request!r}")
 
@@ -15,20 +15,101 @@ class Settings:
     REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
     REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", None)
     REDIS_DB = int(os.getenv("REDIS_DB", 0))
+    # Cache çağrıları Redis'i uzun beklememeli (bağlantı ilk komutta açılır)
+    REDIS_SOCKET_CONNECT_TIMEOUT = float(os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT", 1.0))
+    REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 1.0))
+    REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+    REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", 30))
+    # Art arda bu kadar bağlantı hatasında cache devre dışı kalır, süre sonunda tekrar denenir
+    REDIS_BREAKER_FAILURE_THRESHOLD = int(os.getenv("REDIS_BREAKER_FAILURE_THRESHOLD", 3))
+    REDIS_BREAKER_RESET_SECONDS = float(os.getenv("REDIS_BREAKER_RESET_SECONDS", 15))
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
     
     # Cache TTL (Time To Live) - seconds
-    CACHE_TTL_USER = 300  # 5 minutes
-    CACHE_TTL_COMPANY = 600  # 10 minutes
-    CACHE_TTL_DASHBOARD = 120  # 2 minutes
-    CACHE_TTL_KVKK = 3600  # 1 hour
-    CACHE_TTL_MUTABAKAT_LIST = 60  # 1 minute
+    # Env ile override edilebilir; /api/admin/metrics/cache prefix metriklerine göre ayarlanır
+    CACHE_TTL_USER = int(os.getenv("CACHE_TTL_USER", 300))  # 5 minutes
+    CACHE_TTL_AUTH_USER = int(os.getenv("CACHE_TTL_AUTH_USER", 30))  # get_current_user snapshot'ı (commit'te kullanıcının generation'ı artırılır, bkz. track_user_changes)
+    CACHE_TTL_COMPANY = int(os.getenv("CACHE_TTL_COMPANY", 600))  # 10 minutes
+    CACHE_TTL_DASHBOARD = int(os.getenv("CACHE_TTL_DASHBOARD", 120))  # 2 minutes
+    CACHE_TTL_DASHBOARD_STALE = int(os.getenv("CACHE_TTL_DASHBOARD_STALE", 60))  # Süresi dolan dashboard/rapor verisi yenilenirken bu kadar daha sunulur
+    CACHE_TTL_KVKK = int(os.getenv("CACHE_TTL_KVKK", 3600))  # 1 hour
+    CACHE_TTL_MUTABAKAT_LIST = int(os.getenv("CACHE_TTL_MUTABAKAT_LIST", 60))  # 1 minute
+    
+    # L1: Redis önünde process içi LRU + TTL katmanı
+    CACHE_L1_ENABLED = os.getenv("CACHE_L1_ENABLED", "true").lower() == "true"
+    CACHE_L1_MAXSIZE = int(os.getenv("CACHE_L1_MAXSIZE", 2000))  # Kayıt sayısı
+    CACHE_L1_TTL = int(os.getenv("CACHE_L1_TTL", 30))  # L1 bayatlık üst sınırı (saniye)
+    CACHE_L1_MAX_ITEM_BYTES = int(os.getenv("CACHE_L1_MAX_ITEM_BYTES", 64 * 1024))  # Daha büyük değerler sadece Redis'te
+    CACHE_INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "cache:invalidate")
+    
+    # Redis'e yazılan değerlerin formatı (utils/cache_codec.py)
+    CACHE_CODEC = os.getenv("CACHE_CODEC", "auto").lower()  # auto, msgpack, orjson, json
+    CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", "zlib").lower()  # none, zlib, lz4
+    CACHE_COMPRESS_THRESHOLD = int(os.getenv("CACHE_COMPRESS_THRESHOLD", 2048))  # Byte; daha küçükler sıkıştırılmaz
+    CACHE_COMPRESS_LEVEL = int(os.getenv("CACHE_COMPRESS_LEVEL", 1))  # zlib seviyesi (1 = en hızlı)
+    
+    # Offline IP -> ISP/Konum veritabanı (ip_resolver)
+    IP_DB_PATH = os.getenv("IP_DB_PATH", "data/ip_ranges.bin")
+    IP_DB_REFRESH_SECONDS = int(os.getenv("IP_DB_REFRESH_SECONDS", 300))
+    IP_INFO_CACHE_SIZE = int(os.getenv("IP_INFO_CACHE_SIZE", 10000))  # Process içi LRU kapasitesi
+    CACHE_TTL_IP_INFO = int(os.getenv("CACHE_TTL_IP_INFO", 86400))  # 1 day
+    CACHE_TTL_IP_INFO_NEGATIVE = int(os.getenv("CACHE_TTL_IP_INFO_NEGATIVE", 600))  # 10 minutes (bulunamayan IP'ler)
+    
+    # ISP zenginleştirme: "deferred" (log kayıtları sonradan doldurulur) veya "inline"
+    IP_ENRICHMENT_MODE = os.getenv("IP_ENRICHMENT_MODE", "deferred").lower()
+    IP_ENRICHMENT_BATCH_SIZE = int(os.getenv("IP_ENRICHMENT_BATCH_SIZE", 500))
+    # Celery olmayan ortamlar için process içi zenginleştirme döngüsü (saniye, 0 = kapalı)
+    IP_ENRICHMENT_IN_PROCESS_INTERVAL = int(os.getenv("IP_ENRICHMENT_IN_PROCESS_INTERVAL", 0))
+    
+    # X-Forwarded-For / X-Real-IP header'larına güvenilecek proxy adresleri (IP veya CIDR)
+    TRUSTED_PROXIES = os.getenv(
+        "TRUSTED_PROXIES", "127.0.0.1,::1,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16"
+    )
+
+    # Debug modu (X-DB-Queries / X-DB-Time header'ları vb.)
+    DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+    # Aynı sorgu şekli bir request içinde bu kadar tekrar ederse [N+1] logu yazılır
+    QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", 5))
+    # Bu süreyi aşan SQL ifadeleri yavaş sorgu buffer'ına yazılır (0 = kapalı)
+    SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+    SLOW_QUERY_BUFFER_SIZE = int(os.getenv("SLOW_QUERY_BUFFER_SIZE", 500))
+    # Bu süreyi aşan HTTP istekleri [SLOW REQUEST] olarak loglanır
+    SLOW_REQUEST_THRESHOLD_MS = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", 1000))
+    # Process bellek / CPU örnekleme aralığı (saniye, 0 = kapalı)
+    PROCESS_METRICS_INTERVAL = int(os.getenv("PROCESS_METRICS_INTERVAL", 15))
+    # Response'a faz süreleri (db, cache, pdf_sign...) Server-Timing header'ı olarak eklenir.
+    # Süreler (ör. login DB süresi) dışarıya bilgi sızdırır: varsayılan olarak sadece DEBUG'da açık
+    SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", str(DEBUG)).lower() == "true"
+    # Faz dökümü loglanan isteklerin oranı (yavaş istekler her zaman loglanır)
+    REQUEST_TIMING_LOG_SAMPLE_RATE = float(os.getenv("REQUEST_TIMING_LOG_SAMPLE_RATE", 0.01))
+    # /metrics endpoint'ine erişebilecek adresler (IP veya CIDR)
+    METRICS_ALLOWED_NETWORKS = os.getenv(
+        "METRICS_ALLOWED_NETWORKS", "127.0.0.1,::1,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16"
+    )
+
+    # Logging: seviye, modül bazlı seviyeler ("backend.sms=WARNING,..."), "json" / "text"
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+    LOG_DIR = os.getenv("LOG_DIR", "logs")  # Boş: dosyaya yazılmaz
     
     # Rate Limiting (existing)
     RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    # "redis": sayaçlar tüm worker'larda ortak (Redis yoksa yerel fallback), "local": worker başına
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "redis").lower()
+    RATE_LIMIT_REDIS_PREFIX = os.getenv("RATE_LIMIT_REDIS_PREFIX", "ratelimit")
+    RATE_LIMIT_LOCAL_SHARDS = int(os.getenv("RATE_LIMIT_LOCAL_SHARDS", 16))  # Yerel sayaç kilit shard sayısı
     
     # Database (existing - add if needed)
     DATABASE_URL = os.getenv("DATABASE_URL", "")
     
+    # Read replica (rapor/dashboard/audit okumaları). Boşsa tüm okumalar primary'den
+    DATABASE_READ_URL = os.getenv("DATABASE_READ_URL", "")
+    # Yazma yapan oturumun okumaları bu süre boyunca primary'den yapılır (0 = kapalı)
+    READ_REPLICA_LAG_GUARD_SECONDS = int(os.getenv("READ_REPLICA_LAG_GUARD_SECONDS", 5))
+    # Replica bağlantı hatasından sonra tekrar denenmeden önce beklenecek süre
+    READ_REPLICA_RETRY_SECONDS = int(os.getenv("READ_REPLICA_RETRY_SECONDS", 30))
+    
     # Email (existing - add if needed)
     SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
     SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
@@ -1,11 +1,26 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import NoSuchModuleError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-import pyodbc
+from sqlalchemy.orm import Session, sessionmaker
+from typing import Optional
 import os
 from dotenv import load_dotenv
 import logging
 
+from backend.utils.db_pool import (
+    InstrumentedAsyncQueuePool, InstrumentedQueuePool, detect_process_role,
+    get_pool_options, instrument_engine
+)
+from backend.utils.cache_invalidation import track_mutabakat_changes, track_user_changes
+from backend.utils.query_counter import install_query_counter
+from backend.utils.slow_query_log import install_slow_query_log
+from backend.utils.read_replica import (
+    make_read_only, replica_health, should_read_from_primary, track_primary_writes,
+    watch_replica_errors
+)
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -13,26 +28,152 @@ logger = logging.getLogger(__name__)
 # Veritabanı bağlantı URL'si environment variable'dan al
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-try:
-    engine = create_engine(
-        DATABASE_URL,
+# Pool profili process rolüne göre (api / worker / beat)
+PROCESS_ROLE = detect_process_role()
+POOL_OPTIONS = get_pool_options(PROCESS_ROLE)
+
+# Sync sürücü -> async sürücü eşlemesi (AsyncSession için)
+ASYNC_DRIVERS = {
+    "mssql": "mssql+aioodbc",
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+# Async sürücülerin connect timeout parametresi (aiomysql 'timeout' kabul etmez)
+ASYNC_CONNECT_ARGS = {
+    "mssql": {"timeout": 60},
+    "sqlite": {"timeout": 60},
+    "postgresql": {"timeout": 60},
+    "mysql": {"connect_timeout": 60},
+}
+
+
+class PrimarySession(Session):
+    """Primary veritabanı session'ı (yazmalar lag guard için izlenir)"""
+
+
+class ReadOnlySession(Session):
+    """Replica session'ı (flush engellenir)"""
+
+
+track_primary_writes(PrimarySession)
+track_mutabakat_changes(PrimarySession)
+track_user_changes(PrimarySession)
+make_read_only(ReadOnlySession)
+install_query_counter()
+install_slow_query_log()
+
+
+def to_async_url(url: str) -> str:
+    """Sync bağlantı URL'sini async sürücülü URL'ye çevir"""
+    parsed = make_url(url)
+    backend_name = parsed.get_backend_name()
+    if backend_name not in ASYNC_DRIVERS:
+        raise ValueError(f"Async sürücü tanımlı değil: {parsed.drivername}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend_name]).render_as_string(hide_password=False)
+
+
+def create_db_engine(url: str, name: str):
+    """Profil ayarlarıyla engine oluştur ve pool metriklerine bağla"""
+    db_engine = create_engine(
+        url,
         echo=False,  # SQL loglarını kapat (geliştirme için True yapabilirsiniz)
         pool_pre_ping=True,
-        pool_size=5,
-        max_overflow=10,
         pool_recycle=3600,  # 1 saatte bir connection yenile
+        pool_logging_name=name,
         connect_args={
             "timeout": 60  # Connect timeout artırıldı
-        }
+        },
+        poolclass=InstrumentedQueuePool,
+        **POOL_OPTIONS
+    )
+    instrument_engine(db_engine, name)
+    return db_engine
+
+
+def create_async_db_engine(url: str, name: str):
+    """Aynı veritabanı için async engine (pool metrikleri '<name>_async' altında)"""
+    pool_name = f"{name}_async"
+    async_url = to_async_url(url)
+    db_engine = create_async_engine(
+        async_url,
+        echo=False,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        pool_logging_name=pool_name,
+        connect_args=dict(ASYNC_CONNECT_ARGS[make_url(async_url).get_backend_name()]),
+        poolclass=InstrumentedAsyncQueuePool,
+        **POOL_OPTIONS
     )
-    logger.info("Veritabanı motoru başarıyla oluşturuldu")
+    instrument_engine(db_engine.sync_engine, pool_name)
+    return db_engine
+
+
+def try_create_async_db_engine(url: str, name: str):
+    """
+    Async sürücü yüklü değilse (ör. asyncpg) async engine atlanır
+
+    Uygulama yine açılır; sync endpoint'ler çalışır, AsyncSession isteyen
+    endpoint'ler async_session() hatası döner.
+    """
+    try:
+        return create_async_db_engine(url, name)
+    except (ImportError, ValueError, NoSuchModuleError) as e:
+        logger.warning(f"Async engine oluşturulamadı ({name}), async endpoint'ler devre dışı: {e}")
+        return None
+
+
+try:
+    engine = create_db_engine(DATABASE_URL, "primary")
+    async_engine = try_create_async_db_engine(DATABASE_URL, "primary")
+    logger.info(f"Veritabanı motoru başarıyla oluşturuldu (rol: {PROCESS_ROLE}, pool: {POOL_OPTIONS})")
 except Exception as e:
     logger.error(f"Veritabanı bağlantı hatası: {e}")
     raise
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=PrimarySession)
+# expire_on_commit=False: commit sonrası attribute erişimi event loop'ta IO yapmasın
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False, sync_session_class=PrimarySession
+) if async_engine is not None else None
 Base = declarative_base()
 
+# Read replica (opsiyonel) - configure_read_replica ile ayarlanır
+read_engine = None
+ReadSessionLocal = None
+async_read_engine = None
+AsyncReadSessionLocal = None
+
+def configure_read_replica(url: Optional[str]):
+    """Read replica engine'lerini oluştur (url boşsa replica devre dışı)"""
+    global read_engine, ReadSessionLocal, async_read_engine, AsyncReadSessionLocal
+    if read_engine is not None:
+        read_engine.dispose()
+    if async_read_engine is not None:
+        async_read_engine.sync_engine.dispose(close=False)
+
+    if not url:
+        read_engine = ReadSessionLocal = None
+        async_read_engine = AsyncReadSessionLocal = None
+        return
+
+    read_engine = create_db_engine(url, "replica")
+    async_read_engine = try_create_async_db_engine(url, "replica")
+    watch_replica_errors(read_engine)
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine, class_=ReadOnlySession)
+    if async_read_engine is not None:
+        watch_replica_errors(async_read_engine.sync_engine)
+        AsyncReadSessionLocal = async_sessionmaker(
+            async_read_engine, autoflush=False, expire_on_commit=False, sync_session_class=ReadOnlySession
+        )
+    else:
+        AsyncReadSessionLocal = None
+    replica_health.mark_up()
+    logger.info("Read replica motoru oluşturuldu")
+
+configure_read_replica(os.getenv("DATABASE_READ_URL"))
+
 def get_db():
     """Veritabanı session'ı oluştur"""
     db = SessionLocal()
@@ -41,6 +182,57 @@ def get_db():
     finally:
         db.close()
 
+def read_session() -> Session:
+    """
+    Okuma session'ı (replica varsa ve uygunsa replica, yoksa primary)
+    
+    Request dışından (arka plan cache yenilemesi vb.) kullanılabilir;
+    çağıran kapatmaktan sorumludur.
+    """
+    if ReadSessionLocal is None or should_read_from_primary():
+        return SessionLocal()
+    return ReadSessionLocal()
+
+def async_session() -> AsyncSession:
+    """Primary AsyncSession (`async with async_session() as db:`)"""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async veritabanı sürücüsü yüklü değil (bkz. ASYNC_DRIVERS)")
+    return AsyncSessionLocal()
+
+def async_read_session() -> AsyncSession:
+    """read_session'ın async karşılığı (`async with async_read_session() as db:`)"""
+    if AsyncReadSessionLocal is None or should_read_from_primary():
+        return async_session()
+    return AsyncReadSessionLocal()
+
+def get_read_db():
+    """
+    Sadece okuma yapan endpoint'ler için session (rapor, dashboard, audit log)
+
+    Replica yoksa, erişilemiyorsa veya oturum az önce primary'ye yazdıysa
+    (lag guard) primary session'ı döner.
+    """
+    db = read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    """
+    Async endpoint'ler için AsyncSession (event loop'u bloklamaz)
+
+    Mevcut sync yardımcılar (ActivityLogger, FailedLoginTracker vb.)
+    `await db.run_sync(...)` ile aynı session üzerinden çağrılabilir.
+    """
+    async with async_session() as db:
+        yield db
+
+async def get_async_read_db():
+    """get_read_db'nin async karşılığı (replica + primary fallback)"""
+    async with async_read_session() as db:
+        yield db
+
 def init_db():
     """Veritabanı tablolarını oluştur"""
     try:
@@ -49,4 +241,3 @@ def init_db():
     except Exception as e:
         logger.error(f"Tablo oluşturma hatası: {e}")
         raise
-
@@ -1,45 +1,15 @@
 import logging
-import os
-from datetime import datetime
-from logging.handlers import RotatingFileHandler
 from sqlalchemy.orm import Session
 from backend.models import ActivityLog
+from backend.logging_config import configure_logging
+from backend.middleware.request_context import current_client_context
 from typing import Optional
 
-# Log klasörünü oluştur
-LOG_DIR = "logs"
-if not os.path.exists(LOG_DIR):
-    os.makedirs(LOG_DIR)
-
-# Logging ayarları
-log_file = os.path.join(LOG_DIR, f"app_{datetime.now().strftime('%Y%m%d')}.log")
-
-# Formatter
-formatter = logging.Formatter(
-    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
-
-# File Handler (Rotating)
-file_handler = RotatingFileHandler(
-    log_file,
-    maxBytes=10*1024*1024,  # 10MB
-    backupCount=10,
-    encoding='utf-8'
-)
-file_handler.setFormatter(formatter)
-file_handler.setLevel(logging.INFO)
-
-# Console Handler
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(formatter)
-console_handler.setLevel(logging.INFO)
+# Kuyruk tabanlı pipeline (dosya/console yazımı listener thread'inde, JSON)
+configure_logging()
 
 # Root Logger
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
 
 def log_activity(
     db: Session,
@@ -53,6 +23,14 @@ def log_activity(
 ):
     """Aktivite logunu veritabanına kaydet - ISP bilgili (Yasal Delil için) - Multi-Company"""
     try:
+        # IP verilmediyse aktif request'in client context'ini kullan
+        context = current_client_context()
+        if context is not None:
+            if not ip_info and not ip_address:
+                ip_info = context.evidence_ip_info
+            if user_agent is None:
+                user_agent = context.user_agent
+        
         # ISP bilgisini parse et
         if ip_info:
             if isinstance(ip_info, dict):
@@ -0,0 +1,157 @@
+"""
+Asenkron Log Pipeline'ı
+
+Root logger'a sadece bir QueueHandler bağlanır: log çağrısı kaydı kuyruğa
+koyar ve döner. Dosya (rotating) ve console yazımı QueueListener thread'inde
+yapılır; request thread'i / event loop disk veya stdout I/O'sunda beklemez.
+
+Çıktı LOG_FORMAT=json ise satır başına bir JSON nesnesidir (zaman, seviye,
+logger, mesaj, varsa client IP ve exception). Modül bazlı seviyeler
+LOG_LEVELS ile verilir:
+
+    LOG_LEVEL=INFO
+    LOG_LEVELS="backend.utils.pdf_signer=DEBUG,backend.routers.legal_reports=WARNING"
+
+Modüller logging.getLogger(__name__) kullanır (backend.logger models'i import
+ettiği için alt seviye modüller onu import etmez).
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional
+
+from backend.config import settings
+
+# LogRecord'un standart alanları (geri kalanlar extra={...} ile gelen alanlardır)
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "client_ip"}
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Kaydı tek satır JSON'a çevir"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        client_ip = getattr(record, "client_ip", None)
+        if client_ip:
+            data["client_ip"] = client_ip
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class ContextQueueHandler(QueueHandler):
+    """
+    Kaydı kuyruğa koymadan önce request bilgisini ekler
+
+    Contextvar'lar sadece çağıran thread'de okunabildiğinden client IP burada
+    eklenir. Mesaj ve exception metni de burada hazırlanır (listener thread'i
+    args / traceback nesnelerine dokunmaz).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+
+        from backend.middleware.request_context import current_client_context
+        context = current_client_context()
+        if context is not None:
+            record.client_ip = context.ip
+        return record
+
+
+def parse_log_levels(value: str) -> Dict[str, str]:
+    """'a.b=DEBUG,c=WARNING' -> {"a.b": "DEBUG", "c": "WARNING"}"""
+    levels = {}
+    for item in value.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _build_formatter() -> logging.Formatter:
+    if settings.LOG_FORMAT == "json":
+        return JsonFormatter()
+    return logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+
+
+def _start_listener():
+    """Handler'ları oluşturup listener thread'ini başlat"""
+    global _listener
+    formatter = _build_formatter()
+    handlers = [logging.StreamHandler()]
+    if settings.LOG_DIR:
+        os.makedirs(settings.LOG_DIR, exist_ok=True)
+        handlers.append(RotatingFileHandler(
+            os.path.join(settings.LOG_DIR, f"app_{datetime.now().strftime('%Y%m%d')}.log"),
+            maxBytes=10 * 1024 * 1024,  # 10MB
+            backupCount=10,
+            encoding="utf-8"
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler.queue = log_queue
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def _restart_after_fork():
+    """Fork sonrası (gunicorn preload, Celery prefork) listener thread'i child'a geçmez"""
+    global _listener
+    if _listener is not None:
+        _listener = None
+        _start_listener()
+
+
+def stop_logging():
+    """Kuyruktaki kayıtları yaz ve listener'ı durdur"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging():
+    """Root logger'ı kuyruk tabanlı pipeline'a bağla (tekrar çağrılırsa bir şey yapmaz)"""
+    global _queue_handler
+    if _queue_handler is not None:
+        return
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    _queue_handler = ContextQueueHandler(queue.SimpleQueue())
+    root.addHandler(_queue_handler)
+    root.setLevel(settings.LOG_LEVEL)
+    for name, level in parse_log_levels(settings.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _start_listener()
+    atexit.register(stop_logging)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_restart_after_fork)
@@ -1,9 +1,19 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from backend.database import init_db, engine
-from backend.routers import auth, mutabakat, dashboard, users, users_excel, users_excel_vkn, bulk_mutabakat, public, reports, verification, bayi, notifications, kvkk, legal_reports, admin_companies, security, audit_logs, push
+from backend.routers import auth, mutabakat, dashboard, users, users_excel, users_excel_vkn, bulk_mutabakat, public, reports, verification, bayi, notifications, kvkk, legal_reports, admin_companies, security, audit_logs, push, system_metrics
 from backend.logger import logger
+from backend.config import settings
+from backend.middleware.performance_monitor import (
+    PerformanceMonitorMiddleware, metrics_access_allowed, run_process_sampler
+)
+from backend.middleware.rate_limiter import RateLimitMiddleware, unmatched_route_policies
+from backend.middleware.request_context import RequestContextMiddleware, get_client_context
+from backend.utils.metrics import render_prometheus
+from backend.utils.query_counter import QueryCounterMiddleware
+from backend.utils.request_timing import ServerTimingMiddleware
+import asyncio
 import os
 from dotenv import load_dotenv
 
@@ -19,6 +29,10 @@ app = FastAPI(
     description="Modern ve Hukuka Uygun E-Mutabakat Yönetim Sistemi"
 )
 
+# Route bazlı rate limit (routing / body parsing / dependency'lerden önce).
+# CORS'un içinde kalır; 429 cevapları da CORS header'larını taşır.
+app.add_middleware(RateLimitMiddleware)
+
 # CORS ayarları
 app.add_middleware(
     CORSMiddleware,
@@ -28,6 +42,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request başına SQL sorgu sayısı / süresi ve N+1 tespiti
+app.add_middleware(QueryCounterMiddleware)
+
+# Client kimliği (IP / user agent / ISP) request başına bir kez hesaplanır
+app.add_middleware(RequestContextMiddleware, trusted_proxies=settings.TRUSTED_PROXIES)
+
+# Faz süreleri (db, cache, isp, sms, pdf_*) -> Server-Timing header'ı ve örneklenmiş log
+app.add_middleware(ServerTimingMiddleware)
+
+# Route bazlı süre histogramı / status sayıları (en dışta: 429 ve 404'ler de sayılır)
+app.add_middleware(PerformanceMonitorMiddleware)
+
 # Router'ları ekle
 app.include_router(public.router)  # Public endpoints (authentication yok)
 app.include_router(verification.router)  # Dijital imza doğrulama (mahkeme/yasal)
@@ -47,21 +73,41 @@ app.include_router(admin_companies.router)  # Admin: Şirket yönetimi (Multi-Co
 app.include_router(security.router)  # Güvenlik yönetimi (Failed Login Tracking)
 app.include_router(audit_logs.router)  # Audit Logs (Tüm işlem kayıtları)
 app.include_router(push.router)  # Push Notifications (Web Push)
+app.include_router(system_metrics.router)  # Admin: Sistem metrikleri (DB pool vb.)
 
 @app.on_event("startup")
 async def startup_event():
     """Uygulama başlatma işlemleri"""
     logger.info("E-Mutabakat Sistemi başlatılıyor...")
+    for method, path in unmatched_route_policies(app.routes):
+        logger.error(f"[RATE_LIMIT] Policy'si olan route bulunamadı, limit uygulanmıyor: {method} {path}")
     try:
         init_db()
         logger.info("Veritabanı bağlantısı başarılı")
     except Exception as e:
         logger.error(f"Veritabanı bağlantı hatası: {e}")
+    
+    # Celery beat yoksa ISP zenginleştirmeyi process içinde çalıştır
+    if settings.IP_ENRICHMENT_MODE == "deferred" and settings.IP_ENRICHMENT_IN_PROCESS_INTERVAL > 0:
+        from backend.utils.ip_enrichment import run_enrichment_loop
+        app.state.ip_enrichment_task = asyncio.create_task(
+            run_enrichment_loop(settings.IP_ENRICHMENT_IN_PROCESS_INTERVAL)
+        )
+    
+    # Process bellek / CPU örneklemesi (request başına psutil çağrısı yapılmaz)
+    if settings.PROCESS_METRICS_INTERVAL > 0:
+        app.state.process_sampler_task = asyncio.create_task(
+            run_process_sampler(settings.PROCESS_METRICS_INTERVAL)
+        )
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Uygulama kapatma işlemleri"""
     logger.info("E-Mutabakat Sistemi kapatılıyor...")
+    for task_name in ("ip_enrichment_task", "process_sampler_task"):
+        task = getattr(app.state, task_name, None)
+        if task:
+            task.cancel()
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -93,6 +139,13 @@ def health_check():
         logger.error(f"Health check failed: {e}")
         return {"status": "unhealthy", "database": "disconnected", "error": str(e)}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    """Prometheus exposition (sadece METRICS_ALLOWED_NETWORKS)"""
+    if not metrics_access_allowed(get_client_context(request).ip):
+        return JSONResponse(status_code=403, content={"detail": "Forbidden"})
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -1,56 +1,187 @@
 """
 Performance Monitoring Middleware
 API response time ve diğer metrikleri takip eder
+
+Pure ASGI middleware: route şablonu (ör. /api/mutabakat/{mutabakat_id}) bazlı
+süre histogramı, status sayıları ve in-flight gauge'u tutar. Sayaçlar sadece
+event loop thread'inden, arada await olmadan güncellendiği için kilitsizdir.
+
+Process belleği / CPU request başına değil, arka plandaki örnekleyici ile
+PROCESS_METRICS_INTERVAL saniyede bir okunur. Hepsi register_collector ile
+Prometheus exporter'a (/metrics) eklenir.
 """
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+import asyncio
+import logging
+import os
 import time
+from typing import Dict, List, Optional, Tuple
+
 import psutil
-import os
 
+from backend.config import settings
+from backend.middleware.request_context import _is_trusted, parse_trusted_proxies
+from backend.utils.metrics import Histogram, format_labels, register_collector
+
+logger = logging.getLogger(__name__)
+
+# Route'a düşmeyen istekler (404, routing öncesi 429): path label'ı kardinaliteyi patlatmasın
+UNMATCHED_ROUTE = "__unmatched__"
+
+
+class RouteMetrics:
+    """Tek bir method + route şablonu için sayaçlar"""
+
+    __slots__ = ("latency", "statuses")
 
-class PerformanceMonitorMiddleware(BaseHTTPMiddleware):
-    """Performance monitoring middleware"""
-    
-    async def dispatch(self, request: Request, call_next):
-        # Start time
-        start_time = time.time()
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Calculate duration
-        duration = time.time() - start_time
-        duration_ms = round(duration * 1000, 2)
-        
-        # Add headers
-        response.headers["X-Response-Time"] = f"{duration_ms}ms"
-        response.headers["X-Process-Memory"] = f"{self.get_memory_usage()}MB"
-        
-        # Log slow requests (>1000ms)
-        if duration_ms > 1000:
-            print(f"⚠️ SLOW REQUEST: {request.method} {request.url.path} - {duration_ms}ms")
-        
-        # Log to console (development)
-        if os.getenv("DEBUG", "false").lower() == "true":
-            print(f"{request.method} {request.url.path} - {duration_ms}ms")
-        
-        return response
-    
-    @staticmethod
-    def get_memory_usage() -> float:
-        """Get current process memory usage (MB)"""
-        process = psutil.Process()
-        memory_info = process.memory_info()
-        return round(memory_info.rss / 1024 / 1024, 2)
-    
-    @staticmethod
-    def get_system_stats() -> dict:
-        """Get system statistics"""
+    def __init__(self):
+        self.latency = Histogram(thread_safe=False)
+        self.statuses: Dict[int, int] = {}
+
+
+class HttpMetrics:
+    """(method, route şablonu) -> RouteMetrics ve aktif istek sayısı"""
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self.in_flight = 0
+
+    def record(self, method: str, route: str, status: int, duration_ms: float):
+        metrics = self.routes.get((method, route))
+        if metrics is None:
+            metrics = self.routes[(method, route)] = RouteMetrics()
+        metrics.latency.observe(duration_ms)
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def reset(self):
+        self.routes = {}
+
+    def get_stats(self) -> Dict:
+        routes = dict(self.routes)
         return {
-            "cpu_percent": psutil.cpu_percent(interval=1),
-            "memory_percent": psutil.virtual_memory().percent,
-            "disk_percent": psutil.disk_usage('/').percent,
-            "process_memory_mb": PerformanceMonitorMiddleware.get_memory_usage()
+            "in_flight": self.in_flight,
+            "routes": {
+                f"{method} {route}": {"statuses": dict(metrics.statuses), **metrics.latency.snapshot()}
+                for (method, route), metrics in sorted(routes.items())
+            },
         }
 
+    def prometheus_lines(self) -> List[str]:
+        routes = sorted(dict(self.routes).items())
+        lines = [
+            "# HELP http_requests_in_flight İşlenmekte olan istek sayısı",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP http_requests_total Route ve status bazlı istek sayısı",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route), metrics in routes:
+            for status, count in sorted(dict(metrics.statuses).items()):
+                labels = format_labels({"method": method, "route": route, "status": status})
+                lines.append(f"http_requests_total{labels} {count}")
+
+        lines.append("# HELP http_request_duration_ms Route bazlı istek süresi (ms)")
+        lines.append("# TYPE http_request_duration_ms histogram")
+        for (method, route), metrics in routes:
+            lines.extend(metrics.latency.prometheus_lines(
+                "http_request_duration_ms", {"method": method, "route": route}
+            ))
+        return lines
+
+
+class ProcessMetrics:
+    """Periyodik örneklenen process bellek / CPU değerleri"""
+
+    def __init__(self):
+        self._process: Optional[psutil.Process] = None
+        self.values: Dict[str, float] = {}
+        self.sampled_at: Optional[float] = None
+
+    def sample(self):
+        # Fork sonrası (gunicorn preload) her worker kendi PID'ini örnekler
+        if self._process is None or self._process.pid != os.getpid():
+            self._process = psutil.Process(os.getpid())
+        with self._process.oneshot():
+            memory = self._process.memory_info()
+            cpu = self._process.cpu_times()
+            values = {
+                "resident_memory_bytes": memory.rss,
+                "virtual_memory_bytes": memory.vms,
+                "cpu_seconds_total": round(cpu.user + cpu.system, 3),
+                "threads": self._process.num_threads(),
+            }
+            if hasattr(self._process, "num_fds"):
+                values["open_fds"] = self._process.num_fds()
+        self.values = values
+        self.sampled_at = time.time()
+
+    def prometheus_lines(self) -> List[str]:
+        lines = []
+        for name, value in self.values.items():
+            kind = "counter" if name.endswith("_total") else "gauge"
+            lines.append(f"# TYPE process_{name} {kind}")
+            lines.append(f"process_{name} {value}")
+        return lines
+
+
+http_metrics = HttpMetrics()
+process_metrics = ProcessMetrics()
+
+
+@register_collector
+def http_metrics_collector():
+    """HTTP ve process metrikleri (Prometheus exporter)"""
+    return http_metrics.prometheus_lines() + process_metrics.prometheus_lines()
+
+
+async def run_process_sampler(interval: int):
+    """Process metriklerini interval saniyede bir örnekle (startup'ta task olarak başlatılır)"""
+    while True:
+        try:
+            process_metrics.sample()
+        except Exception as e:
+            logger.warning(f"[METRICS] Process örneklemesi başarısız: {e}")
+        await asyncio.sleep(interval)
+
+
+_allowed_networks = parse_trusted_proxies(settings.METRICS_ALLOWED_NETWORKS)
+
+
+def metrics_access_allowed(ip: str) -> bool:
+    """/metrics sadece METRICS_ALLOWED_NETWORKS'ten (scraper, iç ağ) okunabilir"""
+    return _is_trusted(ip, _allowed_networks)
+
+
+class PerformanceMonitorMiddleware:
+    """Pure ASGI middleware - request süresini route şablonu bazında kaydeder"""
+
+    def __init__(self, app, metrics: Optional[HttpMetrics] = None):
+        self.app = app
+        self.metrics = metrics or http_metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        status = 500  # Response başlamadan hata olursa
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.in_flight -= 1
+            duration_ms = (time.perf_counter() - start) * 1000
+            # Router eşleşen route'u scope'a yazar (aynı scope dict'i)
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            metrics.record(scope["method"], route, status, duration_ms)
+
+            if duration_ms > settings.SLOW_REQUEST_THRESHOLD_MS:
+                logger.warning(f"[SLOW REQUEST] {scope['method']} {scope['path']} - {duration_ms:.0f}ms")
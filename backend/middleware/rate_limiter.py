@@ -2,19 +2,33 @@
 """
 API Rate Limiting Middleware
 DOS/DDOS saldırılarına karşı koruma için endpoint bazlı rate limiting
+
+Korunan endpoint'ler ROUTE_POLICIES tablosunda tanımlıdır; RateLimitMiddleware
+limiti routing, body parsing ve dependency çözümlemesinden önce uygular
+(reddedilen istek için DB session açılmaz, upload body'si okunmaz).
+Kimliği doğrulanmış isteklerde sayaç JWT'deki kullanıcı + şirkete, diğerlerinde
+client IP'sine bağlıdır; aynı NAT arkasındaki kullanıcılar birbirini engellemez.
 """
 from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
-from typing import Callable
+from jose import JWTError, jwt
+from starlette.routing import compile_path
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+import math
+import logging
 import time
-from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import datetime
 import asyncio
 from functools import wraps
 
-# In-memory rate limit storage (production'da Redis kullanılmalı)
-rate_limit_storage = defaultdict(lambda: {"count": 0, "reset_time": None})
-rate_limit_lock = asyncio.Lock()
+from backend import auth as auth_module
+from backend.config import settings
+from backend.middleware.request_context import (
+    STATE_KEY, _default_trusted_proxies, build_client_context, get_client_context
+)
+from backend.utils.rate_limit_store import rate_limit_store
+
+logger = logging.getLogger(__name__)
 
 
 class RateLimiter:
@@ -28,8 +42,7 @@ class RateLimiter:
     """
     
     def __init__(self):
-        self.storage = rate_limit_storage
-        self.lock = rate_limit_lock
+        self.store = rate_limit_store
     
     @staticmethod
     def limit(max_requests: int = 100, window_seconds: int = 60, key_func: Callable = None):
@@ -44,14 +57,14 @@ class RateLimiter:
         def decorator(func):
             @wraps(func)
             async def wrapper(*args, **kwargs):
-                # Request objesini bul
+                # Request objesini bul (FastAPI endpoint parametrelerini keyword olarak verir)
                 request = None
-                for arg in args:
+                for arg in (*args, *kwargs.values()):
                     if isinstance(arg, Request):
                         request = arg
                         break
                 
-                if request is None:
+                if request is None or not settings.RATE_LIMIT_ENABLED:
                     # Request bulunamazsa rate limit uygulama
                     return await func(*args, **kwargs)
                 
@@ -60,62 +73,49 @@ class RateLimiter:
                     client_key = key_func(request)
                 else:
                     # Varsayılan: IP adresi
-                    client_key = request.client.host if request.client else "unknown"
+                    client_key = get_client_context(request).ip
                 
                 # Endpoint path'i ekle (farklı endpoint'ler için ayrı limitler)
                 limit_key = f"{client_key}:{request.url.path}"
                 
-                # Rate limit kontrolü
-                async with rate_limit_lock:
-                    now = datetime.now()
-                    client_data = rate_limit_storage[limit_key]
-                    
-                    # Reset zamanı geçmişse sıfırla
-                    if client_data["reset_time"] is None or now >= client_data["reset_time"]:
-                        client_data["count"] = 0
-                        client_data["reset_time"] = now + timedelta(seconds=window_seconds)
-                    
-                    # İstek sayısını artır
-                    client_data["count"] += 1
-                    current_count = client_data["count"]
-                    reset_time = client_data["reset_time"]
-                    
-                    # Limit aşıldı mı?
-                    if current_count > max_requests:
-                        # Kalan süreyi hesapla
-                        remaining_seconds = int((reset_time - now).total_seconds())
-                        
-                        # Rate limit aşımı error'u
-                        raise HTTPException(
-                            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                            detail={
-                                "error": "Rate limit exceeded",
-                                "message": f"Too many requests. Please try again in {remaining_seconds} seconds.",
-                                "retry_after": remaining_seconds,
-                                "limit": max_requests,
-                                "window": window_seconds
-                            },
-                            headers={
-                                "X-RateLimit-Limit": str(max_requests),
-                                "X-RateLimit-Remaining": "0",
-                                "X-RateLimit-Reset": str(int(reset_time.timestamp())),
-                                "Retry-After": str(remaining_seconds)
-                            }
-                        )
-                    
-                    # Rate limit bilgilerini response header'larına ekle
-                    remaining = max_requests - current_count
-                    
-                    # Normal akış
-                    result = await func(*args, **kwargs)
-                    
-                    # Response'a header'ları ekle
-                    if hasattr(result, 'headers'):
-                        result.headers["X-RateLimit-Limit"] = str(max_requests)
-                        result.headers["X-RateLimit-Remaining"] = str(remaining)
-                        result.headers["X-RateLimit-Reset"] = str(int(reset_time.timestamp()))
+                # Rate limit kontrolü (Redis'te atomik; Redis yoksa shard kilitli process içi sayaç).
+                # Sadece sayaç artışı atomiktir; handler hiçbir kilidin içinde çalışmaz.
+                result = await rate_limit_store.hit(limit_key, max_requests, window_seconds)
+                reset_timestamp = str(int(time.time() + result.reset_after))
+                
+                # Limit aşıldı mı?
+                if not result.allowed:
+                    # Kalan süreyi hesapla
+                    remaining_seconds = max(1, math.ceil(result.reset_after))
                     
-                    return result
+                    # Rate limit aşımı error'u
+                    raise HTTPException(
+                        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                        detail={
+                            "error": "Rate limit exceeded",
+                            "message": f"Too many requests. Please try again in {remaining_seconds} seconds.",
+                            "retry_after": remaining_seconds,
+                            "limit": max_requests,
+                            "window": window_seconds
+                        },
+                        headers={
+                            "X-RateLimit-Limit": str(max_requests),
+                            "X-RateLimit-Remaining": "0",
+                            "X-RateLimit-Reset": reset_timestamp,
+                            "Retry-After": str(remaining_seconds)
+                        }
+                    )
+                
+                # Normal akış
+                response = await func(*args, **kwargs)
+                
+                # Response'a header'ları ekle
+                if hasattr(response, 'headers'):
+                    response.headers["X-RateLimit-Limit"] = str(max_requests)
+                    response.headers["X-RateLimit-Remaining"] = str(result.remaining)
+                    response.headers["X-RateLimit-Reset"] = reset_timestamp
+                
+                return response
             
             return wrapper
         return decorator
@@ -123,10 +123,40 @@ class RateLimiter:
     @staticmethod
     async def clear_storage():
         """
-        Rate limit storage'ı temizle (test için)
+        Yerel rate limit sayaçlarını temizle (test için)
         """
-        async with rate_limit_lock:
-            rate_limit_storage.clear()
+        rate_limit_store.clear_local()
+
+
+def client_ip_identity(scope) -> str:
+    """Rate limit kimliği olarak client IP'si ("ip:<ip>")"""
+    context = (scope.get("state") or {}).get(STATE_KEY)
+    if context is None:
+        context = build_client_context(scope, _default_trusted_proxies)
+    return f"ip:{context.ip}"
+
+
+def rate_limit_identity(scope) -> str:
+    """
+    Rate limit kimliği: geçerli JWT varsa "user:<şirket>:<kullanıcı>", yoksa "ip:<ip>"
+
+    Token sadece imza/süre açısından doğrulanır (DB'ye gidilmez); pasif kullanıcı
+    kontrolü yine get_current_user'da yapılır.
+    """
+    for name, value in scope.get("headers") or []:
+        if name != b"authorization":
+            continue
+        scheme, _, token = value.decode("latin-1").partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                payload = jwt.decode(token, auth_module.SECRET_KEY, algorithms=[auth_module.ALGORITHM])
+            except JWTError:
+                payload = {}
+            if payload.get("sub") and payload.get("company_id") is not None:
+                return f"user:{payload['company_id']}:{payload['sub']}"
+        break
+
+    return client_ip_identity(scope)
 
 
 # Kullanıcı bazlı rate limit key fonksiyonu
@@ -134,14 +164,8 @@ def get_user_key(request: Request) -> str:
     """
     Kullanıcı ID'si varsa kullanıcı bazlı, yoksa IP bazlı key döndür
     """
-    # Authorization header'dan user bilgisi al (varsa)
-    auth_header = request.headers.get("Authorization", "")
-    if auth_header.startswith("Bearer "):
-        # Token'dan user ID'si çıkarılabilir (şimdilik IP kullanıyoruz)
-        pass
-    
-    # IP adresi
-    return request.client.host if request.client else "unknown"
+    get_client_context(request)  # IP için client context'i request.state'e yaz
+    return rate_limit_identity(request.scope)
 
 
 # Önceden tanımlı rate limit kuralları
@@ -175,6 +199,128 @@ class RateLimitRules:
     KVKK_CONSENT = {"max_requests": 10, "window_seconds": 300}  # 10 istek/5 dakika
 
 
+class RoutePolicy(NamedTuple):
+    method: str
+    path: str  # Route şablonu (sayaç key'inde kullanılır)
+    max_requests: int
+    window_seconds: int
+    by_ip: bool = False  # True: token olsa da client IP'si ile say
+
+
+# Korunan endpoint'ler: (method, route şablonu, kural)
+# Login'de brute force koruması token'dan bağımsız olarak her zaman IP bazlıdır
+ROUTE_POLICIES = (
+    ("POST", "/api/auth/login", {**RateLimitRules.LOGIN, "by_ip": True}),
+    ("POST", "/api/auth/login/select-company", {**RateLimitRules.LOGIN, "by_ip": True}),
+    ("POST", "/api/auth/upload-users-excel", RateLimitRules.EXCEL_UPLOAD),
+    ("POST", "/api/bulk-mutabakat/upload-excel", RateLimitRules.EXCEL_UPLOAD),
+    ("POST", "/api/mutabakat/", RateLimitRules.MUTABAKAT_CREATE),
+    ("GET", "/api/mutabakat/{mutabakat_id}/download-pdf", RateLimitRules.PDF_DOWNLOAD),
+    ("GET", "/api/dashboard/stats", RateLimitRules.DASHBOARD),
+)
+
+
+class RoutePolicyTable:
+    """Method + path -> RoutePolicy (sabit path'ler dict'ten, şablonlu olanlar regex ile)"""
+
+    def __init__(self, policies=ROUTE_POLICIES):
+        self.exact: Dict[Tuple[str, str], RoutePolicy] = {}
+        self.patterns = []  # (method, regex, policy)
+        for method, path, rule in policies:
+            policy = RoutePolicy(method, path, **rule)
+            regex, _, params = compile_path(path)
+            if params:
+                self.patterns.append((method, regex, policy))
+            else:
+                self.exact[(method, path)] = policy
+
+    def match(self, method: str, path: str) -> Optional[RoutePolicy]:
+        policy = self.exact.get((method, path))
+        if policy is None:
+            for policy_method, regex, candidate in self.patterns:
+                if policy_method == method and regex.match(path):
+                    return candidate
+        return policy
+
+
+def unmatched_route_policies(routes, policies=ROUTE_POLICIES):
+    """
+    Uygulamada karşılığı olmayan (method, path) policy'leri
+
+    Route yeniden adlandırılırsa / prefix'i değişirse limit sessizce devre dışı
+    kalmasın diye startup'ta ve testte kontrol edilir.
+    """
+    templates = {
+        (method, route.path)
+        for route in routes
+        for method in (getattr(route, "methods", None) or ())
+    }
+    return [(method, path) for method, path, _ in policies if (method, path) not in templates]
+
+
+def _rate_limit_headers(policy: RoutePolicy, remaining: int, reset_after: float) -> Dict[str, str]:
+    return {
+        "X-RateLimit-Limit": str(policy.max_requests),
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(int(time.time() + reset_after)),
+    }
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware - ROUTE_POLICIES'teki endpoint'lere limit uygular
+
+    Limit aşılırsa 429 doğrudan buradan döner; endpoint, dependency'ler ve
+    request body hiç çalıştırılmaz / okunmaz.
+    """
+
+    def __init__(self, app, policies=ROUTE_POLICIES, store=None):
+        self.app = app
+        self.table = RoutePolicyTable(policies)
+        self.store = store  # None ise modül global'i (testlerde değiştirilebilir)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        policy = self.table.match(scope["method"], scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        store = self.store or rate_limit_store
+        identity = client_ip_identity(scope) if policy.by_ip else rate_limit_identity(scope)
+        limit_key = f"{identity}:{policy.path}"
+        result = await store.hit(limit_key, policy.max_requests, policy.window_seconds)
+        headers = _rate_limit_headers(policy, result.remaining, result.reset_after)
+
+        if not result.allowed:
+            remaining_seconds = max(1, math.ceil(result.reset_after))
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": {
+                    "error": "Rate limit exceeded",
+                    "message": f"Too many requests. Please try again in {remaining_seconds} seconds.",
+                    "retry_after": remaining_seconds,
+                    "limit": policy.max_requests,
+                    "window": policy.window_seconds
+                }},
+                headers={**headers, "Retry-After": str(remaining_seconds)}
+            )
+            await response(scope, receive, send)
+            return
+
+        raw_headers = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), *raw_headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
 # Rate limit exception handler
 async def rate_limit_exception_handler(request: Request, exc: HTTPException):
     """
@@ -195,23 +341,12 @@ async def rate_limit_exception_handler(request: Request, exc: HTTPException):
 # Cleanup task (eski rate limit kayıtlarını temizle)
 async def cleanup_rate_limit_storage():
     """
-    Her 1 saatte bir eski rate limit kayıtlarını temizle
+    Her 1 saatte bir eski yerel rate limit kayıtlarını temizle
+    (Redis sayaçları PEXPIRE ile kendiliğinden silinir)
     """
     while True:
         await asyncio.sleep(3600)  # 1 saat bekle
         
-        async with rate_limit_lock:
-            now = datetime.now()
-            keys_to_delete = []
-            
-            for key, data in rate_limit_storage.items():
-                # Reset zamanı geçmişse sil
-                if data["reset_time"] and now >= data["reset_time"] + timedelta(hours=1):
-                    keys_to_delete.append(key)
-            
-            for key in keys_to_delete:
-                del rate_limit_storage[key]
-            
-            if keys_to_delete:
-                print(f"[RATE_LIMIT] {len(keys_to_delete)} adet eski kayıt temizlendi")
-
+        removed = rate_limit_store.local.cleanup()
+        if removed:
+            logger.info(f"[RATE_LIMIT] {removed} adet eski kayıt temizlendi")
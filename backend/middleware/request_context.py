@@ -0,0 +1,186 @@
+"""
+Request Context Middleware
+Client kimliğini (IP, user agent, ISP) request başına bir kez hesaplar ve
+request.state.client_context üzerinde saklar.
+
+X-Forwarded-For sadece güvenilen proxy'lerden (TRUSTED_PROXIES) gelen
+isteklerde dikkate alınır; zincir sağdan sola taranır ve ilk güvenilmeyen
+adres client IP'si kabul edilir (sahte header ile IP taklidi engellenir).
+"""
+import hashlib
+import ipaddress
+import logging
+from contextvars import ContextVar
+from typing import Iterable, List, Optional, Union
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+STATE_KEY = "client_context"
+
+# Request dışından (logger, servisler) erişim için aktif client context
+_current_client_context: ContextVar[Optional["ClientContext"]] = ContextVar(
+    "client_context", default=None
+)
+
+
+def parse_trusted_proxies(value: Union[str, Iterable[str]]) -> List[IPNetwork]:
+    """'127.0.0.1,10.0.0.0/8' formatındaki listeyi network listesine çevir"""
+    if isinstance(value, str):
+        value = value.split(",")
+
+    networks = []
+    for item in value:
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            networks.append(ipaddress.ip_network(item, strict=False))
+        except ValueError:
+            logger.warning(f"[REQUEST CONTEXT] Geçersiz TRUSTED_PROXIES girdisi atlandı: {item}")
+    return networks
+
+
+def _is_trusted(ip: str, trusted: List[IPNetwork]) -> bool:
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    if address.version == 6 and address.ipv4_mapped:
+        address = address.ipv4_mapped
+    return any(address in network for network in trusted)
+
+
+def resolve_client_ip(
+    peer_ip: Optional[str],
+    forwarded_for: Optional[str],
+    real_ip: Optional[str],
+    trusted: List[IPNetwork]
+) -> str:
+    """Bağlantı adresi ve proxy header'larından gerçek client IP'sini bul"""
+    if not peer_ip:
+        return "unknown"
+    if not _is_trusted(peer_ip, trusted):
+        return peer_ip
+
+    if forwarded_for:
+        hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+        for hop in reversed(hops):
+            if not _is_trusted(hop, trusted):
+                return hop
+        if hops:
+            return hops[0]
+
+    if real_ip and real_ip.strip():
+        return real_ip.strip()
+
+    return peer_ip
+
+
+class ClientContext:
+    """
+    Request başına client kimliği
+
+    ISP bilgisi ilk ihtiyaç duyulduğunda bir kez çözülür; aynı request içinde
+    router, audit log, activity log ve PDF üretimi aynı sonucu kullanır.
+    """
+
+    __slots__ = ("ip", "user_agent", "session_key", "_ip_info")
+
+    def __init__(self, ip: str, user_agent: str = "", session_key: Optional[str] = None):
+        self.ip = ip
+        self.user_agent = user_agent
+        # Aynı oturumun request'lerini eşleştirmek için anahtar (token hash'i, yoksa IP)
+        self.session_key = session_key or f"ip:{ip}"
+        self._ip_info: Optional[dict] = None
+
+    @property
+    def ip_info(self) -> dict:
+        """ISP/konum bilgili IP (request içinde cache'lenir)"""
+        if self._ip_info is None:
+            from backend.utils.ip_resolver import ip_info_cache
+            self._ip_info = ip_info_cache.resolve(self.ip)
+        return dict(self._ip_info)
+
+    @property
+    def evidence_ip_info(self) -> dict:
+        """Log kayıtları için IP bilgisi (deferred modda ISP alanları boş)"""
+        if settings.IP_ENRICHMENT_MODE == "inline" or self._ip_info is not None:
+            return self.ip_info
+        from backend.utils.ip_resolver import pending_ip_info
+        return pending_ip_info(self.ip)
+
+
+def build_client_context(scope, trusted: List[IPNetwork]) -> ClientContext:
+    """ASGI scope'tan client context oluştur"""
+    headers = {}
+    for name, value in scope.get("headers") or []:
+        key = name.decode("latin-1").lower()
+        if key in ("x-forwarded-for", "x-real-ip", "user-agent", "authorization"):
+            decoded = value.decode("latin-1")
+            # Birden fazla X-Forwarded-For header'ı tek zincir olarak birleştir
+            headers[key] = f"{headers[key]}, {decoded}" if key in headers else decoded
+
+    client = scope.get("client")
+    ip = resolve_client_ip(
+        client[0] if client else None,
+        headers.get("x-forwarded-for"),
+        headers.get("x-real-ip"),
+        trusted
+    )
+    authorization = headers.get("authorization")
+    session_key = (
+        "auth:" + hashlib.sha1(authorization.encode("latin-1")).hexdigest()[:20]
+        if authorization else None
+    )
+    return ClientContext(ip, headers.get("user-agent", ""), session_key)
+
+
+def get_client_context(request) -> ClientContext:
+    """
+    Request'in client context'i
+
+    Middleware çalışmadıysa (ör. doğrudan çağrılan fonksiyonlar) hesaplanıp
+    request.state'e yazılır.
+    """
+    context = getattr(request.state, STATE_KEY, None)
+    if context is None:
+        context = build_client_context(request.scope, _default_trusted_proxies)
+        setattr(request.state, STATE_KEY, context)
+    return context
+
+
+def current_client_context() -> Optional[ClientContext]:
+    """Aktif request'in client context'i (request dışında None)"""
+    return _current_client_context.get()
+
+
+class RequestContextMiddleware:
+    """Pure ASGI middleware - client context'i scope state'ine ve contextvar'a yazar"""
+
+    def __init__(self, app, trusted_proxies: Union[str, Iterable[str]] = None):
+        self.app = app
+        self.trusted = (
+            parse_trusted_proxies(trusted_proxies)
+            if trusted_proxies is not None else _default_trusted_proxies
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        context = build_client_context(scope, self.trusted)
+        scope.setdefault("state", {})[STATE_KEY] = context
+
+        token = _current_client_context.set(context)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_client_context.reset(token)
+
+
+_default_trusted_proxies = parse_trusted_proxies(settings.TRUSTED_PROXIES)
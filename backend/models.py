@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, ForeignKey, Text, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, ForeignKey, Text, Enum, Index, false
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -12,6 +12,18 @@ def get_turkey_time():
     """Türkiye saatini döndür (UTC+3)"""
     return datetime.now(TURKEY_TZ)
 
+def isp_pending_column(ip_column: str, isp_column: str) -> Column:
+    """
+    Ertelenmiş ISP zenginleştirmesi bekleyen kayıt işareti (ip_enrichment)
+
+    Insert'te IP var ama ISP yoksa True olur; mevcut kayıtlar migration'da False
+    kalır, böylece arka plan görevi eski delil kayıtlarına bugünün ISP'sini yazmaz.
+    """
+    def default(context):
+        params = context.get_current_parameters()
+        return params.get(ip_column) is not None and params.get(isp_column) is None
+    return Column(Boolean, default=default, server_default=false(), nullable=False)
+
 class UserRole(str, enum.Enum):
     ADMIN = "admin"  # Sistem admini (tüm şirketleri yönetir)
     COMPANY_ADMIN = "company_admin"  # Şirket admini (sadece kendi şirketini yönetir)
@@ -133,6 +145,13 @@ class User(Base):
 class Mutabakat(Base):
     """Mutabakat Belgesi Modeli - VKN Bazlı (Çoklu Bayi Desteği) - Multi-Company"""
     __tablename__ = "mutabakats"
+    __table_args__ = (
+        # Şirket listeleri / raporlar: şirket + durum filtresi, tarihe göre sıralama
+        Index("ix_mutabakats_company_durum_created", "company_id", "durum", "created_at"),
+        # Dashboard ve müşteri listeleri: gönderen/alıcı + durum
+        Index("ix_mutabakats_sender_durum", "sender_id", "durum"),
+        Index("ix_mutabakats_receiver_durum", "receiver_id", "durum"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, index=True)
@@ -221,6 +240,10 @@ class MutabakatAttachment(Base):
 class Bayi(Base):
     """Bayi/Cari Kart Modeli - VKN'ye bağlı bayiler"""
     __tablename__ = "bayiler"
+    __table_args__ = (
+        # Kullanıcının bayileri / mutabakat sonrası bakiye güncellemesi
+        Index("ix_bayiler_user_bayi_kodu", "user_id", "bayi_kodu"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     bayi_kodu = Column(String(50), unique=True, index=True, nullable=False)  # Unique bayi kodu
@@ -247,6 +270,9 @@ class Bayi(Base):
 class MutabakatBayiDetay(Base):
     """Mutabakat Bayi Detay - Her mutabakat için bayi bazında bakiye detayları"""
     __tablename__ = "mutabakat_bayi_detay"
+    __table_args__ = (
+        Index("ix_mutabakat_bayi_detay_mutabakat_id", "mutabakat_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     mutabakat_id = Column(Integer, ForeignKey("mutabakats.id", ondelete="CASCADE"), nullable=False)
@@ -263,6 +289,10 @@ class MutabakatBayiDetay(Base):
 class ActivityLog(Base):
     """Aktivite Log Modeli - ISP Bilgili (Yasal Delil için) - Multi-Company"""
     __tablename__ = "activity_logs"
+    __table_args__ = (
+        # Bekleyen ISP zenginleştirmesi (farklı IP'ler)
+        Index("ix_activity_logs_isp_pending", "isp_pending", "ip_address"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=True, index=True)  # Nullable: sistem logları için
@@ -277,6 +307,7 @@ class ActivityLog(Base):
     city = Column(String(255))  # Şehir
     country = Column(String(255))  # Ülke
     organization = Column(String(255))  # ISP Organizasyonu
+    isp_pending = isp_pending_column("ip_address", "isp")
     
     created_at = Column(DateTime, default=get_turkey_time)
 
@@ -288,6 +319,9 @@ class ActivityLog(Base):
 class FailedLoginAttempt(Base):
     """Başarısız Login Denemeleri - Brute Force Koruması"""
     __tablename__ = "failed_login_attempts"
+    __table_args__ = (
+        Index("ix_failed_login_attempts_isp_pending", "isp_pending", "ip_address"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
@@ -306,6 +340,7 @@ class FailedLoginAttempt(Base):
     city = Column(String(255))
     country = Column(String(255))
     organization = Column(String(255))
+    isp_pending = isp_pending_column("ip_address", "isp")
     
     # Hata Bilgisi
     failure_reason = Column(String(500))  # Hata nedeni (wrong password, user not found, account locked, etc.)
@@ -320,6 +355,9 @@ class FailedLoginAttempt(Base):
 class KVKKConsent(Base):
     """KVKK Onay Kayıtları - Yasal Uyumluluk - Multi-Company"""
     __tablename__ = "kvkk_consents"
+    __table_args__ = (
+        Index("ix_kvkk_consents_isp_pending", "isp_pending", "ip_address"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, index=True)
@@ -343,6 +381,7 @@ class KVKKConsent(Base):
     city = Column(String(255))
     country = Column(String(255))
     organization = Column(String(255))
+    isp_pending = isp_pending_column("ip_address", "isp")
     user_agent = Column(String(500))
     
     # Onay Versiyonları (metin değişirse takip için)
@@ -361,6 +400,10 @@ class KVKKConsent(Base):
 class KVKKConsentDeletionLog(Base):
     """KVKK Onay Silme Kayıtları - Yasal Delil için Admin İşlemleri"""
     __tablename__ = "kvkk_consent_deletion_logs"
+    __table_args__ = (
+        Index("ix_kvkk_consent_deletion_logs_original_isp_pending", "original_isp_pending", "original_ip_address"),
+        Index("ix_kvkk_consent_deletion_logs_deletion_isp_pending", "deletion_isp_pending", "deletion_ip_address"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     
@@ -388,6 +431,7 @@ class KVKKConsentDeletionLog(Base):
     original_city = Column(String(255))
     original_country = Column(String(255))
     original_organization = Column(String(255))
+    original_isp_pending = isp_pending_column("original_ip_address", "original_isp")
     original_user_agent = Column(String(500))
     
     # Versiyon Bilgileri
@@ -410,6 +454,7 @@ class KVKKConsentDeletionLog(Base):
     deletion_city = Column(String(255))
     deletion_country = Column(String(255))
     deletion_organization = Column(String(255))
+    deletion_isp_pending = isp_pending_column("deletion_ip_address", "deletion_isp")
     
     deleted_at = Column(DateTime, default=get_turkey_time, nullable=False)
     
@@ -420,6 +465,9 @@ class KVKKConsentDeletionLog(Base):
 class SMSVerificationLog(Base):
     """SMS Doğrulama Logları - Yasal Delil için SMS Gönderim Kayıtları"""
     __tablename__ = "sms_verification_logs"
+    __table_args__ = (
+        Index("ix_sms_verification_logs_isp_pending", "isp_pending", "ip_address"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -438,6 +486,7 @@ class SMSVerificationLog(Base):
     city = Column(String(255))  # Şehir
     country = Column(String(255))  # Ülke
     organization = Column(String(255))  # ISP Organizasyonu
+    isp_pending = isp_pending_column("ip_address", "isp")
     user_agent = Column(String(500))  # User agent (varsa)
 
     # SMS Gönderim Durumu
@@ -523,6 +572,12 @@ class AuditLog(Base):
     Yasal gereklilikler ve güvenlik için tüm önemli işlemler loglanır.
     """
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        # Şirket bazlı audit log listesi (tarihe göre sıralı)
+        Index("ix_audit_logs_company_created", "company_id", "created_at"),
+        # Bekleyen ISP zenginleştirmesi
+        Index("ix_audit_logs_isp_pending", "isp_pending", "ip_address"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -555,6 +610,7 @@ class AuditLog(Base):
     isp = Column(String(255))  # Internet Service Provider
     city = Column(String(255))  # Şehir
     country = Column(String(255))  # Ülke
+    isp_pending = isp_pending_column("ip_address", "isp")
     
     # HTTP Request Bilgileri
     http_method = Column(String(10))  # GET, POST, PUT, DELETE
@@ -8,10 +8,13 @@ from typing import List, Optional
 from backend.database import get_db
 from backend.models import User, Company, UserRole
 from backend.auth import get_current_active_user
+from backend.utils.cache_manager import invalidate_company_cache
 from pydantic import BaseModel
 from datetime import datetime
+import logging
 
 router = APIRouter(prefix="/api/admin/companies", tags=["Admin - Company Management"])
+logger = logging.getLogger(__name__)
 
 
 # Schemas
@@ -136,13 +139,26 @@ def get_all_companies(
     # Şirketleri al (SQL Server için ORDER BY zorunlu!)
     companies = db.query(Company).order_by(Company.id).offset(skip).limit(limit).all()
     
+    # İstatistikler: şirket başına sorgu yerine sayfadaki şirketler için gruplanmış tek sorgu
+    company_ids = [company.id for company in companies]
+    user_counts = dict(
+        db.query(User.company_id, func.count(User.id))
+        .filter(User.company_id.in_(company_ids))
+        .group_by(User.company_id)
+        .all()
+    ) if company_ids else {}
+    mutabakat_counts = dict(
+        db.query(Mutabakat.company_id, func.count(Mutabakat.id))
+        .filter(Mutabakat.company_id.in_(company_ids))
+        .group_by(Mutabakat.company_id)
+        .all()
+    ) if company_ids else {}
+    
     # Her şirket için istatistik ekle
     result = []
     for company in companies:
-        # Kullanıcı sayısı
-        user_count = db.query(func.count(User.id)).filter(User.company_id == company.id).scalar()
-        # Mutabakat sayısı
-        mutabakat_count = db.query(func.count(Mutabakat.id)).filter(Mutabakat.company_id == company.id).scalar()
+        user_count = user_counts.get(company.id, 0)
+        mutabakat_count = mutabakat_counts.get(company.id, 0)
         
         company_dict = {
             "id": company.id,
@@ -281,7 +297,7 @@ def create_company(
     db.commit()
     db.refresh(new_company)
     
-    print(f"[ADMIN] Yeni şirket oluşturuldu: {new_company.company_name} (VKN: {new_company.vkn}) by {current_user.username}")
+    logger.info(f"[ADMIN] Yeni şirket oluşturuldu: {new_company.company_name} (VKN: {new_company.vkn}) by {current_user.username}")
     
     return {
         "id": new_company.id,
@@ -339,7 +355,10 @@ def update_company(
     db.commit()
     db.refresh(company)
     
-    print(f"[ADMIN] Şirket güncellendi: {company.company_name} (ID: {company.id}) by {current_user.username}")
+    # Şirket ayarları ve KVKK metinleri cache'i (utils/company_config.py)
+    invalidate_company_cache(company.id)
+    
+    logger.info(f"[ADMIN] Şirket güncellendi: {company.company_name} (ID: {company.id}) by {current_user.username}")
     
     # İstatistikler
     from sqlalchemy import func
@@ -406,8 +425,9 @@ def delete_company(
     company_name = company.company_name
     db.delete(company)
     db.commit()
+    invalidate_company_cache(company_id)
     
-    print(f"[ADMIN] Şirket silindi: {company_name} (ID: {company_id}) by {current_user.username}")
+    logger.info(f"[ADMIN] Şirket silindi: {company_name} (ID: {company_id}) by {current_user.username}")
     
     return {"message": f"Şirket '{company_name}' başarıyla silindi"}
 
@@ -4,12 +4,12 @@ Sistem loglarını görüntüleme ve filtreleme
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, func, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import desc, func, and_, or_, select
 from typing import Optional, List
 from datetime import datetime, timedelta
 
-from backend.database import get_db
+from backend.database import get_async_read_db
 from backend.models import AuditLog, AuditLogAction, User, UserRole
 from backend.auth import get_current_user
 from pydantic import BaseModel
@@ -54,12 +54,8 @@ class AuditLogStatsResponse(BaseModel):
     recent_errors: List[dict]
 
 
-@router.get("/", response_model=dict)
-async def get_audit_logs(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-    page: int = Query(1, ge=1),
-    page_size: int = Query(50, ge=1, le=100),
+def audit_log_list_query(
+    current_user: User,
     action: Optional[str] = None,
     status: Optional[str] = None,
     username: Optional[str] = None,
@@ -69,50 +65,42 @@ async def get_audit_logs(
     date_to: Optional[str] = None,
     search: Optional[str] = None
 ):
-    """
-    Audit logları listele (filtreleme ve sayfalama ile)
-    Sadece admin kullanıcılar erişebilir
-    """
-    
-    # Yetki kontrolü: Sadece admin ve company_admin
-    if current_user.role not in [UserRole.ADMIN, UserRole.COMPANY_ADMIN]:
-        raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
-    
+    """Audit log listesi sorgusu (yetki kapsamı ve filtreler, sıralama hariç)"""
     # Base query
-    query = db.query(AuditLog)
+    query = select(AuditLog)
     
     # Company admin sadece kendi şirketini görebilir
     if current_user.role == UserRole.COMPANY_ADMIN:
-        query = query.filter(AuditLog.company_id == current_user.company_id)
+        query = query.where(AuditLog.company_id == current_user.company_id)
     
     # Filtreler
     if action:
-        query = query.filter(AuditLog.action == action)
+        query = query.where(AuditLog.action == action)
     
     if status:
-        query = query.filter(AuditLog.status == status)
+        query = query.where(AuditLog.status == status)
     
     if username:
-        query = query.filter(AuditLog.username.ilike(f"%{username}%"))
+        query = query.where(AuditLog.username.ilike(f"%{username}%"))
     
     if target_model:
-        query = query.filter(AuditLog.target_model == target_model)
+        query = query.where(AuditLog.target_model == target_model)
     
     if ip_address:
-        query = query.filter(AuditLog.ip_address == ip_address)
+        query = query.where(AuditLog.ip_address == ip_address)
     
     # Tarih filtreleri
     if date_from:
         try:
             from_date = datetime.fromisoformat(date_from.replace('Z', '+00:00'))
-            query = query.filter(AuditLog.created_at >= from_date)
+            query = query.where(AuditLog.created_at >= from_date)
         except ValueError:
             pass
     
     if date_to:
         try:
             to_date = datetime.fromisoformat(date_to.replace('Z', '+00:00'))
-            query = query.filter(AuditLog.created_at <= to_date)
+            query = query.where(AuditLog.created_at <= to_date)
         except ValueError:
             pass
     
@@ -124,16 +112,54 @@ async def get_audit_logs(
             AuditLog.target_identifier.ilike(f"%{search}%"),
             AuditLog.error_message.ilike(f"%{search}%")
         )
-        query = query.filter(search_filter)
+        query = query.where(search_filter)
+    
+    return query
+
+
+def audit_log_page(query, page: int, page_size: int):
+    """Yeni kayıtlar önce, sayfalanmış"""
+    return (
+        query.order_by(desc(AuditLog.created_at))
+             .offset((page - 1) * page_size)
+             .limit(page_size)
+    )
+
+
+@router.get("/", response_model=dict)
+async def get_audit_logs(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=100),
+    action: Optional[str] = None,
+    status: Optional[str] = None,
+    username: Optional[str] = None,
+    target_model: Optional[str] = None,
+    ip_address: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    search: Optional[str] = None
+):
+    """
+    Audit logları listele (filtreleme ve sayfalama ile)
+    Sadece admin kullanıcılar erişebilir
+    """
+    
+    # Yetki kontrolü: Sadece admin ve company_admin
+    if current_user.role not in [UserRole.ADMIN, UserRole.COMPANY_ADMIN]:
+        raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
+    
+    query = audit_log_list_query(
+        current_user, action=action, status=status, username=username, target_model=target_model,
+        ip_address=ip_address, date_from=date_from, date_to=date_to, search=search
+    )
     
     # Toplam kayıt sayısı
-    total = query.count()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
     
     # Sıralama ve sayfalama
-    logs = query.order_by(desc(AuditLog.created_at))\
-               .offset((page - 1) * page_size)\
-               .limit(page_size)\
-               .all()
+    logs = (await db.scalars(audit_log_page(query, page, page_size))).all()
     
     return {
         "logs": [AuditLogResponse.from_orm(log) for log in logs],
@@ -146,7 +172,7 @@ async def get_audit_logs(
 
 @router.get("/stats", response_model=AuditLogStatsResponse)
 async def get_audit_log_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -158,44 +184,43 @@ async def get_audit_log_stats(
     if current_user.role not in [UserRole.ADMIN, UserRole.COMPANY_ADMIN]:
         raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
     
-    # Base query
-    query = db.query(AuditLog)
-    
-    # Company admin sadece kendi şirketini görebilir
+    # Base filtre - Company admin sadece kendi şirketini görebilir
+    scope = []
     if current_user.role == UserRole.COMPANY_ADMIN:
-        query = query.filter(AuditLog.company_id == current_user.company_id)
+        scope.append(AuditLog.company_id == current_user.company_id)
+    
+    def count_logs(*conditions):
+        return db.scalar(select(func.count(AuditLog.id)).where(*scope, *conditions))
     
     # Toplam log sayısı
-    total_logs = query.count()
+    total_logs = await count_logs()
     
     # Bugünkü loglar
     today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    today_logs = query.filter(AuditLog.created_at >= today).count()
+    today_logs = await count_logs(AuditLog.created_at >= today)
     
     # Başarısız işlemler
-    failed_actions = query.filter(AuditLog.status.in_(['failed', 'error'])).count()
+    failed_actions = await count_logs(AuditLog.status.in_(['failed', 'error']))
     
     # Benzersiz kullanıcı sayısı
-    unique_users = db.query(func.count(func.distinct(AuditLog.username))).scalar()
+    unique_users = await db.scalar(select(func.count(func.distinct(AuditLog.username))))
     
     # En çok yapılan işlemler (top 5)
-    top_actions_query = db.query(
-        AuditLog.action,
-        func.count(AuditLog.id).label('count')
-    )
-    
-    if current_user.role == UserRole.COMPANY_ADMIN:
-        top_actions_query = top_actions_query.filter(AuditLog.company_id == current_user.company_id)
-    
-    top_actions = top_actions_query.group_by(AuditLog.action)\
-                                   .order_by(desc('count'))\
-                                   .limit(5)\
-                                   .all()
+    top_actions = (await db.execute(
+        select(AuditLog.action, func.count(AuditLog.id).label('count'))
+        .where(*scope)
+        .group_by(AuditLog.action)
+        .order_by(desc('count'))
+        .limit(5)
+    )).all()
     
     # Son hatalar (top 5)
-    recent_errors_query = query.filter(AuditLog.status.in_(['failed', 'error']))\
-                              .order_by(desc(AuditLog.created_at))\
-                              .limit(5)
+    recent_error_logs = (await db.scalars(
+        select(AuditLog)
+        .where(*scope, AuditLog.status.in_(['failed', 'error']))
+        .order_by(desc(AuditLog.created_at))
+        .limit(5)
+    )).all()
     
     recent_errors = [
         {
@@ -204,7 +229,7 @@ async def get_audit_log_stats(
             'username': log.username,
             'created_at': log.created_at.isoformat()
         }
-        for log in recent_errors_query.all()
+        for log in recent_error_logs
     ]
     
     return {
@@ -223,7 +248,7 @@ async def get_audit_log_stats(
 @router.get("/{log_id}", response_model=AuditLogResponse)
 async def get_audit_log_detail(
     log_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -235,7 +260,7 @@ async def get_audit_log_detail(
         raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
     
     # Log kaydını bul
-    log = db.query(AuditLog).filter(AuditLog.id == log_id).first()
+    log = await db.get(AuditLog, log_id)
     
     if not log:
         raise HTTPException(status_code=404, detail="Log kaydı bulunamadı")
@@ -269,7 +294,7 @@ async def get_available_actions(
 
 @router.get("/export/csv")
 async def export_audit_logs_csv(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_user),
     date_from: Optional[str] = None,
     date_to: Optional[str] = None
@@ -287,27 +312,27 @@ async def export_audit_logs_csv(
     from fastapi.responses import StreamingResponse
     
     # Query
-    query = db.query(AuditLog)
+    query = select(AuditLog)
     
     if current_user.role == UserRole.COMPANY_ADMIN:
-        query = query.filter(AuditLog.company_id == current_user.company_id)
+        query = query.where(AuditLog.company_id == current_user.company_id)
     
     # Tarih filtreleri
     if date_from:
         try:
             from_date = datetime.fromisoformat(date_from.replace('Z', '+00:00'))
-            query = query.filter(AuditLog.created_at >= from_date)
+            query = query.where(AuditLog.created_at >= from_date)
         except ValueError:
             pass
     
     if date_to:
         try:
             to_date = datetime.fromisoformat(date_to.replace('Z', '+00:00'))
-            query = query.filter(AuditLog.created_at <= to_date)
+            query = query.where(AuditLog.created_at <= to_date)
         except ValueError:
             pass
     
-    logs = query.order_by(desc(AuditLog.created_at)).all()
+    logs = (await db.scalars(query.order_by(desc(AuditLog.created_at)))).all()
     
     # CSV oluştur
     output = StringIO()
@@ -1,9 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from datetime import timedelta
+from typing import List, Optional
 from pydantic import BaseModel
-from backend.database import get_db
+from backend.database import get_db, get_async_db
 from backend.models import User
 from backend.schemas import UserCreate, UserResponse, Token, UserUpdate, PasswordChange
 from backend.auth import (
@@ -11,14 +15,14 @@ from backend.auth import (
     verify_password,
     create_access_token,
     get_current_active_user,
+    get_current_user_model,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 from backend.logger import ActivityLogger
-from backend.middleware.rate_limiter import RateLimiter, RateLimitRules
 from backend.utils.failed_login_tracker import FailedLoginTracker
 from backend.utils.audit_logger import log_login_attempt, create_audit_log
+from backend.utils.ip_resolver import get_client_ip_info
 from backend.models import AuditLogAction
-import requests
 
 router = APIRouter(prefix="/api/auth", tags=["Kimlik Doğrulama"])
 
@@ -30,58 +34,6 @@ class CompanySelectRequest(BaseModel):
     password: str
 
 
-def get_real_ip_with_isp(request: Request) -> dict:
-    """Gerçek public IP adresini ve ISP bilgisini al (Yasal delil için)"""
-    # Önce X-Forwarded-For header'ını kontrol et (proxy/load balancer arkasında)
-    forwarded_for = request.headers.get('X-Forwarded-For')
-    if forwarded_for:
-        client_ip = forwarded_for.split(',')[0].strip()
-    elif request.headers.get('X-Real-IP'):
-        client_ip = request.headers.get('X-Real-IP')
-    else:
-        client_ip = request.client.host if request.client else "unknown"
-    
-    # Eğer localhost ise, gerçek public IP'yi al
-    if client_ip in ['127.0.0.1', 'localhost', '::1', 'unknown']:
-        try:
-            response = requests.get('https://api.ipify.org?format=json', timeout=3)
-            if response.status_code == 200:
-                client_ip = response.json().get('ip')
-                print(f"[AUTH-IP] Public IP alındı: {client_ip}")
-        except Exception as e:
-            print(f"[AUTH-IP] Public IP alınamadı: {e}")
-            client_ip = "unknown"
-    
-    # ISP ve lokasyon bilgisini al
-    ip_info = {
-        "ip": client_ip,
-        "isp": "Bilinmiyor",
-        "org": "Bilinmiyor", 
-        "city": "Bilinmiyor",
-        "country": "Bilinmiyor",
-        "region": "Bilinmiyor"
-    }
-    
-    if client_ip != "unknown":
-        try:
-            response = requests.get(f'http://ip-api.com/json/{client_ip}?fields=status,country,regionName,city,isp,org,query', timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('status') == 'success':
-                    ip_info = {
-                        "ip": data.get('query', client_ip),
-                        "isp": data.get('isp', 'Bilinmiyor'),
-                        "org": data.get('org', 'Bilinmiyor'),
-                        "city": data.get('city', 'Bilinmiyor'),
-                        "country": data.get('country', 'Bilinmiyor'),
-                        "region": data.get('regionName', 'Bilinmiyor')
-                    }
-                    print(f"[AUTH-IP] ISP: {ip_info['isp']} | Konum: {ip_info['city']}, {ip_info['country']}")
-        except Exception as e:
-            print(f"[AUTH-IP] ISP bilgisi alınamadı: {e}")
-    
-    return ip_info
-
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def register(user: UserCreate, request: Request, db: Session = Depends(get_db)):
     """Yeni kullanıcı kaydı"""
@@ -118,7 +70,7 @@ def register(user: UserCreate, request: Request, db: Session = Depends(get_db)):
     db.refresh(db_user)
     
     # Log kaydet (ISP bilgili - Yasal Delil)
-    ip_info = get_real_ip_with_isp(request)
+    ip_info = get_client_ip_info(request)
     ActivityLogger.log(
         db=db,
         action="KULLANICI_OLUSTUR",
@@ -130,49 +82,91 @@ def register(user: UserCreate, request: Request, db: Session = Depends(get_db)):
     
     return db_user
 
+def _find_valid_user(users: List[User], password: str) -> Optional[User]:
+    """Şifresi eşleşen ilk kullanıcı (bcrypt - CPU yoğun, thread pool'da çağrılır)"""
+    for user in users:
+        if verify_password(password, user.hashed_password):
+            return user
+    return None
+
+
+def _record_login_failure(
+    db: Session,
+    *,
+    username: str,
+    vkn_tckn: str,
+    user: Optional[User],
+    reason: str,
+    ip_address: str,
+    user_agent: str,
+    ip_info: dict,
+    audit_error: Optional[str] = None
+):
+    """Başarısız login kaydı (+ opsiyonel audit log) - sync session üzerinde"""
+    FailedLoginTracker.record_failed_login(
+        db=db,
+        vkn_tckn=vkn_tckn,
+        username=username,
+        user=user,
+        ip_address=ip_address,
+        user_agent=user_agent,
+        isp_info=ip_info,
+        failure_reason=reason
+    )
+    
+    if audit_error:
+        log_login_attempt(
+            db=db,
+            username=username,
+            success=False,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            error_message=audit_error,
+            user=user,
+            ip_info=ip_info
+        )
+
+
 @router.post("/login")
-@RateLimiter.limit(**RateLimitRules.LOGIN)
 async def login(
     request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Kullanıcı girişi (Multi-Company) - Failed Login Tracking ile"""
+    """
+    Kullanıcı girişi (Multi-Company) - Failed Login Tracking ile
+    
+    Async: Sorgular AsyncSession ile, bcrypt kontrolü thread pool'da yapılır;
+    mevcut sync yardımcılar (tracker, loglar) db.run_sync ile çağrılır.
+    """
     
     # IP ve ISP bilgisi al (failed login tracking için)
-    ip_info = get_real_ip_with_isp(request)
+    ip_info = get_client_ip_info(request)
     ip_address = ip_info.get("ip", "unknown")
     user_agent = request.headers.get("user-agent", "")
+    failure = dict(ip_address=ip_address, user_agent=user_agent, ip_info=ip_info)
     
     # VKN/TC ile TÜM ŞİRKETLERDEKİ kullanıcıları bul
-    users = db.query(User).filter(User.vkn_tckn == form_data.username).all()
+    users = (await db.scalars(
+        select(User).options(selectinload(User.company)).where(User.vkn_tckn == form_data.username)
+    )).all()
     
     if not users:
         # VKN/TC bulunamadıysa, username ile dene (geriye dönük uyumluluk)
-        users = db.query(User).filter(User.username == form_data.username).all()
+        users = (await db.scalars(
+            select(User).options(selectinload(User.company)).where(User.username == form_data.username)
+        )).all()
     
     if not users:
-        # Failed login kaydı (user bulunamadı)
-        FailedLoginTracker.record_failed_login(
-            db=db,
-            vkn_tckn=form_data.username,
+        # Failed login kaydı (user bulunamadı) + audit log
+        await db.run_sync(
+            _record_login_failure,
             username=form_data.username,
+            vkn_tckn=form_data.username,
             user=None,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            isp_info=ip_info,
-            failure_reason="User not found"
-        )
-        
-        # Audit log kaydı
-        log_login_attempt(
-            db=db,
-            username=form_data.username,
-            success=False,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            error_message="Kullanıcı bulunamadı",
-            ip_info=ip_info
+            reason="User not found",
+            audit_error="Kullanıcı bulunamadı",
+            **failure
         )
         
         raise HTTPException(
@@ -182,36 +176,19 @@ async def login(
         )
     
     # Şifre kontrolü (tüm şirketlerdeki kullanıcılar aynı VKN/şifreye sahip)
-    valid_user = None
-    for user in users:
-        if verify_password(form_data.password, user.hashed_password):
-            valid_user = user
-            break
+    valid_user = await run_in_threadpool(_find_valid_user, users, form_data.password)
     
     if not valid_user:
         # Failed login kaydı (şifre hatalı)
         # İlk kullanıcıyı referans al (hepsi aynı VKN)
-        FailedLoginTracker.record_failed_login(
-            db=db,
-            vkn_tckn=users[0].vkn_tckn,
-            username=users[0].username,
-            user=users[0],
-            ip_address=ip_address,
-            user_agent=user_agent,
-            isp_info=ip_info,
-            failure_reason="Wrong password"
-        )
-        
-        # Audit log kaydı
-        log_login_attempt(
-            db=db,
+        await db.run_sync(
+            _record_login_failure,
             username=users[0].username,
-            success=False,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            error_message="Şifre hatalı",
+            vkn_tckn=users[0].vkn_tckn,
             user=users[0],
-            ip_info=ip_info
+            reason="Wrong password",
+            audit_error="Şifre hatalı",
+            **failure
         )
         
         raise HTTPException(
@@ -227,15 +204,13 @@ async def login(
         remaining_minutes = int(remaining_seconds / 60)
         
         # Failed login kaydı (account locked)
-        FailedLoginTracker.record_failed_login(
-            db=db,
-            vkn_tckn=valid_user.vkn_tckn,
+        await db.run_sync(
+            _record_login_failure,
             username=valid_user.username,
+            vkn_tckn=valid_user.vkn_tckn,
             user=valid_user,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            isp_info=ip_info,
-            failure_reason=f"Account locked until {locked_until}"
+            reason=f"Account locked until {locked_until}",
+            **failure
         )
         
         raise HTTPException(
@@ -254,15 +229,13 @@ async def login(
     active_users = [u for u in users if u.is_active]
     if not active_users:
         # Failed login kaydı (inactive user)
-        FailedLoginTracker.record_failed_login(
-            db=db,
-            vkn_tckn=valid_user.vkn_tckn,
+        await db.run_sync(
+            _record_login_failure,
             username=valid_user.username,
+            vkn_tckn=valid_user.vkn_tckn,
             user=valid_user,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            isp_info=ip_info,
-            failure_reason="User inactive"
+            reason="User inactive",
+            **failure
         )
         
         raise HTTPException(
@@ -293,9 +266,6 @@ async def login(
     # DURUM 2: Kullanıcı tek şirkette kayıtlı → Direkt login
     user = active_users[0]
     
-    # Başarılı login: Failed login counter'ı sıfırla
-    FailedLoginTracker.reset_failed_login_counter(db, user)
-    
     # Token oluştur (company_id dahil)
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -306,27 +276,33 @@ async def login(
         expires_delta=access_token_expires
     )
     
-    # Log kaydet (ISP bilgili - Yasal Delil)
-    ActivityLogger.log(
-        db=db,
-        action="login",
-        description=f"Kullanici girisi yapti: {user.username} (Company: {user.company.company_name})",
-        user_id=user.id,
-        ip_info=ip_info,
-        user_agent=request.headers.get("user-agent", ""),
-        company_id=user.company_id  # Multi-company için
-    )
+    def record_success(sync_db: Session):
+        # Başarılı login: Failed login counter'ı sıfırla
+        FailedLoginTracker.reset_failed_login_counter(sync_db, user)
+        
+        # Log kaydet (ISP bilgili - Yasal Delil)
+        ActivityLogger.log(
+            db=sync_db,
+            action="login",
+            description=f"Kullanici girisi yapti: {user.username} (Company: {user.company.company_name})",
+            user_id=user.id,
+            ip_info=ip_info,
+            user_agent=user_agent,
+            company_id=user.company_id  # Multi-company için
+        )
+        
+        # Audit log kaydı (başarılı login)
+        log_login_attempt(
+            db=sync_db,
+            username=user.username,
+            success=True,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            user=user,
+            ip_info=ip_info
+        )
     
-    # Audit log kaydı (başarılı login)
-    log_login_attempt(
-        db=db,
-        username=user.username,
-        success=True,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        user=user,
-        ip_info=ip_info
-    )
+    await db.run_sync(record_success)
     
     return {
         "access_token": access_token, 
@@ -340,7 +316,6 @@ async def login(
     }
 
 @router.post("/login/select-company")
-@RateLimiter.limit(**RateLimitRules.LOGIN)
 async def login_select_company(
     request: Request,
     data: CompanySelectRequest,
@@ -349,7 +324,7 @@ async def login_select_company(
     """Kullanıcı şirket seçimi yaptıktan sonra login (Multi-Company) - Failed Login Tracking ile"""
     
     # IP ve ISP bilgisi al
-    ip_info = get_real_ip_with_isp(request)
+    ip_info = get_client_ip_info(request)
     ip_address = ip_info.get("ip", "unknown")
     user_agent = request.headers.get("user-agent", "")
     
@@ -494,9 +469,9 @@ async def login_select_company(
 @router.get("/me", response_model=UserResponse)
 def get_me(current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
     """Mevcut kullanıcı bilgilerini getir"""
-    # Şirket bilgilerini al
-    from backend.models import Company
-    company = db.query(Company).filter(Company.id == current_user.company_id).first()
+    # Şirket bilgilerini al (cache'den, KVKK metinleri olmadan)
+    from backend.utils.company_config import get_company_config
+    company = get_company_config(current_user.company_id)
     
     # Role'u string olarak döndür
     user_dict = {
@@ -528,7 +503,7 @@ def logout(
     """Kullanıcı çıkışı"""
     
     # Log kaydet (ISP bilgili - Yasal Delil)
-    ip_info = get_real_ip_with_isp(request)
+    ip_info = get_client_ip_info(request)
     ActivityLogger.log_logout(
         db,
         current_user.id,
@@ -541,7 +516,7 @@ def logout(
 def update_profile(
     profile_data: UserUpdate,
     request: Request,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user_model),
     db: Session = Depends(get_db)
 ):
     """Kullanıcı profil bilgilerini güncelle"""
@@ -583,7 +558,7 @@ def update_profile(
     db.refresh(current_user)
     
     # Log kaydet (ISP bilgili - Yasal Delil)
-    ip_info = get_real_ip_with_isp(request)
+    ip_info = get_client_ip_info(request)
     ActivityLogger.log(
         db=db,
         action="profile_updated",
@@ -599,7 +574,7 @@ def update_profile(
 def change_password(
     password_data: PasswordChange,
     request: Request,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user_model),
     db: Session = Depends(get_db)
 ):
     """Kullanıcı şifresini değiştir"""
@@ -616,7 +591,7 @@ def change_password(
     db.commit()
     
     # Log kaydet (ISP bilgili - Yasal Delil)
-    ip_info = get_real_ip_with_isp(request)
+    ip_info = get_client_ip_info(request)
     ActivityLogger.log(
         db=db,
         action="password_changed",
@@ -633,7 +608,7 @@ def complete_profile(
     phone: str,
     email: str,
     request: Request,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user_model),
     db: Session = Depends(get_db)
 ):
     """
@@ -662,7 +637,7 @@ def complete_profile(
     db.refresh(current_user)
     
     # Log kaydet (ISP bilgili - Yasal Delil)
-    ip_info = get_real_ip_with_isp(request)
+    ip_info = get_client_ip_info(request)
     ActivityLogger.log(
         db=db,
         action="profile_completed",
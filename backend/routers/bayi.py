@@ -15,6 +15,7 @@ from pathlib import Path
 import re
 import bcrypt
 import json
+import logging
 
 from backend.database import get_db
 from backend.models import User, Bayi, UserRole
@@ -25,6 +26,7 @@ router = APIRouter(
     prefix="/api/bayi",
     tags=["bayi"]
 )
+logger = logging.getLogger(__name__)
 
 # =====================
 # SCHEMAS
@@ -153,7 +155,7 @@ def get_or_create_user_by_vkn(db: Session, vkn_tckn: str, company_id: int, compa
     db.commit()
     db.refresh(user)
     
-    print(f"[BAYI] Yeni kullanici olusturuldu: VKN={vkn_tckn}, Email={temp_email}, Sifre={password} (son 6 hane)")
+    logger.info(f"[BAYI] Yeni kullanici olusturuldu: VKN={vkn_tckn}, Email={temp_email}")
     
     return user
 
@@ -354,9 +356,7 @@ def upload_excel_bayi(
         raise
     except Exception as e:
         db.rollback()
-        print(f"[HATA] Excel upload hatasi: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"[HATA] Excel upload hatasi: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Beklenmeyen hata: {str(e)[:100]}"
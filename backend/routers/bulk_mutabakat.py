@@ -2,17 +2,20 @@
 Toplu Mutabakat İşlemleri - Dino Gıda
 """
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
-from backend.database import get_db
+from backend.database import get_async_db, get_db
 from backend.models import User, Mutabakat, MutabakatItem, MutabakatDurumu, UserRole
 from backend.schemas import MutabakatResponse
 from backend.auth import get_current_active_user
 from backend.permissions import Permissions
 from backend.logger import ActivityLogger
-from backend.middleware.rate_limiter import RateLimiter, RateLimitRules
+from backend.utils.ip_resolver import get_real_ip
 from pydantic import BaseModel
 import random
 import string
@@ -30,6 +33,10 @@ def generate_mutabakat_no() -> str:
     random_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
     return f"MUT-{timestamp}-{random_str}"
 
+def _hash_default_password(password: str) -> str:
+    """Yeni kullanıcı için bcrypt hash (CPU yoğun - thread pool'da çağrılır)"""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
 @router.post("/create-multiple", response_model=List[MutabakatResponse])
 def create_bulk_mutabakat(
     request: Request,
@@ -85,7 +92,7 @@ def create_bulk_mutabakat(
             db,
             current_user.id,
             mutabakat.mutabakat_no,
-            request.client.host if request.client else "unknown"
+            get_real_ip(request)
         )
     
     return created_mutabakats
@@ -298,13 +305,121 @@ def clean_phone(phone: str) -> str:
     return phone[:11]  # Maksimum 11 karakter
 
 
+def _parse_excel_rows(fileobj):
+    """
+    Excel satırlarını doğrula ve VKN + Dönem bazında grupla (CPU yoğun - thread pool'da çağrılır)
+    
+    Returns:
+        (mutabakat_groups, hatalar)
+    """
+    # Excel dosyasını oku
+    wb = load_workbook(fileobj, data_only=True)
+    ws = wb.active
+    
+    # İlk satır başlıklar
+    rows = list(ws.iter_rows(min_row=2, values_only=True))
+    
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Excel dosyası boş veya geçersiz format"
+        )
+    
+    # Maksimum satır kontrolü
+    MAX_ROWS = 5000
+    if len(rows) > MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tek seferde maksimum {MAX_ROWS} satır yüklenebilir. Şu an {len(rows)} satır var."
+        )
+    
+    # VKN + Dönem bazında bayileri grupla
+    # Key: (vkn, donem_baslangic, donem_bitis, aciklama)
+    # Value: [(bayi_kodu, bakiye), ...]
+    mutabakat_groups = {}
+    hatalar = []
+    
+    for row_num, row in enumerate(rows, start=2):
+        try:
+            # Boş satırı atla
+            if not any(row):
+                continue
+            
+            # Verileri al (Yeni format: 6 sütun)
+            vergi_no = str(row[0]).strip() if row[0] else None  # VKN/TC
+            bayi_kodu = str(row[1]).strip() if row[1] else None  # Bayi Kodu
+            bakiye_str = str(row[2]).strip() if row[2] else "0"  # Bakiye
+            donem_baslangic_str = str(row[3]).strip() if len(row) > 3 and row[3] else None  # Dönem Başlangıç
+            donem_bitis_str = str(row[4]).strip() if len(row) > 4 and row[4] else None  # Dönem Bitiş
+            aciklama = str(row[5]).strip() if len(row) > 5 and row[5] else None  # Açıklama
+            
+            # Zorunlu alan kontrolü
+            if not vergi_no:
+                hatalar.append({
+                    "satir": row_num,
+                    "hata": "VKN/TC zorunludur"
+                })
+                continue
+            
+            if not bayi_kodu:
+                hatalar.append({
+                    "satir": row_num,
+                    "hata": f"Bayi Kodu zorunludur (VKN: {vergi_no})"
+                })
+                continue
+            
+            if not donem_baslangic_str or not donem_bitis_str:
+                hatalar.append({
+                    "satir": row_num,
+                    "hata": f"Dönem tarihleri zorunludur (VKN: {vergi_no})"
+                })
+                continue
+            
+            # Bakiyeyi parse et
+            try:
+                bakiye = float(bakiye_str)
+            except ValueError:
+                hatalar.append({
+                    "satir": row_num,
+                    "hata": f"Geçersiz bakiye formatı: {bakiye_str} (VKN: {vergi_no})"
+                })
+                continue
+            
+            # Tarihleri parse et
+            donem_baslangic_dt = parse_turkish_date(donem_baslangic_str)
+            donem_bitis_dt = parse_turkish_date(donem_bitis_str)
+            
+            if not donem_baslangic_dt or not donem_bitis_dt:
+                hatalar.append({
+                    "satir": row_num,
+                    "hata": f"Geçersiz tarih formatı (GG.AA.YYYY kullanın) - VKN: {vergi_no}"
+                })
+                continue
+            
+            # VKN + Dönem bazında grupla
+            # Key: (vkn, donem_baslangic, donem_bitis, aciklama)
+            group_key = (vergi_no, donem_baslangic_dt, donem_bitis_dt, aciklama or "")
+            
+            if group_key not in mutabakat_groups:
+                mutabakat_groups[group_key] = []
+            
+            mutabakat_groups[group_key].append((bayi_kodu, bakiye))
+            
+        except Exception as e:
+            hatalar.append({
+                "satir": row_num,
+                "hata": f"Beklenmeyen hata: {str(e)}"
+            })
+    
+    return mutabakat_groups, hatalar
+
+
 @router.post("/upload-excel", response_model=ExcelUploadResult)
-@RateLimiter.limit(**RateLimitRules.EXCEL_UPLOAD)
 async def upload_excel_mutabakat(
     request: Request,
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Excel dosyasından toplu mutabakat yükle (Multi-Company - Bayi Bazlı)
@@ -344,104 +459,8 @@ async def upload_excel_mutabakat(
         )
     
     try:
-        # Excel dosyasını oku
-        wb = load_workbook(file.file, data_only=True)
-        ws = wb.active
-        
-        # İlk satır başlıklar
-        rows = list(ws.iter_rows(min_row=2, values_only=True))
-        
-        if not rows:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Excel dosyası boş veya geçersiz format"
-            )
-        
-        # Maksimum satır kontrolü
-        MAX_ROWS = 5000
-        if len(rows) > MAX_ROWS:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Tek seferde maksimum {MAX_ROWS} satır yüklenebilir. Şu an {len(rows)} satır var."
-            )
-        
-        # VKN + Dönem bazında bayileri grupla
-        # Key: (vkn, donem_baslangic, donem_bitis, aciklama)
-        # Value: [(bayi_kodu, bakiye), ...]
-        mutabakat_groups = {}
-        hatalar = []
-        
-        for row_num, row in enumerate(rows, start=2):
-            try:
-                # Boş satırı atla
-                if not any(row):
-                    continue
-                
-                # Verileri al (Yeni format: 6 sütun)
-                vergi_no = str(row[0]).strip() if row[0] else None  # VKN/TC
-                bayi_kodu = str(row[1]).strip() if row[1] else None  # Bayi Kodu
-                bakiye_str = str(row[2]).strip() if row[2] else "0"  # Bakiye
-                donem_baslangic_str = str(row[3]).strip() if len(row) > 3 and row[3] else None  # Dönem Başlangıç
-                donem_bitis_str = str(row[4]).strip() if len(row) > 4 and row[4] else None  # Dönem Bitiş
-                aciklama = str(row[5]).strip() if len(row) > 5 and row[5] else None  # Açıklama
-                
-                # Zorunlu alan kontrolü
-                if not vergi_no:
-                    hatalar.append({
-                        "satir": row_num,
-                        "hata": "VKN/TC zorunludur"
-                    })
-                    continue
-                
-                if not bayi_kodu:
-                    hatalar.append({
-                        "satir": row_num,
-                        "hata": f"Bayi Kodu zorunludur (VKN: {vergi_no})"
-                    })
-                    continue
-                
-                if not donem_baslangic_str or not donem_bitis_str:
-                    hatalar.append({
-                        "satir": row_num,
-                        "hata": f"Dönem tarihleri zorunludur (VKN: {vergi_no})"
-                    })
-                    continue
-                
-                # Bakiyeyi parse et
-                try:
-                    bakiye = float(bakiye_str)
-                except ValueError:
-                    hatalar.append({
-                        "satir": row_num,
-                        "hata": f"Geçersiz bakiye formatı: {bakiye_str} (VKN: {vergi_no})"
-                    })
-                    continue
-                
-                # Tarihleri parse et
-                donem_baslangic_dt = parse_turkish_date(donem_baslangic_str)
-                donem_bitis_dt = parse_turkish_date(donem_bitis_str)
-                
-                if not donem_baslangic_dt or not donem_bitis_dt:
-                    hatalar.append({
-                        "satir": row_num,
-                        "hata": f"Geçersiz tarih formatı (GG.AA.YYYY kullanın) - VKN: {vergi_no}"
-                    })
-                    continue
-                
-                # VKN + Dönem bazında grupla
-                # Key: (vkn, donem_baslangic, donem_bitis, aciklama)
-                group_key = (vergi_no, donem_baslangic_dt, donem_bitis_dt, aciklama or "")
-                
-                if group_key not in mutabakat_groups:
-                    mutabakat_groups[group_key] = []
-                
-                mutabakat_groups[group_key].append((bayi_kodu, bakiye))
-                
-            except Exception as e:
-                hatalar.append({
-                    "satir": row_num,
-                    "hata": f"Beklenmeyen hata: {str(e)}"
-                })
+        # Excel dosyasını oku (openpyxl senkron - event loop'u bloklamasın)
+        mutabakat_groups, hatalar = await run_in_threadpool(_parse_excel_rows, file.file)
         
         # Şimdi VKN + Dönem bazında mutabakatları oluştur
         from backend.models import Bayi, MutabakatBayiDetay
@@ -456,10 +475,12 @@ async def upload_excel_mutabakat(
             vergi_no, donem_baslangic_dt, donem_bitis_dt, aciklama = group_key
             try:
                 # Kullanıcı var mı kontrol et
-                receiver = db.query(User).filter(
-                    User.vkn_tckn == vergi_no,
-                    User.company_id == current_user.company_id
-                ).first()
+                receiver = await db.scalar(
+                    select(User).where(
+                        User.vkn_tckn == vergi_no,
+                        User.company_id == current_user.company_id
+                    ).limit(1)
+                )
                 
                 # Yoksa oluştur
                 if not receiver:
@@ -472,7 +493,7 @@ async def upload_excel_mutabakat(
                         continue
                     
                     default_password = vergi_no[-6:]
-                    hashed_pwd = bcrypt.hashpw(default_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+                    hashed_pwd = await run_in_threadpool(_hash_default_password, default_password)
                     
                     receiver = User(
                         company_id=current_user.company_id,
@@ -489,7 +510,7 @@ async def upload_excel_mutabakat(
                         created_at=datetime.now(turkey_tz)
                     )
                     db.add(receiver)
-                    db.flush()
+                    await db.flush()
                 
                 # Toplam borç ve alacak hesapla
                 toplam_borc = 0.0
@@ -520,7 +541,7 @@ async def upload_excel_mutabakat(
                 )
                 
                 db.add(mutabakat)
-                db.flush()
+                await db.flush()
                 
                 # Her bayi için detay oluştur ve bayi tablosunu güncelle
                 for bayi_kodu, bakiye in bayiler:
@@ -535,10 +556,12 @@ async def upload_excel_mutabakat(
                     db.add(detay)
                     
                     # Bayi tablosunu güncelle (bakiye ve son_mutabakat_tarihi)
-                    bayi = db.query(Bayi).filter(
-                        Bayi.bayi_kodu == bayi_kodu,
-                        Bayi.user_id == receiver.id
-                    ).first()
+                    bayi = await db.scalar(
+                        select(Bayi).where(
+                            Bayi.bayi_kodu == bayi_kodu,
+                            Bayi.user_id == receiver.id
+                        ).limit(1)
+                    )
                     
                     if bayi:
                         bayi.bakiye = bakiye
@@ -546,11 +569,11 @@ async def upload_excel_mutabakat(
                         bayi.updated_at = datetime.now(turkey_tz)
                 
                 # Log
-                ActivityLogger.log_mutabakat_created(
-                    db,
+                await db.run_sync(
+                    ActivityLogger.log_mutabakat_created,
                     current_user.id,
                     mutabakat.mutabakat_no,
-                    request.client.host if request.client else "unknown"
+                    get_real_ip(request)
                 )
                 
                 olusturulan_mutabakatlar.append({
@@ -574,7 +597,7 @@ async def upload_excel_mutabakat(
                 basarisiz += 1
         
         # Tüm işlemler başarılı ise commit et
-        db.commit()
+        await db.commit()
         
         return ExcelUploadResult(
             toplam=len(mutabakat_groups),  # Toplam mutabakat sayısı (VKN + Dönem kombinasyonları)
@@ -587,7 +610,7 @@ async def upload_excel_mutabakat(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Excel işleme hatası: {str(e)}"
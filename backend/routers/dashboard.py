@@ -1,81 +1,71 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
-from backend.database import get_db
+from sqlalchemy import func, or_, select
+from backend.config import settings
+from backend.database import async_read_session
 from backend.models import User, Mutabakat, MutabakatDurumu
 from backend.schemas import DashboardStats
 from backend.auth import get_current_active_user
-from backend.middleware.rate_limiter import RateLimiter, RateLimitRules
-from backend.utils.cache_manager import cache_manager
+from backend.utils.cache_manager import async_cached
 
 router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
 
-@router.get("/stats", response_model=DashboardStats)
-@RateLimiter.limit(**RateLimitRules.DASHBOARD)
-async def get_dashboard_stats(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-):
-    """Dashboard istatistiklerini getir (cached)"""
-    
-    # Cache kontrolü (2 dakika TTL)
-    cache_key = f"cache:dashboard_stats:{current_user.id}"
-    cached_stats = cache_manager.get(cache_key)
-    
-    if cached_stats:
-        return DashboardStats(**cached_stats)
-    
-    # Cache miss - hesapla
-    # Kullanıcının tüm mutabakatları
-    base_query = db.query(Mutabakat).filter(
-        or_(
-            Mutabakat.sender_id == current_user.id,
-            Mutabakat.receiver_id == current_user.id
+def dashboard_stats_query(user_id: int):
+    """Kullanıcının gönderdiği/aldığı mutabakatlar - durum bazında sayı ve toplamlar"""
+    return (
+        select(
+            Mutabakat.durum,
+            func.count(Mutabakat.id),
+            func.coalesce(func.sum(Mutabakat.toplam_borc), 0),
+            func.coalesce(func.sum(Mutabakat.toplam_alacak), 0)
+        )
+        .where(
+            or_(
+                Mutabakat.sender_id == user_id,
+                Mutabakat.receiver_id == user_id
+            )
         )
+        .group_by(Mutabakat.durum)
     )
+
+@async_cached(
+    "dashboard_stats",
+    ttl=settings.CACHE_TTL_DASHBOARD,
+    stale_ttl=settings.CACHE_TTL_DASHBOARD_STALE,
+    namespaces=lambda user_id: [f"dashboard:user:{user_id}"],
+    distributed_lock=True
+)
+async def compute_dashboard_stats(user_id: int) -> dict:
+    """
+    Dashboard istatistiklerini hesapla (cached, worker'lar arası stampede korumalı)
     
-    # Toplam mutabakat sayısı
-    toplam_mutabakat = base_query.count()
-    
-    # Bekleyen mutabakatlar (gönderilen)
-    bekleyen_mutabakat = base_query.filter(
-        Mutabakat.durum == MutabakatDurumu.GONDERILDI
-    ).count()
+    Arka planda yenilenebildiği için kendi okuma session'ını açar.
+    """
+    async with async_read_session() as db:
+        # Kullanıcının tüm mutabakatları - durum bazında tek sorguda say ve topla
+        result = await db.execute(dashboard_stats_query(user_id))
+        by_status = {durum: (count, borc, alacak) for durum, count, borc, alacak in result.all()}
     
-    # Onaylanan mutabakatlar
-    onaylanan_mutabakat = base_query.filter(
-        Mutabakat.durum == MutabakatDurumu.ONAYLANDI
-    ).count()
+    # Toplam mutabakat sayısı
+    toplam_mutabakat = sum(count for count, _, _ in by_status.values())
     
-    # Reddedilen mutabakatlar
-    reddedilen_mutabakat = base_query.filter(
-        Mutabakat.durum == MutabakatDurumu.REDDEDILDI
-    ).count()
+    # Bekleyen (gönderilen), onaylanan ve reddedilen mutabakatlar
+    bekleyen_mutabakat = by_status.get(MutabakatDurumu.GONDERILDI, (0, 0, 0))[0]
+    onaylanan_mutabakat, toplam_borc, toplam_alacak = by_status.get(MutabakatDurumu.ONAYLANDI, (0, 0.0, 0.0))
+    reddedilen_mutabakat = by_status.get(MutabakatDurumu.REDDEDILDI, (0, 0, 0))[0]
     
     # Toplam borç ve alacak (onaylanan mutabakatlardan)
-    onaylanan_mutabakats = base_query.filter(
-        Mutabakat.durum == MutabakatDurumu.ONAYLANDI
-    ).all()
-    
-    # Eğer onaylanan mutabakat varsa topla, yoksa 0
-    if onaylanan_mutabakats:
-        toplam_borc = sum(m.toplam_borc for m in onaylanan_mutabakats)
-        toplam_alacak = sum(m.toplam_alacak for m in onaylanan_mutabakats)
-    else:
-        toplam_borc = 0.0
-        toplam_alacak = 0.0
-    
-    stats = DashboardStats(
+    return DashboardStats(
         toplam_mutabakat=toplam_mutabakat,
         bekleyen_mutabakat=bekleyen_mutabakat,
         onaylanan_mutabakat=onaylanan_mutabakat,
         reddedilen_mutabakat=reddedilen_mutabakat,
-        toplam_borc=toplam_borc,
-        toplam_alacak=toplam_alacak
-    )
-    
-    # Cache'e kaydet (2 dakika TTL)
-    cache_manager.set(cache_key, stats.dict(), ttl=120)
-    
-    return stats
+        toplam_borc=float(toplam_borc or 0.0),
+        toplam_alacak=float(toplam_alacak or 0.0)
+    ).dict()
 
+@router.get("/stats", response_model=DashboardStats)
+async def get_dashboard_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    """Dashboard istatistiklerini getir (cached)"""
+    return DashboardStats(**await compute_dashboard_stats(current_user.id))
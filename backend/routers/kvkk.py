@@ -5,22 +5,22 @@ Kullanıcı onayları ve KVKK metinleri
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 from backend.database import get_db
-from backend.models import User, KVKKConsent, UserRole, KVKKConsentDeletionLog, Company
+from backend.models import User, KVKKConsent, UserRole, KVKKConsentDeletionLog
 from backend.schemas import KVKKConsentCreate, KVKKConsentResponse, KVKKTextsResponse
 from backend.auth import get_current_active_user
 from datetime import datetime
+import logging
 import pytz
-import requests
+from backend.utils.ip_resolver import get_client_ip_info
+from backend.utils.company_config import get_company_kvkk_texts
 
-# KVKK metinlerini import et
+# KVKK metin versiyonları (metinlerin kendisi utils/company_config.py'de)
 from backend.kvkk_constants import (
-    KVKK_POLICY_TEXT, KVKK_POLICY_TITLE, KVKK_POLICY_SUMMARY, KVKK_POLICY_VERSION,
-    CUSTOMER_NOTICE_TEXT, CUSTOMER_NOTICE_TITLE, CUSTOMER_NOTICE_SUMMARY, CUSTOMER_NOTICE_VERSION,
-    DATA_RETENTION_POLICY_TEXT, DATA_RETENTION_TITLE, DATA_RETENTION_SUMMARY, DATA_RETENTION_VERSION,
-    SYSTEM_CONSENT_TEXT, SYSTEM_CONSENT_TITLE, SYSTEM_CONSENT_SUMMARY, SYSTEM_CONSENT_VERSION
+    KVKK_POLICY_VERSION, CUSTOMER_NOTICE_VERSION, DATA_RETENTION_VERSION, SYSTEM_CONSENT_VERSION
 )
 
 router = APIRouter(prefix="/api/kvkk", tags=["KVKK"])
+logger = logging.getLogger(__name__)
 
 # Türkiye saat dilimi
 TURKEY_TZ = pytz.timezone('Europe/Istanbul')
@@ -29,94 +29,14 @@ def get_turkey_time():
     """Türkiye saatini döndür (UTC+3)"""
     return datetime.now(TURKEY_TZ)
 
-def get_real_ip_with_isp(request: Request) -> dict:
-    """Gerçek public IP adresini ve ISP bilgisini al (Yasal delil için)"""
-    # Önce X-Forwarded-For header'ını kontrol et
-    forwarded_for = request.headers.get('X-Forwarded-For')
-    if forwarded_for:
-        client_ip = forwarded_for.split(',')[0].strip()
-    elif request.headers.get('X-Real-IP'):
-        client_ip = request.headers.get('X-Real-IP')
-    else:
-        client_ip = request.client.host if request.client else "unknown"
-    
-    # Localhost ise gerçek public IP'yi al
-    if client_ip in ['127.0.0.1', 'localhost', '::1']:
-        try:
-            response = requests.get('https://api.ipify.org?format=json', timeout=3)
-            if response.status_code == 200:
-                public_ip = response.json().get('ip')
-                print(f"[IP] Public IP alındı: {public_ip}")
-                client_ip = public_ip
-        except Exception as e:
-            print(f"[IP] Public IP alınamadı: {e}")
-    
-    # ISP bilgisini al
-    isp_info = {
-        'ip': client_ip,
-        'isp': None,
-        'city': None,
-        'country': None,
-        'org': None
-    }
-    
-    try:
-        response = requests.get(f'http://ip-api.com/json/{client_ip}', timeout=3)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get('status') == 'success':
-                isp_info['isp'] = data.get('isp')
-                isp_info['city'] = data.get('city')
-                isp_info['country'] = data.get('country')
-                isp_info['org'] = data.get('org')
-                
-                print(f"[IP] IP Adresi: {isp_info['ip']}")
-                print(f"[IP] ISP: {isp_info['isp']}")
-                print(f"[IP] Şehir: {isp_info['city']}, {data.get('regionName')}")
-                print(f"[IP] Ülke: {isp_info['country']}")
-                print(f"[IP] Organizasyon: {data.get('org')}")
-    except Exception as e:
-        print(f"[IP] ISP bilgisi alınamadı: {e}")
-    
-    return isp_info
-
 @router.get("/texts", response_model=KVKKTextsResponse)
 def get_kvkk_texts(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user)
 ):
     """KVKK metinlerini döndür (Multi-Company: Her şirket kendi metinleri)"""
     
-    # Kullanıcının şirketini al
-    company = db.query(Company).filter(Company.id == current_user.company_id).first()
-    
-    # Company'den metinleri al, yoksa fallback to constants
-    return {
-        "kvkk_policy": {
-            "title": KVKK_POLICY_TITLE,
-            "summary": KVKK_POLICY_SUMMARY,
-            "content": company.kvkk_policy_text if company and company.kvkk_policy_text else KVKK_POLICY_TEXT,
-            "version": company.kvkk_policy_version if company and company.kvkk_policy_version else KVKK_POLICY_VERSION
-        },
-        "customer_notice": {
-            "title": CUSTOMER_NOTICE_TITLE,
-            "summary": CUSTOMER_NOTICE_SUMMARY,
-            "content": company.customer_notice_text if company and company.customer_notice_text else CUSTOMER_NOTICE_TEXT,
-            "version": company.customer_notice_version if company and company.customer_notice_version else CUSTOMER_NOTICE_VERSION
-        },
-        "data_retention": {
-            "title": DATA_RETENTION_TITLE,
-            "summary": DATA_RETENTION_SUMMARY,
-            "content": company.data_retention_policy_text if company and company.data_retention_policy_text else DATA_RETENTION_POLICY_TEXT,
-            "version": company.data_retention_version if company and company.data_retention_version else DATA_RETENTION_VERSION
-        },
-        "system_consent": {
-            "title": SYSTEM_CONSENT_TITLE,
-            "summary": SYSTEM_CONSENT_SUMMARY,
-            "content": company.system_consent_text if company and company.system_consent_text else SYSTEM_CONSENT_TEXT,
-            "version": company.system_consent_version if company and company.system_consent_version else SYSTEM_CONSENT_VERSION
-        }
-    }
+    # Şirket metinleri cache'den; tanımlanmayanlar için sabit metinler
+    return get_company_kvkk_texts(current_user.company_id)
 
 @router.get("/consent/status", response_model=KVKKConsentResponse)
 def get_kvkk_consent_status(
@@ -146,7 +66,7 @@ def create_or_update_kvkk_consent(
     """KVKK onaylarını kaydet veya güncelle (Multi-Company)"""
     
     # IP ve ISP bilgisini al
-    ip_info = get_real_ip_with_isp(request)
+    ip_info = get_client_ip_info(request)
     user_agent = request.headers.get('user-agent', '')
     
     # Mevcut onay kaydını kontrol et (SADECE KENDİ ŞİRKETİNDE)
@@ -185,6 +105,7 @@ def create_or_update_kvkk_consent(
         consent.city = ip_info['city']
         consent.country = ip_info['country']
         consent.organization = ip_info['org']
+        consent.isp_pending = ip_info['ip'] is not None and ip_info['isp'] is None  # Ertelenmiş zenginleştirme
         consent.user_agent = user_agent
         
     else:
@@ -217,12 +138,14 @@ def create_or_update_kvkk_consent(
     db.refresh(consent)
     
     # Log kaydet
-    print(f"[KVKK] User {current_user.id} ({current_user.username}) onay verdi:")
-    print(f"  - KVKK Politikası: {consent.kvkk_policy_accepted}")
-    print(f"  - Müşteri Aydınlatma: {consent.customer_notice_accepted}")
-    print(f"  - Veri Saklama: {consent.data_retention_accepted}")
-    print(f"  - Sistem Onayı: {consent.system_consent_accepted}")
-    print(f"  - IP: {ip_info['ip']} ({ip_info['isp']})")
+    logger.info(
+        f"[KVKK] User {current_user.id} ({current_user.username}) onay verdi: "
+        f"KVKK Politikası={consent.kvkk_policy_accepted}, "
+        f"Müşteri Aydınlatma={consent.customer_notice_accepted}, "
+        f"Veri Saklama={consent.data_retention_accepted}, "
+        f"Sistem Onayı={consent.system_consent_accepted}, "
+        f"IP={ip_info['ip']} ({ip_info['isp']})"
+    )
     
     return consent
 
@@ -344,7 +267,7 @@ def delete_user_kvkk_consent(
         )
     
     # Silme işleminin IP ve ISP bilgilerini al
-    deletion_ip_info = get_real_ip_with_isp(request)
+    deletion_ip_info = get_client_ip_info(request)
     
     # Silinen onayı log tablosuna kaydet (Yasal delil)
     deletion_log = KVKKConsentDeletionLog(
@@ -371,6 +294,7 @@ def delete_user_kvkk_consent(
         original_city=consent.city,
         original_country=consent.country,
         original_organization=consent.organization,
+        original_isp_pending=consent.isp_pending,  # Onay zenginleştirme bekliyorsa snapshot da doldurulur
         original_user_agent=consent.user_agent,
         
         # Versiyon bilgileri
@@ -401,14 +325,13 @@ def delete_user_kvkk_consent(
     db.commit()
     
     # Console log kaydet
-    print(f"\n[KVKK ADMIN] ========================================")
-    print(f"[KVKK ADMIN] KVKK Onayı Silindi (Yasal Delil Kaydedildi)")
-    print(f"[KVKK ADMIN] ========================================")
-    print(f"[KVKK ADMIN] Silinen Kullanıcı: {user.username} (ID: {user_id})")
-    print(f"[KVKK ADMIN] Silen Admin: {current_user.username} (ID: {current_user.id})")
-    print(f"[KVKK ADMIN] Admin IP: {deletion_ip_info['ip']} ({deletion_ip_info['isp']})")
-    print(f"[KVKK ADMIN] Log ID: {deletion_log.id}")
-    print(f"[KVKK ADMIN] ========================================\n")
+    logger.warning(
+        f"[KVKK ADMIN] KVKK Onayı Silindi (Yasal Delil Kaydedildi): "
+        f"Silinen Kullanıcı: {user.username} (ID: {user_id}), "
+        f"Silen Admin: {current_user.username} (ID: {current_user.id}), "
+        f"Admin IP: {deletion_ip_info['ip']} ({deletion_ip_info['isp']}), "
+        f"Log ID: {deletion_log.id}"
+    )
     
     return {
         "message": "KVKK onayları başarıyla silindi. Kullanıcı tekrar onay vermek zorunda kalacak.",
@@ -3,10 +3,11 @@ Yasal Raporlar Router
 Resmi makamlar için detaylı mutabakat ve kullanıcı raporları
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
-from backend.database import get_db
+from backend.database import get_db, get_read_db
 from backend.models import (
     User, Mutabakat, MutabakatItem, ActivityLog, 
     KVKKConsent, KVKKConsentDeletionLog, UserRole, Company
@@ -16,80 +17,23 @@ from backend.utils.legal_report_pdf import LegalReportPDFGenerator, generate_leg
 from backend.utils.pdf_signer import pdf_signer
 from backend.utils.pdf_permissions import apply_pdf_permissions
 from backend.logger import ActivityLogger
+from backend.utils.ip_resolver import get_client_ip_info
 from datetime import datetime
 from typing import Optional
+import logging
 import os
 from pathlib import Path
 import hashlib
-import requests
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
 
 router = APIRouter(prefix="/api/reports", tags=["Legal Reports"])
+logger = logging.getLogger(__name__)
 
 
-def get_real_ip_with_isp(request: Request) -> dict:
-    """Gerçek public IP adresini ve ISP bilgisini al (Yasal delil için)"""
-    # Önce X-Forwarded-For header'ını kontrol et (proxy/load balancer arkasında)
-    forwarded_for = request.headers.get('X-Forwarded-For')
-    if forwarded_for:
-        # İlk IP gerçek client IP'sidir
-        client_ip = forwarded_for.split(',')[0].strip()
-    elif request.headers.get('X-Real-IP'):
-        client_ip = request.headers.get('X-Real-IP')
-    else:
-        # Client IP'yi al
-        client_ip = request.client.host if request.client else "unknown"
-    
-    # Eğer localhost ise, gerçek public IP'yi al
-    if client_ip in ['127.0.0.1', 'localhost', '::1', 'unknown']:
-        try:
-            response = requests.get('https://api.ipify.org?format=json', timeout=3)
-            if response.status_code == 200:
-                client_ip = response.json().get('ip')
-                print(f"[IP] Public IP alındı: {client_ip}")
-        except Exception as e:
-            print(f"[IP] Public IP alınamadı: {e}")
-            client_ip = "unknown"
-    
-    # ISP ve lokasyon bilgisini al (ip-api.com - ücretsiz, yasal delil için)
-    ip_info = {
-        "ip": client_ip,
-        "isp": "Bilinmiyor",
-        "org": "Bilinmiyor", 
-        "city": "Bilinmiyor",
-        "country": "Bilinmiyor",
-        "region": "Bilinmiyor"
-    }
-    
-    if client_ip != "unknown":
-        try:
-            # ip-api.com ücretsiz ve ISP bilgisi veriyor
-            response = requests.get(f'http://ip-api.com/json/{client_ip}?fields=status,country,regionName,city,isp,org,query', timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('status') == 'success':
-                    ip_info = {
-                        "ip": data.get('query', client_ip),
-                        "isp": data.get('isp', 'Bilinmiyor'),
-                        "org": data.get('org', 'Bilinmiyor'),
-                        "city": data.get('city', 'Bilinmiyor'),
-                        "country": data.get('country', 'Bilinmiyor'),
-                        "region": data.get('regionName', 'Bilinmiyor')
-                    }
-                    print(f"[IP] IP Adresi: {ip_info['ip']}")
-                    print(f"[IP] ISP: {ip_info['isp']}")
-                    print(f"[IP] Konum: {ip_info['city']}, {ip_info['country']}")
-        except Exception as e:
-            print(f"[IP] ISP bilgisi alınamadı: {e}")
-    
-    return ip_info
-
 @router.get("/legal/search")
 def search_legal_report(
     identifier: str,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Yasal Rapor Arama - VKN veya Mutabakat Numarası ile (Multi-Company)
@@ -207,7 +151,7 @@ def search_legal_report(
 def get_legal_mutabakat_report(
     mutabakat_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Belirli bir mutabakat için detaylı yasal rapor (Multi-Company)
@@ -384,12 +328,10 @@ def get_legal_mutabakat_report(
     }
     
     # Console log
-    print(f"\n[YASAL RAPOR] ========================================")
-    print(f"[YASAL RAPOR] Yasal Rapor Oluşturuldu")
-    print(f"[YASAL RAPOR] Mutabakat No: {mutabakat.mutabakat_no}")
-    print(f"[YASAL RAPOR] Raporu Oluşturan: {current_user.username}")
-    print(f"[YASAL RAPOR] Toplam Log Sayısı: {len(activity_logs)}")
-    print(f"[YASAL RAPOR] ========================================\n")
+    logger.info(
+        f"[YASAL RAPOR] Yasal Rapor Oluşturuldu: Mutabakat No: {mutabakat.mutabakat_no}, "
+        f"Raporu Oluşturan: {current_user.username}, Toplam Log Sayısı: {len(activity_logs)}"
+    )
     
     return report
 
@@ -397,7 +339,7 @@ def get_legal_mutabakat_report(
 def get_legal_user_report(
     user_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Belirli bir kullanıcı için detaylı yasal rapor (Multi-Company)
@@ -557,13 +499,11 @@ def get_legal_user_report(
     }
     
     # Console log
-    print(f"\n[YASAL RAPOR] ========================================")
-    print(f"[YASAL RAPOR] Kullanıcı Yasal Rapor Oluşturuldu")
-    print(f"[YASAL RAPOR] Kullanıcı: {user.username} ({user.vkn_tckn})")
-    print(f"[YASAL RAPOR] Raporu Oluşturan: {current_user.username}")
-    print(f"[YASAL RAPOR] Toplam Mutabakat: {len(mutabakats)}")
-    print(f"[YASAL RAPOR] Toplam Log: {len(activity_logs)}")
-    print(f"[YASAL RAPOR] ========================================\n")
+    logger.info(
+        f"[YASAL RAPOR] Kullanıcı Yasal Rapor Oluşturuldu: Kullanıcı: {user.username} ({user.vkn_tckn}), "
+        f"Raporu Oluşturan: {current_user.username}, Toplam Mutabakat: {len(mutabakats)}, "
+        f"Toplam Log: {len(activity_logs)}"
+    )
     
     return report
 
@@ -573,14 +513,14 @@ async def download_legal_mutabakat_pdf(
     mutabakat_id: int,
     request: Request,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db),
+    write_db: Session = Depends(get_db)  # Activity log kaydı primary'ye
 ):
     """
     Mutabakat Yasal Raporu PDF İndir (Multi-Company)
     Dijital imzalı, şifreli, hash'lenmiş PDF oluşturur
     """
-    print(f"\n[YASAL RAPOR PDF] PDF indirme istegi alindi - Mutabakat ID: {mutabakat_id}")
-    print(f"[YASAL RAPOR PDF] Admin: {current_user.username}")
+    logger.info(f"[YASAL RAPOR PDF] PDF indirme istegi alindi - Mutabakat ID: {mutabakat_id}, Admin: {current_user.username}")
     
     # Admin kontrolü
     if current_user.role not in [UserRole.ADMIN, UserRole.COMPANY_ADMIN]:
@@ -668,38 +608,29 @@ async def download_legal_mutabakat_pdf(
         # Dijital imza ekle (şirket sertifikası ile - thread pool'da çalıştır)
         signed_pdf_path = str(temp_pdf_path)
         try:
-            print(f"[YASAL RAPOR PDF] Dijital imza ekleniyor...")
-            print(f"[YASAL RAPOR PDF] Şirket: {company.company_name}")
-            
-            # Thread pool'da senkron fonksiyonu çalıştır
-            loop = asyncio.get_event_loop()
+            logger.debug(f"[YASAL RAPOR PDF] Dijital imza ekleniyor: {company.company_name}")
             
+            # Thread pool'da senkron fonksiyonu çalıştır (context kopyalanır, pdf_sign süresi kaydedilir)
             # Şirket sertifikası varsa kullan
             if company.certificate_path:
-                print(f"[YASAL RAPOR PDF] Şirket sertifikası kullanılıyor: {company.certificate_path}")
-                signed_pdf_path = await loop.run_in_executor(
-                    None,
-                    lambda: pdf_signer.sign_pdf(
-                        str(temp_pdf_path),
-                        company_name=company.full_company_name or company.company_name,
-                        cert_path=company.certificate_path,
-                        cert_password=company.certificate_password
-                    )
-                )
-            else:
-                print(f"[YASAL RAPOR PDF] Şirket sertifikası yok, default sertifika kullanılıyor")
-                signed_pdf_path = await loop.run_in_executor(
-                    None,
+                logger.debug(f"[YASAL RAPOR PDF] Şirket sertifikası kullanılıyor: {company.certificate_path}")
+                signed_pdf_path = await run_in_threadpool(
                     pdf_signer.sign_pdf,
-                    str(temp_pdf_path)
+                    str(temp_pdf_path),
+                    company_name=company.full_company_name or company.company_name,
+                    cert_path=company.certificate_path,
+                    cert_password=company.certificate_password
                 )
-            print(f"[YASAL RAPOR PDF] [OK] Dijital imza basariyla eklendi")
+            else:
+                logger.warning(f"[YASAL RAPOR PDF] Şirket sertifikası yok, default sertifika kullanılıyor")
+                signed_pdf_path = await run_in_threadpool(pdf_signer.sign_pdf, str(temp_pdf_path))
+            logger.debug(f"[YASAL RAPOR PDF] [OK] Dijital imza basariyla eklendi")
         except Exception as e:
-            print(f"[YASAL RAPOR PDF] [UYARI] Dijital imza eklenemedi (devam ediliyor): {str(e)[:100]}")
+            logger.warning(f"[YASAL RAPOR PDF] [UYARI] Dijital imza eklenemedi (devam ediliyor): {str(e)[:100]}")
             # İmzasız devam et
         
         # İzinleri uygula (256-bit AES şifreleme)
-        print(f"[YASAL RAPOR PDF] Izinler ve sifreleme uygulan iyor...")
+        logger.debug(f"[YASAL RAPOR PDF] Izinler ve sifreleme uygulanıyor...")
         final_pdf_path = apply_pdf_permissions(signed_pdf_path)
         
         # PDF'i oku
@@ -709,12 +640,11 @@ async def download_legal_mutabakat_pdf(
         # Hash oluştur
         pdf_hash = hashlib.sha256(final_pdf_bytes).hexdigest()
         
-        print(f"[YASAL RAPOR PDF] PDF Hash: {pdf_hash[:16]}...")
         
         # Activity log kaydet (ISP bilgili)
-        ip_info = get_real_ip_with_isp(request)
+        ip_info = get_client_ip_info(request)
         ActivityLogger.log(
-            db=db,
+            db=write_db,
             action="legal_report_pdf_download",
             description=f"Yasal rapor PDF indirildi: {mutabakat.mutabakat_no} (Hash: {pdf_hash[:16]}...)",
             user_id=current_user.id,
@@ -722,12 +652,10 @@ async def download_legal_mutabakat_pdf(
             user_agent=request.headers.get('user-agent')
         )
         
-        print(f"[YASAL RAPOR PDF] [OK] PDF basariyla olusturuldu ve imzalandi")
-        print(f"  - Dosya: {temp_pdf_path.name}")
-        print(f"  - Hash: {pdf_hash[:32]}...")
-        print(f"  - Sifreleme: 256-bit AES")
-        print(f"  - Dijital Imza: Eklendi")
-        print(f"  - Izinler: Sadece Yazdirma + Imzalama")
+        logger.info(
+            f"[YASAL RAPOR PDF] [OK] PDF basariyla olusturuldu ve imzalandi: "
+            f"{temp_pdf_path.name} (Hash: {pdf_hash[:32]}..., 256-bit AES, Sadece Yazdirma + Imzalama)"
+        )
         
         # PDF'i yanıt olarak döndür
         return StreamingResponse(
@@ -741,9 +669,7 @@ async def download_legal_mutabakat_pdf(
         )
         
     except Exception as e:
-        print(f"[YASAL RAPOR PDF] [!] HATA: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"[YASAL RAPOR PDF] [!] HATA: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"PDF oluşturma hatası: {str(e)}"
@@ -755,14 +681,14 @@ async def download_legal_user_pdf(
     user_id: int,
     request: Request,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db),
+    write_db: Session = Depends(get_db)  # Activity log kaydı primary'ye
 ):
     """
     Kullanıcı Yasal Raporu PDF İndir (Multi-Company)
     Dijital imzalı, şifreli, hash'lenmiş PDF oluşturur
     """
-    print(f"\n[YASAL RAPOR PDF] PDF indirme istegi alindi - User ID: {user_id}")
-    print(f"[YASAL RAPOR PDF] Admin: {current_user.username}")
+    logger.info(f"[YASAL RAPOR PDF] PDF indirme istegi alindi - User ID: {user_id}, Admin: {current_user.username}")
     
     # Admin kontrolü
     if current_user.role not in [UserRole.ADMIN, UserRole.COMPANY_ADMIN]:
@@ -875,38 +801,29 @@ async def download_legal_user_pdf(
         # Dijital imza ekle (şirket sertifikası ile - thread pool'da çalıştır)
         signed_pdf_path = str(temp_pdf_path)
         try:
-            print(f"[YASAL RAPOR PDF] Dijital imza ekleniyor...")
-            print(f"[YASAL RAPOR PDF] Şirket: {company.company_name}")
-            
-            # Thread pool'da senkron fonksiyonu çalıştır
-            loop = asyncio.get_event_loop()
+            logger.debug(f"[YASAL RAPOR PDF] Dijital imza ekleniyor: {company.company_name}")
             
+            # Thread pool'da senkron fonksiyonu çalıştır (context kopyalanır, pdf_sign süresi kaydedilir)
             # Şirket sertifikası varsa kullan
             if company.certificate_path:
-                print(f"[YASAL RAPOR PDF] Şirket sertifikası kullanılıyor: {company.certificate_path}")
-                signed_pdf_path = await loop.run_in_executor(
-                    None,
-                    lambda: pdf_signer.sign_pdf(
-                        str(temp_pdf_path),
-                        company_name=company.full_company_name or company.company_name,
-                        cert_path=company.certificate_path,
-                        cert_password=company.certificate_password
-                    )
-                )
-            else:
-                print(f"[YASAL RAPOR PDF] Şirket sertifikası yok, default sertifika kullanılıyor")
-                signed_pdf_path = await loop.run_in_executor(
-                    None,
+                logger.debug(f"[YASAL RAPOR PDF] Şirket sertifikası kullanılıyor: {company.certificate_path}")
+                signed_pdf_path = await run_in_threadpool(
                     pdf_signer.sign_pdf,
-                    str(temp_pdf_path)
+                    str(temp_pdf_path),
+                    company_name=company.full_company_name or company.company_name,
+                    cert_path=company.certificate_path,
+                    cert_password=company.certificate_password
                 )
-            print(f"[YASAL RAPOR PDF] [OK] Dijital imza basariyla eklendi")
+            else:
+                logger.warning(f"[YASAL RAPOR PDF] Şirket sertifikası yok, default sertifika kullanılıyor")
+                signed_pdf_path = await run_in_threadpool(pdf_signer.sign_pdf, str(temp_pdf_path))
+            logger.debug(f"[YASAL RAPOR PDF] [OK] Dijital imza basariyla eklendi")
         except Exception as e:
-            print(f"[YASAL RAPOR PDF] [UYARI] Dijital imza eklenemedi (devam ediliyor): {str(e)[:100]}")
+            logger.warning(f"[YASAL RAPOR PDF] [UYARI] Dijital imza eklenemedi (devam ediliyor): {str(e)[:100]}")
             # İmzasız devam et
         
         # İzinleri uygula (256-bit AES şifreleme)
-        print(f"[YASAL RAPOR PDF] Izinler ve sifreleme uygulan iyor...")
+        logger.debug(f"[YASAL RAPOR PDF] Izinler ve sifreleme uygulanıyor...")
         final_pdf_path = apply_pdf_permissions(signed_pdf_path)
         
         # PDF'i oku
@@ -916,12 +833,11 @@ async def download_legal_user_pdf(
         # Hash oluştur
         pdf_hash = hashlib.sha256(final_pdf_bytes).hexdigest()
         
-        print(f"[YASAL RAPOR PDF] PDF Hash: {pdf_hash[:16]}...")
         
         # Activity log kaydet (ISP bilgili)
-        ip_info = get_real_ip_with_isp(request)
+        ip_info = get_client_ip_info(request)
         ActivityLogger.log(
-            db=db,
+            db=write_db,
             action="legal_report_pdf_download",
             description=f"Kullanıcı yasal rapor PDF indirildi: {user.vkn_tckn or user.username} (Hash: {pdf_hash[:16]}...)",
             user_id=current_user.id,
@@ -929,12 +845,10 @@ async def download_legal_user_pdf(
             user_agent=request.headers.get('user-agent')
         )
         
-        print(f"[YASAL RAPOR PDF] [OK] PDF basariyla olusturuldu ve imzalandi")
-        print(f"  - Dosya: {temp_pdf_path.name}")
-        print(f"  - Hash: {pdf_hash[:32]}...")
-        print(f"  - Sifreleme: 256-bit AES")
-        print(f"  - Dijital Imza: Eklendi")
-        print(f"  - Izinler: Sadece Yazdirma + Imzalama")
+        logger.info(
+            f"[YASAL RAPOR PDF] [OK] PDF basariyla olusturuldu ve imzalandi: "
+            f"{temp_pdf_path.name} (Hash: {pdf_hash[:32]}..., 256-bit AES, Sadece Yazdirma + Imzalama)"
+        )
         
         # PDF'i yanıt olarak döndür
         return StreamingResponse(
@@ -948,9 +862,7 @@ async def download_legal_user_pdf(
         )
         
     except Exception as e:
-        print(f"[YASAL RAPOR PDF] [!] HATA: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"[YASAL RAPOR PDF] [!] HATA: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"PDF oluşturma hatası: {str(e)}"
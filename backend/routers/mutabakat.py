@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import or_, and_
 from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel
-from backend.database import get_db
-from backend.models import User, Mutabakat, MutabakatItem, MutabakatDurumu, UserRole, Bayi, MutabakatBayiDetay, Company
+from backend.database import SessionLocal, get_async_db, get_db
+from backend.models import User, Mutabakat, MutabakatItem, MutabakatDurumu, UserRole, Bayi, MutabakatBayiDetay
 from backend.schemas import (
     MutabakatCreate,
     MutabakatResponse,
@@ -14,8 +16,7 @@ from backend.schemas import (
     MutabakatUpdate
 )
 from backend.auth import get_current_active_user
-from backend.logger import ActivityLogger, logger
-from backend.middleware.rate_limiter import RateLimiter, RateLimitRules
+from backend.logger import ActivityLogger
 from backend.sms import sms_service
 from backend.utils.audit_logger import log_mutabakat_action, create_audit_log
 from backend.models import AuditLogAction
@@ -23,14 +24,19 @@ from backend.utils.pdf_service import create_mutabakat_pdf
 from backend.utils.pdf_signer import pdf_signer
 from backend.utils.pdf_permissions import apply_pdf_permissions
 from backend.utils.pagination import Paginator, SortableColumns
-from backend.utils.cache_manager import cache_manager
+from backend.utils.cache_manager import cache_manager, resolve_namespaces
+from backend.utils.company_config import get_company_config, get_company_secret
+from backend.config import settings
+from backend.utils.ip_resolver import get_real_ip, get_real_ip_with_isp, get_client_ip_info
+import logging
 import random
 import string
 import os
-import requests
 from datetime import datetime, timedelta
 import pytz
 
+logger = logging.getLogger(__name__)
+
 # Türkiye saat dilimi
 TURKEY_TZ = pytz.timezone('Europe/Istanbul')
 
@@ -38,75 +44,29 @@ def get_turkey_time():
     """Türkiye saatini döndür (UTC+3)"""
     return datetime.now(TURKEY_TZ)
 
-def invalidate_mutabakat_caches(sender_id: int = None, receiver_id: int = None):
-    """Mutabakat işlemlerinde cache'leri temizle"""
-    if sender_id:
-        cache_manager.delete(f"cache:dashboard_stats:{sender_id}")
-    if receiver_id:
-        cache_manager.delete(f"cache:dashboard_stats:{receiver_id}")
+# Şirketin tüm mutabakatlarını görebilen roller
+COMPANY_WIDE_ROLES = (UserRole.COMPANY_ADMIN, UserRole.MUHASEBE, UserRole.PLANLAMA)
 
-def get_real_ip_with_isp(request: Request) -> dict:
-    """Gerçek public IP adresini ve ISP bilgisini al (Yasal delil için)"""
-    # Önce X-Forwarded-For header'ını kontrol et (proxy/load balancer arkasında)
-    forwarded_for = request.headers.get('X-Forwarded-For')
-    if forwarded_for:
-        # İlk IP gerçek client IP'sidir
-        client_ip = forwarded_for.split(',')[0].strip()
-    elif request.headers.get('X-Real-IP'):
-        client_ip = request.headers.get('X-Real-IP')
-    else:
-        # Client IP'yi al
-        client_ip = request.client.host if request.client else "unknown"
-    
-    # Eğer localhost ise, gerçek public IP'yi al
-    if client_ip in ['127.0.0.1', 'localhost', '::1', 'unknown']:
-        try:
-            response = requests.get('https://api.ipify.org?format=json', timeout=3)
-            if response.status_code == 200:
-                client_ip = response.json().get('ip')
-                print(f"[IP] Public IP alındı: {client_ip}")
-        except Exception as e:
-            print(f"[IP] Public IP alınamadı: {e}")
-            client_ip = "unknown"
-    
-    # ISP ve lokasyon bilgisini al (ip-api.com - ücretsiz, yasal delil için)
-    ip_info = {
-        "ip": client_ip,
-        "isp": "Bilinmiyor",
-        "org": "Bilinmiyor", 
-        "city": "Bilinmiyor",
-        "country": "Bilinmiyor",
-        "region": "Bilinmiyor"
-    }
-    
-    if client_ip != "unknown":
-        try:
-            # ip-api.com ücretsiz ve ISP bilgisi veriyor
-            response = requests.get(f'http://ip-api.com/json/{client_ip}?fields=status,country,regionName,city,isp,org,query', timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('status') == 'success':
-                    ip_info = {
-                        "ip": data.get('query', client_ip),
-                        "isp": data.get('isp', 'Bilinmiyor'),
-                        "org": data.get('org', 'Bilinmiyor'),
-                        "city": data.get('city', 'Bilinmiyor'),
-                        "country": data.get('country', 'Bilinmiyor'),
-                        "region": data.get('regionName', 'Bilinmiyor')
-                    }
-                    print(f"[IP] IP Adresi: {ip_info['ip']}")
-                    print(f"[IP] ISP: {ip_info['isp']}")
-                    print(f"[IP] Şehir: {ip_info['city']}, {ip_info['region']}")
-                    print(f"[IP] Ülke: {ip_info['country']}")
-                    print(f"[IP] Organizasyon: {ip_info['org']}")
-        except Exception as e:
-            print(f"[IP] ISP bilgisi alınamadı: {e}")
-    
-    return ip_info
+def mutabakat_list_scope(user: User):
+    """
+    Kullanıcının görebildiği mutabakat kümesi (cache key) ve bu kümeyi
+    geçersiz kılan generation namespace'leri
+    (invalidation: utils/cache_invalidation.py)
+    """
+    if user.role == UserRole.ADMIN:
+        return "all", ["mutabakat_list:all"]
+    if user.role in COMPANY_WIDE_ROLES:
+        return f"company:{user.company_id}", [f"mutabakat_list:company:{user.company_id}"]
+    return f"user:{user.company_id}:{user.id}", [f"mutabakat_list:user:{user.id}"]
 
-def get_real_ip(request: Request) -> str:
-    """Eski fonksiyon - geriye dönük uyumluluk için"""
-    return get_real_ip_with_isp(request)["ip"]
+def parse_list_date(value: Optional[str]):
+    """YYYY-MM-DD -> datetime; geçersiz format filtre dışı bırakılır"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value.strip(), "%Y-%m-%d")
+    except ValueError:
+        return None
 
 router = APIRouter(prefix="/api/mutabakat", tags=["Mutabakat"])
 
@@ -127,7 +87,6 @@ def generate_mutabakat_no() -> str:
     return f"MUT-{timestamp}-{random_str}"
 
 @router.post("/", response_model=MutabakatResponse, status_code=status.HTTP_201_CREATED)
-@RateLimiter.limit(**RateLimitRules.MUTABAKAT_CREATE)
 async def create_mutabakat(
     mutabakat: MutabakatCreate,
     request: Request,
@@ -180,7 +139,7 @@ async def create_mutabakat(
     db.refresh(db_mutabakat)
     
     # Log kaydet (ISP bilgili - Yasal Delil için)
-    ip_info = get_real_ip_with_isp(request)
+    ip_info = get_client_ip_info(request)
     ActivityLogger.log_mutabakat_created(
         db,
         current_user.id,
@@ -190,8 +149,7 @@ async def create_mutabakat(
     
     return db_mutabakat
 
-@router.get("/")
-def get_mutabakats(
+def mutabakat_list_params(
     page: int = 1,
     page_size: int = 50,
     order_by: str = "created_at",
@@ -204,30 +162,45 @@ def get_mutabakats(
     date_end: str = None,
     amount_min: float = None,
     amount_max: float = None,
-    company: str = None,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-):
+    company: str = None
+) -> dict:
+    """Liste parametrelerini normalize et (aynı sonucu veren istekler aynı cache key'i kullanır)"""
+    start_date = parse_list_date(date_start)
+    end_date = parse_list_date(date_end)
+    return {
+        "page": max(1, page),
+        "page_size": min(max(1, page_size), Paginator.MAX_PAGE_SIZE),
+        "order_by": SortableColumns.get_safe_column(order_by, SortableColumns.MUTABAKAT),
+        "order_direction": "asc" if (order_direction or "").lower() == "asc" else "desc",
+        "search": (search or "").strip() or None,
+        "durum": durum.value if durum else None,
+        "sender_id": sender_id or None,
+        "receiver_id": receiver_id or None,
+        "date_start": start_date.date().isoformat() if start_date else None,
+        "date_end": end_date.date().isoformat() if end_date else None,
+        "amount_min": amount_min,
+        "amount_max": amount_max,
+        "company": (company or "").strip() or None,
+    }
+
+def mutabakat_list_query(db: Session, current_user: User, params: dict):
     """
-    Mutabakatları listele (Multi-Company & Role-Based) - Pagination & Sorting ile
+    Mutabakat listesi sorgusu (rol ve filtreler uygulanmış, sıralama/sayfalama hariç)
     
-    Query Parameters:
-        - page: Sayfa numarası (default: 1)
-        - page_size: Sayfa başına kayıt (default: 50, max: 200)
-        - order_by: Sıralama kolonu (default: created_at)
-        - order_direction: Sıralama yönü (asc/desc, default: desc)
-        - search: Arama (mutabakat_no, receiver_vkn)
-        - durum: Durum filtresi
-        - sender_id: Gönderen ID filtresi
-        - receiver_id: Alıcı ID filtresi
-        - date_start: Başlangıç tarihi (YYYY-MM-DD)
-        - date_end: Bitiş tarihi (YYYY-MM-DD)
-        - amount_min: Minimum tutar
-        - amount_max: Maximum tutar
-        - company: Şirket adı (partial match)
+    params: get_mutabakats'ta normalize edilen parametreler (cache key ile aynı)
     """
     from sqlalchemy.orm import joinedload
     
+    search = params["search"]
+    company = params["company"]
+    durum = MutabakatDurumu(params["durum"]) if params["durum"] else None
+    sender_id = params["sender_id"]
+    receiver_id = params["receiver_id"]
+    start_date = parse_list_date(params["date_start"])
+    end_date = parse_list_date(params["date_end"])
+    amount_min = params["amount_min"]
+    amount_max = params["amount_max"]
+    
     # Sorgu oluştur
     query = db.query(Mutabakat).options(
         joinedload(Mutabakat.sender),
@@ -238,7 +211,7 @@ def get_mutabakats(
     if current_user.role == UserRole.ADMIN:
         # Sistem admini: TÜM mutabakatları görebilir
         pass  # Filtre yok
-    elif current_user.role in [UserRole.COMPANY_ADMIN, UserRole.MUHASEBE, UserRole.PLANLAMA]:
+    elif current_user.role in COMPANY_WIDE_ROLES:
         # Şirket admini, Muhasebe, Planlama: Kendi şirketinin TÜM mutabakatlarını görebilir
         query = query.filter(Mutabakat.company_id == current_user.company_id)
     else:
@@ -275,22 +248,13 @@ def get_mutabakats(
     if receiver_id:
         query = query.filter(Mutabakat.receiver_id == receiver_id)
     
-    # Tarih aralığı filtresi (created_at bazlı)
-    if date_start:
-        try:
-            start_date = datetime.strptime(date_start, "%Y-%m-%d")
-            query = query.filter(Mutabakat.created_at >= start_date)
-        except ValueError:
-            pass  # Geçersiz tarih formatı, filtre skip
+    # Tarih aralığı filtresi (created_at bazlı, geçersiz format filtre dışı)
+    if start_date:
+        query = query.filter(Mutabakat.created_at >= start_date)
     
-    if date_end:
-        try:
-            end_date = datetime.strptime(date_end, "%Y-%m-%d")
-            # Gün sonuna kadar dahil et
-            end_date = end_date.replace(hour=23, minute=59, second=59)
-            query = query.filter(Mutabakat.created_at <= end_date)
-        except ValueError:
-            pass  # Geçersiz tarih formatı, filtre skip
+    if end_date:
+        # Gün sonuna kadar dahil et
+        query = query.filter(Mutabakat.created_at <= end_date.replace(hour=23, minute=59, second=59))
     
     # Tutar aralığı filtresi (bakiye bazlı)
     if amount_min is not None:
@@ -312,16 +276,69 @@ def get_mutabakats(
             )
         )
     
-    # Güvenli sıralama kolonu
-    safe_order_by = SortableColumns.get_safe_column(order_by, SortableColumns.MUTABAKAT)
+    return query
+
+@router.get("/")
+def get_mutabakats(
+    page: int = 1,
+    page_size: int = 50,
+    order_by: str = "created_at",
+    order_direction: str = "desc",
+    search: str = None,
+    durum: MutabakatDurumu = None,
+    sender_id: int = None,
+    receiver_id: int = None,
+    date_start: str = None,
+    date_end: str = None,
+    amount_min: float = None,
+    amount_max: float = None,
+    company: str = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Mutabakatları listele (Multi-Company & Role-Based) - Pagination & Sorting ile
     
-    # Paginate
+    Query Parameters:
+        - page: Sayfa numarası (default: 1)
+        - page_size: Sayfa başına kayıt (default: 50, max: 200)
+        - order_by: Sıralama kolonu (default: created_at)
+        - order_direction: Sıralama yönü (asc/desc, default: desc)
+        - search: Arama (mutabakat_no, receiver_vkn)
+        - durum: Durum filtresi
+        - sender_id: Gönderen ID filtresi
+        - receiver_id: Alıcı ID filtresi
+        - date_start: Başlangıç tarihi (YYYY-MM-DD)
+        - date_end: Bitiş tarihi (YYYY-MM-DD)
+        - amount_min: Minimum tutar
+        - amount_max: Maximum tutar
+        - company: Şirket adı (partial match)
+    """
+    params = mutabakat_list_params(
+        page=page, page_size=page_size, order_by=order_by, order_direction=order_direction,
+        search=search, durum=durum, sender_id=sender_id, receiver_id=receiver_id,
+        date_start=date_start, date_end=date_end, amount_min=amount_min, amount_max=amount_max,
+        company=company
+    )
+    
+    # Generation'lar sorgudan önce okunur: arada commit olursa sonuç eski key'e yazılır
+    scope, scope_namespaces = mutabakat_list_scope(current_user)
+    cache_key = cache_manager.versioned_key(
+        "mutabakat_list", resolve_namespaces("mutabakat_list", scope_namespaces), scope, **params
+    )
+    cached_response = cache_manager.get(cache_key)
+    if cached_response is not None:
+        return cached_response
+    
+    query = mutabakat_list_query(db, current_user, params)
+    
+    # Paginate (güvenli sıralama kolonu params'ta)
     result = Paginator.paginate(
         query=query,
-        page=page,
-        page_size=page_size,
-        order_by=safe_order_by,
-        order_direction=order_direction,
+        page=params["page"],
+        page_size=params["page_size"],
+        order_by=params["order_by"],
+        order_direction=params["order_direction"],
         model_class=Mutabakat
     )
     
@@ -364,10 +381,12 @@ def get_mutabakats(
         }
         serialized_items.append(mutabakat_dict)
     
-    return {
+    response = {
         "items": serialized_items,
-        "metadata": result["metadata"]
+        "metadata": result["metadata"].model_dump()  # Cache codec düz dict bekler
     }
+    cache_manager.set(cache_key, response, settings.CACHE_TTL_MUTABAKAT_LIST)
+    return response
 
 @router.get("/{mutabakat_id}", response_model=MutabakatDetailResponse)
 def get_mutabakat(
@@ -506,7 +525,7 @@ def send_mutabakat(
     db.refresh(mutabakat)
     
     # Log kaydet (ISP bilgili - Yasal Delil için)
-    ip_info = get_real_ip_with_isp(request)
+    ip_info = get_client_ip_info(request)
     ActivityLogger.log_mutabakat_sent(
         db,
         current_user.id,
@@ -521,12 +540,12 @@ def send_mutabakat(
         try:
             receiver_name = receiver.company_name or receiver.full_name or receiver.username
             # Şirket bazlı SMS başlığı için company ile örnek oluştur
-            from backend.models import Company, SMSVerificationLog
+            from backend.models import SMSVerificationLog
             from backend.sms import GoldSMS
-            company = db.query(Company).filter(Company.id == mutabakat.company_id).first()
+            company = get_company_config(mutabakat.company_id)
             
             # IP bilgisini al (yasal delil için)
-            ip_info = get_real_ip_with_isp(request)
+            ip_info = get_client_ip_info(request)
             
             # SMS gönder
             sms_result, sms_message = GoldSMS(company).send_mutabakat_notification(
@@ -565,7 +584,7 @@ def send_mutabakat(
                 db,
                 f"SMS gönderme hatası: {e}",
                 current_user.id,
-                request.client.host if request.client else "unknown"
+                get_real_ip(request)
             )
     else:
         sms_info = "Alıcının telefon numarası bulunamadı"
@@ -593,15 +612,8 @@ def send_mutabakat(
         "success": True
     }
 
-@router.post("/send-all-drafts")
-def send_all_draft_mutabakats(
-    request: Request,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-):
-    """Tüm taslak mutabakatları toplu gönder (Role-Based Access)"""
-    
-    # Taslak mutabakatları filtrele
+def draft_mutabakats_query(db: Session, current_user: User):
+    """Kullanıcının toplu gönderebileceği taslak mutabakatlar (Role-Based Access)"""
     query = db.query(Mutabakat).filter(Mutabakat.durum == MutabakatDurumu.TASLAK)
     
     # Role-based filtering
@@ -614,8 +626,17 @@ def send_all_draft_mutabakats(
     else:
         # Müşteri/Tedarikçi: Sadece kendi oluşturduğu taslak mutabakatları gönderebilir
         query = query.filter(Mutabakat.sender_id == current_user.id)
+    return query
+
+@router.post("/send-all-drafts")
+def send_all_draft_mutabakats(
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Tüm taslak mutabakatları toplu gönder (Role-Based Access)"""
     
-    draft_mutabakats = query.all()
+    draft_mutabakats = draft_mutabakats_query(db, current_user).all()
     
     if not draft_mutabakats:
         return {
@@ -627,7 +648,7 @@ def send_all_draft_mutabakats(
         }
     
     # IP bilgisini al (loglar için)
-    ip_info = get_real_ip_with_isp(request)
+    ip_info = get_client_ip_info(request)
     
     sent_count = 0
     failed_count = 0
@@ -657,9 +678,9 @@ def send_all_draft_mutabakats(
             if receiver and receiver.phone:
                 try:
                     receiver_name = receiver.company_name or receiver.full_name or receiver.username
-                    from backend.models import Company, SMSVerificationLog
+                    from backend.models import SMSVerificationLog
                     from backend.sms import GoldSMS
-                    company = db.query(Company).filter(Company.id == mutabakat.company_id).first()
+                    company = get_company_config(mutabakat.company_id)
                     
                     # SMS gönder
                     sms_result, sms_message = GoldSMS(company).send_mutabakat_notification(
@@ -692,7 +713,7 @@ def send_all_draft_mutabakats(
                     
                     sms_sent = sms_result
                 except Exception as e:
-                    print(f"[TOPLU GONDERIM] SMS hatasi: {e}")
+                    logger.warning(f"[TOPLU GONDERIM] SMS hatasi: {e}")
             
             sent_count += 1
             details.append({
@@ -784,7 +805,7 @@ def approve_mutabakat(
     db.refresh(mutabakat)
     
     # Log kaydet (ISP bilgili - Yasal Delil için)
-    ip_info = get_real_ip_with_isp(request)
+    ip_info = get_client_ip_info(request)
     ActivityLogger.log_mutabakat_approved(
         db,
         current_user.id,
@@ -794,7 +815,7 @@ def approve_mutabakat(
     
     # Email gönder (gönderene - şirketin notification email'ine)
     sender = db.query(User).filter(User.id == mutabakat.sender_id).first()
-    sender_company = db.query(Company).filter(Company.id == sender.company_id).first() if sender else None
+    sender_company = get_company_config(sender.company_id) if sender else None
     
     if sender_company and sender_company.notification_email:
         try:
@@ -819,7 +840,7 @@ def approve_mutabakat(
                 db,
                 f"Email gönderme hatası: {e}",
                 current_user.id,
-                request.client.host if request.client else "unknown"
+                get_real_ip(request)
             )
     
     # Push notification gönder (gönderene)
@@ -883,7 +904,7 @@ def reject_mutabakat(
     db.refresh(mutabakat)
     
     # Log kaydet (ISP bilgili - Yasal Delil için)
-    ip_info = get_real_ip_with_isp(request)
+    ip_info = get_client_ip_info(request)
     ActivityLogger.log_mutabakat_rejected(
         db,
         current_user.id,
@@ -894,7 +915,7 @@ def reject_mutabakat(
     
     # Email gönder (gönderene - şirketin notification email'ine)
     sender = db.query(User).filter(User.id == mutabakat.sender_id).first()
-    sender_company = db.query(Company).filter(Company.id == sender.company_id).first() if sender else None
+    sender_company = get_company_config(sender.company_id) if sender else None
     
     if sender_company and sender_company.notification_email:
         try:
@@ -920,7 +941,7 @@ def reject_mutabakat(
                 db,
                 f"Email gönderme hatası: {e}",
                 current_user.id,
-                request.client.host if request.client else "unknown"
+                get_real_ip(request)
             )
     
     # Push notification gönder (gönderene)
@@ -943,16 +964,20 @@ def reject_mutabakat(
     return mutabakat
 
 @router.get("/{mutabakat_id}/download-pdf")
-@RateLimiter.limit(**RateLimitRules.PDF_DOWNLOAD)
 async def download_mutabakat_pdf(
     mutabakat_id: int,
     request: Request,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Mutabakat PDF'ini indir (lazy generation - istendiğinde oluştur)"""
+    """
+    Mutabakat PDF'ini indir (lazy generation - istendiğinde oluştur)
     
-    mutabakat = db.query(Mutabakat).filter(Mutabakat.id == mutabakat_id).first()
+    Yetki kontrolü AsyncSession ile yapılır; PDF üretimi/imzalama CPU ve dosya
+    IO'su olduğundan thread pool'da kendi sync session'ı ile çalışır.
+    """
+    
+    mutabakat = await db.get(Mutabakat, mutabakat_id)
     
     if not mutabakat:
         raise HTTPException(
@@ -984,72 +1009,15 @@ async def download_mutabakat_pdf(
             detail="PDF belgesi sadece onaylanan veya reddedilen mutabakatlar için oluşturulabilir."
         )
     
+    pdf_file_path = mutabakat.pdf_file_path
+    
     # PDF dosyası yoksa veya silinmişse, şimdi oluştur (LAZY GENERATION)
-    if not mutabakat.pdf_file_path or not os.path.exists(mutabakat.pdf_file_path):
+    if not pdf_file_path or not os.path.exists(pdf_file_path):
         try:
-            # Gerçek public IP adresini ve ISP bilgisini al (Yasal delil için)
-            ip_info = get_real_ip_with_isp(request)
-            print(f"[PDF] IP Bilgileri: {ip_info['ip']} - {ip_info['isp']}")
-            
-            # PDF'i kim işledi? (Onaylayan/Reddeden)
-            action_user = mutabakat.receiver if mutabakat.durum in [MutabakatDurumu.ONAYLANDI, MutabakatDurumu.REDDEDILDI] else current_user
-            action = 'ONAYLANDI' if mutabakat.durum == MutabakatDurumu.ONAYLANDI else 'REDDEDİLDİ'
-            
-            # Şirket bilgilerini al (logo için)
-            company = db.query(Company).filter(Company.id == mutabakat.company_id).first()
-            
-            pdf_bytes = create_mutabakat_pdf(
-                mutabakat=mutabakat,
-                user=action_user,
-                ip_info=ip_info,  # ISP bilgili IP (yasal delil için)
-                action=action,
-                red_nedeni=mutabakat.red_nedeni if action == 'REDDEDİLDİ' else None,
-                company=company  # Şirket logosu için
-            )
-            
-            # PDF'i kaydet
-            pdf_dir = "pdfs/mutabakat"
-            os.makedirs(pdf_dir, exist_ok=True)
-            
-            status_suffix = "ONAY" if mutabakat.durum == MutabakatDurumu.ONAYLANDI else "RED"
-            pdf_filename = f"{mutabakat.mutabakat_no}_{status_suffix}_{get_turkey_time().strftime('%Y%m%d_%H%M%S')}.pdf"
-            pdf_path = os.path.join(pdf_dir, pdf_filename)
-            
-            with open(pdf_path, 'wb') as f:
-                f.write(pdf_bytes)
-            
-            # Dijital imza ekle (şirket sertifikası ile)
-            print(f"[PDF] Dijital imza ekleniyor: {pdf_path}")
-            
-            # Şirket bilgilerini al
-            company = db.query(Company).filter(Company.id == mutabakat.company_id).first()
-            
-            if company and company.certificate_path:
-                # Şirketin kendi sertifikası ile imzala
-                signed_pdf_path = pdf_signer.sign_pdf(
-                    input_pdf_path=pdf_path,
-                    company_name=company.full_company_name or company.company_name,
-                    cert_path=company.certificate_path,
-                    cert_password=company.certificate_password
-                )
-            else:
-                # Fallback: Default Dino sertifikası
-                print("[PDF] Sirket sertifikasi bulunamadi, default sertifika kullaniliyor")
-                signed_pdf_path = pdf_signer.sign_pdf(pdf_path)
-            
-            # PDF izinlerini uygula (yazdirma ve imzalama haric digerleri engellenir)
-            print(f"[PDF] Izinler uygulanıyor: {signed_pdf_path}")
-            final_pdf_path = apply_pdf_permissions(signed_pdf_path)
-            
-            mutabakat.pdf_file_path = final_pdf_path
-            db.commit()
-            
+            pdf_file_path = await run_in_threadpool(_generate_mutabakat_pdf, mutabakat_id, request)
         except Exception as e:
-            import traceback
             error_detail = f"PDF oluşturulurken hata oluştu: {str(e)}"
-            print(f"[PDF ERROR] {error_detail}")
-            print(f"[PDF ERROR] Traceback:")
-            traceback.print_exc()
+            logger.exception(f"[PDF ERROR] {error_detail}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=error_detail
@@ -1057,11 +1025,75 @@ async def download_mutabakat_pdf(
     
     # PDF'i döndür
     return FileResponse(
-        path=mutabakat.pdf_file_path,
+        path=pdf_file_path,
         media_type='application/pdf',
-        filename=os.path.basename(mutabakat.pdf_file_path)
+        filename=os.path.basename(pdf_file_path)
     )
 
+
+def _generate_mutabakat_pdf(mutabakat_id: int, request: Request) -> str:
+    """Onaylı/reddedilmiş mutabakat için imzalı PDF üret ve yolunu kaydet (thread pool'da çalışır)"""
+    db = SessionLocal()
+    try:
+        mutabakat = db.query(Mutabakat).filter(Mutabakat.id == mutabakat_id).first()
+        
+        # Gerçek public IP adresini ve ISP bilgisini al (Yasal delil için)
+        ip_info = get_real_ip_with_isp(request)
+        logger.debug(f"[PDF] IP Bilgileri: {ip_info['ip']} - {ip_info['isp']}")
+        
+        # PDF'i kim işledi? (Onaylayan/Reddeden)
+        action_user = mutabakat.receiver
+        action = 'ONAYLANDI' if mutabakat.durum == MutabakatDurumu.ONAYLANDI else 'REDDEDİLDİ'
+        
+        # Şirket bilgilerini al (logo ve sertifika için, cache'den)
+        company = get_company_config(mutabakat.company_id)
+        
+        pdf_bytes = create_mutabakat_pdf(
+            mutabakat=mutabakat,
+            user=action_user,
+            ip_info=ip_info,  # ISP bilgili IP (yasal delil için)
+            action=action,
+            red_nedeni=mutabakat.red_nedeni if action == 'REDDEDİLDİ' else None,
+            company=company  # Şirket logosu için
+        )
+        
+        # PDF'i kaydet
+        pdf_dir = "pdfs/mutabakat"
+        os.makedirs(pdf_dir, exist_ok=True)
+        
+        status_suffix = "ONAY" if mutabakat.durum == MutabakatDurumu.ONAYLANDI else "RED"
+        pdf_filename = f"{mutabakat.mutabakat_no}_{status_suffix}_{get_turkey_time().strftime('%Y%m%d_%H%M%S')}.pdf"
+        pdf_path = os.path.join(pdf_dir, pdf_filename)
+        
+        with open(pdf_path, 'wb') as f:
+            f.write(pdf_bytes)
+        
+        # Dijital imza ekle (şirket sertifikası ile)
+        logger.debug(f"[PDF] Dijital imza ekleniyor: {pdf_path}")
+        
+        if company and company.certificate_path:
+            # Şirketin kendi sertifikası ile imzala
+            signed_pdf_path = pdf_signer.sign_pdf(
+                input_pdf_path=pdf_path,
+                company_name=company.full_company_name or company.company_name,
+                cert_path=company.certificate_path,
+                cert_password=get_company_secret(company, "certificate_password")
+            )
+        else:
+            # Fallback: Default Dino sertifikası
+            logger.warning("[PDF] Sirket sertifikasi bulunamadi, default sertifika kullaniliyor")
+            signed_pdf_path = pdf_signer.sign_pdf(pdf_path)
+        
+        # PDF izinlerini uygula (yazdirma ve imzalama haric digerleri engellenir)
+        logger.debug(f"[PDF] Izinler uygulanıyor: {signed_pdf_path}")
+        final_pdf_path = apply_pdf_permissions(signed_pdf_path)
+        
+        mutabakat.pdf_file_path = final_pdf_path
+        db.commit()
+        return final_pdf_path
+    finally:
+        db.close()
+
 @router.delete("/{mutabakat_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_mutabakat(
     mutabakat_id: int,
@@ -1169,7 +1201,7 @@ def create_mutabakat_by_vkn_manual(
     db.refresh(db_mutabakat)
     
     # Activity log
-    ip_info = get_real_ip_with_isp(request)
+    ip_info = get_client_ip_info(request)
     ActivityLogger.log_mutabakat_created(
         db=db,
         user_id=current_user.id,
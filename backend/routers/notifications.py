@@ -1,8 +1,8 @@
 """Bildirim Router - Gerçek zamanlı kullanıcı bildirimleri"""
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from backend.database import get_db
+from sqlalchemy import and_, or_, select
+from backend.database import get_db, async_session
 from backend.models import User, Mutabakat, MutabakatDurumu, UserRole
 from backend.auth import get_current_active_user
 from datetime import datetime, timedelta
@@ -230,8 +230,7 @@ def get_notifications(
 @router.get("/stream")
 async def notifications_stream(
     request: Request,
-    token: str,
-    db: Session = Depends(get_db)
+    token: str
 ):
     """
     Server-Sent Events (SSE) akışı.
@@ -247,12 +246,15 @@ async def notifications_stream(
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token doğrulanamadı")
 
-    # Kullanıcıyı doğrula
-    user = db.query(User).filter(
-        User.username == username,
-        User.company_id == company_id,
-        User.is_active == True  # noqa: E712
-    ).first()
+    # Kullanıcıyı doğrula (session hemen kapatılır; akış bağlantı tutmaz)
+    async with async_session() as db:
+        user = await db.scalar(
+            select(User).where(
+                User.username == username,
+                User.company_id == company_id,
+                User.is_active == True  # noqa: E712
+            )
+        )
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Kullanıcı bulunamadı")
 
@@ -262,8 +264,12 @@ async def notifications_stream(
         while True:
             if await request.is_disconnected():
                 break
-            # Bildirimleri üret
-            notifs = get_notifications(current_user=user, db=db)
+            # Bildirimleri üret - her turda kısa ömürlü session (akış boyunca
+            # bağlantı tutulmaz, sorgular event loop'u bloklamaz)
+            async with async_session() as session:
+                notifs = await session.run_sync(
+                    lambda sync_session: get_notifications(current_user=user, db=sync_session)
+                )
             data = {"count": len(notifs), "items": notifs[:5]}  # son 5'i gönder
             # Değiştiyse gönder
             if data != last_payload:
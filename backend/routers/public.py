@@ -4,7 +4,7 @@ Public API endpoints (authentication gerektirmez)
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from backend.database import get_db
-from backend.models import Mutabakat, MutabakatDurumu, Company, ActivityLog
+from backend.models import Mutabakat, MutabakatDurumu, ActivityLog
 from backend.schemas import MutabakatResponse
 from backend.utils.tokens import verify_approval_token, mark_token_as_used
 from backend.logger import ActivityLogger, logger
@@ -12,73 +12,8 @@ from backend.sms import sms_service
 from datetime import datetime
 from pydantic import BaseModel
 from typing import Optional, List, Dict
-import requests
-
-def get_real_ip(request: Request) -> str:
-    """Gerçek public IP adresini al (ISP IP)"""
-    forwarded_for = request.headers.get('X-Forwarded-For')
-    if forwarded_for:
-        return forwarded_for.split(',')[0].strip()
-    
-    real_ip = request.headers.get('X-Real-IP')
-    if real_ip:
-        return real_ip
-    
-    client_ip = request.client.host if request.client else "unknown"
-    
-    if client_ip in ['127.0.0.1', 'localhost', '::1']:
-        try:
-            response = requests.get('https://api.ipify.org?format=json', timeout=3)
-            if response.status_code == 200:
-                return response.json().get('ip')
-        except:
-            pass
-    
-    return client_ip
-
-def get_real_ip_with_isp(request: Request) -> dict:
-    """Gerçek public IP adresini ve ISP bilgisini al"""
-    forwarded_for = request.headers.get('X-Forwarded-For')
-    if forwarded_for:
-        client_ip = forwarded_for.split(',')[0].strip()
-    elif request.headers.get('X-Real-IP'):
-        client_ip = request.headers.get('X-Real-IP')
-    else:
-        client_ip = request.client.host if request.client else "unknown"
-    
-    if client_ip in ['127.0.0.1', 'localhost', '::1', 'unknown']:
-        try:
-            response = requests.get('https://api.ipify.org?format=json', timeout=3)
-            if response.status_code == 200:
-                client_ip = response.json().get('ip')
-        except:
-            pass
-    
-    ip_info = {
-        "ip": client_ip,
-        "isp": "Bilinmiyor",
-        "org": "Bilinmiyor",
-        "city": "Bilinmiyor",
-        "country": "Bilinmiyor"
-    }
-    
-    if client_ip != "unknown":
-        try:
-            response = requests.get(f'http://ip-api.com/json/{client_ip}?fields=status,country,regionName,city,isp,org,query', timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('status') == 'success':
-                    ip_info = {
-                        "ip": data.get('query', client_ip),
-                        "isp": data.get('isp', 'Bilinmiyor'),
-                        "org": data.get('org', 'Bilinmiyor'),
-                        "city": data.get('city', 'Bilinmiyor'),
-                        "country": data.get('country', 'Bilinmiyor')
-                    }
-        except:
-            pass
-    
-    return ip_info
+from backend.utils.ip_resolver import get_real_ip, get_client_ip_info
+from backend.utils.company_config import get_company_config, get_company_kvkk_texts
 
 router = APIRouter(prefix="/api/public", tags=["Public"])
 
@@ -215,16 +150,7 @@ def approve_or_reject_by_token(
         db.refresh(mutabakat)
         
         # IP ve ISP bilgilerini al
-        try:
-            ip_info = get_real_ip_with_isp(request)
-        except:
-            ip_info = {
-                "ip": request.client.host if request.client else "unknown",
-                "isp": "Bilinmiyor",
-                "city": "Bilinmiyor",
-                "country": "Bilinmiyor",
-                "org": "Bilinmiyor"
-            }
+        ip_info = get_client_ip_info(request)
         
         # Log kaydet - SMS üzerinden onay (ISP bilgili)
         from backend.logger import log_activity
@@ -239,7 +165,7 @@ def approve_or_reject_by_token(
         
         # Gönderen şirketin email adresine bildirim gönder
         sender = mutabakat.sender
-        sender_company = db.query(Company).filter(Company.id == sender.company_id).first() if sender else None
+        sender_company = get_company_config(sender.company_id) if sender else None
         
         if sender_company and sender_company.notification_email:
             try:
@@ -263,7 +189,7 @@ def approve_or_reject_by_token(
                     db, 
                     f"Email gönderme hatası: {e}", 
                     mutabakat.receiver_id, 
-                    request.client.host if request.client else "unknown"
+                    get_real_ip(request)
                 )
         
         # Push notification gönder (gönderene)
@@ -308,16 +234,7 @@ def approve_or_reject_by_token(
         db.refresh(mutabakat)
         
         # IP ve ISP bilgilerini al
-        try:
-            ip_info = get_real_ip_with_isp(request)
-        except:
-            ip_info = {
-                "ip": request.client.host if request.client else "unknown",
-                "isp": "Bilinmiyor",
-                "city": "Bilinmiyor",
-                "country": "Bilinmiyor",
-                "org": "Bilinmiyor"
-            }
+        ip_info = get_client_ip_info(request)
         
         # Log kaydet - SMS üzerinden red (ISP bilgili)
         from backend.logger import log_activity
@@ -332,7 +249,7 @@ def approve_or_reject_by_token(
         
         # Gönderen şirketin email adresine bildirim gönder
         sender = mutabakat.sender
-        sender_company = db.query(Company).filter(Company.id == sender.company_id).first() if sender else None
+        sender_company = get_company_config(sender.company_id) if sender else None
         
         if sender_company and sender_company.notification_email:
             try:
@@ -357,7 +274,7 @@ def approve_or_reject_by_token(
                     db, 
                     f"Email gönderme hatası: {e}", 
                     mutabakat.receiver_id, 
-                    request.client.host if request.client else "unknown"
+                    get_real_ip(request)
                 )
         
         # Push notification gönder (gönderene)
@@ -430,16 +347,7 @@ def submit_kvkk_consent_by_token(
         raise HTTPException(status_code=404, detail="Alıcı bulunamadı")
     
     # IP ve ISP bilgisini al
-    try:
-        ip_info = get_real_ip_with_isp(request)
-    except:
-        ip_info = {
-            "ip": request.client.host if request.client else "unknown",
-            "isp": "Bilinmiyor",
-            "city": "Bilinmiyor",
-            "country": "Bilinmiyor",
-            "org": "Bilinmiyor"
-        }
+    ip_info = get_client_ip_info(request)
     
     user_agent = request.headers.get('user-agent', '')
     
@@ -482,6 +390,7 @@ def submit_kvkk_consent_by_token(
         consent.city = ip_info['city']
         consent.country = ip_info['country']
         consent.organization = ip_info.get('org', 'Bilinmiyor')
+        consent.isp_pending = ip_info['ip'] is not None and ip_info['isp'] is None  # Ertelenmiş zenginleştirme
         consent.user_agent = user_agent
     else:
         # Yeni kayıt
@@ -599,43 +508,8 @@ def get_kvkk_texts_by_token(
             detail="Geçersiz veya kullanılmış link. Bu link artık geçerli değil."
         )
     
-    # Şirket bilgisini al
-    company = db.query(Company).filter(Company.id == mutabakat.company_id).first()
-    
-    # KVKK metinlerini import et
-    from backend.kvkk_constants import (
-        KVKK_POLICY_TEXT, KVKK_POLICY_TITLE, KVKK_POLICY_SUMMARY, KVKK_POLICY_VERSION,
-        CUSTOMER_NOTICE_TEXT, CUSTOMER_NOTICE_TITLE, CUSTOMER_NOTICE_SUMMARY, CUSTOMER_NOTICE_VERSION,
-        DATA_RETENTION_POLICY_TEXT, DATA_RETENTION_TITLE, DATA_RETENTION_SUMMARY, DATA_RETENTION_VERSION,
-        SYSTEM_CONSENT_TEXT, SYSTEM_CONSENT_TITLE, SYSTEM_CONSENT_SUMMARY, SYSTEM_CONSENT_VERSION
-    )
-    
-    return {
-        "kvkk_policy": {
-            "title": KVKK_POLICY_TITLE,
-            "summary": KVKK_POLICY_SUMMARY,
-            "content": company.kvkk_policy_text if company and company.kvkk_policy_text else KVKK_POLICY_TEXT,
-            "version": company.kvkk_policy_version if company and company.kvkk_policy_version else KVKK_POLICY_VERSION
-        },
-        "customer_notice": {
-            "title": CUSTOMER_NOTICE_TITLE,
-            "summary": CUSTOMER_NOTICE_SUMMARY,
-            "content": company.customer_notice_text if company and company.customer_notice_text else CUSTOMER_NOTICE_TEXT,
-            "version": company.customer_notice_version if company and company.customer_notice_version else CUSTOMER_NOTICE_VERSION
-        },
-        "data_retention": {
-            "title": DATA_RETENTION_TITLE,
-            "summary": DATA_RETENTION_SUMMARY,
-            "content": company.data_retention_policy_text if company and company.data_retention_policy_text else DATA_RETENTION_POLICY_TEXT,
-            "version": company.data_retention_version if company and company.data_retention_version else DATA_RETENTION_VERSION
-        },
-        "system_consent": {
-            "title": SYSTEM_CONSENT_TITLE,
-            "summary": SYSTEM_CONSENT_SUMMARY,
-            "content": company.system_consent_text if company and company.system_consent_text else SYSTEM_CONSENT_TEXT,
-            "version": company.system_consent_version if company and company.system_consent_version else SYSTEM_CONSENT_VERSION
-        }
-    }
+    # Şirketin KVKK metinleri (cache'den)
+    return get_company_kvkk_texts(mutabakat.company_id)
 
 
 @router.get("/mutabakat/verify/{mutabakat_no}")
@@ -664,8 +538,8 @@ def verify_mutabakat_by_no(
             detail="Mutabakat bulunamadı"
         )
     
-    # Şirket bilgisi
-    company = db.query(Company).filter(Company.id == mutabakat.company_id).first()
+    # Şirket bilgisi (cache'den)
+    company = get_company_config(mutabakat.company_id)
     
     # Activity logları - mutabakat oluşturma ve onaylama/red logları
     logs = db.query(ActivityLog).filter(
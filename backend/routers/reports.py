@@ -1,17 +1,20 @@
 """Raporlama Router"""
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract, and_, or_, text
-from backend.database import get_db
+from sqlalchemy import func, extract, and_, or_, select, text
+from backend.config import settings
+from backend.database import get_read_db, read_session
 from backend.models import User, Mutabakat, MutabakatDurumu, UserRole, ActivityLog
 from backend.auth import get_current_active_user
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 import csv
 import io
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from backend.utils.cache_manager import async_cached
 
 router = APIRouter(prefix="/api/reports", tags=["Reports"])
 
@@ -21,16 +24,42 @@ def require_admin(current_user: User = Depends(get_current_active_user)) -> User
         raise HTTPException(status_code=403, detail="Bu sayfaya erişim yetkiniz yok")
     return current_user
 
+def report_company_id(current_user: User) -> Optional[int]:
+    """Rapor kapsamı: şirket admini kendi şirketi, sistem admini tümü (None)"""
+    return current_user.company_id if current_user.role == UserRole.COMPANY_ADMIN else None
+
+def report_namespaces(company_id: Optional[int]) -> List[str]:
+    """Şirket raporu sadece o şirketin, sistem geneli rapor tüm mutabakat değişikliklerinde yenilenir"""
+    return [f"dashboard:company:{company_id}"] if company_id is not None else ["mutabakat"]
+
 @router.get("/overview")
-def get_overview_stats(
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+async def get_overview_stats(
+    current_user: User = Depends(require_admin)
 ):
-    """Genel İstatistikler - Multi-Company"""
-    
+    """Genel İstatistikler - Multi-Company (cached)"""
+    return await overview_stats(report_company_id(current_user))
+
+@async_cached(
+    "report_overview",
+    ttl=settings.CACHE_TTL_DASHBOARD,
+    stale_ttl=settings.CACHE_TTL_DASHBOARD_STALE,
+    namespaces=report_namespaces,
+    distributed_lock=True
+)
+async def overview_stats(company_id: Optional[int]) -> Dict[str, Any]:
+    return await run_in_threadpool(_compute_overview_stats, company_id)
+
+def _compute_overview_stats(company_id: Optional[int]) -> Dict[str, Any]:
+    db = read_session()
+    try:
+        return _overview_stats_query(db, company_id)
+    finally:
+        db.close()
+
+def _overview_stats_query(db: Session, company_id: Optional[int]) -> Dict[str, Any]:
     # Company ID bazlı filtreleme
-    company_filter = User.company_id == current_user.company_id if current_user.role == UserRole.COMPANY_ADMIN else True
-    mutabakat_company_filter = Mutabakat.company_id == current_user.company_id if current_user.role == UserRole.COMPANY_ADMIN else True
+    company_filter = User.company_id == company_id if company_id is not None else True
+    mutabakat_company_filter = Mutabakat.company_id == company_id if company_id is not None else True
     
     # Toplam kullanıcılar
     total_users = db.query(User).filter(company_filter).count()
@@ -89,7 +118,7 @@ def get_overview_stats(
 @router.get("/user-performance")
 def get_user_performance(
     current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Kullanıcı Performans Raporu - Multi-Company"""
     
@@ -142,7 +171,7 @@ def get_time_series(
     days: int = Query(90, ge=1, le=365, description="Kaç günlük zaman serisi"),
     group_by: str = Query("day", pattern="^(day|week)$", description="Gruplama: day|week"),
     current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Onay/Red zaman serisi ve ortalama onay süresi (günlük/haftalık)."""
     mutabakat_company_filter = Mutabakat.company_id == current_user.company_id if current_user.role == UserRole.COMPANY_ADMIN else True
@@ -211,7 +240,7 @@ def export_time_series_csv(
     days: int = Query(90, ge=1, le=365),
     group_by: str = Query("day", pattern="^(day|week)$"),
     current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Zaman serisi CSV export."""
     data = get_time_series(days=days, group_by=group_by, current_user=current_user, db=db)
@@ -232,7 +261,7 @@ def export_time_series_csv(
 def get_monthly_trend(
     months: int = 6,
     current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Aylık Trend Analizi - Multi-Company"""
     
@@ -268,7 +297,7 @@ def get_monthly_trend(
 def get_recent_activities(
     limit: int = 50,
     current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Son Aktiviteler - Multi-Company"""
     
@@ -306,7 +335,7 @@ def get_recent_activities(
 def get_top_customers(
     limit: int = 10,
     current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """En Çok Mutabakat Alan Müşteriler - Multi-Company"""
     
@@ -363,42 +392,48 @@ def get_top_customers(
     return result
 
 @router.get("/approval-statistics")
-def get_approval_statistics(
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+async def get_approval_statistics(
+    current_user: User = Depends(require_admin)
 ):
-    """Onay/Red İstatistikleri - Multi-Company"""
-    
-    # Company ID bazlı filtreleme
-    mutabakat_company_filter = Mutabakat.company_id == current_user.company_id if current_user.role == UserRole.COMPANY_ADMIN else True
-    
-    # Toplam gönderilmiş
-    total_sent = db.query(Mutabakat).filter(
-        Mutabakat.durum != MutabakatDurumu.TASLAK,
-        mutabakat_company_filter
-    ).count()
-    
-    # Onaylanan
-    approved = db.query(Mutabakat).filter(
-        Mutabakat.durum == MutabakatDurumu.ONAYLANDI,
-        mutabakat_company_filter
-    ).count()
-    
-    # Reddedilen
-    rejected = db.query(Mutabakat).filter(
-        Mutabakat.durum == MutabakatDurumu.REDDEDILDI,
-        mutabakat_company_filter
-    ).count()
+    """Onay/Red İstatistikleri - Multi-Company (cached)"""
+    return await approval_statistics(report_company_id(current_user))
+
+@async_cached(
+    "report_approval",
+    ttl=settings.CACHE_TTL_DASHBOARD,
+    stale_ttl=settings.CACHE_TTL_DASHBOARD_STALE,
+    namespaces=report_namespaces,
+    distributed_lock=True
+)
+async def approval_statistics(company_id: Optional[int]) -> Dict[str, Any]:
+    return await run_in_threadpool(_compute_approval_statistics, company_id)
+
+def _compute_approval_statistics(company_id: Optional[int]) -> Dict[str, Any]:
+    db = read_session()
+    try:
+        return _approval_statistics_query(db, company_id)
+    finally:
+        db.close()
+
+def mutabakat_status_count_query(company_id: Optional[int], status_filter):
+    """Şirketin (None: tüm şirketler) verilen durum koşuluna uyan mutabakat sayısı"""
+    query = select(func.count(Mutabakat.id)).where(status_filter)
+    if company_id is not None:
+        query = query.where(Mutabakat.company_id == company_id)
+    return query
+
+def _approval_statistics_query(db: Session, company_id: Optional[int]) -> Dict[str, Any]:
+    def count(status_filter):
+        return db.scalar(mutabakat_status_count_query(company_id, status_filter))
     
-    # Bekleyen
-    pending = db.query(Mutabakat).filter(
-        Mutabakat.durum == MutabakatDurumu.GONDERILDI,
-        mutabakat_company_filter
-    ).count()
+    total_sent = count(Mutabakat.durum != MutabakatDurumu.TASLAK)  # Toplam gönderilmiş
+    approved = count(Mutabakat.durum == MutabakatDurumu.ONAYLANDI)  # Onaylanan
+    rejected = count(Mutabakat.durum == MutabakatDurumu.REDDEDILDI)  # Reddedilen
+    pending = count(Mutabakat.durum == MutabakatDurumu.GONDERILDI)  # Bekleyen
     
     # Ortalama yanıt süresi (onaylananlar için)
     # SQL Server için DATEDIFF kullanıyoruz - Raw SQL ile
-    if current_user.role == UserRole.COMPANY_ADMIN:
+    if company_id is not None:
         avg_response_time_result = db.execute(
             text("""
                 SELECT AVG(CAST(DATEDIFF(day, gonderim_tarihi, onay_tarihi) AS FLOAT)) 
@@ -408,7 +443,7 @@ def get_approval_statistics(
                 AND gonderim_tarihi IS NOT NULL
                 AND company_id = :company_id
             """),
-            {"durum": "ONAYLANDI", "company_id": current_user.company_id}
+            {"durum": "ONAYLANDI", "company_id": company_id}
         ).scalar()
     else:
         avg_response_time_result = db.execute(
@@ -439,7 +474,7 @@ def get_detailed_user_analysis(
     user_id: Optional[int] = Query(None, description="Kullanıcı ID filtresi"),
     period: Optional[str] = Query(None, description="Dönem filtresi (MM/YYYY formatında, örn: 09/2025)"),
     current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Detaylı Kullanıcı Analizi (Dönem ve Kullanıcı Filtreli) - Multi-Company"""
     
@@ -609,7 +644,7 @@ def get_detailed_user_analysis(
 @router.get("/available-periods")
 def get_available_periods(
     current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Sistemdeki mevcut dönemleri listele (donem_bitis'e göre) - Multi-Company"""
     
@@ -638,7 +673,7 @@ def get_available_periods(
 def get_period_comparison(
     end_period: Optional[str] = Query(None, description="Bitiş dönemi MM/YYYY (ör. 12/2025). Belirtilmezse bugüne göre hesaplanır."),
     current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Dönemsel Karşılaştırma - Son 12 Ay (Dönem Bitiş Tarihine Göre) - Multi-Company"""
     
@@ -712,7 +747,7 @@ def get_period_comparison(
 def get_pending_heatmap(
     days: int = Query(30, description="Son kaç günlük veri (default: 30)"),
     current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Bekleyen Mutabakat Isı Haritası - Multi-Company
@@ -877,7 +912,7 @@ def get_pending_heatmap(
 def get_day_hour_heatmap(
     days: int = Query(30, ge=1, le=365),
     current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Gün-saat ısı haritası (7x24) - gönderilmiş ama henüz cevaplanmamış mutabakatların dağılımı.
@@ -921,7 +956,7 @@ def get_day_hour_heatmap(
 def export_mutabakat_list_excel(
     period: Optional[str] = Query(None, description="Dönem filtresi (MM/YYYY formatında, örn: 11/2025)"),
     current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Mutabakat listesini Excel olarak export et (dönem filtresi ile)
@@ -13,6 +13,7 @@ from backend.models import User, UserRole, FailedLoginAttempt
 from backend.auth import get_current_active_user
 from backend.utils.failed_login_tracker import FailedLoginTracker
 from backend.logger import ActivityLogger
+from backend.utils.ip_resolver import get_real_ip
 
 router = APIRouter(prefix="/api/security", tags=["Güvenlik Yönetimi"])
 
@@ -146,7 +147,7 @@ def unlock_account(
     FailedLoginTracker.unlock_account(db, user, admin_user_id=current_user.id)
     
     # Log kaydet
-    ip_info = {"ip": request.client.host if request.client else "unknown"}
+    ip_info = {"ip": get_real_ip(request)}
     ActivityLogger.log(
         db=db,
         action="ACCOUNT_UNLOCK",
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Sistem Metrikleri Endpoint'leri (Sadece Sistem Admini)
+Kapasite planlama için process içi metrikler
+"""
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+
+from backend.auth import get_system_admin_user
+from backend.config import settings
+from backend.database import PROCESS_ROLE, POOL_OPTIONS
+from backend.middleware.performance_monitor import http_metrics, process_metrics
+from backend.models import User
+from backend.utils.cache_manager import cache_manager
+from backend.utils import ip_resolver
+from backend.utils.db_pool import get_all_pool_stats, get_pool_metrics
+from backend.utils.metrics import render_prometheus
+from backend.utils.slow_query_log import slow_query_log
+
+router = APIRouter(prefix="/api/admin/metrics", tags=["Sistem Metrikleri"])
+
+
+@router.get("/db-pool")
+async def get_db_pool_metrics(current_user: User = Depends(get_system_admin_user)):
+    """
+    Veritabanı connection pool metrikleri
+
+    Not: Değerler bu API process'ine aittir (her worker kendi pool'unu tutar)
+    """
+    return {
+        "process_role": PROCESS_ROLE,
+        "profile": POOL_OPTIONS,
+        "pools": get_all_pool_stats()
+    }
+
+
+@router.post("/db-pool/reset")
+async def reset_db_pool_metrics(current_user: User = Depends(get_system_admin_user)):
+    """Pool sayaçlarını ve bekleme histogramını sıfırla"""
+    for name in get_all_pool_stats():
+        get_pool_metrics(name).reset()
+    return {"message": "Pool metrikleri sıfırlandı"}
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_system_admin_user)
+):
+    """
+    En pahalı yavaş sorgular (parmak izine göre gruplu, toplam süreye göre sıralı)
+
+    Not: Buffer bu API process'ine aittir ve sınırlıdır (en eski kayıtlar düşer)
+    """
+    return {
+        **slow_query_log.get_stats(),
+        "top": slow_query_log.top_offenders(limit)
+    }
+
+
+@router.post("/slow-queries/reset")
+async def reset_slow_queries(current_user: User = Depends(get_system_admin_user)):
+    """Yavaş sorgu buffer'ını temizle"""
+    slow_query_log.clear()
+    return {"message": "Yavaş sorgu kayıtları temizlendi"}
+
+
+@router.get("/cache")
+async def get_cache_metrics(current_user: User = Depends(get_system_admin_user)):
+    """
+    Key prefix bazlı cache metrikleri ve yapılandırılmış TTL'ler
+
+    CACHE_TTL_* değerleri prefix'lerin hit oranı, set sayısı ve değer
+    boyutlarına bakılarak ayarlanır (env ile override edilebilir).
+    """
+    return {
+        "server": cache_manager.get_stats(),
+        "prefixes": cache_manager.metrics.get_stats(),
+        "ip_info": ip_resolver.ip_info_cache.get_stats(),
+        "ttl_settings": {
+            name: getattr(settings, name) for name in dir(settings) if name.startswith("CACHE_TTL_")
+        },
+    }
+
+
+@router.post("/cache/reset")
+async def reset_cache_metrics(current_user: User = Depends(get_system_admin_user)):
+    """Prefix ve ISP cache sayaçlarını sıfırla (cache içeriğine dokunmaz)"""
+    cache_manager.metrics.reset()
+    ip_resolver.ip_info_cache.reset_stats()
+    return {"message": "Cache metrikleri sıfırlandı"}
+
+
+@router.get("/http")
+async def get_http_metrics(current_user: User = Depends(get_system_admin_user)):
+    """
+    Route şablonu bazlı süre / status metrikleri ve son process örneği
+
+    Not: Değerler bu API process'ine aittir (her worker kendi sayaçlarını tutar)
+    """
+    return {
+        **http_metrics.get_stats(),
+        "process": process_metrics.values,
+        "process_sampled_at": process_metrics.sampled_at,
+    }
+
+
+@router.post("/http/reset")
+async def reset_http_metrics(current_user: User = Depends(get_system_admin_user)):
+    """Route sayaçlarını sıfırla"""
+    http_metrics.reset()
+    return {"message": "HTTP metrikleri sıfırlandı"}
+
+
+@router.get("/prometheus", response_class=PlainTextResponse)
+async def get_prometheus_metrics(current_user: User = Depends(get_system_admin_user)):
+    """Kayıtlı collector'ların Prometheus text formatındaki çıktısı"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -9,6 +9,7 @@ from backend.schemas import UserResponse
 from backend.auth import get_current_active_user
 from backend.permissions import Permissions
 from backend.logger import ActivityLogger
+from backend.utils.ip_resolver import get_real_ip
 from backend.utils.pagination import Paginator, PaginatedResponse, PaginationMetadata, SortableColumns
 from pydantic import BaseModel, EmailStr
 import bcrypt
@@ -323,7 +324,7 @@ def create_user(
             current_user.id,
             "BAYI_OLUSTUR",
             f"Otomatik bayi oluşturuldu: {user_data.bayi_kodu} - {new_bayi.bayi_adi}",
-            request.client.host if request.client else "unknown"
+            get_real_ip(request)
         )
     
     # Log
@@ -332,7 +333,7 @@ def create_user(
         current_user.id,
         "KULLANICI_OLUSTUR",
         f"Yeni kullanıcı oluşturuldu: {new_user.username}",
-        request.client.host if request.client else "unknown"
+        get_real_ip(request)
     )
     
     return new_user
@@ -423,7 +424,7 @@ def update_user(
         current_user.id,
         "KULLANICI_GUNCELLE",
         f"Kullanıcı güncellendi: {user.username}",
-        request.client.host if request.client else "unknown"
+        get_real_ip(request)
     )
     
     return user
@@ -480,7 +481,7 @@ def toggle_user_active(
         current_user.id,
         "KULLANICI_GUNCELLE",
         f"Kullanıcı {action_desc} yapıldı: {user.username}",
-        request.client.host if request.client else "unknown"
+        get_real_ip(request)
     )
     
     return {"message": f"Kullanıcı {action_desc} yapıldı", "is_active": user.is_active}
@@ -535,7 +536,7 @@ def delete_user(
         current_user.id,
         "KULLANICI_SIL",
         f"Kullanıcı kalıcı olarak silindi: {username}",
-        request.client.host if request.client else "unknown"
+        get_real_ip(request)
     )
     
     return None
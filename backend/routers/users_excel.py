@@ -11,7 +11,7 @@ from backend.database import get_db
 from backend.models import User, UserRole
 from backend.auth import get_current_active_user
 from backend.logger import ActivityLogger
-from backend.middleware.rate_limiter import RateLimiter, RateLimitRules
+from backend.utils.ip_resolver import get_real_ip
 from pydantic import BaseModel
 import bcrypt
 import random
@@ -195,7 +195,6 @@ def get_company_slug(company_name: str) -> str:
 
 
 @router.post("/upload-users-excel", response_model=ExcelUserUploadResult)
-@RateLimiter.limit(**RateLimitRules.EXCEL_UPLOAD)
 async def upload_users_excel(
     request: Request,
     file: UploadFile = File(...),
@@ -566,7 +565,7 @@ async def upload_users_excel(
             current_user.id,
             "TOPLU_VKN_BAYI_YUKLE",
             f"{basarili_user} kullanıcı, {basarili_bayi} bayi Excel'den yüklendi (VKN bazlı)",
-            request.client.host if request.client else "unknown"
+            get_real_ip(request)
         )
         
         return ExcelUserUploadResult(
@@ -11,6 +11,7 @@ from backend.database import get_db
 from backend.models import User, UserRole, Company, Bayi
 from backend.auth import get_current_active_user
 from backend.logger import ActivityLogger
+from backend.utils.ip_resolver import get_real_ip
 from pydantic import BaseModel
 import bcrypt
 from pathlib import Path
@@ -361,7 +362,7 @@ def upload_users_vkn_excel(
             current_user.id,
             "TOPLU_VKN_BAYI_YUKLE",
             f"{basarili_user} kullanıcı, {basarili_bayi} bayi Excel'den yüklendi (VKN bazlı)",
-            request.client.host if request.client else "unknown"
+            get_real_ip(request)
         )
         
         return VKNExcelUploadResult(
@@ -8,6 +8,7 @@ from backend.database import get_db
 from backend.models import Mutabakat
 from pydantic import BaseModel
 import hashlib
+import logging
 from typing import Optional
 from pyhanko.sign.validation import validate_pdf_signature, ValidationContext
 from pyhanko.pdf_utils.reader import PdfFileReader
@@ -17,6 +18,7 @@ import os
 from pathlib import Path
 
 router = APIRouter(prefix="/api/verify", tags=["Verification"])
+logger = logging.getLogger(__name__)
 
 
 class VerificationRequest(BaseModel):
@@ -184,7 +186,7 @@ def verify_pdf_file(
         pdf_content = file.file.read()
         pdf_buffer = BytesIO(pdf_content)
         
-        print(f"[PDF DOGRULAMA] Dosya alindi: {file.filename} ({len(pdf_content)} bytes)")
+        logger.info(f"[PDF DOGRULAMA] Dosya alindi: {file.filename} ({len(pdf_content)} bytes)")
         
         # pyHanko ile PDF'i aç
         pdf_reader = PdfFileReader(pdf_buffer)
@@ -202,7 +204,7 @@ def verify_pdf_file(
         # İlk imzayı doğrula
         sig_field = embedded_sigs[0]
         
-        print(f"[PDF DOGRULAMA] Imza bulundu: {sig_field.field_name}")
+        logger.debug(f"[PDF DOGRULAMA] Imza bulundu: {sig_field.field_name}")
         
         # Self-signed sertifika için validation context oluştur
         try:
@@ -219,7 +221,7 @@ def verify_pdf_file(
             # İmzayı doğrula
             validation_result = validate_pdf_signature(sig_field, validation_context=vc)
         except Exception as val_error:
-            print(f"[PDF DOGRULAMA] Validation hatasi (devam ediliyor): {val_error}")
+            logger.warning(f"[PDF DOGRULAMA] Validation hatasi (devam ediliyor): {val_error}")
             # Validation hata verse bile, intact kontrolü yapalım
             validation_result = validate_pdf_signature(sig_field)
         
@@ -233,7 +235,7 @@ def verify_pdf_file(
             "degistirilmis_mi": not validation_result.intact
         }
         
-        print(f"[PDF DOGRULAMA] Imza durumu: gecerli={validation_result.intact}, intact={validation_result.intact}")
+        logger.info(f"[PDF DOGRULAMA] Imza durumu: gecerli={validation_result.intact}, intact={validation_result.intact}")
         
         # PDF değiştirilmiş mi?
         if not validation_result.intact:
@@ -258,7 +260,7 @@ def verify_pdf_file(
         if "MUT-" in pdf_text:
             start_idx = pdf_text.index("MUT-")
             mutabakat_no = pdf_text[start_idx:start_idx+20].split()[0].strip()
-            print(f"[PDF DOGRULAMA] Mutabakat No bulundu: {mutabakat_no}")
+            logger.debug(f"[PDF DOGRULAMA] Mutabakat No bulundu: {mutabakat_no}")
         
         hash_dogrulama = None
         if mutabakat_no:
@@ -282,13 +284,13 @@ def verify_pdf_file(
                         "gecerli": True,
                         "mesaj": "Veritabanı ile hash eşleşiyor"
                     }
-                    print("[PDF DOGRULAMA] Hash eslesti!")
+                    logger.debug("[PDF DOGRULAMA] Hash eslesti!")
                 else:
                     hash_dogrulama = {
                         "gecerli": False,
                         "mesaj": "Veritabanı ile hash eşleşmiyor - veriler değiştirilmiş olabilir"
                     }
-                    print("[PDF DOGRULAMA] Hash eslesmedi!")
+                    logger.warning("[PDF DOGRULAMA] Hash eslesmedi!")
         
         # Tüm kontroller başarılı
         return PDFVerificationResponse(
@@ -300,9 +302,7 @@ def verify_pdf_file(
         )
         
     except Exception as e:
-        print(f"[PDF DOGRULAMA] Hata: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"[PDF DOGRULAMA] Hata: {e}")
         
         return PDFVerificationResponse(
             gecerli=False,
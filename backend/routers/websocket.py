@@ -7,9 +7,11 @@ from backend.websocket.manager import websocket_manager
 from backend.auth import get_current_user_from_token
 from backend.models import User
 import json
+import logging
 
 
 router = APIRouter(prefix="/ws", tags=["WebSocket"])
+logger = logging.getLogger(__name__)
 
 
 @router.websocket("/notifications")
@@ -64,7 +66,7 @@ async def websocket_endpoint(websocket: WebSocket, token: str = None):
             websocket_manager.disconnect(websocket, user.id, user.company_id)
             
     except Exception as e:
-        print(f"WebSocket error: {e}")
+        logger.error(f"WebSocket error: {e}")
         try:
             await websocket.close(code=1011, reason=str(e))
         except:
@@ -2,11 +2,14 @@
 GoldSMS API Entegrasyonu
 """
 import requests
+import logging
 import os
 from typing import Optional
-from backend.logger import logger
+from backend.utils.request_timing import timed
 import urllib3
 
+logger = logging.getLogger(__name__)
+
 # SSL uyarılarını bastır
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -25,7 +28,9 @@ class GoldSMS:
             username_raw = company.sms_username or os.getenv("GOLDSMS_USERNAME")
             # Fix: dinogida45 -> dinogıda45 (GoldSMS hesabı Türkçe ı ile kayıtlı)
             self.username = username_raw.replace('dinogida45', 'dinogıda45') if username_raw else None
-            self.password = company.sms_password or os.getenv("GOLDSMS_PASSWORD")
+            # Şifre config cache'inde tutulmaz, DB'den okunur
+            from backend.utils.company_config import get_company_secret
+            self.password = get_company_secret(company, "sms_password") or os.getenv("GOLDSMS_PASSWORD")
             self.originator = company.sms_header or os.getenv("GOLDSMS_ORIGINATOR")
         else:
             # Fallback: Env'den al (geriye dönük uyumluluk)
@@ -108,6 +113,7 @@ class GoldSMS:
             logger.error(f"GoldSMS kredi kontrol hatası: {e}")
             return False
     
+    @timed("sms")
     def send_sms(self, phone: str, message: str) -> bool:
         """
         SMS gönder
@@ -5,6 +5,9 @@ from celery import Task
 from backend.celery_app import celery_app
 from backend.utils.email_service import EmailService
 from typing import List
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class EmailTask(Task):
@@ -50,7 +53,7 @@ def send_email(self, to_email: str, subject: str, body: str, html_body: str = No
         }
         
     except Exception as e:
-        print(f"Email send error: {e}")
+        logger.error(f"Email send error: {e}")
         raise
 
 
@@ -78,7 +81,7 @@ def send_bulk_emails(emails: List[dict]) -> dict:
             )
             success_count += 1
         except Exception as e:
-            print(f"Bulk email error: {e}")
+            logger.error(f"Bulk email error: {e}")
             failed_count += 1
     
     return {
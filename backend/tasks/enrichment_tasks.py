@@ -0,0 +1,27 @@
+"""
+IP Enrichment Tasks (Scheduled)
+Log kayıtlarının ISP/konum bilgilerini arka planda toplu doldurur
+"""
+from backend.celery_app import celery_app
+from backend.database import get_db
+from backend.utils.ip_enrichment import enrich_pending_ip_rows
+
+
+@celery_app.task(name="backend.tasks.enrichment_tasks.enrich_pending_ips")
+def enrich_pending_ips(batch_size: int = None) -> dict:
+    """
+    ISP bilgisi bekleyen log kayıtlarını zenginleştir
+    
+    Args:
+        batch_size: Tablo başına işlenecek maksimum farklı IP sayısı
+    
+    Returns:
+        dict: {"updated": {"activity_logs": 12, ...}}
+    """
+    db = next(get_db())
+    
+    try:
+        stats = enrich_pending_ip_rows(db, batch_size)
+        return {"updated": stats}
+    finally:
+        db.close()
@@ -6,6 +6,9 @@ from backend.celery_app import celery_app
 from typing import List
 import openpyxl
 import os
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 @celery_app.task(bind=True, name="backend.tasks.excel_tasks.process_excel_upload")
@@ -52,7 +55,7 @@ def process_excel_upload(self, file_path: str, sheet_name: str = None) -> dict:
         }
         
     except Exception as e:
-        print(f"Excel processing error: {e}")
+        logger.error(f"Excel processing error: {e}")
         raise
 
 
@@ -6,8 +6,11 @@ from backend.celery_app import celery_app
 from backend.database import get_db
 from backend.models import ActivityLog, User
 from datetime import datetime, timedelta
+import logging
 import pytz
 
+logger = logging.getLogger(__name__)
+
 
 TURKEY_TZ = pytz.timezone('Europe/Istanbul')
 
@@ -35,7 +38,7 @@ def cleanup_old_logs(days: int = 90) -> dict:
         
         db.commit()
         
-        print(f"Cleanup: {deleted_count} eski log silindi")
+        logger.info(f"Cleanup: {deleted_count} eski log silindi")
         
         return {
             "deleted_count": deleted_count,
@@ -44,7 +47,7 @@ def cleanup_old_logs(days: int = 90) -> dict:
         
     except Exception as e:
         db.rollback()
-        print(f"Cleanup error: {e}")
+        logger.error(f"Cleanup error: {e}")
         raise
     finally:
         db.close()
@@ -75,14 +78,14 @@ def check_password_expiry() -> dict:
         #     # Email gönder
         #     notified_count += 1
         
-        print(f"Password expiry check: {notified_count} kullanıcıya bildirim gönderildi")
+        logger.info(f"Password expiry check: {notified_count} kullanıcıya bildirim gönderildi")
         
         return {
             "notified_users": notified_count
         }
         
     except Exception as e:
-        print(f"Password expiry check error: {e}")
+        logger.error(f"Password expiry check error: {e}")
         raise
     finally:
         db.close()
@@ -9,17 +9,20 @@ from backend.utils.pdf_service import create_mutabakat_pdf
 from backend.utils.pdf_signer import pdf_signer
 from backend.utils.pdf_permissions import apply_pdf_permissions
 import os
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class CallbackTask(Task):
     """Task with callbacks"""
     def on_success(self, retval, task_id, args, kwargs):
         """Task başarılı olduğunda"""
-        print(f"Task {task_id} başarılı: {retval}")
+        logger.info(f"Task {task_id} başarılı: {retval}")
     
     def on_failure(self, exc, task_id, args, kwargs, einfo):
         """Task başarısız olduğunda"""
-        print(f"Task {task_id} başarısız: {exc}")
+        logger.error(f"Task {task_id} başarısız: {exc}")
 
 
 @celery_app.task(base=CallbackTask, bind=True, name="backend.tasks.pdf_tasks.generate_mutabakat_pdf")
@@ -107,7 +110,7 @@ def generate_mutabakat_pdf(self, mutabakat_id: int) -> dict:
         }
         
     except Exception as e:
-        print(f"PDF generation error: {e}")
+        logger.error(f"PDF generation error: {e}")
         raise
     finally:
         db.close()
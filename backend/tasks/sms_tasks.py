@@ -3,8 +3,11 @@ SMS Tasks (Async)
 """
 from celery import Task
 from backend.celery_app import celery_app
-from backend.sms import sms_service
+from backend.sms import GoldSMS
 from typing import List
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 @celery_app.task(bind=True, name="backend.tasks.sms_tasks.send_sms")
@@ -20,27 +23,18 @@ def send_sms(self, phone: str, message: str, company_id: int) -> dict:
     Returns:
         dict: {"status": "success", "phone": "..."}
     """
-    from backend.database import get_db
-    from backend.models import Company
-    
-    db = next(get_db())
+    from backend.utils.company_config import get_company_config
     
     try:
         self.update_state(state="PROGRESS", meta={"status": "SMS gönderiliyor..."})
         
-        # Company bilgilerini al
-        company = db.query(Company).filter(Company.id == company_id).first()
+        # Company bilgilerini al (cache'den)
+        company = get_company_config(company_id)
         if not company:
             raise ValueError(f"Şirket bulunamadı: {company_id}")
         
-        # SMS gönder
-        result = sms_service.send_sms(
-            phone=phone,
-            message=message,
-            sms_header=company.sms_header,
-            sms_username=company.sms_username,
-            sms_password=company.sms_password
-        )
+        # SMS gönder (şirketin SMS hesabı ile, şifre DB'den okunur)
+        result = GoldSMS(company).send_sms(phone=phone, message=message)
         
         return {
             "status": "success" if result else "failed",
@@ -48,10 +42,8 @@ def send_sms(self, phone: str, message: str, company_id: int) -> dict:
         }
         
     except Exception as e:
-        print(f"SMS send error: {e}")
+        logger.error(f"SMS send error: {e}")
         raise
-    finally:
-        db.close()
 
 
 @celery_app.task(name="backend.tasks.sms_tasks.send_bulk_sms")
@@ -74,7 +66,7 @@ def send_bulk_sms(messages: List[dict], company_id: int) -> dict:
             send_sms(msg["phone"], msg["message"], company_id)
             success_count += 1
         except Exception as e:
-            print(f"Bulk SMS error: {e}")
+            logger.error(f"Bulk SMS error: {e}")
             failed_count += 1
     
     return {
@@ -0,0 +1,126 @@
+"""
+Sync Session vs AsyncSession Eşzamanlılık Benchmark'ı
+
+async def endpoint içinde sync Session kullanıldığında her sorgu event loop'u
+bloklar; eşzamanlı istekler sırayla çalışır. AsyncSession ile sorgular
+beklerken loop diğer istekleri işler.
+
+Ağ gecikmesini taklit etmek için SQLite'a sleep_ms() fonksiyonu eklenir.
+
+Kullanım:
+    python -m backend.tests.benchmark_async_db --requests 50 --latency-ms 20
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+QUERY = text("SELECT sleep_ms(:latency)")
+
+
+class QueryTracker:
+    """Aynı anda çalışan sorgu sayısının en yüksek değeri"""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def sleep_ms(self, ms):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(ms / 1000)
+        with self._lock:
+            self.active -= 1
+        return ms
+
+    def register(self, dbapi_connection, connection_record):
+        dbapi_connection.create_function("sleep_ms", 1, self.sleep_ms)
+
+
+async def _run_sync_sessions(url: str, requests: int, latency_ms: int, pool_size: int):
+    """Önceki hal: async handler içinde sync Session (loop bloklanır)"""
+    engine = create_engine(url, poolclass=QueuePool, pool_size=pool_size, max_overflow=0)
+    tracker = QueryTracker()
+    event.listen(engine, "connect", tracker.register)
+
+    async def handler(i):
+        with Session(engine) as session:
+            return session.execute(QUERY, {"latency": latency_ms + i % 2}).scalar()
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(handler(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+    return elapsed, tracker.max_active, results
+
+
+async def _run_async_sessions(url: str, requests: int, latency_ms: int, pool_size: int):
+    """Yeni hal: AsyncSession (sorgu beklerken loop serbest)"""
+    engine = create_async_engine(
+        url.replace("sqlite://", "sqlite+aiosqlite://", 1),
+        poolclass=AsyncAdaptedQueuePool, pool_size=pool_size, max_overflow=0
+    )
+    tracker = QueryTracker()
+    event.listen(engine.sync_engine, "connect", tracker.register)
+
+    async def handler(i):
+        async with AsyncSession(engine) as session:
+            return (await session.execute(QUERY, {"latency": latency_ms + i % 2})).scalar()
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(handler(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    await engine.dispose()
+    return elapsed, tracker.max_active, results
+
+
+async def run_benchmark(requests: int = 50, latency_ms: int = 20, pool_size: int = 10) -> Dict:
+    """
+    Aynı iş yükünü iki yöntemle çalıştır
+
+    Süre / throughput'a ek olarak aynı anda çalışan en fazla sorgu sayısı ve
+    sorgu sonuçları döner (testler süreye değil bunlara bakar).
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+        sync_elapsed, sync_concurrency, sync_results = await _run_sync_sessions(url, requests, latency_ms, pool_size)
+        async_elapsed, async_concurrency, async_results = await _run_async_sessions(url, requests, latency_ms, pool_size)
+
+    return {
+        "requests": requests,
+        "latency_ms": latency_ms,
+        "pool_size": pool_size,
+        "sync_seconds": round(sync_elapsed, 3),
+        "async_seconds": round(async_elapsed, 3),
+        "sync_rps": round(requests / sync_elapsed, 1),
+        "async_rps": round(requests / async_elapsed, 1),
+        "speedup": round(sync_elapsed / async_elapsed, 2),
+        "sync_max_concurrency": sync_concurrency,
+        "async_max_concurrency": async_concurrency,
+        "sync_results": sync_results,
+        "async_results": async_results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync Session vs AsyncSession benchmark")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency-ms", type=int, default=20)
+    parser.add_argument("--pool-size", type=int, default=10)
+    args = parser.parse_args()
+
+    result = asyncio.run(run_benchmark(args.requests, args.latency_ms, args.pool_size))
+    print(f"[BENCHMARK] {result['requests']} eşzamanlı istek, {result['latency_ms']} ms sorgu gecikmesi")
+    print(f"[BENCHMARK] Sync Session : {result['sync_seconds']} sn ({result['sync_rps']} req/s)")
+    print(f"[BENCHMARK] AsyncSession : {result['async_seconds']} sn ({result['async_rps']} req/s)")
+    print(f"[BENCHMARK] Hızlanma     : {result['speedup']}x")
@@ -0,0 +1,167 @@
+"""
+Rate Limiter Benchmark'ları
+
+1) Kontrol başına ek yük: her korunan istek handler'dan önce bir sayaç
+   kontrolü yapar. Yerel sayaç (process içi) ile Redis Lua script'i (tek
+   EVALSHA round trip) karşılaştırılır. Limit, ölçüm sırasında hiçbir istek
+   reddedilmeyecek kadar yüksek tutulur.
+
+2) Eşzamanlılık: önceki limiter global kilidi handler boyunca tutuyordu; aynı
+   worker'daki korunan istekler (login, PDF, dashboard...) sırayla çalışıyordu.
+   N paralel dashboard isteği eski davranış ve RateLimitMiddleware (ASGI app'i
+   saran, production'daki yol) ile çalıştırılır.
+
+Kullanım:
+    python -m backend.tests.benchmark_rate_limiter --checks 5000
+    python -m backend.tests.benchmark_rate_limiter --checks 5000 --redis   # REDIS_HOST'taki sunucu ile
+    python -m backend.tests.benchmark_rate_limiter --concurrency 50 --handler-ms 50
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Dict, List
+
+from backend.middleware.rate_limiter import RateLimitMiddleware, RateLimitRules
+from backend.utils.rate_limit_store import RateLimitStore
+
+
+def _summary(durations: List[float]) -> Dict[str, float]:
+    durations = sorted(durations)
+    total = sum(durations)
+    return {
+        "checks": len(durations),
+        "mean_us": round(total / len(durations) * 1e6, 1),
+        "p50_us": round(durations[len(durations) // 2] * 1e6, 1),
+        "p99_us": round(durations[min(len(durations) - 1, int(len(durations) * 0.99))] * 1e6, 1),
+        "checks_per_second": round(len(durations) / total, 1) if total else 0.0,
+    }
+
+
+async def _measure(store: RateLimitStore, checks: int, keys: int) -> Dict[str, float]:
+    durations = []
+    for index in range(checks):
+        key = f"bench-{index % keys}:/api/auth/login"
+        start = time.perf_counter()
+        await store.hit(key, checks + 1, 60)
+        durations.append(time.perf_counter() - start)
+    return _summary(durations)
+
+
+async def run_benchmark(checks: int = 5000, keys: int = 100, redis: bool = False) -> Dict[str, Dict]:
+    """Kontrol başına süre (mikrosaniye) ve saniyedeki kontrol sayısı"""
+    results = {"local": await _measure(RateLimitStore(enabled=False), checks, keys)}
+
+    if redis:
+        # Ayrı prefix: uygulamanın sayaçlarına dokunulmaz, key'ler 2 pencere sonra silinir
+        store = RateLimitStore(enabled=True, prefix=f"ratelimit-bench:{uuid.uuid4().hex[:8]}")
+        results["redis"] = await _measure(store, checks, keys)
+        if store.redis_checks == 0:
+            results["redis"]["error"] = "Redis'e bağlanılamadı (yerel fallback ölçüldü)"
+    return results
+
+
+def _dashboard_scope(index: int) -> Dict:
+    """Farklı kullanıcılardan (IP) gelen dashboard isteği"""
+    return {
+        "type": "http", "method": "GET", "path": "/api/dashboard/stats", "raw_path": b"/api/dashboard/stats",
+        "query_string": b"", "headers": [], "scheme": "http", "server": ("testserver", 80),
+        "client": (f"10.0.{index // 250}.{index % 250 + 1}", 50000), "state": {},
+    }
+
+
+class _DashboardApp:
+    """Handler'ı taklit eden ASGI app (aynı anda çalışan istek sayısını tutar)"""
+
+    def __init__(self, handler_ms: int):
+        self.handler_ms = handler_ms
+        self.active = 0
+        self.max_active = 0
+
+    async def __call__(self, scope, receive, send):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(self.handler_ms / 1000)  # Cache miss / DB sorgusu
+        self.active -= 1
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b'{"toplam_mutabakat": 0}'})
+
+
+class _GlobalLockLimit:
+    """Önceki davranış: sayaç kontrolü VE handler tek bir global kilidin içinde"""
+
+    def __init__(self, app, store: RateLimitStore, max_requests: int, window_seconds: int):
+        self.app = app
+        self.store = store
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self.lock = asyncio.Lock()
+
+    async def __call__(self, scope, receive, send):
+        async with self.lock:
+            await self.store.hit(f"{scope['client'][0]}:{scope['path']}", self.max_requests, self.window_seconds)
+            await self.app(scope, receive, send)
+
+
+async def _run_parallel(app, requests: int):
+    statuses = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def call(index):
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+        await app(_dashboard_scope(index), receive, send)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call(index) for index in range(requests)))
+    return time.perf_counter() - start, statuses
+
+
+async def run_concurrency_benchmark(requests: int = 20, handler_ms: int = 50) -> Dict:
+    """N paralel dashboard isteği: eski global kilit vs RateLimitMiddleware (production yolu)"""
+    serialized_app = _DashboardApp(handler_ms)
+    serialized = _GlobalLockLimit(serialized_app, RateLimitStore(enabled=False), **RateLimitRules.DASHBOARD)
+    serialized_elapsed, _ = await _run_parallel(serialized, requests)
+
+    limited_app = _DashboardApp(handler_ms)
+    limited = RateLimitMiddleware(limited_app, store=RateLimitStore(enabled=False))
+    limited_elapsed, statuses = await _run_parallel(limited, requests)
+
+    return {
+        "requests": requests,
+        "handler_ms": handler_ms,
+        "global_lock_seconds": round(serialized_elapsed, 3),
+        "rate_limiter_seconds": round(limited_elapsed, 3),
+        "speedup": round(serialized_elapsed / limited_elapsed, 1),
+        "global_lock_max_concurrency": serialized_app.max_active,
+        "rate_limiter_max_concurrency": limited_app.max_active,
+        "rate_limiter_statuses": statuses,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rate limiter benchmark'ları")
+    parser.add_argument("--checks", type=int, default=5000)
+    parser.add_argument("--keys", type=int, default=100)
+    parser.add_argument("--redis", action="store_true", help="Redis Lua sayaçlarını da ölç")
+    parser.add_argument("--concurrency", type=int, default=20, help="Paralel dashboard isteği sayısı")
+    parser.add_argument("--handler-ms", type=int, default=50)
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args.checks, args.keys, args.redis))
+    for backend, result in results.items():
+        print(
+            f"[BENCHMARK] {backend:<5}: ortalama {result['mean_us']} µs, p50 {result['p50_us']} µs, "
+            f"p99 {result['p99_us']} µs ({result['checks_per_second']} kontrol/s)"
+        )
+        if "error" in result:
+            print(f"[BENCHMARK] {backend:<5}: {result['error']}")
+
+    result = asyncio.run(run_concurrency_benchmark(args.concurrency, args.handler_ms))
+    print(f"[BENCHMARK] {result['requests']} paralel dashboard isteği, handler {result['handler_ms']} ms")
+    print(f"[BENCHMARK] Global kilit   : {result['global_lock_seconds']} sn")
+    print(f"[BENCHMARK] Middleware     : {result['rate_limiter_seconds']} sn")
+    print(f"[BENCHMARK] Hızlanma       : {result['speedup']}x")
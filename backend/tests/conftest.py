@@ -4,24 +4,39 @@ Pytest konfigürasyonu ve test fixtures
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 import os
-from backend.database import Base, get_db
+import tempfile
+from backend import database
+from backend.database import Base, PrimarySession, get_async_db, get_async_read_db, get_db, get_read_db
 from backend.main import app
+from backend.middleware import rate_limiter
+from backend.utils.rate_limit_store import RateLimitStore
 from backend.models import User, Company, UserRole
 from datetime import datetime
 import pytz
 
-# Test veritabanı (SQLite in-memory)
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# Test veritabanı (SQLite dosyası - sync ve async session'lar aynı veriyi görür)
+TEST_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="mutabakat_test_"), "test.db")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{TEST_DB_PATH}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# PrimarySession: commit event'leri (lag guard, cache invalidation) testlerde de çalışır
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=PrimarySession)
+
+# NullPool: TestClient her testte yeni event loop açar, bağlantılar loop'lar arası paylaşılmaz
+async_engine = create_async_engine(
+    f"sqlite+aiosqlite:///{TEST_DB_PATH}",
+    poolclass=NullPool,
+)
+AsyncTestingSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False, sync_session_class=PrimarySession
+)
 
 
 @pytest.fixture(scope="function")
@@ -37,7 +52,7 @@ def db():
 
 
 @pytest.fixture(scope="function")
-def client(db):
+def client(db, monkeypatch):
     """Test client"""
     def override_get_db():
         try:
@@ -45,7 +60,19 @@ def client(db):
         finally:
             pass
     
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as async_db:
+            yield async_db
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
+    # Cache'li hesaplamalar kendi session'larını açar (read_session / async_read_session)
+    monkeypatch.setattr(database, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(database, "AsyncSessionLocal", AsyncTestingSessionLocal)
+    # Rate limit sayaçları test başına sıfırdan (Redis'e gidilmez)
+    monkeypatch.setattr(rate_limiter, "rate_limit_store", RateLimitStore(enabled=False))
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -105,3 +132,56 @@ def auth_headers(client, test_admin_user):
     token = response.json().get("access_token")
     return {"Authorization": f"Bearer {token}"}
 
+
+
+@pytest.fixture
+def admin_headers(test_admin_user, monkeypatch):
+    """Login akışından bağımsız, doğrudan üretilmiş admin token header'ı"""
+    import backend.auth as auth_module
+    if not auth_module.SECRET_KEY:
+        monkeypatch.setattr(auth_module, "SECRET_KEY", "test-secret-key")
+    token = auth_module.create_access_token({
+        "sub": test_admin_user.username,
+        "company_id": test_admin_user.company_id
+    })
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def query_budget(monkeypatch):
+    """
+    Endpoint sorgu bütçesi kontrolü (X-DB-Queries header'ı üzerinden)
+    
+    Örnek: query_budget(client.get("/api/..."), 5)
+    """
+    from backend.config import settings
+    monkeypatch.setattr(settings, "DEBUG", True)
+    
+    def check(response, max_queries: int) -> int:
+        used = int(response.headers["X-DB-Queries"])
+        assert used <= max_queries, f"Sorgu bütçesi aşıldı: {used} > {max_queries}"
+        return used
+    
+    return check
+
+
+@pytest.fixture
+def fake_cache(monkeypatch):
+    """
+    Bellek içi Redis üzerinde CacheManager kurar ve global cache_manager'ı onunla değiştirir
+
+    Örnek: cache = fake_cache(l1_enabled=False, modules=[mutabakat_router])
+    (cache_manager'ı isimle import eden modüller `modules` ile verilir)
+    """
+    from backend.tests.fake_redis import FakeRedis
+    from backend.utils import cache_manager as cache_module
+
+    def make(l1_enabled: bool = True, modules=(), redis_client=None, **kwargs):
+        cache = cache_module.CacheManager(
+            redis_client=redis_client or FakeRedis(), l1_enabled=l1_enabled, **kwargs
+        )
+        for module in (cache_module, *modules):
+            monkeypatch.setattr(module, "cache_manager", cache)
+        return cache
+
+    return make
@@ -0,0 +1,122 @@
+"""
+Bellek içi Redis taklidi (Redis sunucusu gerektirmeyen cache testleri için)
+"""
+import fnmatch
+import queue
+
+
+class FakePipeline:
+    """Komutları biriktirip execute'ta sırayla çalıştırır"""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+        return lambda *args, **kwargs: self.calls.append(lambda: method(*args, **kwargs))
+
+    def execute(self):
+        return [call() for call in self.calls]
+
+
+class FakePubSub:
+    def __init__(self, client):
+        self.client = client
+        self.messages = queue.Queue()
+
+    def subscribe(self, channel):
+        self.client.subscribers.setdefault(channel, []).append(self)
+
+    def get_message(self, timeout=1.0):
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        pass
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.subscribers = {}
+        self.get_calls = 0
+
+    def get(self, key):
+        self.get_calls += 1
+        return self.data.get(key)
+
+    def ttl(self, key):
+        return 300 if key in self.data else -2
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def eval(self, script, numkeys, key, token):
+        """Sadece kilit bırakma script'i (compare-and-delete)"""
+        if self.data.get(key) == token:
+            return self.delete(key)
+        return 0
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key) or 0) + 1)
+        return int(self.data[key])
+
+    def expire(self, key, ttl):
+        return key in self.data
+
+    def scan_iter(self, match=None, count=None):
+        return iter([key for key in self.data if fnmatch.fnmatchcase(key, match)])
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub(self)
+
+    def publish(self, channel, message):
+        for subscriber in self.subscribers.get(channel, []):
+            subscriber.messages.put({"type": "message", "data": message})
+
+    def info(self, section=None):
+        return {}
+
+
+class FakeAsyncRedis:
+    """FakeRedis'in redis.asyncio arayüzü (aynı veriyi paylaşır)"""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = 0
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+
+        async def call(*args, **kwargs):
+            self.calls += 1
+            return method(*args, **kwargs)
+        return call
+
+    def pipeline(self, transaction=True):
+        pipe = FakePipeline(self.client)
+        execute = pipe.execute
+
+        async def async_execute():
+            self.calls += 1
+            return execute()
+        pipe.execute = async_execute
+        return pipe
@@ -0,0 +1,33 @@
+"""
+Kimlik Doğrulama Snapshot Cache Testleri (get_current_user sıcak yolu ve generation invalidation)
+"""
+import backend.auth as auth_module
+
+
+def test_current_user_snapshot_skips_user_query_and_is_invalidated_on_commit(fake_cache, client, admin_headers, db, test_admin_user, query_budget):
+    cache = fake_cache(l1_enabled=True, modules=[auth_module])
+
+    first = client.get("/api/auth/me", headers=admin_headers)
+    second = client.get("/api/auth/me", headers=admin_headers)
+    assert second.json() == first.json()
+    assert query_budget(second, 0) == 0, "snapshot ve şirket ayarları cache'den"
+    stats = cache.metrics.get_stats()["auth_user"]
+    assert (stats["misses"], stats["l1_hits"]) == (1, 1)
+
+    # ORM gereken endpoint snapshot'tan tam nesneyi yükler; şifre değişikliği kullanıcının generation'ını artırır
+    response = client.post(
+        "/api/auth/change-password", headers=admin_headers,
+        json={"current_password": "123456", "new_password": "YeniSifre123!"}
+    )
+    assert response.status_code == 200, response.text
+    namespace = auth_module.auth_user_namespace(test_admin_user.username, test_admin_user.company_id)
+    assert cache.get_generation(namespace) == 1
+
+    # Yarış: istek generation'ı okudu ve aktif kullanıcıyı SELECT etti, bu arada
+    # kullanıcı pasife alındı; istek eski snapshot'ı sonradan cache'e yazar
+    stale_key = auth_module.auth_user_key(test_admin_user.username, test_admin_user.company_id, 1)
+    stale_snapshot = {field: getattr(test_admin_user, field) for field in auth_module.USER_SNAPSHOT_FIELDS}
+    test_admin_user.is_active = False
+    db.commit()
+    cache.set(stale_key, stale_snapshot, 60)
+    assert client.get("/api/auth/me", headers=admin_headers).status_code == 400
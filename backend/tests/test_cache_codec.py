@@ -0,0 +1,59 @@
+"""
+Cache Codec Testleri (header byte, tipli değerler, sıkıştırma)
+"""
+import json
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from backend.models import MutabakatDurumu
+from backend.utils.cache_codec import CacheCodec, CodecError, ORJSON_AVAILABLE
+
+
+def sample_value():
+    return {
+        "durum": MutabakatDurumu.ONAYLANDI,
+        "created_at": datetime(2024, 5, 1, 10, 30, tzinfo=timezone.utc),
+        "donem": date(2024, 4, 30),
+        "bakiye": Decimal("1250.75"),
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "etiketler": {"a"},
+        "satirlar": [{"borc": 1.5, "alacak": None}, (1, 2)],
+        MutabakatDurumu.REDDEDILDI: 3,
+    }
+
+
+@pytest.mark.parametrize("codec_name", ["json", "orjson"])
+def test_typed_values_round_trip(codec_name):
+    codec = CacheCodec(codec_name, compression="none")
+    value = codec.decode(codec.encode(sample_value()))
+
+    assert value["durum"] is MutabakatDurumu.ONAYLANDI
+    assert value["created_at"] == datetime(2024, 5, 1, 10, 30, tzinfo=timezone.utc)
+    assert value["donem"] == date(2024, 4, 30)
+    assert value["bakiye"] == Decimal("1250.75")
+    assert isinstance(value["id"], uuid.UUID)
+    assert value["etiketler"] == {"a"}
+    assert value["satirlar"] == [{"borc": 1.5, "alacak": None}, [1, 2]]
+    assert value[MutabakatDurumu.REDDEDILDI.value] == 3
+
+
+def test_header_records_codec_and_compression():
+    """Okuyan taraf codec'i header'dan seçer; eski düz JSON değerler de okunur"""
+    payload = {"rows": [{"vkn": "1234567890", "toplam": i} for i in range(200)]}
+    writer = CacheCodec("json", compression="zlib", compress_threshold=256)
+    reader = CacheCodec("orjson" if ORJSON_AVAILABLE else "json", compression="none")
+
+    raw = writer.encode(payload)
+    assert raw[0] & 0x03 == 1 and raw[0] >> 3 == 1
+    assert len(raw) < len(json.dumps(payload)) / 4
+    assert reader.decode(raw) == payload
+
+    small = writer.encode({"a": 1})
+    assert small[0] >> 3 == 0, "eşik altı değerler sıkıştırılmaz"
+
+    assert reader.decode(json.dumps({"eski": "format"})) == {"eski": "format"}
+    with pytest.raises(CodecError):
+        reader.decode(b"\x19\x00")  # bilinmeyen sıkıştırma
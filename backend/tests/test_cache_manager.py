@@ -0,0 +1,306 @@
+"""
+CacheManager L1 (process içi) + L2 (Redis) Testleri
+
+Redis sunucusu gerektirmemek için bellek içi bir Redis taklidi kullanılır;
+iki CacheManager aynı taklidi paylaşarak iki worker'ı temsil eder.
+"""
+import asyncio
+import time
+
+import redis
+
+from backend.tests.fake_redis import FakeAsyncRedis, FakeRedis
+from backend.utils import cache_manager as cache_module
+from backend.utils.cache_manager import CacheManager, async_cached, cached, invalidate_company_cache
+
+
+class DownRedis(FakeRedis):
+    """Bağlantı hatası veren Redis (down sayacı sıfırlanınca düzelir)"""
+
+    def __init__(self):
+        super().__init__()
+        self.down = True
+        self.attempts = 0
+
+    def setex(self, key, ttl, value):
+        self.attempts += 1
+        if self.down:
+            raise redis.ConnectionError("Connection refused")
+        return super().setex(key, ttl, value)
+
+
+def wait_until(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_l1_serves_hot_keys_without_redis_round_trip():
+    redis_client = FakeRedis()
+    cache = CacheManager(redis_client=redis_client, l1_enabled=True)
+
+    cache.set("cache:dashboard_stats:1", {"toplam": 3})
+    calls = redis_client.get_calls
+    for _ in range(5):
+        assert cache.get("cache:dashboard_stats:1") == {"toplam": 3}
+    assert redis_client.get_calls == calls
+
+    stats = cache.get_stats()
+    assert stats["l1"]["hits"] == 5
+    assert stats["l2"]["hits"] == 0
+
+
+def test_l1_hits_return_independent_copies():
+    """Çağıranın dönen değeri değiştirmesi L1'deki kaydı bozmaz"""
+    redis_client = FakeRedis()
+    writer = CacheManager(redis_client=redis_client, l1_enabled=True)
+    reader = CacheManager(redis_client=redis_client, l1_enabled=True)
+
+    writer.set("cache:company_config:1", {"sms_header": "TEST", "items": [1]})
+    reader.get("cache:company_config:1")["items"].append(2)  # L2 -> L1
+    for cache in (writer, reader):
+        value = cache.get("cache:company_config:1")  # L1
+        value["sms_header"] = "BOZUK"
+        assert cache.get("cache:company_config:1") == {"sms_header": "TEST", "items": [1]}
+    assert reader.get_stats()["l1"]["hits"] == 2
+
+
+def test_l2_hit_populates_l1_and_counters_are_separate():
+    redis_client = FakeRedis()
+    writer = CacheManager(redis_client=redis_client, l1_enabled=False)
+    reader = CacheManager(redis_client=redis_client, l1_enabled=True)
+
+    writer.set("cache:company:1", {"ad": "Dino"})
+    assert reader.get("cache:company:1") == {"ad": "Dino"}  # L2
+    assert reader.get("cache:company:1") == {"ad": "Dino"}  # L1
+    assert reader.get("cache:company:yok") is None
+
+    stats = reader.get_stats()
+    assert (stats["l1"]["hits"], stats["l2"]["hits"], stats["l2"]["misses"]) == (1, 1, 1)
+    assert "l1" in writer.get_stats() and writer.get_stats()["l1"] == {"enabled": False}
+
+
+def test_delete_invalidates_l1_in_other_workers():
+    redis_client = FakeRedis()
+    worker_a = CacheManager(redis_client=redis_client, l1_enabled=True)
+    worker_b = CacheManager(redis_client=redis_client, l1_enabled=True)
+
+    worker_a.set("cache:dashboard_stats:7", {"v": 1})
+    worker_a.set("cache:mutabakat_list:7", {"v": 1})
+    assert worker_b.get("cache:dashboard_stats:7") == {"v": 1}
+    assert worker_b.get("cache:mutabakat_list:7") == {"v": 1}
+    assert len(worker_b.l1) == 2
+    # Dinleyici thread'leri kanala abone olana kadar bekle
+    assert wait_until(lambda: len(redis_client.subscribers.get(worker_b.invalidation_channel, [])) == 2)
+
+    worker_a.delete("cache:dashboard_stats:7")
+    assert wait_until(lambda: len(worker_b.l1) == 1)
+
+    worker_a.delete_pattern("cache:mutabakat_*")
+    assert wait_until(lambda: len(worker_b.l1) == 0)
+    assert worker_b.get("cache:mutabakat_list:7") is None
+
+
+def test_large_values_stay_in_redis_only(monkeypatch):
+    from backend.config import settings
+    monkeypatch.setattr(settings, "CACHE_L1_MAX_ITEM_BYTES", 10)
+
+    cache = CacheManager(redis_client=FakeRedis(), l1_enabled=True)
+    cache.set("cache:big", {"data": "x" * 100})
+    assert len(cache.l1) == 0
+    assert cache.get("cache:big") == {"data": "x" * 100}
+
+
+def test_generation_bump_invalidates_cached_results(fake_cache):
+    """Şirket invalidation'ı tek INCR; cached() key'leri yeni generation'a geçer"""
+    fake_cache(l1_enabled=True)
+    calls = []
+
+    @cached("company_config", ttl=600, namespaces=lambda company_id: [f"company:{company_id}"])
+    def get_company_config(company_id):
+        calls.append(company_id)
+        return {"company_id": company_id, "version": len(calls)}
+
+    assert get_company_config(1)["version"] == 1
+    assert get_company_config(1)["version"] == 1
+    assert get_company_config(2)["version"] == 2
+
+    invalidate_company_cache(1)
+    assert get_company_config(1)["version"] == 3
+    assert get_company_config(2)["version"] == 2  # Diğer şirket etkilenmez
+
+    get_company_config.invalidate_all()
+    assert get_company_config(2)["version"] == 4
+    assert calls == [1, 2, 1, 2]
+
+
+def expire_entry(redis_client, key_prefix, expires_in, compute_seconds=0.0):
+    """Redis'teki async_cached zarfının mantıksal bitişini değiştir"""
+    codec = cache_module.cache_manager.codec
+    for key, raw in redis_client.data.items():
+        if key.startswith(key_prefix):
+            envelope = codec.decode(raw)
+            envelope["exp"] = time.time() + expires_in
+            envelope["d"] = compute_seconds
+            redis_client.data[key] = codec.encode(envelope)
+
+
+def test_async_cached_single_flight(fake_cache):
+    """Aynı anda gelen çağrılar tek hesaplamayı bekler"""
+    fake_cache(l1_enabled=False)
+    calls = []
+
+    @async_cached("report", ttl=60)
+    async def slow_report(company_id):
+        calls.append(company_id)
+        await asyncio.sleep(0.05)
+        return {"company_id": company_id}
+
+    async def scenario():
+        return await asyncio.gather(*[slow_report(1) for _ in range(20)], slow_report(2))
+
+    results = asyncio.run(scenario())
+    assert results[0] == {"company_id": 1} and results[-1] == {"company_id": 2}
+    assert sorted(calls) == [1, 2]
+
+
+def test_async_cached_serves_stale_and_refreshes_in_background(fake_cache):
+    redis_client = fake_cache(l1_enabled=False).redis_client
+    calls = []
+
+    @async_cached("stats", ttl=60, stale_ttl=30, early_refresh_beta=0)
+    async def stats(user_id):
+        calls.append(user_id)
+        return {"version": len(calls)}
+
+    async def scenario():
+        assert await stats(1) == {"version": 1}
+        expire_entry(redis_client, "cache:stats:", expires_in=-5)
+        # Süresi dolmuş ama stale penceresinde: eski değer hemen döner
+        assert await stats(1) == {"version": 1}
+        await asyncio.sleep(0.01)
+        assert await stats(1) == {"version": 2}
+        # Stale penceresi de geçtiyse çağıran yeni değeri bekler
+        expire_entry(redis_client, "cache:stats:", expires_in=-60)
+        assert await stats(1) == {"version": 3}
+
+    asyncio.run(scenario())
+
+
+def test_async_cached_early_refresh(fake_cache):
+    """Bitişe hesaplama süresinden daha yakın girdiler önceden yenilenir"""
+    redis_client = fake_cache(l1_enabled=False).redis_client
+    calls = []
+
+    @async_cached("stats", ttl=60, early_refresh_beta=1.0)
+    async def stats(user_id):
+        calls.append(user_id)
+        return {"version": len(calls)}
+
+    async def scenario():
+        await stats(1)
+        expire_entry(redis_client, "cache:stats:", expires_in=0.5, compute_seconds=1000)
+        assert await stats(1) == {"version": 1}
+        await asyncio.sleep(0.01)
+        assert await stats(1) == {"version": 2}
+
+    asyncio.run(scenario())
+
+
+def test_async_cached_distributed_lock(fake_cache):
+    """Redis kilidini alamayan worker diğerinin sonucunu bekler"""
+    redis_client = fake_cache(l1_enabled=False).redis_client
+    calls = []
+
+    def make_worker(name):
+        # Her decorator ayrı bir worker'ın in-process single-flight tablosu gibi davranır
+        @async_cached("heavy", ttl=60, distributed_lock=True, lock_timeout=2)
+        async def heavy(company_id):
+            calls.append(name)
+            await asyncio.sleep(0.1)
+            return {"worker": name}
+        return heavy
+
+    worker_a, worker_b = make_worker("a"), make_worker("b")
+
+    async def scenario():
+        return await asyncio.gather(worker_a(1), worker_b(1))
+
+    assert asyncio.run(scenario()) == [{"worker": "a"}, {"worker": "a"}]
+    assert calls == ["a"]
+    assert not any(key.startswith("cache:lock:") for key in redis_client.data)
+
+
+def test_prefix_metrics_and_exporter(monkeypatch, fake_cache, client, admin_headers):
+    """Hit/miss/set/eviction prefix bazında sayılır; admin endpoint ve exporter'da görünür"""
+    from backend.config import settings
+    monkeypatch.setattr(settings, "CACHE_L1_MAXSIZE", 2)
+    cache = fake_cache(l1_enabled=True)
+
+    cache.set("cache:dashboard_stats:v1:a", {"toplam": 1}, ttl=120)
+    cache.get("cache:dashboard_stats:v1:a")
+    cache.get("cache:dashboard_stats:v1:b")
+    cache.set("ip_info:10.0.0.1", {"isp": "X"}, ttl=600)
+    cache.set("ip_info:10.0.0.2", {"isp": "Y"}, ttl=600)  # L1 kapasitesi 2: dashboard kaydı atılır
+    cache.get("cache:dashboard_stats:v1:a")  # L2'den
+
+    stats = cache.metrics.get_stats()
+    dashboard = stats["dashboard_stats"]
+    assert (dashboard["l1_hits"], dashboard["l2_hits"], dashboard["misses"]) == (1, 1, 1)
+    assert dashboard["sets"] == 1 and dashboard["ttl"] == 120
+    assert dashboard["evictions"] == 1
+    assert dashboard["bytes_written"] > 0 and dashboard["get_ms"]["count"] == 3
+    assert stats["ip_info"]["sets"] == 2
+
+    response = client.get("/api/admin/metrics/prometheus", headers=admin_headers)
+    assert response.status_code == 200
+    assert 'cache_hits_total{prefix="dashboard_stats",tier="l1"} 1' in response.text
+    assert 'cache_get_duration_ms_count{prefix="dashboard_stats"} 3' in response.text
+
+    response = client.get("/api/admin/metrics/cache", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["ttl_settings"]["CACHE_TTL_DASHBOARD"] == settings.CACHE_TTL_DASHBOARD
+
+
+def test_lazy_connect_and_circuit_breaker(monkeypatch):
+    """Redis yokken import/başlangıç beklemez; breaker açılır ve süre sonunda tekrar dener"""
+    from backend.config import settings
+    monkeypatch.setattr(settings, "REDIS_BREAKER_FAILURE_THRESHOLD", 2)
+    monkeypatch.setattr(settings, "REDIS_BREAKER_RESET_SECONDS", 0.1)
+
+    lazy = CacheManager(l1_enabled=False)
+    assert lazy.enabled and lazy.pool._created_connections == 0, "ping yapılmamalı"
+
+    redis_client = DownRedis()
+    cache = CacheManager(redis_client=redis_client, l1_enabled=False)
+    for _ in range(5):
+        assert cache.set("cache:kvkk:1", {"metin": "x"}) is False
+    assert redis_client.attempts == 2, "breaker açıkken Redis'e gidilmez"
+    assert cache.get_stats()["breaker"]["state"] == "open"
+
+    redis_client.down = False
+    time.sleep(0.15)
+    assert cache.set("cache:kvkk:1", {"metin": "x"}) is True  # deneme çağrısı
+    assert cache.breaker.is_closed
+    assert cache.get("cache:kvkk:1") == {"metin": "x"}
+
+
+def test_async_api_uses_async_client(fake_cache):
+    async_client = FakeAsyncRedis(FakeRedis())
+    redis_client = fake_cache(l1_enabled=False, async_redis_client=async_client).redis_client
+
+    @async_cached("report", ttl=60, namespaces=lambda company_id: [f"company:{company_id}"])
+    async def report(company_id):
+        return {"company_id": company_id}
+
+    async def scenario():
+        assert await report(3) == {"company_id": 3}
+        assert await report(3) == {"company_id": 3}
+
+    asyncio.run(scenario())
+    # MGET + GET + SETEX, sonra MGET + GET; sync client hiç kullanılmaz
+    assert async_client.calls == 5
+    assert redis_client.get_calls == 0 and not redis_client.data
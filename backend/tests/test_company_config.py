@@ -0,0 +1,41 @@
+"""
+Şirket Ayarları Cache Testleri (read-through, admin güncellemesinde invalidation, gizli alanlar)
+"""
+from backend.utils.company_config import (
+    CONFIG_FIELDS, SECRET_FIELDS, CompanyConfig, get_company_config, get_company_secret
+)
+
+
+def test_company_config_read_through_and_admin_update_invalidation(fake_cache, client, admin_headers, test_company):
+    cache = fake_cache(l1_enabled=True)
+
+    config = get_company_config(test_company.id)
+    assert isinstance(config, CompanyConfig) and config.sms_header == "TEST"
+    assert not hasattr(config, "kvkk_policy_text"), "sıcak yolda KVKK metinleri taşınmaz"
+    assert get_company_config(test_company.id) == config
+    stats = cache.metrics.get_stats()["company_config"]
+    assert (stats["misses"], stats["l1_hits"]) == (1, 1)
+
+    texts = client.get("/api/kvkk/texts", headers=admin_headers).json()
+    assert client.get("/api/kvkk/texts", headers=admin_headers).json() == texts
+    assert cache.metrics.get_stats()["kvkk_texts"]["misses"] == 1
+
+    response = client.put(
+        f"/api/admin/companies/{test_company.id}", headers=admin_headers,
+        json={"sms_header": "YENI", "kvkk_policy_text": "Şirket KVKK metni"}
+    )
+    assert response.status_code == 200
+    assert get_company_config(test_company.id).sms_header == "YENI"
+    texts = client.get("/api/kvkk/texts", headers=admin_headers).json()
+    assert texts["kvkk_policy"]["content"] == "Şirket KVKK metni"
+
+
+def test_company_config_cache_never_holds_secrets(fake_cache, client, test_company):
+    redis_client = fake_cache(l1_enabled=True).redis_client
+
+    config = get_company_config(test_company.id)
+    assert not set(SECRET_FIELDS) & set(CONFIG_FIELDS)
+    assert redis_client.data and not any(b"test_pass" in value for value in redis_client.data.values())
+    # Şifre ihtiyaç anında DB'den okunur
+    assert get_company_secret(config, "sms_password") == "test_pass"
+    assert get_company_secret(test_company, "sms_password") == "test_pass"
@@ -0,0 +1,62 @@
+"""
+DB Pool Profil ve Metrik Testleri
+"""
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from backend.utils.db_pool import (
+    InstrumentedQueuePool, detect_process_role, get_pool_options, instrument_engine
+)
+
+
+def test_pool_profiles(monkeypatch):
+    """Rol tespiti ve env override"""
+    monkeypatch.setenv("DB_PROCESS_ROLE", "beat")
+    assert detect_process_role() == "beat"
+    assert get_pool_options("beat")["pool_size"] == 1
+
+    monkeypatch.setenv("DB_PROCESS_ROLE", "")
+    monkeypatch.setattr("sys.argv", ["celery", "-A", "backend.celery_app", "worker"])
+    assert detect_process_role() == "worker"
+
+    monkeypatch.setenv("DB_POOL_SIZE", "7")
+    assert get_pool_options("api")["pool_size"] == 7
+
+
+def test_pool_metrics_checkout_and_timeout(tmp_path):
+    """Checkout, bekleme histogramı ve timeout sayaçları"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name="test_pool",
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05
+    )
+    metrics = instrument_engine(engine, "test_pool")
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert metrics.get_stats()["checked_out"] == 1
+
+        # Pool dolu: ikinci checkout timeout'a düşer
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    stats = metrics.get_stats()
+    assert stats["checkouts"] == 1
+    assert stats["checkins"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["peak_in_use"] == 1
+    assert stats["checked_out"] == 0
+    assert stats["checkout_wait_ms"]["count"] == 2
+    engine.dispose()
+
+
+def test_db_pool_endpoint_requires_system_admin(client, admin_headers):
+    """Metrik endpoint'i sistem adminine açık"""
+    assert client.get("/api/admin/metrics/db-pool").status_code == 401
+
+    response = client.get("/api/admin/metrics/db-pool", headers=admin_headers)
+    assert response.status_code == 200
+    assert "primary" in response.json()["pools"]
@@ -0,0 +1,191 @@
+"""
+Offline IP Çözümleyici Testleri
+"""
+import os
+import pytest
+from backend.utils.ip_resolver import IPResolver, IPInfoCache, build_ip_database, empty_ip_info, pending_ip_info
+
+
+@pytest.fixture
+def ip_db_path(tmp_path):
+    """Test IP veritabanı oluştur"""
+    csv_path = tmp_path / "ranges.csv"
+    csv_path.write_text(
+        "start_ip,end_ip,network,isp,org,city,region,country\n"
+        "85.105.0.0,85.105.255.255,,Turk Telekom,TTNet,Istanbul,Istanbul,Turkey\n"
+        "78.160.0.0,78.160.127.255,,Superonline,Turkcell,Ankara,Ankara,Turkey\n"
+        ",,2a02:e0::/32,Turk Telekom,TTNet,Izmir,Izmir,Turkey\n",
+        encoding="utf-8"
+    )
+    db_path = tmp_path / "ip_ranges.bin"
+    assert build_ip_database(str(csv_path), str(db_path)) == 3
+    return db_path
+
+
+def test_lookup_ipv4(ip_db_path):
+    """IPv4 aralık araması"""
+    resolver = IPResolver(str(ip_db_path))
+    info = resolver.resolve("85.105.12.34")
+    assert info["ip"] == "85.105.12.34"
+    assert info["isp"] == "Turk Telekom"
+    assert info["org"] == "TTNet"
+    assert info["city"] == "Istanbul"
+    assert info["region"] == "Istanbul"
+    assert info["country"] == "Turkey"
+
+    assert resolver.resolve("78.160.127.255")["isp"] == "Superonline"
+    assert resolver.resolve("78.160.128.0") == empty_ip_info("78.160.128.0")
+
+
+def test_lookup_ipv6(ip_db_path):
+    """IPv6 aralık araması"""
+    resolver = IPResolver(str(ip_db_path))
+    assert resolver.resolve("2a02:e0::1")["city"] == "Izmir"
+
+
+def test_unknown_and_invalid_ip(ip_db_path):
+    """Bulunamayan veya geçersiz IP'ler 'Bilinmiyor' döner"""
+    resolver = IPResolver(str(ip_db_path))
+    assert resolver.resolve("10.0.0.1")["isp"] == "Bilinmiyor"
+    assert resolver.resolve("unknown") == empty_ip_info("unknown")
+
+
+def test_nested_ranges_most_specific_wins(tmp_path):
+    """İç içe/çakışan aralıklarda en dar aralık, dışında kalan kısımda dış aralık döner"""
+    csv_path = tmp_path / "nested.csv"
+    csv_path.write_text(
+        "start_ip,end_ip,network,isp,org,city,region,country\n"
+        ",,10.0.0.0/8,Outer,,,,\n"
+        ",,10.1.0.0/24,Inner,,,,\n"
+        ",,10.1.0.128/25,Innermost,,,,\n"
+        "10.1.0.200,10.1.1.10,,Partial,,,,\n",
+        encoding="utf-8"
+    )
+    db_path = tmp_path / "nested.bin"
+    build_ip_database(str(csv_path), str(db_path))
+    resolver = IPResolver(str(db_path))
+
+    expected = {
+        "10.0.0.1": "Outer", "10.1.0.5": "Inner", "10.1.0.130": "Innermost",
+        "10.1.0.210": "Partial", "10.1.1.0": "Partial", "10.1.1.10": "Partial",
+        "10.1.1.11": "Outer", "10.2.0.5": "Outer", "10.255.255.255": "Outer",
+        "11.0.0.0": "Bilinmiyor",
+    }
+    assert {ip: resolver.resolve(ip)["isp"] for ip in expected} == expected
+
+
+def test_missing_database(tmp_path):
+    """Veritabanı dosyası yoksa hata vermez"""
+    resolver = IPResolver(str(tmp_path / "yok.bin"))
+    assert resolver.resolve("85.105.12.34")["isp"] == "Bilinmiyor"
+
+
+def test_reload_on_change(ip_db_path, tmp_path):
+    """Dosya değiştiğinde yeni veritabanı yüklenir"""
+    resolver = IPResolver(str(ip_db_path), refresh_seconds=0)
+    assert resolver.resolve("85.105.12.34")["isp"] == "Turk Telekom"
+
+    csv_path = tmp_path / "ranges2.csv"
+    csv_path.write_text(
+        "network,isp,org,city,region,country\n"
+        "85.105.0.0/16,Vodafone Net,Vodafone,Bursa,Bursa,Turkey\n",
+        encoding="utf-8"
+    )
+    build_ip_database(str(csv_path), str(ip_db_path))
+    os.utime(ip_db_path, (1, 1))
+
+    assert resolver.resolve("85.105.12.34")["isp"] == "Vodafone Net"
+
+
+def test_ip_info_cache_hits_and_negative_caching(ip_db_path):
+    """Tekrarlanan IP'ler cache'ten, bulunamayanlar negatif cache'ten döner"""
+    resolver = IPResolver(str(ip_db_path))
+    cache = IPInfoCache(resolver, maxsize=10, ttl=60, negative_ttl=60)
+
+    lookups = []
+    original_lookup = resolver.lookup
+
+    def counting_lookup(ip):
+        lookups.append(ip)
+        return original_lookup(ip)
+
+    resolver.lookup = counting_lookup
+
+    for _ in range(3):
+        assert cache.resolve("85.105.12.34")["isp"] == "Turk Telekom"
+        assert cache.resolve("10.0.0.1")["isp"] == "Bilinmiyor"
+
+    assert lookups == ["85.105.12.34", "10.0.0.1"]
+
+    stats = cache.get_stats()
+    assert stats["misses"] == 2
+    assert stats["local_hits"] == 4
+    assert stats["negative_hits"] == 2
+
+
+def test_ip_info_cache_stats_are_exported(ip_db_path, monkeypatch, client, admin_headers):
+    """ISP cache sayaçları admin cache metriklerinde ve Prometheus çıktısında görünür"""
+    from backend.utils import ip_resolver
+    cache = IPInfoCache(IPResolver(str(ip_db_path)), maxsize=10, ttl=60)
+    monkeypatch.setattr(ip_resolver, "ip_info_cache", cache)
+    for _ in range(3):
+        cache.resolve("85.105.12.34")
+
+    stats = client.get("/api/admin/metrics/cache", headers=admin_headers).json()["ip_info"]
+    assert (stats["misses"], stats["local_hits"], stats["lookups"]) == (1, 2, 3)
+    text = client.get("/api/admin/metrics/prometheus", headers=admin_headers).text
+    assert 'ip_info_cache_hits_total{tier="local"} 2' in text
+    assert "ip_info_cache_misses_total 1" in text
+
+    assert client.post("/api/admin/metrics/cache/reset", headers=admin_headers).status_code == 200
+    assert cache.get_stats()["lookups"] == 0
+
+
+def test_deferred_enrichment(ip_db_path, db, monkeypatch):
+    """ISP'si boş yazılan log kayıtları toplu olarak doldurulur"""
+    from backend.logger import log_activity
+    from backend.models import ActivityLog, FailedLoginAttempt
+    from backend.utils import ip_enrichment
+
+    resolver = IPResolver(str(ip_db_path))
+    monkeypatch.setattr(ip_enrichment, "ip_info_cache", IPInfoCache(resolver, maxsize=10, ttl=60))
+
+    for _ in range(2):
+        log_activity(db, "LOGIN", "test", None, ip_info=pending_ip_info("85.105.12.34"))
+    log_activity(db, "LOGIN", "test", None, ip_info=pending_ip_info("10.0.0.1"))
+    db.add(FailedLoginAttempt(vkn_tckn="1234567890", ip_address="78.160.0.1"))
+    db.commit()
+
+    assert db.query(ActivityLog).filter(ActivityLog.isp.is_(None)).count() == 3
+
+    stats = ip_enrichment.enrich_pending_ip_rows(db)
+    assert stats == {"activity_logs": 3, "failed_login_attempts": 1}
+
+    logs = {log.ip_address: log for log in db.query(ActivityLog).all()}
+    assert logs["85.105.12.34"].isp == "Turk Telekom"
+    assert logs["85.105.12.34"].organization == "TTNet"
+    assert logs["10.0.0.1"].isp == "Bilinmiyor"
+    assert db.query(FailedLoginAttempt).first().city == "Ankara"
+
+    # Tekrar çalıştırıldığında bekleyen kayıt kalmaz
+    assert ip_enrichment.enrich_pending_ip_rows(db) == {}
+
+
+def test_enrichment_leaves_legacy_null_rows_alone(ip_db_path, db, monkeypatch):
+    """Özellik öncesi ISP'si boş kalmış delil kayıtlarına bugünün ISP'si yazılmaz"""
+    from backend.models import ActivityLog, AuditLog, AuditLogAction
+    from backend.utils import ip_enrichment
+
+    monkeypatch.setattr(ip_enrichment, "ip_info_cache", IPInfoCache(IPResolver(str(ip_db_path)), maxsize=10, ttl=60))
+
+    # Migration'da isp_pending=False ile kalan eski kayıtlar
+    db.add(ActivityLog(action="LOGIN", ip_address="85.105.12.34", isp_pending=False))
+    db.add(AuditLog(action=AuditLogAction.LOGIN, ip_address="85.105.12.34", isp_pending=False))
+    # Ertelenmiş modda yazılan yeni kayıt: işaret insert'te otomatik konur
+    db.add(ActivityLog(action="LOGIN", ip_address="85.105.12.34"))
+    db.commit()
+
+    assert ip_enrichment.enrich_pending_ip_rows(db) == {"activity_logs": 1}
+    legacy, new = db.query(ActivityLog).order_by(ActivityLog.id).all()
+    assert (legacy.isp, new.isp, new.isp_pending) == (None, "Turk Telekom", False)
+    assert db.query(AuditLog).one().isp is None
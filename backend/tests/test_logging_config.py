@@ -0,0 +1,41 @@
+"""
+Kuyruk Tabanlı Log Pipeline'ı Testleri
+"""
+import json
+import logging
+import sys
+
+from backend import logging_config
+from backend.logging_config import ContextQueueHandler, JsonFormatter, configure_logging, parse_log_levels
+from backend.middleware.request_context import ClientContext, _current_client_context
+
+
+def test_root_logger_only_has_queue_handler():
+    configure_logging()
+    configure_logging()  # İkinci çağrı handler eklemez
+    # pytest kendi capture handler'larını ekler, sadece bizimkiler sayılır
+    handlers = [h for h in logging.getLogger().handlers if isinstance(h, ContextQueueHandler)]
+    assert handlers == [logging_config._queue_handler]
+    assert parse_log_levels("a.b=debug, c = WARNING,bozuk") == {"a.b": "DEBUG", "c": "WARNING"}
+
+
+def test_prepared_record_is_json_with_client_ip_and_exception():
+    handler = ContextQueueHandler(None)
+    token = _current_client_context.set(ClientContext(ip="203.0.113.7", user_agent="test"))
+    try:
+        raise ValueError("bozuk imza")
+    except ValueError:
+        record = logging.getLogger("backend.test").makeRecord(
+            "backend.test", logging.ERROR, __file__, 1, "PDF %s imzalanamadı", ("42",),
+            sys.exc_info(), extra={"mutabakat_id": 42},
+        )
+        prepared = handler.prepare(record)
+    finally:
+        _current_client_context.reset(token)
+
+    data = json.loads(JsonFormatter().format(prepared))
+    assert data["message"] == "PDF 42 imzalanamadı" and data["level"] == "ERROR"
+    assert data["client_ip"] == "203.0.113.7"
+    assert data["mutabakat_id"] == 42
+    assert "ValueError: bozuk imza" in data["exc"]
+    assert prepared.exc_info is None and prepared.args is None
@@ -0,0 +1,66 @@
+"""
+Mutabakat Listesi Cache Testleri (kapsam bazlı key'ler ve generation invalidation)
+"""
+from datetime import datetime
+
+from backend.models import Mutabakat, MutabakatDurumu, User, UserRole
+from backend.routers import mutabakat as mutabakat_router
+
+
+def _list_fixture(db, company):
+    """Şirkette iki müşteri ve birer mutabakat"""
+    customers = []
+    for index in (1, 2):
+        user = User(
+            company_id=company.id, vkn_tckn=f"2222222222{index}", username=f"musteri{index}",
+            hashed_password="hash", role=UserRole.MUSTERI, is_active=True
+        )
+        db.add(user)
+        customers.append(user)
+    db.commit()
+    for index, customer in enumerate(customers, start=1):
+        db.add(Mutabakat(
+            company_id=company.id, mutabakat_no=f"MUT-LIST-{index}", sender_id=customer.id,
+            receiver_id=customer.id, receiver_vkn=customer.vkn_tckn, donem_baslangic=datetime.now(),
+            donem_bitis=datetime.now(), durum=MutabakatDurumu.TASLAK, bakiye=100.0 * index
+        ))
+    db.commit()
+    return customers
+
+
+def test_mutabakat_list_is_cached_per_scope_and_normalized_params(fake_cache, client, admin_headers, db, test_company):
+    cache = fake_cache(l1_enabled=False, modules=[mutabakat_router])
+    _list_fixture(db, test_company)
+
+    first = client.get("/api/mutabakat/?page_size=10&order_direction=DESC&search=%20MUT-", headers=admin_headers)
+    assert first.status_code == 200 and first.json()["metadata"]["total_items"] == 2
+    # Aynı sonucu veren farklı yazım -> aynı key (L2 hit)
+    second = client.get("/api/mutabakat/?page_size=10&order_direction=desc&search=MUT-&date_start=gecersiz", headers=admin_headers)
+    assert second.json() == first.json()
+    stats = cache.metrics.get_stats()["mutabakat_list"]
+    assert (stats["misses"], stats["l2_hits"], stats["sets"]) == (1, 1, 1)
+
+
+def test_mutabakat_commit_bumps_only_affected_generations(fake_cache, db, test_company):
+    cache = fake_cache(l1_enabled=False)
+    customer, other = _list_fixture(db, test_company)
+    namespaces = [
+        f"mutabakat_list:user:{customer.id}", f"mutabakat_list:user:{other.id}",
+        f"mutabakat_list:company:{test_company.id}", f"dashboard:user:{customer.id}",
+    ]
+    assert cache.get_generations(namespaces) == [1, 1, 1, 1]  # Oluşturma commit'i
+    before = dict(cache.redis_client.data)
+
+    mutabakat = db.query(Mutabakat).filter(Mutabakat.sender_id == customer.id).one()
+    mutabakat.ekstre_talep_edildi = True
+    db.commit()
+    assert cache.redis_client.data == before, "listede görünmeyen alan invalidation yapmaz"
+
+    mutabakat.durum = MutabakatDurumu.ONAYLANDI
+    db.rollback()
+    assert cache.redis_client.data == before, "rollback invalidation yapmaz"
+
+    mutabakat.durum = MutabakatDurumu.ONAYLANDI
+    db.commit()
+    # Diğer müşterinin listesi etkilenmez
+    assert cache.get_generations(namespaces) == [2, 1, 2, 2]
@@ -0,0 +1,59 @@
+"""
+HTTP Metrik Middleware'i ve /metrics Testleri
+"""
+import asyncio
+
+from backend.middleware.performance_monitor import (
+    UNMATCHED_ROUTE, HttpMetrics, PerformanceMonitorMiddleware, http_metrics, process_metrics
+)
+from backend.utils.metrics import render_prometheus
+
+
+def test_requests_are_recorded_by_route_template(client):
+    http_metrics.reset()
+    client.get("/health")
+    client.get("/api/mutabakat/123")
+    client.get("/api/mutabakat/456")
+    client.get("/yok")
+
+    routes = http_metrics.get_stats()["routes"]
+    assert routes["GET /api/mutabakat/{mutabakat_id}"]["statuses"] == {401: 2}
+    assert routes["GET /api/mutabakat/{mutabakat_id}"]["count"] == 2
+    assert routes[f"GET {UNMATCHED_ROUTE}"]["statuses"] == {404: 1}
+    assert not any("/123" in route for route in routes)
+
+    exposition = render_prometheus()
+    assert 'http_requests_total{method="GET",route="/health",status="200"} 1' in exposition
+    assert 'http_request_duration_ms_count{method="GET",route="/api/mutabakat/{mutabakat_id}"} 2' in exposition
+
+
+def test_in_flight_gauge_and_error_status():
+    metrics = HttpMetrics()
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(metrics.in_flight)
+        raise RuntimeError("handler hatası")
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "POST", "path": "/x"}
+    try:
+        asyncio.run(PerformanceMonitorMiddleware(app, metrics)(scope, None, send))
+    except RuntimeError:
+        pass
+    assert seen == [1] and metrics.in_flight == 0
+    assert metrics.routes[("POST", UNMATCHED_ROUTE)].statuses == {500: 1}
+
+
+def test_metrics_endpoint_restricted_and_process_sampled(client, monkeypatch):
+    assert client.get("/metrics").status_code == 403  # TestClient adresi iç ağda değil
+
+    monkeypatch.setattr("backend.main.metrics_access_allowed", lambda ip: True)
+    process_metrics.sample()
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert process_metrics.values["resident_memory_bytes"] > 0
+    assert "process_resident_memory_bytes" in response.text
+    assert "http_requests_in_flight" in response.text
@@ -0,0 +1,45 @@
+"""
+SQL Sorgu Sayacı ve Sorgu Bütçesi Testleri
+"""
+from sqlalchemy import text
+
+from backend.models import Company
+from backend.utils.query_counter import count_queries, normalize_statement
+
+
+def test_normalize_statement():
+    """Literal ve IN listeleri aynı şekle indirgenir"""
+    assert normalize_statement("SELECT * FROM t WHERE id IN (?, ?, ?) AND name = 'x'") == \
+        normalize_statement("SELECT *  FROM t WHERE id IN (?, ?) AND name = 'yy'")
+    assert normalize_statement("SELECT 1 FROM t WHERE a = 5") == "SELECT ? FROM t WHERE a = ?"
+
+
+def test_count_queries_detects_repeated_shapes(db):
+    """Aynı sorgu şekli tekrarlandığında N+1 adayı olarak raporlanır"""
+    with count_queries() as stats:
+        for company_id in range(6):
+            db.execute(text(f"SELECT id FROM companies WHERE id = {company_id}"))
+
+    assert stats.count == 6
+    assert stats.total_ms > 0
+    assert stats.repeated(5)[0][1] == 6
+
+
+def test_debug_headers_and_company_list_budget(client, admin_headers, db, query_budget):
+    """Şirket listesi sorgu sayısı şirket sayısıyla artmaz"""
+    response = client.get("/api/admin/companies/", headers=admin_headers)
+    assert response.status_code == 200
+    assert float(response.headers["X-DB-Time"]) >= 0
+    baseline = query_budget(response, 6)
+
+    for i in range(5):
+        db.add(Company(vkn=f"99900000{i:02d}", company_name=f"Şirket {i}"))
+    db.commit()
+
+    response = client.get("/api/admin/companies/", headers=admin_headers)
+    assert len(response.json()) == 6
+    query_budget(response, baseline)
+
+
+def test_headers_hidden_without_debug(client):
+    assert "X-DB-Queries" not in client.get("/health").headers
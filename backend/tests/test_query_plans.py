@@ -0,0 +1,107 @@
+"""
+Sorgu Planı Regresyon Testleri
+
+Sıcak sorguların (mutabakat listesi, dashboard, raporlar, audit log, ISP
+zenginleştirme) SQLite
+EXPLAIN QUERY PLAN çıktısında indeks kullandığını doğrular. Bir indeks
+silinir veya sorgu şekli değişip tablo taramasına (SCAN <tablo>) dönerse
+test başarısız olur.
+"""
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select, text
+
+from backend.models import Bayi, Mutabakat, MutabakatBayiDetay, MutabakatDurumu, UserRole
+from backend.routers.audit_logs import audit_log_list_query, audit_log_page
+from backend.routers.dashboard import dashboard_stats_query
+from backend.routers.mutabakat import draft_mutabakats_query, mutabakat_list_params, mutabakat_list_query
+from backend.routers.reports import mutabakat_status_count_query
+from backend.utils.ip_enrichment import ENRICHMENT_TARGETS, pending_ips_query
+
+
+def explain(db, statement) -> list:
+    compiled = statement.compile(bind=db.get_bind(), compile_kwargs={"literal_binds": True})
+    rows = db.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    return [row[-1] for row in rows]
+
+
+def assert_no_full_scan(plan: list, table: str):
+    for detail in plan:
+        if detail.startswith(f"SCAN {table}") and "INDEX" not in detail:
+            pytest.fail(f"{table} tablosunda tam tarama: {plan}")
+    assert any(table in detail for detail in plan), plan
+
+
+COMPANY_ADMIN = SimpleNamespace(id=5, company_id=1, role=UserRole.COMPANY_ADMIN)
+CUSTOMER = SimpleNamespace(id=5, company_id=1, role=UserRole.MUSTERI)
+
+
+def _list_page(query):
+    """Paginator.paginate'in varsayılan sıralaması ve sayfa limiti"""
+    return query.order_by(Mutabakat.created_at.desc()).limit(20).statement
+
+
+# Sorgular router'lardaki builder'lardan üretilir (router sorgusu değişirse plan testi de değişir)
+# (tablo, beklenen indeks veya None, db -> sorgu)
+HOT_QUERIES = {
+    # mutabakat listesi - şirket admini, durum filtresi, created_at sıralaması
+    "mutabakat_company_list": (
+        "mutabakats", "ix_mutabakats_company_durum_created",
+        lambda db: _list_page(mutabakat_list_query(
+            db, COMPANY_ADMIN, mutabakat_list_params(durum=MutabakatDurumu.GONDERILDI)
+        ))
+    ),
+    # mutabakat listesi - müşteri (gönderen/alıcı)
+    "mutabakat_customer_list": (
+        "mutabakats", None,
+        lambda db: _list_page(mutabakat_list_query(db, CUSTOMER, mutabakat_list_params()))
+    ),
+    # draft gönderimi - gönderenin taslakları
+    "mutabakat_sender_drafts": (
+        "mutabakats", "ix_mutabakats_sender_durum",
+        lambda db: draft_mutabakats_query(db, CUSTOMER).statement
+    ),
+    # raporlar - onay/red istatistikleri
+    "report_approval_stats": (
+        "mutabakats", "ix_mutabakats_company_durum_created",
+        lambda db: mutabakat_status_count_query(1, Mutabakat.durum == MutabakatDurumu.ONAYLANDI)
+    ),
+    # audit log listesi - şirket bazlı, yeni kayıtlar önce
+    "audit_log_company_list": (
+        "audit_logs", "ix_audit_logs_company_created",
+        lambda db: audit_log_page(audit_log_list_query(COMPANY_ADMIN), page=1, page_size=50)
+    ),
+    # bulk upload - bayi bakiye güncellemesi
+    "bayi_by_user": (
+        "bayiler", None,
+        lambda db: select(Bayi).where(Bayi.user_id == 5, Bayi.bayi_kodu == "B001")
+    ),
+    # mutabakat detayı - bayi detayları (selectinload)
+    "bayi_detay_by_mutabakat": (
+        "mutabakat_bayi_detay", "ix_mutabakat_bayi_detay_mutabakat_id",
+        lambda db: select(MutabakatBayiDetay).where(MutabakatBayiDetay.mutabakat_id.in_([1, 2, 3]))
+    ),
+    # ISP zenginleştirme - bekleyen farklı IP'ler (her dakika, tüm delil tabloları)
+    **{
+        f"ip_enrichment_{target.name}": (
+            target.model.__tablename__, f"ix_{target.model.__tablename__}_{target.pending}",
+            lambda db, target=target: pending_ips_query(target, 500)
+        )
+        for target in ENRICHMENT_TARGETS
+    },
+}
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index(db, name):
+    table, expected_index, build = HOT_QUERIES[name]
+    plan = explain(db, build(db))
+    assert_no_full_scan(plan, table)
+    if expected_index:
+        assert any(expected_index in detail for detail in plan), plan
+
+
+def test_dashboard_query_uses_index(db):
+    """Dashboard (gönderen VEYA alıcı) sorgusu iki indeksi birlikte kullanır"""
+    assert_no_full_scan(explain(db, dashboard_stats_query(5)), "mutabakats")
@@ -0,0 +1,176 @@
+"""
+Rate Limiter Testleri (Redis Lua sayaçları, yerel fallback, route policy middleware'i)
+
+Redis sunucusu gerektirmemek için script çağrısı taklit edilir; Lua
+algoritmasının Python karşılığı LocalRateLimitStore ile test edilir.
+"""
+import asyncio
+
+import redis
+
+from backend import auth as auth_module
+from backend.middleware import rate_limiter as rate_limiter_module
+from backend.middleware.rate_limiter import (
+    RateLimitMiddleware, RateLimitRules, RoutePolicyTable, unmatched_route_policies
+)
+from backend.tests.benchmark_rate_limiter import run_benchmark, run_concurrency_benchmark
+from backend.utils import rate_limit_store as store_module
+from backend.utils.rate_limit_store import LocalRateLimitStore, RateLimitStore
+
+
+def test_local_sliding_window_weights_previous_window(monkeypatch):
+    now = [1000.0 + 5]  # 10 sn'lik pencere 1000'de başlar
+    monkeypatch.setattr(store_module.time, "time", lambda: now[0])
+    store = LocalRateLimitStore()
+
+    results = [store.hit("ip:/api/auth/login", 4, 10) for _ in range(5)]
+    assert [result.allowed for result in results] == [True, True, True, True, False]
+    assert [result.remaining for result in results[:4]] == [3, 2, 1, 0]
+
+    now[0] = 1012.0  # Önceki pencerenin %80'i sayılır: 3.2 + 1 > 4
+    assert not store.hit("ip:/api/auth/login", 4, 10).allowed
+    now[0] = 1017.0  # %30: 1.2 + 1 <= 4
+    result = store.hit("ip:/api/auth/login", 4, 10)
+    assert result.allowed and result.remaining == 1
+
+    now[0] = 1040.0
+    assert store.cleanup() == 1 and len(store) == 0
+
+
+class FakeScriptRedis:
+    """register_script çağrılarını kaydeden redis.asyncio taklidi"""
+
+    def __init__(self, reply=(1, 9, 30000), error=None):
+        self.reply = reply
+        self.error = error
+        self.calls = []
+
+    def register_script(self, script):
+        async def run(keys, args):
+            self.calls.append((keys, args))
+            if self.error:
+                raise self.error
+            return list(self.reply)
+        return run
+
+
+def test_redis_store_uses_script_and_falls_back_when_down(monkeypatch):
+    from backend.config import settings
+    monkeypatch.setattr(settings, "REDIS_BREAKER_FAILURE_THRESHOLD", 2)
+
+    client = FakeScriptRedis()
+    store = RateLimitStore(redis_client=client, prefix="ratelimit")
+    result = asyncio.run(store.hit("10.0.0.1:/api/auth/login", 10, 60))
+    assert (result.allowed, result.remaining, result.reset_after, result.backend) == (True, 9, 30.0, "redis")
+    assert client.calls == [(["ratelimit:10.0.0.1:/api/auth/login"], [10, 60000])]
+
+    down = FakeScriptRedis(error=redis.ConnectionError("Connection refused"))
+    store = RateLimitStore(redis_client=down)
+    results = [asyncio.run(store.hit("k", 2, 60)) for _ in range(4)]
+    assert [result.allowed for result in results] == [True, True, False, False]
+    assert {result.backend for result in results} == {"local"}
+    assert len(down.calls) == 2, "breaker açıkken Redis'e gidilmez"
+    assert store.get_stats()["breaker"]["state"] == "open"
+
+
+def test_local_store_shards_keys():
+    store = LocalRateLimitStore(shards=4)
+    for index in range(40):
+        assert store.hit(f"10.0.0.{index}:/api/dashboard/stats", 1, 60).allowed
+    assert len(store) == 40
+    assert sum(1 for counters in store._shards if counters) > 1
+    assert not store.hit("10.0.0.7:/api/dashboard/stats", 1, 60).allowed
+
+
+def test_login_limit_returns_429_with_retry_after(client):
+    for _ in range(5):
+        response = client.post("/api/auth/login", data={"username": "yok", "password": "x"})
+        assert response.status_code != 429
+    response = client.post("/api/auth/login", data={"username": "yok", "password": "x"})
+    assert response.status_code == 429
+    assert response.headers["X-RateLimit-Remaining"] == "0"
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_policy_table_matches_route_templates():
+    table = RoutePolicyTable()
+    assert table.match("POST", "/api/auth/login").max_requests == 5
+    assert table.match("GET", "/api/mutabakat/42/download-pdf").path == "/api/mutabakat/{mutabakat_id}/download-pdf"
+    assert table.match("GET", "/api/auth/login") is None
+    assert table.match("GET", "/api/mutabakat/42") is None
+
+
+def test_every_route_policy_matches_an_app_route():
+    """Route yeniden adlandırılırsa limit sessizce devre dışı kalmasın"""
+    from backend.main import app
+    assert unmatched_route_policies(app.routes) == []
+    assert unmatched_route_policies(app.routes, [("GET", "/api/yok", RateLimitRules.LOGIN)]) == [("GET", "/api/yok")]
+
+
+def _asgi_request(path, method="GET", token=None, ip="10.0.0.1"):
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return {
+        "type": "http", "method": method, "path": path, "raw_path": path.encode(),
+        "query_string": b"", "headers": headers, "client": (ip, 50000), "state": {},
+    }
+
+
+def test_middleware_keys_by_jwt_user_and_rejects_before_app(monkeypatch):
+    """Aynı NAT IP'sindeki iki kullanıcı ayrı sayaç; reddedilen istekte app/body çalışmaz"""
+    if not auth_module.SECRET_KEY:
+        monkeypatch.setattr(auth_module, "SECRET_KEY", "test-secret-key")
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["path"])
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def receive():
+        raise AssertionError("reddedilen isteğin body'si okunmamalı")
+
+    middleware = RateLimitMiddleware(app, store=RateLimitStore(enabled=False))
+
+    async def call(scope):
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+        await middleware(scope, receive, send)
+        return messages[0]["status"], dict(messages[0]["headers"])
+
+    alice = auth_module.create_access_token({"sub": "alice", "company_id": 1})
+    bob = auth_module.create_access_token({"sub": "bob", "company_id": 1})
+    path = "/api/mutabakat/7/download-pdf"
+
+    statuses = [asyncio.run(call(_asgi_request(path, token=alice)))[0] for _ in range(10)]
+    assert statuses == [200] * 10
+    status, headers = asyncio.run(call(_asgi_request("/api/mutabakat/8/download-pdf", token=alice)))
+    assert status == 429 and b"retry-after" in headers and len(calls) == 10
+
+    status, headers = asyncio.run(call(_asgi_request(path, token=bob)))
+    assert status == 200 and headers[b"x-ratelimit-remaining"] == b"9"
+    # Geçersiz token IP'ye düşer; korunmayan path'e limit uygulanmaz
+    assert asyncio.run(call(_asgi_request(path, token="bozuk")))[0] == 200
+    assert asyncio.run(call(_asgi_request("/api/mutabakat/7", token=alice)))[0] == 200
+
+    # Login her zaman IP bazlı: token değiştirmek brute force sayacını sıfırlamaz
+    login = [
+        asyncio.run(call(_asgi_request("/api/auth/login", method="POST", token=token)))[0]
+        for token in (alice, bob, "bozuk", None, alice, bob)
+    ]
+    assert login == [200] * 5 + [429]
+
+
+def test_rate_limit_benchmark():
+    result = asyncio.run(run_benchmark(checks=200, keys=10))
+    assert result["local"]["checks"] == 200 and result["local"]["mean_us"] > 0
+
+
+def test_parallel_requests_are_not_serialized_by_limiter(monkeypatch):
+    """RateLimitMiddleware handler'ı kilit altında çalıştırmaz: paralel istekler aynı anda işlenir"""
+    monkeypatch.setattr(rate_limiter_module.settings, "RATE_LIMIT_ENABLED", True)
+    result = asyncio.run(run_concurrency_benchmark(requests=10, handler_ms=20))
+    assert result["rate_limiter_statuses"] == [200] * 10
+    assert result["global_lock_max_concurrency"] == 1
+    assert result["rate_limiter_max_concurrency"] == 10
@@ -0,0 +1,73 @@
+"""
+Read Replica Yönlendirme Testleri (iki SQLite dosyası ile)
+"""
+import pytest
+from sqlalchemy import create_engine
+
+from backend import database
+from backend.database import Base, configure_read_replica, get_read_db
+from backend.middleware.request_context import ClientContext, _current_client_context
+from backend.models import Company
+from backend.utils.read_replica import ReadOnlySessionError, mark_recent_write, replica_health
+
+
+@pytest.fixture
+def replica(tmp_path):
+    """Primary'den farklı veriye sahip replica dosyası"""
+    replica_url = f"sqlite:///{tmp_path / 'replica.db'}"
+    seed_engine = create_engine(replica_url)
+    Base.metadata.create_all(bind=seed_engine)
+    with seed_engine.begin() as conn:
+        conn.execute(Company.__table__.insert().values(vkn="9999999999", company_name="Replica Şirketi"))
+    seed_engine.dispose()
+
+    configure_read_replica(replica_url)
+    yield
+    configure_read_replica(None)
+    replica_health.mark_up()
+
+
+def _read_session():
+    generator = get_read_db()
+    return generator, next(generator)
+
+
+def test_reads_go_to_replica(replica):
+    """get_read_db replica engine'ini kullanır"""
+    generator, db = _read_session()
+    assert db.get_bind() is database.read_engine
+    assert db.query(Company).filter(Company.vkn == "9999999999").count() == 1
+    generator.close()
+
+
+def test_read_session_is_read_only(replica):
+    """Replica session'ı üzerinden yazma engellenir"""
+    generator, db = _read_session()
+    db.add(Company(vkn="1111111111", company_name="Yazılamaz"))
+    with pytest.raises(ReadOnlySessionError):
+        db.flush()
+    generator.close()
+
+
+def test_lag_guard_and_fallback(replica):
+    """Yazma sonrası ve replica hatasında okumalar primary'ye düşer"""
+    token = _current_client_context.set(ClientContext("85.105.12.34", session_key="auth:test"))
+    try:
+        mark_recent_write("auth:test")
+        generator, db = _read_session()
+        assert db.get_bind() is database.engine
+        generator.close()
+    finally:
+        _current_client_context.reset(token)
+
+    replica_health.mark_down("test")
+    generator, db = _read_session()
+    assert db.get_bind() is database.engine
+    generator.close()
+
+
+def test_without_replica_uses_primary():
+    """Replica tanımlı değilse primary kullanılır"""
+    generator, db = _read_session()
+    assert db.get_bind() is database.engine
+    generator.close()
@@ -0,0 +1,34 @@
+"""
+Dashboard/Rapor Cache Testleri (worker'lar arası stampede kilidi)
+"""
+import asyncio
+
+from backend.routers.dashboard import compute_dashboard_stats
+from backend.routers.reports import overview_stats
+
+
+def test_hot_report_caches_take_distributed_lock(fake_cache, client, test_admin_user):
+    cache = fake_cache(l1_enabled=False)
+    locked = []
+    acquire_lock = cache.aacquire_lock
+
+    async def tracking_acquire_lock(name, timeout):
+        locked.append(name.split(":")[1])
+        return await acquire_lock(name, timeout)
+
+    cache.aacquire_lock = tracking_acquire_lock
+
+    async def scenario():
+        return await asyncio.gather(
+            compute_dashboard_stats(test_admin_user.id),
+            overview_stats(test_admin_user.company_id),
+        )
+
+    dashboard, overview = asyncio.run(scenario())
+    assert dashboard["toplam_mutabakat"] == 0 and overview
+    assert sorted(locked) == ["dashboard_stats", "report_overview"]
+    assert not any(key.startswith("cache:lock:") for key in cache.redis_client.data), "kilitler bırakılır"
+
+    # Cache'ten gelen sonuç kilit almaz
+    asyncio.run(scenario())
+    assert len(locked) == 2
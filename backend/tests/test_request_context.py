@@ -0,0 +1,45 @@
+"""
+Request Context Middleware Testleri
+"""
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from backend.middleware.request_context import (
+    RequestContextMiddleware, parse_trusted_proxies, resolve_client_ip
+)
+from backend.utils.ip_resolver import get_real_ip
+
+TRUSTED = parse_trusted_proxies("127.0.0.1,10.0.0.0/8")
+
+
+def test_untrusted_peer_ignores_forwarded_headers():
+    """Güvenilmeyen bağlantıdan gelen X-Forwarded-For dikkate alınmaz"""
+    assert resolve_client_ip("85.105.12.34", "1.2.3.4", "5.6.7.8", TRUSTED) == "85.105.12.34"
+
+
+def test_trusted_proxy_chain():
+    """Zincir sağdan sola taranır, ilk güvenilmeyen adres client'tır"""
+    assert resolve_client_ip("127.0.0.1", "1.2.3.4, 85.105.12.34, 10.0.0.5", None, TRUSTED) == "85.105.12.34"
+    assert resolve_client_ip("10.0.0.2", None, "85.105.12.34", TRUSTED) == "85.105.12.34"
+    assert resolve_client_ip("127.0.0.1", None, None, TRUSTED) == "127.0.0.1"
+    assert resolve_client_ip(None, "1.2.3.4", None, TRUSTED) == "unknown"
+
+
+def test_middleware_stores_context_once():
+    """Client context request.state üzerinde tek sefer oluşturulur"""
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware, trusted_proxies="127.0.0.1")
+
+    @app.get("/whoami")
+    async def whoami(request: Request):
+        context = request.state.client_context
+        return {
+            "ip": get_real_ip(request),
+            "same": context is request.state.client_context,
+            "user_agent": context.user_agent
+        }
+
+    client = TestClient(app)
+    # TestClient bağlantısı güvenilen proxy değil: sahte header yok sayılır
+    response = client.get("/whoami", headers={"X-Forwarded-For": "85.105.12.34", "User-Agent": "pytest"})
+    assert response.json() == {"ip": "testclient", "same": True, "user_agent": "pytest"}
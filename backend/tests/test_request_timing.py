@@ -0,0 +1,60 @@
+"""
+Request Faz Süreleri (Server-Timing) Testleri
+"""
+import asyncio
+import os
+
+from fastapi.concurrency import run_in_threadpool
+
+from backend.utils import request_timing
+from backend.utils.request_timing import RequestTimings, _current_timings, record_span, timed
+
+
+def test_timed_records_inside_threadpool_and_noop_outside():
+    @timed("pdf_sign")
+    def sign():
+        return "signed.pdf"
+
+    assert sign() == "signed.pdf"  # Request dışında kayıt yok
+
+    async def handler():
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        try:
+            await run_in_threadpool(sign)
+            await run_in_threadpool(sign)
+            record_span("db", 1.5)
+        finally:
+            _current_timings.reset(token)
+        return timings
+
+    timings = asyncio.run(handler())
+    assert timings.as_dict()["pdf_sign"]["count"] == 2
+    header = timings.server_timing(10)
+    assert 'pdf_sign;dur=' in header and 'desc="2x"' in header
+    assert "db;dur=1.5" in header and header.endswith("total;dur=10")
+
+
+def test_server_timing_header_and_sampled_log(client, admin_headers, monkeypatch):
+    logged = []
+    monkeypatch.setattr(request_timing.settings, "SERVER_TIMING_ENABLED", True)
+    monkeypatch.setattr(request_timing.settings, "REQUEST_TIMING_LOG_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(request_timing, "log_request_timings", logged.append)
+
+    response = client.get("/api/auth/me", headers=admin_headers)
+    assert response.status_code == 200
+    assert "db;dur=" in response.headers["Server-Timing"]
+    assert "total;dur=" in response.headers["Server-Timing"]
+
+    record = logged[-1]
+    assert record["route"] == "/api/auth/me" and record["status"] == 200
+    assert record["phases"]["db"]["count"] >= 1
+
+
+def test_server_timing_header_follows_debug_by_default(client, monkeypatch):
+    if "SERVER_TIMING_ENABLED" not in os.environ:
+        assert request_timing.settings.SERVER_TIMING_ENABLED == request_timing.settings.DEBUG
+    # Production'da (DEBUG kapalı) faz süreleri client'a gönderilmez
+    monkeypatch.setattr(request_timing.settings, "SERVER_TIMING_ENABLED", False)
+    response = client.post("/api/auth/login", data={"username": "yok", "password": "yanlis"})
+    assert "Server-Timing" not in response.headers
@@ -0,0 +1,47 @@
+"""
+Yavaş Sorgu Kaydı Testleri
+"""
+from sqlalchemy import text
+
+from backend.utils.slow_query_log import SlowQueryLog, parameters_shape, slow_query_log
+
+
+def test_ring_buffer_groups_by_fingerprint():
+    """Buffer sınırlıdır; kayıtlar sorgu şekline göre gruplanır"""
+    log = SlowQueryLog(threshold_ms=100, maxlen=3)
+    log.record("SELECT * FROM users WHERE id = 1", (1,), 150, route="GET /a")
+    log.record("SELECT * FROM users WHERE id = 2", (2,), 450, route="GET /b")
+    log.record("SELECT * FROM users WHERE id = 3", (3,), 300, route="GET /b")
+    log.record("SELECT count(*) FROM mutabakats", (), 120)
+
+    assert log.get_stats()["buffered"] == 3
+    assert log.get_stats()["total_recorded"] == 4
+
+    top = log.top_offenders()
+    assert top[0]["count"] == 2
+    assert top[0]["max_ms"] == 450
+    assert top[0]["routes"] == {"GET /b": 2}
+    assert top[0]["parameters"] == ["int"]
+
+
+def test_parameters_shape_hides_values():
+    assert parameters_shape({"vkn": "1234567890", "id": 5}) == {"vkn": "str", "id": "int"}
+    assert parameters_shape([(1, "a"), (2, "b")], executemany=True) == {"rows": 2, "row": ["int", "str"]}
+
+
+def test_engine_hook_and_admin_endpoint(client, admin_headers, db, monkeypatch):
+    """Eşik üstü sorgular kaydedilir ve admin endpoint'inden okunur"""
+    monkeypatch.setattr(slow_query_log, "threshold_ms", 0.000001)
+    slow_query_log.clear()
+
+    db.execute(text("SELECT id FROM companies WHERE vkn = '1'"))
+    assert slow_query_log.records()[-1]["stack"], "çağıran kod satırı kaydedilmeli"
+
+    response = client.get("/api/admin/metrics/slow-queries?limit=5", headers=admin_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_recorded"] >= 1
+    assert len(data["top"]) <= 5
+    assert any("GET /api/admin/metrics/slow-queries" in group["routes"] for group in data["top"])
+
+    assert client.get("/api/admin/metrics/slow-queries").status_code == 401
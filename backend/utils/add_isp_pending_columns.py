@@ -0,0 +1,46 @@
+"""
+ISP Zenginleştirme İşareti Migration Script (Python)
+Delil/log tablolarına isp_pending kolonlarını ve (isp_pending, ip) indekslerini ekler
+(create_all var olan tablolara kolon eklemez).
+
+Mevcut kayıtlar False ile eklenir: ISP'si boş eski kayıtlar arka plan görevinde
+bugünün ISP bilgisiyle doldurulmaz.
+
+Kullanım:
+    python -m backend.utils.add_isp_pending_columns
+"""
+import sys
+from sqlalchemy import inspect, text
+from backend.database import engine
+from backend.logger import logger
+from backend.utils.ip_enrichment import ENRICHMENT_TARGETS
+
+
+def add_isp_pending_columns() -> bool:
+    """Eksik kolonları ve indeksleri oluştur (var olanlar atlanır)"""
+    try:
+        for target in ENRICHMENT_TARGETS:
+            table = target.model.__table__
+            existing = {column["name"] for column in inspect(engine).get_columns(table.name)}
+            if target.pending not in existing:
+                column = table.c[target.pending]
+                column_type = column.type.compile(dialect=engine.dialect)
+                default = column.server_default.arg.compile(dialect=engine.dialect)
+                with engine.begin() as connection:
+                    connection.execute(text(
+                        f"ALTER TABLE {table.name} ADD {column.name} {column_type} DEFAULT {default} NOT NULL"
+                    ))
+                logger.info(f"✅ Kolon eklendi: {table.name}.{column.name}")
+            for index in table.indexes:
+                if target.pending in index.columns:
+                    index.create(bind=engine, checkfirst=True)
+                    logger.info(f"✅ İndeks hazır: {index.name}")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Migration hatası: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = add_isp_pending_columns()
+    sys.exit(0 if success else 1)
@@ -8,18 +8,23 @@ from typing import Optional, Dict, Any
 from fastapi import Request
 from sqlalchemy.orm import Session
 import json
+import logging
 import traceback
 from datetime import datetime
 import time
 
 from backend.models import AuditLog, AuditLogAction, User
+from backend.middleware.request_context import get_client_context
+
+logger = logging.getLogger(__name__)
 
 
 def get_client_info(request: Request) -> Dict[str, str]:
-    """Request'ten client bilgilerini çıkar"""
+    """Request'ten client bilgilerini çıkar (RequestContextMiddleware'in hesapladığı kimlik)"""
+    context = get_client_context(request)
     return {
-        'ip_address': request.client.host if request.client else 'unknown',
-        'user_agent': request.headers.get('user-agent', ''),
+        'ip_address': context.ip,
+        'user_agent': context.user_agent,
         'http_method': request.method,
         'endpoint': str(request.url.path)
     }
@@ -87,6 +92,8 @@ def create_audit_log(
     client_info = {}
     if request:
         client_info = get_client_info(request)
+        if ip_info is None:
+            ip_info = get_client_context(request).evidence_ip_info
     
     # Kullanıcı bilgileri
     user_id = user.id if user else None
@@ -95,10 +102,10 @@ def create_audit_log(
     company_id = user.company_id if user else None
     company_name = user.company.company_name if (user and user.company) else None
     
-    # IP bilgileri (ip_info'dan)
-    isp = ip_info.get('isp', '') if ip_info else ''
-    city = ip_info.get('city', '') if ip_info else ''
-    country = ip_info.get('country', '') if ip_info else ''
+    # IP bilgileri (ip_info'dan) - None kalan alanlar arka planda doldurulur (ip_enrichment)
+    isp = ip_info.get('isp') if ip_info else None
+    city = ip_info.get('city') if ip_info else None
+    country = ip_info.get('country') if ip_info else None
     
     # Audit log kaydı oluştur
     audit_log = AuditLog(
@@ -136,7 +143,7 @@ def create_audit_log(
         return audit_log
     except Exception as e:
         db.rollback()
-        print(f"[AUDIT LOG ERROR] Audit log kaydedilemedi: {e}")
+        logger.error(f"[AUDIT LOG ERROR] Audit log kaydedilemedi: {e}")
         # Audit log hatası kritik sistem hatasına yol açmamalı
         return None
 
@@ -196,7 +203,7 @@ def audit_log_decorator(
                             duration_ms=duration_ms
                         )
                     except Exception as audit_error:
-                        print(f"[AUDIT LOG] Loglama hatası: {audit_error}")
+                        logger.error(f"[AUDIT LOG] Loglama hatası: {audit_error}")
         
         return wrapper
     return decorator
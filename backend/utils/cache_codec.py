@@ -0,0 +1,323 @@
+"""
+Cache Değer Codec'i
+Redis'e yazılan değerlerin serileştirilmesi ve sıkıştırılması
+
+Format: [1 byte header][payload]
+
+    header bit 0-1: codec (1 = json, 2 = orjson, 3 = msgpack)
+    header bit 2  : payload tipli değer etiketleri içeriyor
+    header bit 3-4: sıkıştırma (0 = yok, 1 = zlib, 2 = lz4)
+
+Header her zaman 0x20'den küçüktür; eski sürümün yazdığı düz JSON metni
+(ilk karakteri '{', '[', '"', rakam vb.) header'sız olarak okunur. Okuma
+tarafı codec'i header'dan seçer, bu yüzden CACHE_CODEC değiştirildiğinde
+eski değerler okunmaya devam eder.
+
+datetime, date, time, Decimal, UUID, Enum, set ve bytes değerleri etiketlenerek
+yazılır ve aynı tiple geri okunur (json.dumps(default=str) stringe çeviriyordu).
+"""
+import base64
+import importlib
+import json
+import logging
+import uuid
+import zlib
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+CODEC_JSON = 1
+CODEC_ORJSON = 2
+CODEC_MSGPACK = 3
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_LZ4 = 2
+
+_TYPED_FLAG = 0x04
+_COMPRESSION_SHIFT = 3
+# Header'lı değerlerin ilk byte'ı bu değerden küçüktür (düz JSON metni değil)
+_HEADER_LIMIT = 0x20
+
+# Tipli değer etiketi: {"__codec__": "<tip>", "v": <değer>}
+TYPE_TAG = "__codec__"
+
+CODEC_NAMES = {"json": CODEC_JSON, "orjson": CODEC_ORJSON, "msgpack": CODEC_MSGPACK}
+COMPRESSION_NAMES = {"none": COMPRESSION_NONE, "zlib": COMPRESSION_ZLIB, "lz4": COMPRESSION_LZ4}
+
+_PRIMITIVES = (str, int, float, bool, type(None))
+
+
+class CodecError(ValueError):
+    """Değer çözülemedi (bilinmeyen header veya bu process'te olmayan codec)"""
+
+
+# ----------------------------------------------------------------------
+# Tipli değer hook'ları
+# ----------------------------------------------------------------------
+
+def _enum_path(cls) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+_enum_types: Dict[str, type] = {}
+
+
+def register_enum(cls):
+    """Enum'u çözme için kaydet (backend dışındaki enum'lar için gerekli)"""
+    _enum_types[_enum_path(cls)] = cls
+    return cls
+
+
+def _resolve_enum(path: str) -> Optional[type]:
+    cls = _enum_types.get(path)
+    if cls is not None:
+        return cls
+    module_name, _, qualname = path.partition(":")
+    # Sadece uygulama modülleri import edilir (cache içeriğiyle keyfi import yapılmasın)
+    if not module_name.startswith("backend."):
+        return None
+    try:
+        target = importlib.import_module(module_name)
+        for part in qualname.split("."):
+            target = getattr(target, part)
+    except (ImportError, AttributeError):
+        return None
+    if isinstance(target, type) and issubclass(target, Enum):
+        _enum_types[path] = target
+        return target
+    return None
+
+
+def _decode_enum(value):
+    cls = _resolve_enum(value["c"])
+    return cls(value["v"]) if cls is not None else value["v"]
+
+
+# Sıra önemli: Enum (str/int alt sınıfı olabilir) ve datetime (date alt sınıfı) önce
+_ENCODERS: Tuple[Tuple[type, str, Callable[[Any], Any]], ...] = (
+    (Enum, "enum", lambda value: {"c": _enum_path(type(value)), "v": value.value}),
+    (datetime, "datetime", lambda value: value.isoformat()),
+    (date, "date", lambda value: value.isoformat()),
+    (time, "time", lambda value: value.isoformat()),
+    (Decimal, "decimal", str),
+    (uuid.UUID, "uuid", str),
+    ((set, frozenset), "set", list),
+    (bytes, "bytes", lambda value: base64.b64encode(value).decode("ascii")),
+)
+
+_DECODERS: Dict[str, Callable[[Any], Any]] = {
+    "enum": _decode_enum,
+    "datetime": datetime.fromisoformat,
+    "date": date.fromisoformat,
+    "time": time.fromisoformat,
+    "decimal": Decimal,
+    "uuid": uuid.UUID,
+    "set": set,
+    "bytes": base64.b64decode,
+}
+
+
+class _TypedEncoder:
+    """Değer ağacını etiketli, serileştirilebilir forma çevirir"""
+
+    __slots__ = ("typed",)
+
+    def __init__(self):
+        self.typed = False
+
+    def encode(self, value):
+        value_type = type(value)
+        if value_type in (str, int, float, bool) or value is None:
+            return value
+        if value_type is dict:
+            return {self.encode_key(key): self.encode(item) for key, item in value.items()}
+        if value_type in (list, tuple):
+            return [self.encode(item) for item in value]
+        for types, tag, encoder in _ENCODERS:
+            if isinstance(value, types):
+                self.typed = True
+                payload = encoder(value)
+                if tag == "set":
+                    payload = [self.encode(item) for item in payload]
+                return {TYPE_TAG: tag, "v": payload}
+        if isinstance(value, dict):
+            return {self.encode_key(key): self.encode(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self.encode(item) for item in value]
+        if isinstance(value, _PRIMITIVES):
+            return value
+        # Eski davranış (json.dumps default=str) korunur
+        return str(value)
+
+    @staticmethod
+    def encode_key(key):
+        if isinstance(key, Enum):
+            return key.value if isinstance(key.value, _PRIMITIVES) else str(key.value)
+        return key if isinstance(key, _PRIMITIVES) else str(key)
+
+
+def _restore(value):
+    """Etiketli değerleri orijinal tiplerine çevir"""
+    if isinstance(value, dict):
+        tag = value.get(TYPE_TAG)
+        if tag is not None and len(value) == 2 and "v" in value:
+            decoder = _DECODERS.get(tag)
+            if decoder is not None:
+                return decoder(_restore(value["v"]) if tag == "set" else value["v"])
+        return {key: _restore(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_restore(item) for item in value]
+    return value
+
+
+# ----------------------------------------------------------------------
+# Codec ve sıkıştırma
+# ----------------------------------------------------------------------
+
+def _dump(codec: int, tree) -> bytes:
+    if codec == CODEC_ORJSON:
+        return orjson.dumps(tree, option=orjson.OPT_NON_STR_KEYS)
+    if codec == CODEC_MSGPACK:
+        return msgpack.packb(tree, use_bin_type=True)
+    return json.dumps(tree, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _load(codec: int, payload: bytes):
+    if codec == CODEC_ORJSON:
+        if not ORJSON_AVAILABLE:
+            raise CodecError("orjson yüklü değil")
+        return orjson.loads(payload)
+    if codec == CODEC_MSGPACK:
+        if not MSGPACK_AVAILABLE:
+            raise CodecError("msgpack yüklü değil")
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+    if codec == CODEC_JSON:
+        return json.loads(payload)
+    raise CodecError(f"Bilinmeyen codec: {codec}")
+
+
+def _compress(compression: int, payload: bytes, level: int) -> bytes:
+    if compression == COMPRESSION_LZ4:
+        return lz4.frame.compress(payload)
+    return zlib.compress(payload, level)
+
+
+def _decompress(compression: int, payload: bytes) -> bytes:
+    if compression == COMPRESSION_ZLIB:
+        return zlib.decompress(payload)
+    if compression == COMPRESSION_LZ4:
+        if not LZ4_AVAILABLE:
+            raise CodecError("lz4 yüklü değil")
+        return lz4.frame.decompress(payload)
+    raise CodecError(f"Bilinmeyen sıkıştırma: {compression}")
+
+
+def _pick_codec(name: str) -> int:
+    if name == "auto":
+        if MSGPACK_AVAILABLE:
+            return CODEC_MSGPACK
+        return CODEC_ORJSON if ORJSON_AVAILABLE else CODEC_JSON
+    codec = CODEC_NAMES.get(name)
+    if codec is None:
+        raise ValueError(f"Geçersiz cache codec'i: {name}")
+    if (codec == CODEC_ORJSON and not ORJSON_AVAILABLE) or (codec == CODEC_MSGPACK and not MSGPACK_AVAILABLE):
+        logger.warning(f"[WARNING] Cache codec'i '{name}' yuklu degil, json kullaniliyor")
+        return CODEC_JSON
+    return codec
+
+
+def _pick_compression(name: str) -> int:
+    compression = COMPRESSION_NAMES.get(name)
+    if compression is None:
+        raise ValueError(f"Geçersiz cache sıkıştırması: {name}")
+    if compression == COMPRESSION_LZ4 and not LZ4_AVAILABLE:
+        logger.warning("[WARNING] lz4 yuklu degil, zlib kullaniliyor")
+        return COMPRESSION_ZLIB
+    return compression
+
+
+class CacheCodec:
+    """
+    Cache değerlerini byte'a çevirir / geri okur
+
+    Kullanım:
+        codec = CacheCodec("orjson", compression="zlib", compress_threshold=2048)
+        raw = codec.encode({"tarih": datetime.now()})
+        value = codec.decode(raw)  # datetime olarak döner
+    """
+
+    def __init__(self, codec: str = "auto", compression: str = "zlib",
+                 compress_threshold: int = 2048, compress_level: int = 1):
+        self.codec = _pick_codec(codec)
+        self.compression = _pick_compression(compression)
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+
+    @property
+    def name(self) -> str:
+        return next(name for name, codec in CODEC_NAMES.items() if codec == self.codec)
+
+    def encode(self, value: Any) -> bytes:
+        encoder = _TypedEncoder()
+        tree = encoder.encode(value)
+        payload = _dump(self.codec, tree)
+        header = self.codec | (_TYPED_FLAG if encoder.typed else 0)
+
+        if self.compression != COMPRESSION_NONE and 0 < self.compress_threshold <= len(payload):
+            compressed = _compress(self.compression, payload, self.compress_level)
+            # Sıkışmayan veride (ör. zaten sıkıştırılmış) ham payload tutulur
+            if len(compressed) < len(payload):
+                payload = compressed
+                header |= self.compression << _COMPRESSION_SHIFT
+
+        return bytes((header,)) + payload
+
+    def decode(self, raw) -> Any:
+        if isinstance(raw, str):
+            raw = raw.encode("utf-8")
+        if not raw:
+            raise CodecError("Boş değer")
+
+        header = raw[0]
+        if header >= _HEADER_LIMIT:
+            # Header'sız eski format (düz JSON metni)
+            return json.loads(raw)
+
+        payload = raw[1:]
+        compression = header >> _COMPRESSION_SHIFT
+        if compression != COMPRESSION_NONE:
+            payload = _decompress(compression, payload)
+        value = _load(header & 0x03, payload)
+        return _restore(value) if header & _TYPED_FLAG else value
+
+
+cache_codec = CacheCodec(
+    settings.CACHE_CODEC,
+    compression=settings.CACHE_COMPRESSION,
+    compress_threshold=settings.CACHE_COMPRESS_THRESHOLD,
+    compress_level=settings.CACHE_COMPRESS_LEVEL,
+)
@@ -0,0 +1,118 @@
+"""
+ORM Değişikliklerinden Cache Invalidation
+
+Mutabakat oluşturma, gönderme, onay, red, güncelleme ve silme işlemleri farklı
+router'larda (mutabakat, public, bulk_mutabakat) yapıldığından invalidation
+endpoint'lere dağıtılmak yerine primary session'ların flush/commit event'lerine
+bağlanır. Commit başarılı olunca sadece etkilenen şirket ve kullanıcıların
+liste / dashboard / rapor generation'ları artırılır; rollback'te hiçbir şey
+yapılmaz.
+
+Kullanıcı güncelleme, pasife alma, kilitleme ve şifre değişikliği de aynı
+şekilde get_current_user snapshot'ını commit anında geçersiz kılar.
+"""
+from typing import Dict, Set
+
+from sqlalchemy import event, exc as sa_exc, inspect
+
+from backend.utils.cache_manager import invalidate_auth_user, invalidate_mutabakat_caches
+
+# Liste, dashboard ve raporlarda görünen alanlar (pdf yolu vb. değişimi invalidation yapmaz)
+LISTED_FIELDS = (
+    "mutabakat_no", "company_id", "sender_id", "receiver_id", "receiver_vkn",
+    "donem_baslangic", "donem_bitis", "toplam_borc", "toplam_alacak", "bakiye",
+    "durum", "aciklama", "red_nedeni", "gonderim_tarihi", "onay_tarihi", "red_tarihi",
+)
+_SCOPE_FIELDS = ("company_id", "sender_id", "receiver_id")
+_PENDING_KEY = "mutabakat_cache_scopes"
+_PENDING_USERS_KEY = "auth_user_snapshots"
+
+
+def _listed_fields_changed(mutabakat) -> bool:
+    attrs = inspect(mutabakat).attrs
+    return any(attrs[field].history.has_changes() for field in LISTED_FIELDS)
+
+
+def _field_values(obj, field) -> Set:
+    """Alanın flush öncesi ve sonrası değerleri (expire olmuşsa güncel değer)"""
+    history = inspect(obj).attrs[field].history
+    values = {value for value in (*history.unchanged, *history.added, *history.deleted) if value}
+    if not values:
+        try:
+            value = getattr(obj, field)
+        except sa_exc.SQLAlchemyError:
+            value = None
+        values = {value} if value else set()
+    return values
+
+
+def _collect_scope(scopes: Dict[int, Set[int]], mutabakat):
+    """Şirket -> kullanıcılar; şirket/taraf değiştiyse eski değerler de eklenir"""
+    values = {field: _field_values(mutabakat, field) for field in _SCOPE_FIELDS}
+    user_ids = values["sender_id"] | values["receiver_id"]
+    for company_id in values["company_id"] or {None}:
+        scopes.setdefault(company_id, set()).update(user_ids)
+
+
+def track_mutabakat_changes(session_class):
+    """Commit edilen Mutabakat değişikliklerinde ilgili cache generation'larını artır"""
+
+    @event.listens_for(session_class, "after_flush")
+    def _collect(session, flush_context):
+        # database.py models'ten önce yüklendiği için geç import
+        from backend.models import Mutabakat
+
+        scopes = session.info.setdefault(_PENDING_KEY, {})
+        for mutabakat in (*session.new, *session.deleted):
+            if isinstance(mutabakat, Mutabakat):
+                _collect_scope(scopes, mutabakat)
+        for mutabakat in session.dirty:
+            if isinstance(mutabakat, Mutabakat) and _listed_fields_changed(mutabakat):
+                _collect_scope(scopes, mutabakat)
+        if not scopes:
+            session.info.pop(_PENDING_KEY, None)
+
+    @event.listens_for(session_class, "after_commit")
+    def _invalidate(session):
+        for company_id, user_ids in session.info.pop(_PENDING_KEY, {}).items():
+            invalidate_mutabakat_caches(company_id=company_id, user_ids=user_ids)
+
+    @event.listens_for(session_class, "after_rollback")
+    def _discard(session):
+        session.info.pop(_PENDING_KEY, None)
+
+
+def _user_identities(user) -> Set[tuple]:
+    """(username, company_id) çiftleri; username/şirket değiştiyse eskisi de"""
+    return {
+        (username, company_id)
+        for username in _field_values(user, "username")
+        for company_id in _field_values(user, "company_id")
+    }
+
+
+def track_user_changes(session_class):
+    """Commit edilen User değişikliklerinde get_current_user snapshot'ını geçersiz kıl"""
+
+    @event.listens_for(session_class, "after_flush")
+    def _collect(session, flush_context):
+        from backend.models import User
+
+        identities = session.info.setdefault(_PENDING_USERS_KEY, set())
+        for user in session.deleted:
+            if isinstance(user, User):
+                identities.update(_user_identities(user))
+        for user in session.dirty:
+            if isinstance(user, User) and session.is_modified(user, include_collections=False):
+                identities.update(_user_identities(user))
+        if not identities:
+            session.info.pop(_PENDING_USERS_KEY, None)
+
+    @event.listens_for(session_class, "after_commit")
+    def _invalidate(session):
+        for username, company_id in session.info.pop(_PENDING_USERS_KEY, ()):
+            invalidate_auth_user(username, company_id)
+
+    @event.listens_for(session_class, "after_rollback")
+    def _discard(session):
+        session.info.pop(_PENDING_USERS_KEY, None)
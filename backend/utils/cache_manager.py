@@ -1,49 +1,151 @@
 """
 Redis Cache Manager
 Sık kullanılan verileri cache'lemek için utility
+
+İki katmanlı:
+- L1: Process içi LRU + TTL (opsiyonel, CACHE_L1_ENABLED). Sık okunan key'ler
+  Redis'e gitmeden ve JSON decode edilmeden döner.
+- L2: Redis (tüm worker'lar arasında paylaşılır)
+
+delete / delete_pattern / clear_all Redis pub/sub kanalı üzerinden yayınlanır;
+diğer worker'lar kendi L1 kayıtlarını siler. set() yayınlanmaz, bu nedenle L1
+TTL'i CACHE_L1_TTL ile sınırlıdır (kaçan mesajlarda da bayatlık süresi sınırlı).
+
+Invalidation namespace generation sayaçları ile yapılır: cached() key'leri
+ilgili namespace'lerin (ör. "user:5", "company:3") güncel generation'ını içerir;
+bump_generation() tek bir INCR ile eski key'lerin hepsini geçersiz kılar
+(eskiler TTL ile düşer). KEYS taraması gerekmez.
+
+Değerler Redis'e cache_codec ile yazılır (header byte + orjson/msgpack,
+eşik üstünde sıkıştırılmış); datetime, Enum, Decimal vb. tipleriyle geri okunur.
+
+Bağlantı lazy açılır (import sırasında ping yok). Bağlantı hataları circuit
+breaker'ı açar; açıkken cache çağrıları Redis'i beklemeden devre dışı davranır
+ve breaker süre dolunca tekrar dener. Async kod aget/aset (redis.asyncio) kullanır.
+
+Not: L1'den dönen değerler process içinde paylaşılır, çağıran değiştirmemelidir.
 """
-from typing import Optional, Any, Callable
+from typing import Optional, Any, Callable, Dict, Iterable, List, Union
+from fnmatch import fnmatchcase
+import asyncio
 import json
 import hashlib
+import logging
+import math
+import os
+import random
+import threading
+import time
+import uuid
+import weakref
 from functools import wraps
 from datetime import timedelta
+
+logger = logging.getLogger(__name__)
+
 try:
     import redis
     REDIS_AVAILABLE = True
+    REDIS_CONNECTION_ERRORS = (redis.ConnectionError, redis.TimeoutError)
 except ImportError:
     REDIS_AVAILABLE = False
-    print("[WARNING] redis paketi yuklu degil. 'pip install redis' ile yukleyin.")
+    REDIS_CONNECTION_ERRORS = ()
+    logger.warning("[WARNING] redis paketi yuklu degil. 'pip install redis' ile yukleyin.")
+try:
+    import redis.asyncio as redis_async
+    REDIS_ASYNC_AVAILABLE = True
+except ImportError:
+    REDIS_ASYNC_AVAILABLE = False
 
 from backend.config import settings
+from backend.utils.cache_codec import CacheCodec, cache_codec
+from backend.utils.cache_metrics import CacheMetrics
+from backend.utils.circuit_breaker import OPEN, CircuitBreaker
+from backend.utils.metrics import register_collector
+from backend.utils.lru_cache import TTLCache, MISSING
+
+LOCK_PREFIX = "cache:lock"
+GENERATION_PREFIX = "cache:gen"
+# Generation sayaçları tüm cache TTL'lerinden uzun yaşamalı (sıfırlanırsa eski key'ler geri dönebilir)
+GENERATION_TTL = 30 * 24 * 3600
+
+def redis_connection_kwargs() -> dict:
+    """Sync ve async pool'lar için ortak bağlantı ayarları"""
+    return {
+        "host": settings.REDIS_HOST,
+        "port": settings.REDIS_PORT,
+        "password": settings.REDIS_PASSWORD,
+        "db": settings.REDIS_DB,
+        # Değerler binary (codec header'ı + sıkıştırma)
+        "decode_responses": False,
+        "socket_connect_timeout": settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+        "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+        "max_connections": settings.REDIS_MAX_CONNECTIONS,
+        "health_check_interval": settings.REDIS_HEALTH_CHECK_INTERVAL,
+    }
+
 
 class CacheManager:
-    """Redis Cache Manager"""
+    """Redis Cache Manager (L1 process içi + L2 Redis)"""
     
-    def __init__(self):
-        """Redis connection pool oluştur"""
-        if not REDIS_AVAILABLE:
+    def __init__(self, redis_client=None, l1_enabled: Optional[bool] = None,
+                 codec: Optional[CacheCodec] = None, async_redis_client=None):
+        """
+        Redis connection pool oluştur
+        
+        Bağlantı ilk komutta açılır (import sırasında ping yok; Redis kapalıyken
+        uygulama başlangıcı beklemez). Bağlantı hataları circuit breaker'ı açar,
+        breaker açıkken cache çağrıları Redis'e gitmeden None/False döner ve
+        REDIS_BREAKER_RESET_SECONDS sonra tekrar denenir.
+        """
+        self.codec = codec or cache_codec
+        
+        # Key prefix bazlı metrikler (hit/miss, süre, boyut)
+        self.metrics = CacheMetrics()
+        
+        # L2 istatistikleri (Redis)
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self._stats_lock = threading.Lock()
+        
+        # L1 ve invalidation yayını
+        self.l1 = None
+        self.instance_id = uuid.uuid4().hex[:12]
+        self.invalidation_channel = settings.CACHE_INVALIDATION_CHANNEL
+        self._listener_pid = None
+        self._listener_lock = threading.Lock()
+        
+        self.breaker = CircuitBreaker(
+            "redis-cache",
+            failure_threshold=settings.REDIS_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.REDIS_BREAKER_RESET_SECONDS
+        )
+        self.breaker.on_state_change(self._on_breaker_state_change)
+        
+        # Async client'lar event loop'a bağlıdır: loop başına bir client
+        self.pool = None
+        self._async_redis_client = async_redis_client
+        self._async_clients = weakref.WeakKeyDictionary()
+        
+        if redis_client is not None:
+            self.redis_client = redis_client
+            self.enabled = True
+        elif not REDIS_AVAILABLE or not settings.CACHE_ENABLED:
             self.redis_client = None
             self.enabled = False
             return
+        else:
+            self.pool = redis.ConnectionPool(**redis_connection_kwargs())
+            self.redis_client = redis.Redis(connection_pool=self.pool)
+            self.enabled = True
         
-        try:
-            self.redis_client = redis.Redis(
-                host=settings.REDIS_HOST,
-                port=settings.REDIS_PORT,
-                password=settings.REDIS_PASSWORD,
-                db=settings.REDIS_DB,
-                decode_responses=True,
-                socket_connect_timeout=5,
-                socket_timeout=5
+        # L1 sadece Redis varken açılır (worker'lar arası invalidation pub/sub ile)
+        if settings.CACHE_L1_ENABLED if l1_enabled is None else l1_enabled:
+            self.l1 = TTLCache(
+                maxsize=settings.CACHE_L1_MAXSIZE,
+                ttl=settings.CACHE_L1_TTL,
+                on_evict=self.metrics.record_eviction
             )
-            # Test connection
-            self.redis_client.ping()
-            self.enabled = True
-            print("[OK] Redis cache baglantisi basarili")
-        except Exception as e:
-            print(f"[WARNING] Redis baglantisi basarisiz, cache devre disi: {e}")
-            self.redis_client = None
-            self.enabled = False
     
     def _generate_key(self, prefix: str, *args, **kwargs) -> str:
         """Cache key oluştur"""
@@ -52,102 +154,541 @@ class CacheManager:
         key_hash = hashlib.md5(key_data.encode()).hexdigest()
         return f"cache:{prefix}:{key_hash}"
     
-    def get(self, key: str) -> Optional[Any]:
-        """Cache'den veri al"""
+    # ------------------------------------------------------------------
+    # Bağlantı durumu (circuit breaker) ve async client
+    # ------------------------------------------------------------------
+    
+    def _redis_ready(self) -> bool:
+        """Redis yapılandırılmış ve breaker çağrıya izin veriyor mu"""
+        return self.enabled and self.breaker.allow()
+    
+    def _redis_error(self, op: str, error: Exception, key: Optional[str] = None):
+        """Bağlantı hataları breaker'a sayılır; diğer hatalar (codec vb.) loglanır"""
+        if isinstance(error, REDIS_CONNECTION_ERRORS):
+            self.breaker.record_failure()
+        else:
+            logger.error(f"Cache {op} error: {error}")
+        if key is not None:
+            self.metrics.record_error(key)
+    
+    def _on_breaker_state_change(self, old_state: str, new_state: str):
+        # Redis erişilemezken invalidation yayınları kaçırılmış olabilir
+        if new_state == OPEN and self.l1 is not None:
+            self.l1.clear()
+    
+    def _get_async_client(self):
+        """
+        Çalışan event loop'a ait redis.asyncio client'ı
+        
+        None dönerse (Redis kapalı, test client'ı vb.) sync client kullanılır.
+        """
         if not self.enabled:
             return None
+        if self._async_redis_client is not None:
+            return self._async_redis_client
+        if self.pool is None or not REDIS_ASYNC_AVAILABLE:
+            return None
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = redis_async.Redis(
+                connection_pool=redis_async.ConnectionPool(**redis_connection_kwargs())
+            )
+            self._async_clients[loop] = client
+        return client
+    
+    # ------------------------------------------------------------------
+    # L1 yardımcıları
+    # ------------------------------------------------------------------
+    
+    def _l1_set(self, key: str, raw: bytes, ttl: int):
+        """
+        L1'e kodlanmış hali yazılır, her hit'te yeniden çözülür
+        
+        Çözülmüş nesne saklansaydı çağıranlar aynı dict/list'i paylaşır, birinin
+        değişikliği diğerlerine (ve sonraki hit'lere) yansırdı. Büyük değerler
+        L1'e alınmaz (process belleği sınırlı kalsın).
+        """
+        if self.l1 is None or len(raw) > settings.CACHE_L1_MAX_ITEM_BYTES:
+            return
+        l1_ttl = min(ttl, settings.CACHE_L1_TTL) if ttl and ttl > 0 else settings.CACHE_L1_TTL
+        self.l1.set(key, raw, ttl=l1_ttl)
+    
+    def _l1_get(self, key: str, start: float) -> Any:
+        if self.l1 is None:
+            return MISSING
+        self._ensure_invalidation_listener()
+        raw = self.l1.get(key)
+        if raw is MISSING:
+            return MISSING
+        # Redis'ten okunurken/yazılırken zaten çözülebildiği doğrulanmış bayt
+        value = self.codec.decode(raw)
+        self.metrics.record_get(key, (time.perf_counter() - start) * 1000, "l1")
+        return value
+    
+    def _l1_evict(self, op: str, target: Optional[str] = None) -> int:
+        if self.l1 is None:
+            return 0
+        if op == "delete":
+            return int(self.l1.delete(target))
+        if op == "pattern":
+            return self.l1.delete_where(lambda key: fnmatchcase(str(key), target))
+        count = len(self.l1)
+        self.l1.clear()
+        return count
+    
+    def _publish_invalidation(self, op: str, target: Optional[str] = None):
+        """Diğer worker'ların L1 kayıtlarını silmesi için yayın yap"""
+        if self.l1 is None:
+            return
+        try:
+            message = json.dumps({"origin": self.instance_id, "op": op, "target": target})
+            self.redis_client.publish(self.invalidation_channel, message)
+        except Exception as e:
+            self._redis_error("invalidation publish", e)
+    
+    def handle_invalidation_message(self, data: str) -> int:
+        """Pub/sub mesajını uygula (kendi yayınlarımız atlanır)"""
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            return 0
+        if message.get("origin") == self.instance_id:
+            return 0
+        return self._l1_evict(message.get("op"), message.get("target"))
+    
+    def _ensure_invalidation_listener(self):
+        """
+        Invalidation dinleyici thread'ini başlat
+        
+        Fork sonrası (Celery prefork, gunicorn) thread child process'e geçmez;
+        pid değiştiyse yeniden başlatılır.
+        """
+        if self.l1 is None or self._listener_pid == os.getpid():
+            return
+        with self._listener_lock:
+            if self._listener_pid == os.getpid():
+                return
+            # Fork öncesi L1 içeriği başka process'in invalidation'larını kaçırmış olabilir
+            self.l1.clear()
+            self._listener_pid = os.getpid()
+            threading.Thread(
+                target=self._listen_invalidations, name="cache-invalidation", daemon=True
+            ).start()
+    
+    def _listen_invalidations(self):
+        pid = os.getpid()
+        while self._listener_pid == pid:
+            # Breaker açıkken bağlanmayı deneme; istek trafiği Redis'i tekrar açınca abone ol
+            if not self.breaker.is_closed:
+                time.sleep(1)
+                continue
+            pubsub = None
+            try:
+                pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.invalidation_channel)
+                while self._listener_pid == pid:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self.handle_invalidation_message(message.get("data"))
+            except Exception as e:
+                # Bağlantı koptu: kaçan mesajlar olabilir, L1'i boşalt ve yeniden abone ol
+                logger.warning(f"[CACHE] Invalidation kanalı hatası, L1 temizlendi: {e}")
+                self.l1.clear()
+                self._redis_error("invalidation listen", e)
+                time.sleep(1)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+    
+    # ------------------------------------------------------------------
+    # Cache API
+    # ------------------------------------------------------------------
+    
+    def _finish_get(self, key: str, raw, remaining: Optional[int], start: float) -> Optional[Any]:
+        """Redis'ten gelen değeri çöz, say ve L1'e yaz"""
+        if not raw:
+            with self._stats_lock:
+                self.l2_misses += 1
+            self.metrics.record_get(key, (time.perf_counter() - start) * 1000, None)
+            return None
+        try:
+            value = self.codec.decode(raw)
+        except Exception as e:
+            self._redis_error("decode", e, key)
+            return None
+        with self._stats_lock:
+            self.l2_hits += 1
+        if remaining is not None:
+            self._l1_set(key, raw, remaining)
+        self.metrics.record_get(key, (time.perf_counter() - start) * 1000, "l2")
+        return value
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Cache'den veri al (önce L1, sonra Redis)"""
+        if not self._redis_ready():
+            return None
+        
+        start = time.perf_counter()
+        value = self._l1_get(key, start)
+        if value is not MISSING:
+            return value
         
         try:
-            value = self.redis_client.get(key)
-            if value:
-                return json.loads(value)
+            if self.l1 is not None:
+                # Değer ve kalan TTL tek round trip'te (L1 Redis kaydından uzun yaşamasın)
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.get(key)
+                pipe.ttl(key)
+                raw, remaining = pipe.execute()
+            else:
+                raw, remaining = self.redis_client.get(key), None
+        except Exception as e:
+            self._redis_error("get", e, key)
             return None
+        self.breaker.record_success()
+        return self._finish_get(key, raw, remaining, start)
+    
+    async def aget(self, key: str) -> Optional[Any]:
+        """get()'in async karşılığı (redis.asyncio; event loop'u bloklamaz)"""
+        client = self._get_async_client()
+        if client is None:
+            return self.get(key)
+        if not self.breaker.allow():
+            return None
+        
+        start = time.perf_counter()
+        value = self._l1_get(key, start)
+        if value is not MISSING:
+            return value
+        
+        try:
+            if self.l1 is not None:
+                pipe = client.pipeline(transaction=False)
+                pipe.get(key)
+                pipe.ttl(key)
+                raw, remaining = await pipe.execute()
+            else:
+                raw, remaining = await client.get(key), None
         except Exception as e:
-            print(f"Cache get error: {e}")
+            self._redis_error("get", e, key)
             return None
+        self.breaker.record_success()
+        return self._finish_get(key, raw, remaining, start)
+    
+    def _finish_set(self, key: str, serialized: bytes, ttl: int, start: float):
+        if self.l1 is not None:
+            self._ensure_invalidation_listener()
+            self._l1_set(key, serialized, ttl)
+        self.metrics.record_set(key, (time.perf_counter() - start) * 1000, len(serialized), ttl)
     
     def set(self, key: str, value: Any, ttl: int = 300) -> bool:
         """Cache'e veri yaz (TTL saniye cinsinden)"""
-        if not self.enabled:
+        if not self._redis_ready():
             return False
         
+        start = time.perf_counter()
         try:
-            serialized = json.dumps(value, default=str)
+            serialized = self.codec.encode(value)
             self.redis_client.setex(key, ttl, serialized)
-            return True
         except Exception as e:
-            print(f"Cache set error: {e}")
+            self._redis_error("set", e, key)
+            return False
+        self.breaker.record_success()
+        self._finish_set(key, serialized, ttl, start)
+        return True
+    
+    async def aset(self, key: str, value: Any, ttl: int = 300) -> bool:
+        """set()'in async karşılığı"""
+        client = self._get_async_client()
+        if client is None:
+            return self.set(key, value, ttl)
+        if not self.breaker.allow():
+            return False
+        
+        start = time.perf_counter()
+        try:
+            serialized = self.codec.encode(value)
+            await client.setex(key, ttl, serialized)
+        except Exception as e:
+            self._redis_error("set", e, key)
             return False
+        self.breaker.record_success()
+        self._finish_set(key, serialized, ttl, start)
+        return True
     
     def delete(self, key: str) -> bool:
-        """Cache'den veri sil"""
+        """Cache'den veri sil (tüm worker'ların L1'inden de)"""
         if not self.enabled:
             return False
         
+        self._l1_evict("delete", key)
+        if not self.breaker.allow():
+            return False
         try:
-            self.redis_client.delete(key)
+            self.metrics.record_delete(key, self.redis_client.delete(key))
+            self._publish_invalidation("delete", key)
+            self.breaker.record_success()
             return True
         except Exception as e:
-            print(f"Cache delete error: {e}")
+            self._redis_error("delete", e, key)
             return False
     
     def delete_pattern(self, pattern: str) -> int:
-        """Pattern'e uyan tüm key'leri sil"""
+        """
+        Pattern'e uyan tüm key'leri sil (tüm worker'ların L1'inden de)
+        
+        O(keyspace) - sıcak yollarda bump_generation() tercih edilmeli.
+        KEYS yerine SCAN kullanılır (Redis'i bloklamaz).
+        """
         if not self.enabled:
             return 0
         
-        try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                return self.redis_client.delete(*keys)
+        self._l1_evict("pattern", pattern)
+        if not self.breaker.allow():
             return 0
+        try:
+            deleted = 0
+            batch = []
+            for key in self.redis_client.scan_iter(match=pattern, count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    deleted += self.redis_client.delete(*batch)
+                    batch = []
+            if batch:
+                deleted += self.redis_client.delete(*batch)
+            self.metrics.record_delete(pattern, deleted)
+            self._publish_invalidation("pattern", pattern)
+            self.breaker.record_success()
+            return deleted
         except Exception as e:
-            print(f"Cache delete pattern error: {e}")
+            self._redis_error("delete pattern", e)
             return 0
     
+    # ------------------------------------------------------------------
+    # Namespace generation'ları (O(1) invalidation)
+    # ------------------------------------------------------------------
+    
+    def _generation_key(self, namespace: str) -> str:
+        return f"{GENERATION_PREFIX}:{namespace}"
+    
+    def _cached_generations(self, keys: List[str]):
+        """L1'de olan generation'lar ve Redis'ten okunması gerekenler"""
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.l1.get(key) if self.l1 is not None else MISSING
+            if value is MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        return found, missing
+    
+    def _store_generations(self, found: dict, missing: List[str], values) -> None:
+        for key, value in zip(missing, values):
+            found[key] = int(value) if value else 0
+            if self.l1 is not None:
+                # int değiştirilemez: generation'lar kodlanmadan tutulur
+                self.l1.set(key, found[key], ttl=settings.CACHE_L1_TTL)
+    
+    def get_generations(self, namespaces: List[str]) -> List[int]:
+        """Namespace'lerin güncel generation'ları (L1'de olmayanlar tek MGET ile)"""
+        if not namespaces or not self._redis_ready():
+            return [0] * len(namespaces)
+        
+        keys = [self._generation_key(namespace) for namespace in namespaces]
+        found, missing = self._cached_generations(keys)
+        if missing:
+            try:
+                values = self.redis_client.mget(missing)
+                self.breaker.record_success()
+            except Exception as e:
+                self._redis_error("generation get", e)
+                values = [None] * len(missing)
+            self._store_generations(found, missing, values)
+        
+        return [found[key] for key in keys]
+    
+    async def aget_generations(self, namespaces: List[str]) -> List[int]:
+        """get_generations()'ın async karşılığı"""
+        client = self._get_async_client()
+        if client is None:
+            return self.get_generations(namespaces)
+        if not namespaces or not self.breaker.allow():
+            return [0] * len(namespaces)
+        
+        keys = [self._generation_key(namespace) for namespace in namespaces]
+        found, missing = self._cached_generations(keys)
+        if missing:
+            try:
+                values = await client.mget(missing)
+                self.breaker.record_success()
+            except Exception as e:
+                self._redis_error("generation get", e)
+                values = [None] * len(missing)
+            self._store_generations(found, missing, values)
+        
+        return [found[key] for key in keys]
+    
+    def get_generation(self, namespace: str) -> int:
+        return self.get_generations([namespace])[0]
+    
+    def bump_generation(self, namespace: str) -> int:
+        """Namespace'e bağlı tüm cache key'lerini geçersiz kıl (tek INCR)"""
+        return self.bump_generations([namespace])[0]
+    
+    def bump_generations(self, namespaces: List[str]) -> List[int]:
+        """Birden fazla namespace'i tek round trip'te artır (INCR + EXPIRE + yayın)"""
+        if not self.enabled or not namespaces:
+            return [0] * len(namespaces)
+        
+        keys = [self._generation_key(namespace) for namespace in namespaces]
+        for key in keys:
+            self._l1_evict("delete", key)
+        if not self.breaker.allow():
+            return [0] * len(namespaces)
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key in keys:
+                pipe.incr(key)
+                pipe.expire(key, GENERATION_TTL)
+                if self.l1 is not None:
+                    pipe.publish(self.invalidation_channel, json.dumps(
+                        {"origin": self.instance_id, "op": "delete", "target": key}
+                    ))
+            results = pipe.execute()
+            self.breaker.record_success()
+        except Exception as e:
+            self._redis_error("generation bump", e)
+            return [0] * len(namespaces)
+        for key in keys:
+            self.metrics.record_delete(key)
+        step = 3 if self.l1 is not None else 2
+        return [int(results[index * step]) for index in range(len(keys))]
+    
+    def _build_versioned_key(self, prefix: str, generations: List[int], *args, **kwargs) -> str:
+        key_hash = self._generate_key(prefix, *args, **kwargs).rsplit(":", 1)[1]
+        version = ".".join(str(generation) for generation in generations)
+        return f"cache:{prefix}:v{version}:{key_hash}"
+    
+    def versioned_key(self, prefix: str, namespaces: List[str], *args, **kwargs) -> str:
+        """Namespace generation'larını içeren cache key (generation artınca key değişir)"""
+        return self._build_versioned_key(prefix, self.get_generations(namespaces), *args, **kwargs)
+    
+    async def aversioned_key(self, prefix: str, namespaces: List[str], *args, **kwargs) -> str:
+        return self._build_versioned_key(prefix, await self.aget_generations(namespaces), *args, **kwargs)
+    
+    # ------------------------------------------------------------------
+    # Worker'lar arası kilit (single-flight)
+    # ------------------------------------------------------------------
+    
+    _RELEASE_LOCK_SCRIPT = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    end
+    return 0
+    """
+    
+    def acquire_lock(self, name: str, timeout: float) -> Optional[str]:
+        """Kilidi al (SET NX PX); alınamazsa None. Redis yoksa yerel token döner."""
+        token = uuid.uuid4().hex
+        if not self._redis_ready():
+            return token
+        try:
+            acquired = self.redis_client.set(
+                f"{LOCK_PREFIX}:{name}", token, nx=True, px=int(timeout * 1000)
+            )
+            self.breaker.record_success()
+            return token if acquired else None
+        except Exception as e:
+            self._redis_error("lock", e)
+            return token
+    
+    async def aacquire_lock(self, name: str, timeout: float) -> Optional[str]:
+        client = self._get_async_client()
+        if client is None:
+            return self.acquire_lock(name, timeout)
+        token = uuid.uuid4().hex
+        if not self.breaker.allow():
+            return token
+        try:
+            acquired = await client.set(f"{LOCK_PREFIX}:{name}", token, nx=True, px=int(timeout * 1000))
+            self.breaker.record_success()
+            return token if acquired else None
+        except Exception as e:
+            self._redis_error("lock", e)
+            return token
+    
+    def release_lock(self, name: str, token: str):
+        """Kilidi sadece sahibi bırakır (süresi dolup başkasına geçmişse dokunulmaz)"""
+        if not self._redis_ready():
+            return
+        try:
+            self.redis_client.eval(self._RELEASE_LOCK_SCRIPT, 1, f"{LOCK_PREFIX}:{name}", token)
+        except Exception as e:
+            self._redis_error("unlock", e)
+    
+    async def arelease_lock(self, name: str, token: str):
+        client = self._get_async_client()
+        if client is None:
+            return self.release_lock(name, token)
+        if not self.breaker.allow():
+            return
+        try:
+            await client.eval(self._RELEASE_LOCK_SCRIPT, 1, f"{LOCK_PREFIX}:{name}", token)
+        except Exception as e:
+            self._redis_error("unlock", e)
+    
     def clear_all(self) -> bool:
         """Tüm cache'i temizle"""
         if not self.enabled:
             return False
         
+        self._l1_evict("clear")
+        if not self.breaker.allow():
+            return False
         try:
             self.redis_client.flushdb()
+            self._publish_invalidation("clear")
             return True
         except Exception as e:
-            print(f"Cache clear error: {e}")
+            self._redis_error("clear", e)
             return False
     
     def exists(self, key: str) -> bool:
         """Key var mı kontrol et"""
-        if not self.enabled:
+        if not self._redis_ready():
             return False
         
         try:
             return self.redis_client.exists(key) > 0
         except Exception as e:
-            print(f"Cache exists error: {e}")
+            self._redis_error("exists", e)
             return False
     
     def ttl(self, key: str) -> int:
         """Key'in kalan TTL'ini al (saniye)"""
-        if not self.enabled:
+        if not self._redis_ready():
             return -1
         
         try:
             return self.redis_client.ttl(key)
         except Exception as e:
-            print(f"Cache TTL error: {e}")
+            self._redis_error("TTL", e)
             return -1
     
     def increment(self, key: str, amount: int = 1) -> Optional[int]:
         """Counter artır"""
-        if not self.enabled:
+        if not self._redis_ready():
             return None
         
         try:
             return self.redis_client.incrby(key, amount)
         except Exception as e:
-            print(f"Cache increment error: {e}")
+            self._redis_error("increment", e)
             return None
     
     def get_stats(self) -> dict:
@@ -155,10 +696,25 @@ class CacheManager:
         if not self.enabled:
             return {"enabled": False}
         
+        tiers = {
+            "l1": self.l1.get_stats() if self.l1 is not None else {"enabled": False},
+            "l2": {
+                "hits": self.l2_hits,
+                "misses": self.l2_misses,
+                "hit_rate": self._calculate_hit_rate(self.l2_hits, self.l2_misses)
+            },
+            "breaker": self.breaker.get_stats(),
+        }
+        
+        if not self.breaker.allow():
+            return {"enabled": True, "available": False, **tiers}
         try:
             info = self.redis_client.info("stats")
+            self.breaker.record_success()
             return {
                 "enabled": True,
+                "available": True,
+                **tiers,
                 "total_connections": info.get("total_connections_received", 0),
                 "commands_processed": info.get("total_commands_processed", 0),
                 "keyspace_hits": info.get("keyspace_hits", 0),
@@ -169,8 +725,8 @@ class CacheManager:
                 )
             }
         except Exception as e:
-            print(f"Cache stats error: {e}")
-            return {"enabled": True, "error": str(e)}
+            self._redis_error("stats", e)
+            return {"enabled": True, "available": False, **tiers, "error": str(e)}
     
     def _calculate_hit_rate(self, hits: int, misses: int) -> float:
         """Cache hit rate hesapla"""
@@ -184,22 +740,45 @@ class CacheManager:
 cache_manager = CacheManager()
 
 
+@register_collector
+def cache_metrics_collector():
+    """Prefix bazlı cache metrikleri (Prometheus exporter)"""
+    return cache_manager.metrics.prometheus_lines()
+
+
 # Decorator for caching
-def cached(prefix: str, ttl: int = 300):
+NamespaceSpec = Union[Iterable[str], Callable[..., Iterable[str]], None]
+
+
+def resolve_namespaces(prefix: str, namespaces: NamespaceSpec, *args, **kwargs) -> List[str]:
+    """Fonksiyonun kendi namespace'i (prefix) + çağrıya bağlı namespace'ler"""
+    extra = namespaces(*args, **kwargs) if callable(namespaces) else (namespaces or [])
+    return [prefix, *extra]
+
+
+def cached(prefix: str, ttl: int = 300, namespaces: NamespaceSpec = None):
     """
     Cache decorator
     
+    Key, prefix ve namespaces generation'larını içerir; invalidate_*_cache
+    çağrıları ilgili generation'ı artırarak eski sonuçları geçersiz kılar.
+    
     Usage:
-        @cached("user_profile", ttl=600)
+        @cached("user_profile", ttl=600, namespaces=lambda user_id: [f"user:{user_id}"])
         def get_user_profile(user_id: int):
             # ... expensive operation
             return user_data
+        
+        invalidate_user_cache(5)              # user:5 generation'ı artar
+        get_user_profile.invalidate_all()     # Bu fonksiyonun tüm sonuçları
     """
     def decorator(func: Callable):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # Cache key oluştur
-            cache_key = cache_manager._generate_key(prefix, *args, **kwargs)
+            # Cache key oluştur (güncel generation'larla)
+            cache_key = cache_manager.versioned_key(
+                prefix, resolve_namespaces(prefix, namespaces, *args, **kwargs), *args, **kwargs
+            )
             
             # Cache'den dene
             cached_value = cache_manager.get(cache_key)
@@ -215,30 +794,198 @@ def cached(prefix: str, ttl: int = 300):
             
             return result
         
+        wrapper.invalidate_all = lambda: cache_manager.bump_generation(prefix)
         return wrapper
     return decorator
 
 
-# Helper functions
+class _AsyncCacheEntry:
+    """async_cached zarfı: değer + mantıksal bitiş zamanı + hesaplama süresi"""
+    
+    __slots__ = ("value", "expires_at", "compute_seconds")
+    
+    def __init__(self, value: Any, expires_at: float, compute_seconds: float):
+        self.value = value
+        self.expires_at = expires_at
+        self.compute_seconds = compute_seconds
+    
+    @classmethod
+    def load(cls, raw: Any) -> Optional["_AsyncCacheEntry"]:
+        if isinstance(raw, dict) and "exp" in raw and "v" in raw:
+            return cls(raw["v"], raw["exp"], raw.get("d", 0.0))
+        return None
+    
+    def dump(self) -> dict:
+        return {"v": self.value, "exp": self.expires_at, "d": round(self.compute_seconds, 4)}
+
+
+# Arka plan yenileme task'ları (GC toplamasın diye referans tutulur)
+_background_refreshes = set()
+
+
+def async_cached(
+    prefix: str,
+    ttl: int = 300,
+    namespaces: NamespaceSpec = None,
+    stale_ttl: int = 0,
+    early_refresh_beta: float = 1.0,
+    distributed_lock: bool = False,
+    lock_timeout: float = 10.0
+):
+    """
+    async def fonksiyonlar için cache decorator (stampede korumalı)
+    
+    - Single-flight: Aynı key için process içinde tek hesaplama çalışır, diğer
+      çağıranlar aynı sonucu bekler. distributed_lock=True ise Redis kilidiyle
+      worker'lar arasında da tek hesaplama yapılır (kilidi alamayan, sonucun
+      cache'e düşmesini lock_timeout kadar bekler).
+    - Stale-while-revalidate: stale_ttl > 0 ise süresi dolan değer stale_ttl
+      boyunca hemen döner, yenileme arka planda yapılır.
+    - Erken olasılıksal yenileme (XFetch): Bitişe yaklaştıkça, hesaplama süresi
+      ve early_refresh_beta ile orantılı olasılıkla arka planda yenilenir
+      (0 = kapalı).
+    
+    Arka plan yenilemesi request bittikten sonra da çalışabileceğinden
+    fonksiyon argümanları request'e bağlı nesneler (db session vb.) olmamalı;
+    fonksiyon kendi session'ını açmalıdır. Dönüş değeri JSON serileştirilebilir
+    olmalıdır.
+    
+    Usage:
+        @async_cached("dashboard_stats", ttl=120, stale_ttl=60,
+                      namespaces=lambda user_id: [f"dashboard:user:{user_id}"])
+        async def compute_dashboard_stats(user_id: int) -> dict:
+            ...
+    """
+    def decorator(func: Callable):
+        inflight: Dict[str, asyncio.Future] = {}
+        
+        async def compute(cache_key: str, args, kwargs):
+            lock_token = None
+            if distributed_lock:
+                lock_token = await cache_manager.aacquire_lock(cache_key, lock_timeout)
+                if lock_token is None:
+                    # Başka worker hesaplıyor: sonucunu bekle
+                    deadline = time.monotonic() + lock_timeout
+                    while time.monotonic() < deadline:
+                        await asyncio.sleep(0.05)
+                        entry = _AsyncCacheEntry.load(await cache_manager.aget(cache_key))
+                        if entry is not None and entry.expires_at > time.time():
+                            return entry.value
+            try:
+                start = time.monotonic()
+                value = await func(*args, **kwargs)
+                if value is not None:
+                    entry = _AsyncCacheEntry(value, time.time() + ttl, time.monotonic() - start)
+                    await cache_manager.aset(cache_key, entry.dump(), ttl + stale_ttl)
+                return value
+            finally:
+                if lock_token is not None:
+                    await cache_manager.arelease_lock(cache_key, lock_token)
+        
+        def single_flight(cache_key: str, args, kwargs) -> asyncio.Future:
+            future = inflight.get(cache_key)
+            if future is None or future.done() or future.get_loop() is not asyncio.get_running_loop():
+                future = asyncio.ensure_future(compute(cache_key, args, kwargs))
+                inflight[cache_key] = future
+                future.add_done_callback(
+                    lambda done, key=cache_key: inflight.pop(key, None) if inflight.get(key) is done else None
+                )
+            return future
+        
+        def refresh_in_background(cache_key: str, args, kwargs):
+            if cache_key in inflight and not inflight[cache_key].done():
+                return
+            task = single_flight(cache_key, args, kwargs)
+            _background_refreshes.add(task)
+            task.add_done_callback(_background_refreshes.discard)
+            task.add_done_callback(log_refresh_error)
+        
+        def log_refresh_error(task: asyncio.Future):
+            """Arka plan hatası loglanır, çağırana yansımaz"""
+            if not task.cancelled() and task.exception() is not None:
+                logger.error(f"[CACHE] {prefix} arka plan yenileme hatası: {task.exception()}")
+        
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            cache_key = await cache_manager.aversioned_key(
+                prefix, resolve_namespaces(prefix, namespaces, *args, **kwargs), *args, **kwargs
+            )
+            
+            entry = _AsyncCacheEntry.load(await cache_manager.aget(cache_key))
+            if entry is not None:
+                now = time.time()
+                if now < entry.expires_at:
+                    # XFetch: -delta * beta * ln(rand) kadar erken yenile
+                    if early_refresh_beta > 0 and entry.compute_seconds > 0:
+                        jitter = -entry.compute_seconds * early_refresh_beta * math.log(1.0 - random.random())
+                        if now + jitter >= entry.expires_at:
+                            refresh_in_background(cache_key, args, kwargs)
+                    return entry.value
+                if stale_ttl > 0 and now < entry.expires_at + stale_ttl:
+                    refresh_in_background(cache_key, args, kwargs)
+                    return entry.value
+            
+            # asyncio.shield: bir çağıranın iptali ortak hesaplamayı iptal etmesin
+            return await asyncio.shield(single_flight(cache_key, args, kwargs))
+        
+        wrapper.invalidate_all = lambda: cache_manager.bump_generation(prefix)
+        return wrapper
+    return decorator
+
+
+# Helper functions (O(1) - generation artırımı)
 def invalidate_user_cache(user_id: int):
     """Kullanıcı cache'ini temizle"""
-    cache_manager.delete_pattern(f"cache:user_*:{user_id}*")
+    cache_manager.bump_generation(f"user:{user_id}")
 
 
 def invalidate_company_cache(company_id: int):
     """Şirket cache'ini temizle"""
-    cache_manager.delete_pattern(f"cache:company_*:{company_id}*")
+    cache_manager.bump_generation(f"company:{company_id}")
+
+
+def auth_user_namespace(username: str, company_id: int) -> str:
+    """Kullanıcı snapshot'ının generation namespace'i (JWT: sub + company_id)"""
+    return f"auth_user:{company_id}:{username}"
+
+
+def auth_user_key(username: str, company_id: int, generation: int) -> str:
+    """get_current_user snapshot key'i (kullanıcının generation'ı ile)"""
+    return f"{auth_user_namespace(username, company_id)}:v{generation}"
+
+
+def invalidate_auth_user(username: str, company_id: int):
+    """
+    Kullanıcı snapshot'ını geçersiz kıl (generation artırılır)
+
+    Silmek yetmez: SELECT ile set arasında commit olursa eski snapshot silme
+    işleminden sonra yazılabilir. Generation'ı önceden okuyan istek eski
+    key'e yazar, sonraki istekler yeni key'i okur.
+    """
+    cache_manager.bump_generation(auth_user_namespace(username, company_id))
 
 
 def invalidate_dashboard_cache(user_id: int = None, company_id: int = None):
     """Dashboard cache'ini temizle"""
     if user_id:
-        cache_manager.delete_pattern(f"cache:dashboard_*:{user_id}*")
+        cache_manager.bump_generation(f"dashboard:user:{user_id}")
     if company_id:
-        cache_manager.delete_pattern(f"cache:dashboard_*:{company_id}*")
+        cache_manager.bump_generation(f"dashboard:company:{company_id}")
+
+
+def invalidate_mutabakat_caches(company_id: int = None, user_ids: Iterable[int] = ()):
+    """
+    Mutabakat değişikliği sonrası sadece etkilenen şirket ve kullanıcıların
+    liste, dashboard ve rapor generation'larını artır (tek round trip)
+    """
+    namespaces = ["mutabakat", "mutabakat_list:all"]
+    if company_id:
+        namespaces += [f"mutabakat_list:company:{company_id}", f"dashboard:company:{company_id}"]
+    for user_id in sorted({user_id for user_id in user_ids if user_id}):
+        namespaces += [f"mutabakat_list:user:{user_id}", f"dashboard:user:{user_id}"]
+    cache_manager.bump_generations(namespaces)
 
 
 def invalidate_mutabakat_cache():
     """Mutabakat cache'ini temizle"""
-    cache_manager.delete_pattern("cache:mutabakat_*")
-
+    cache_manager.bump_generation("mutabakat")
@@ -0,0 +1,174 @@
+"""
+Key Prefix Bazlı Cache Metrikleri
+Redis INFO sunucu genelini verir; hangi cache'in (dashboard, kvkk, ip_info...)
+işe yaradığını görmek için istemci tarafında prefix başına sayaç tutulur.
+
+Prefix: "cache:<prefix>:..." key'lerinde <prefix>, diğerlerinde ilk segment
+(ör. "ip_info:1.2.3.4" -> "ip_info"). Prefix'ler kodda sabit olduğundan
+label sayısı sınırlıdır.
+
+CACHE_TTL_* ayarları bu metriklere bakılarak ayarlanır: düşük hit oranı ve
+yüksek miss/set oranı TTL'in kısa, sık invalidation ise uzun TTL'in boşa
+olduğunu gösterir.
+"""
+import threading
+from typing import Dict, List, Optional
+
+from backend.utils.metrics import Histogram, format_labels
+from backend.utils.request_timing import record_span
+
+# Cache işlemleri çoğunlukla milisaniyenin altında
+CACHE_LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+
+
+def key_prefix(key) -> str:
+    if isinstance(key, bytes):
+        key = key.decode("utf-8", "replace")
+    parts = str(key).split(":", 2)
+    if parts[0] == "cache" and len(parts) > 1:
+        return parts[1]
+    return parts[0]
+
+
+class PrefixStats:
+    """Tek bir key prefix'i için sayaçlar"""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.deletes = 0
+        self.evictions = 0
+        self.errors = 0
+        self.bytes_written = 0
+        self.max_value_bytes = 0
+        self.last_ttl: Optional[int] = None
+        self.get_ms = Histogram(CACHE_LATENCY_BUCKETS_MS)
+        self.set_ms = Histogram(CACHE_LATENCY_BUCKETS_MS)
+        self._lock = threading.Lock()
+
+    @property
+    def hits(self) -> int:
+        return self.l1_hits + self.l2_hits
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 2) if lookups else 0.0,
+            "sets": self.sets,
+            "deletes": self.deletes,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "bytes_written": self.bytes_written,
+            "avg_value_bytes": round(self.bytes_written / self.sets) if self.sets else 0,
+            "max_value_bytes": self.max_value_bytes,
+            "ttl": self.last_ttl,
+            "get_ms": self.get_ms.snapshot(),
+            "set_ms": self.set_ms.snapshot(),
+        }
+
+
+class CacheMetrics:
+    """Prefix -> PrefixStats (CacheManager her işlemde günceller)"""
+
+    def __init__(self):
+        self._prefixes: Dict[str, PrefixStats] = {}
+        self._lock = threading.Lock()
+
+    def for_key(self, key) -> PrefixStats:
+        prefix = key_prefix(key)
+        stats = self._prefixes.get(prefix)
+        if stats is None:
+            with self._lock:
+                stats = self._prefixes.setdefault(prefix, PrefixStats(prefix))
+        return stats
+
+    def record_get(self, key, duration_ms: float, tier: Optional[str]):
+        """tier: "l1", "l2" veya None (miss)"""
+        stats = self.for_key(key)
+        with stats._lock:
+            if tier == "l1":
+                stats.l1_hits += 1
+            elif tier == "l2":
+                stats.l2_hits += 1
+            else:
+                stats.misses += 1
+        stats.get_ms.observe(duration_ms)
+        record_span("cache", duration_ms)
+
+    def record_set(self, key, duration_ms: float, size: int, ttl: int):
+        stats = self.for_key(key)
+        with stats._lock:
+            stats.sets += 1
+            stats.bytes_written += size
+            stats.last_ttl = ttl
+            if size > stats.max_value_bytes:
+                stats.max_value_bytes = size
+        stats.set_ms.observe(duration_ms)
+        record_span("cache", duration_ms)
+
+    def record_delete(self, key, count: int = 1):
+        stats = self.for_key(key)
+        with stats._lock:
+            stats.deletes += count
+
+    def record_eviction(self, key):
+        """L1'den kapasite nedeniyle atılan kayıt"""
+        stats = self.for_key(key)
+        with stats._lock:
+            stats.evictions += 1
+
+    def record_error(self, key):
+        stats = self.for_key(key)
+        with stats._lock:
+            stats.errors += 1
+
+    def reset(self):
+        with self._lock:
+            self._prefixes.clear()
+
+    def get_stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            prefixes = dict(self._prefixes)
+        return {prefix: prefixes[prefix].get_stats() for prefix in sorted(prefixes)}
+
+    def prometheus_lines(self) -> List[str]:
+        with self._lock:
+            prefixes = [self._prefixes[prefix] for prefix in sorted(self._prefixes)]
+
+        counters = (
+            ("cache_hits_total", "Cache hit sayısı (tier: l1/l2)", None),
+            ("cache_misses_total", "Cache miss sayısı", "misses"),
+            ("cache_sets_total", "Cache yazma sayısı", "sets"),
+            ("cache_deletes_total", "Açık silme/invalidation sayısı", "deletes"),
+            ("cache_evictions_total", "L1 kapasite tahliyeleri", "evictions"),
+            ("cache_errors_total", "Redis hata sayısı", "errors"),
+            ("cache_written_bytes_total", "Yazılan (codec sonrası) byte", "bytes_written"),
+        )
+        lines = []
+        for name, help_text, attribute in counters:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for stats in prefixes:
+                if attribute is None:
+                    for tier in ("l1", "l2"):
+                        labels = format_labels({"prefix": stats.prefix, "tier": tier})
+                        lines.append(f"{name}{labels} {getattr(stats, f'{tier}_hits')}")
+                else:
+                    lines.append(f"{name}{format_labels({'prefix': stats.prefix})} {getattr(stats, attribute)}")
+
+        for name, help_text, attribute in (
+            ("cache_get_duration_ms", "Cache okuma süresi (ms)", "get_ms"),
+            ("cache_set_duration_ms", "Cache yazma süresi (ms)", "set_ms"),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for stats in prefixes:
+                lines.extend(getattr(stats, attribute).prometheus_lines(name, {"prefix": stats.prefix}))
+        return lines
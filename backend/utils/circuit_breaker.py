@@ -0,0 +1,118 @@
+"""
+Circuit Breaker
+Erişilemeyen bir bağımlılığa (Redis vb.) her çağrıda bağlanmaya çalışıp
+timeout beklememek için
+
+- closed   : Çağrılar geçer; art arda failure_threshold hata -> open
+- open     : Çağrılar hemen reddedilir; reset_timeout sonra -> half_open
+- half_open: Tek bir deneme çağrısı geçer; başarılıysa closed, değilse open
+
+Deneme çağrısı sonuç bildirmezse reset_timeout sonra yeni deneme yapılır.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Thread-safe circuit breaker"""
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 15.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_count = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str, str], None]] = []
+
+    def on_state_change(self, listener: Callable[[str, str], None]):
+        """listener(eski_durum, yeni_durum) - lock dışında çağrılır"""
+        self._listeners.append(listener)
+
+    def _transition(self, new_state: str) -> str:
+        old_state, self.state = self.state, new_state
+        return old_state
+
+    def _notify(self, old_state: str, new_state: str):
+        if old_state == new_state:
+            return
+        if new_state == OPEN:
+            logger.warning(f"[BREAKER] {self.name} devre disi ({self.reset_timeout:.0f} sn sonra tekrar denenecek)")
+        elif new_state == CLOSED:
+            logger.info(f"[BREAKER] {self.name} tekrar aktif")
+        for listener in self._listeners:
+            try:
+                listener(old_state, new_state)
+            except Exception as e:
+                logger.exception(f"[BREAKER] {self.name} listener hatası: {e}")
+
+    @property
+    def is_closed(self) -> bool:
+        return self.state == CLOSED
+
+    def allow(self) -> bool:
+        """Çağrı yapılabilir mi (half_open'da sadece deneme çağrısı için True)"""
+        if self.state == CLOSED:
+            return True
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            now = time.monotonic()
+            if now - self._opened_at >= self.reset_timeout:
+                # Deneme hakkı: bir sonraki deneme için sayaç yeniden başlar
+                self._opened_at = now
+                old_state = self._transition(HALF_OPEN)
+            else:
+                self.rejected += 1
+                return False
+        self._notify(old_state, HALF_OPEN)
+        return True
+
+    def record_success(self):
+        if self.state == CLOSED and self.failures == 0:
+            return
+        with self._lock:
+            self.failures = 0
+            old_state = self._transition(CLOSED)
+        self._notify(old_state, CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == CLOSED and self.failures < self.failure_threshold:
+                return
+            if self.state != OPEN:
+                self.opened_count += 1
+            self._opened_at = time.monotonic()
+            old_state = self._transition(OPEN)
+        self._notify(old_state, OPEN)
+
+    def reset(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_at = 0.0
+            old_state = self._transition(CLOSED)
+        self._notify(old_state, CLOSED)
+
+    def get_stats(self) -> Dict:
+        retry_in = None
+        if self.state != CLOSED:
+            retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)), 1)
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened_count": self.opened_count,
+            "rejected": self.rejected,
+            "retry_in_seconds": retry_in,
+        }
@@ -0,0 +1,157 @@
+"""
+Şirket Yapılandırması Cache'i (read-through)
+
+SMS gönderimi, PDF üretimi, /auth/me ve KVKK metinleri her çağrıda Company
+satırını (büyük KVKK metin kolonlarıyla) okuyordu. Sıcak yollar artık sadece
+hafif alanları içeren CompanyConfig'i, KVKK endpoint'leri ise ayrı cache'lenen
+metinleri kullanır. İkisi de "company:<id>" namespace'ine bağlıdır;
+admin_companies güncelleme/silme işlemleri invalidate_company_cache çağırır.
+
+Şifre / API anahtarı kolonları (SECRET_FIELDS) cache'e (Redis, L1) hiç
+yazılmaz; ihtiyaç anında get_company_secret ile DB'den okunur.
+"""
+from dataclasses import dataclass, fields
+from typing import Dict, Optional
+
+from sqlalchemy.orm import load_only
+
+from backend import database
+from backend.config import settings
+from backend.kvkk_constants import (
+    KVKK_POLICY_TEXT, KVKK_POLICY_TITLE, KVKK_POLICY_SUMMARY, KVKK_POLICY_VERSION,
+    CUSTOMER_NOTICE_TEXT, CUSTOMER_NOTICE_TITLE, CUSTOMER_NOTICE_SUMMARY, CUSTOMER_NOTICE_VERSION,
+    DATA_RETENTION_POLICY_TEXT, DATA_RETENTION_TITLE, DATA_RETENTION_SUMMARY, DATA_RETENTION_VERSION,
+    SYSTEM_CONSENT_TEXT, SYSTEM_CONSENT_TITLE, SYSTEM_CONSENT_SUMMARY, SYSTEM_CONSENT_VERSION
+)
+from backend.models import Company
+from backend.utils.cache_manager import cached
+
+
+@dataclass(frozen=True)
+class CompanyConfig:
+    """
+    Şirketin hafif ayarları (KVKK metinleri hariç)
+
+    Company ile aynı alan adlarını taşıdığından GoldSMS(company) ve
+    create_mutabakat_pdf(company=...) gibi Company bekleyen yerlere verilebilir.
+    Gizli kolonları taşımaz (get_company_secret).
+    """
+    id: int
+    vkn: str
+    company_name: str
+    full_company_name: Optional[str] = None
+    tax_office: Optional[str] = None
+    address: Optional[str] = None
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    website: Optional[str] = None
+    logo_path: Optional[str] = None
+    primary_color: Optional[str] = None
+    secondary_color: Optional[str] = None
+    sms_enabled: bool = True
+    sms_provider: Optional[str] = None
+    sms_header: Optional[str] = None
+    sms_username: Optional[str] = None
+    notification_email: Optional[str] = None
+    certificate_path: Optional[str] = None
+    is_active: bool = True
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CompanyConfig":
+        return cls(**{name: data.get(name) for name in CONFIG_FIELDS})
+
+
+CONFIG_FIELDS = tuple(field.name for field in fields(CompanyConfig))
+
+# Cache'lenmeyen kolonlar
+SECRET_FIELDS = ("sms_password", "sms_api_key", "certificate_password")
+
+# Bölüm -> (metin kolonu, versiyon kolonu, başlık, özet, varsayılan metin, varsayılan versiyon)
+KVKK_SECTIONS = {
+    "kvkk_policy": (
+        "kvkk_policy_text", "kvkk_policy_version",
+        KVKK_POLICY_TITLE, KVKK_POLICY_SUMMARY, KVKK_POLICY_TEXT, KVKK_POLICY_VERSION,
+    ),
+    "customer_notice": (
+        "customer_notice_text", "customer_notice_version",
+        CUSTOMER_NOTICE_TITLE, CUSTOMER_NOTICE_SUMMARY, CUSTOMER_NOTICE_TEXT, CUSTOMER_NOTICE_VERSION,
+    ),
+    "data_retention": (
+        "data_retention_policy_text", "data_retention_version",
+        DATA_RETENTION_TITLE, DATA_RETENTION_SUMMARY, DATA_RETENTION_POLICY_TEXT, DATA_RETENTION_VERSION,
+    ),
+    "system_consent": (
+        "system_consent_text", "system_consent_version",
+        SYSTEM_CONSENT_TITLE, SYSTEM_CONSENT_SUMMARY, SYSTEM_CONSENT_TEXT, SYSTEM_CONSENT_VERSION,
+    ),
+}
+
+
+def company_namespaces(company_id: Optional[int]):
+    return [f"company:{company_id}"]
+
+
+def _load_company_columns(company_id: int, columns) -> Optional[Dict]:
+    """
+    Company satırından sadece istenen kolonlar
+
+    Güncelleme sonrası replica gecikmesi eski değeri cache'e yazmasın diye primary kullanılır.
+    """
+    db = database.SessionLocal()
+    try:
+        company = db.query(Company).options(
+            load_only(*(getattr(Company, column) for column in columns))
+        ).filter(Company.id == company_id).first()
+        if company is None:
+            return None
+        return {column: getattr(company, column) for column in columns}
+    finally:
+        db.close()
+
+
+@cached("company_config", ttl=settings.CACHE_TTL_COMPANY, namespaces=company_namespaces)
+def _cached_company_config(company_id: int) -> Optional[Dict]:
+    return _load_company_columns(company_id, CONFIG_FIELDS)
+
+
+def get_company_config(company_id: Optional[int]) -> Optional[CompanyConfig]:
+    """Şirket ayarları (cache'den; şirket yoksa None)"""
+    if not company_id:
+        return None
+    data = _cached_company_config(company_id)
+    return CompanyConfig.from_dict(data) if data else None
+
+
+def get_company_secret(company, column: str) -> Optional[str]:
+    """
+    Gizli kolonu oku (cache'siz)
+
+    Company ORM nesnesi verilirse değeri zaten yüklüdür; CompanyConfig için
+    sadece o kolon DB'den okunur.
+    """
+    if column not in SECRET_FIELDS:
+        raise ValueError(f"Gizli kolon değil: {column}")
+    if company is None:
+        return None
+    if hasattr(company, column):
+        return getattr(company, column)
+    data = _load_company_columns(company.id, (column,))
+    return data[column] if data else None
+
+
+@cached("kvkk_texts", ttl=settings.CACHE_TTL_KVKK, namespaces=company_namespaces)
+def get_company_kvkk_texts(company_id: Optional[int]) -> Dict:
+    """Şirketin KVKK metinleri (tanımlanmayan metin/versiyon için varsayılanlar)"""
+    columns = [column for section in KVKK_SECTIONS.values() for column in section[:2]]
+    company = _load_company_columns(company_id, columns) if company_id else None
+    company = company or {}
+
+    texts = {}
+    for name, (text_column, version_column, title, summary, default_text, default_version) in KVKK_SECTIONS.items():
+        texts[name] = {
+            "title": title,
+            "summary": summary,
+            "content": company.get(text_column) or default_text,
+            "version": company.get(version_column) or default_version,
+        }
+    return texts
@@ -0,0 +1,32 @@
+"""
+Performans İndeksleri Oluşturma Script (Python)
+Modellerde __table_args__ ile tanımlı composite indeksleri mevcut veritabanına ekler
+(create_all var olan tablolara indeks eklemez).
+
+Kullanım:
+    python -m backend.utils.create_performance_indexes
+"""
+import sys
+from backend.database import engine
+from backend.models import AuditLog, Bayi, Mutabakat, MutabakatBayiDetay
+from backend.logger import logger
+
+INDEXED_MODELS = [Mutabakat, AuditLog, Bayi, MutabakatBayiDetay]
+
+
+def create_performance_indexes() -> bool:
+    """Eksik indeksleri oluştur (var olanlar atlanır)"""
+    try:
+        for model in INDEXED_MODELS:
+            for index in model.__table__.indexes:
+                index.create(bind=engine, checkfirst=True)
+                logger.info(f"✅ İndeks hazır: {index.name}")
+        return True
+    except Exception as e:
+        logger.error(f"❌ İndeks oluşturma hatası: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = create_performance_indexes()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,199 @@
+"""
+Veritabanı Connection Pool Profilleri ve Metrikleri
+
+Profil process rolüne göre seçilir (API, Celery worker, Celery beat);
+DB_PROCESS_ROLE verilmezse komut satırından tahmin edilir.
+
+Metrikler:
+- checked_out / overflow / checked_in: Pool'un anlık durumu
+- checkout_wait_ms: Pool'dan bağlantı alma süresi histogramı
+- timeouts: pool_timeout aşıldığı için başarısız olan checkout sayısı
+"""
+from typing import Dict, Optional
+import os
+import sys
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from backend.utils.metrics import Histogram
+
+# Rol bazlı pool profilleri
+# - api: Eşzamanlı request'ler için geniş pool
+# - worker: Prefork Celery child'ı aynı anda tek task çalıştırır
+# - beat: Sadece zamanlayıcı, DB'ye nadiren dokunur
+POOL_PROFILES: Dict[str, Dict[str, int]] = {
+    "api": {"pool_size": 5, "max_overflow": 10, "pool_timeout": 30},
+    "worker": {"pool_size": 2, "max_overflow": 2, "pool_timeout": 30},
+    "beat": {"pool_size": 1, "max_overflow": 1, "pool_timeout": 30},
+}
+
+
+def detect_process_role() -> str:
+    """Process rolünü belirle (DB_PROCESS_ROLE > komut satırı > api)"""
+    role = os.getenv("DB_PROCESS_ROLE", "").strip().lower()
+    if role in POOL_PROFILES:
+        return role
+
+    argv = " ".join(sys.argv).lower()
+    if "celery" in argv:
+        return "beat" if " beat" in argv else "worker"
+    return "api"
+
+
+def get_pool_options(role: str) -> Dict[str, int]:
+    """Rol profilini env override'ları ile birleştir (DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT)"""
+    options = dict(POOL_PROFILES.get(role, POOL_PROFILES["api"]))
+    for key, env_name in (
+        ("pool_size", "DB_POOL_SIZE"),
+        ("max_overflow", "DB_MAX_OVERFLOW"),
+        ("pool_timeout", "DB_POOL_TIMEOUT"),
+    ):
+        value = os.getenv(env_name)
+        if value:
+            options[key] = int(value)
+    return options
+
+
+class PoolMetrics:
+    """Tek bir engine pool'u için metrikler"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self.checkout_wait_ms = Histogram()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self._lock = threading.Lock()
+
+    def on_checkout(self, *args):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            if self.in_use > self.peak_in_use:
+                self.peak_in_use = self.in_use
+
+    def on_checkin(self, *args):
+        with self._lock:
+            self.checkins += 1
+            self.in_use = max(0, self.in_use - 1)
+
+    def on_connect(self, *args):
+        with self._lock:
+            self.connects += 1
+
+    def on_invalidate(self, *args):
+        with self._lock:
+            self.invalidations += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def reset(self):
+        """Sayaçları sıfırla (anlık pool durumu korunur)"""
+        with self._lock:
+            self.checkouts = self.checkins = self.connects = 0
+            self.invalidations = self.timeouts = 0
+            self.peak_in_use = self.in_use
+        self.checkout_wait_ms.reset()
+
+    def get_stats(self) -> Dict:
+        pool = self.pool
+        state = {}
+        if pool is not None:
+            state["pool_class"] = type(pool).__name__
+            for key, method in (
+                ("size", "size"),
+                ("checked_out", "checkedout"),
+                ("checked_in", "checkedin"),
+                ("overflow", "overflow"),
+            ):
+                if hasattr(pool, method):
+                    state[key] = getattr(pool, method)()
+            if hasattr(pool, "_max_overflow"):
+                state["max_overflow"] = pool._max_overflow
+            if hasattr(pool, "_timeout"):
+                state["timeout"] = pool._timeout
+
+        return {
+            **state,
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "timeouts": self.timeouts,
+            "checkout_wait_ms": self.checkout_wait_ms.snapshot(),
+        }
+
+
+# Engine adı -> metrikler (pool_logging_name ile eşleşir)
+_pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+def get_pool_metrics(name: str) -> PoolMetrics:
+    if name not in _pool_metrics:
+        _pool_metrics[name] = PoolMetrics(name)
+    return _pool_metrics[name]
+
+
+def get_all_pool_stats() -> Dict[str, Dict]:
+    return {name: metrics.get_stats() for name, metrics in _pool_metrics.items()}
+
+
+class InstrumentedPoolMixin:
+    """
+    Checkout bekleme süresini ve timeout'ları ölçen pool mixin'i
+
+    SQLAlchemy'de checkout öncesi event olmadığı için bekleme süresi _do_get
+    etrafında ölçülür; geri kalan metrikler pool event'lerinden gelir.
+    """
+
+    def _do_get(self):
+        metrics = get_pool_metrics(self.logging_name or "default")
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except sa_exc.TimeoutError:
+            metrics.record_timeout()
+            raise
+        finally:
+            metrics.checkout_wait_ms.observe((time.perf_counter() - start) * 1000)
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    """Sync engine'ler için ölçümlü QueuePool"""
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """Async engine'ler için ölçümlü pool"""
+
+
+def instrument_engine(engine: Engine, name: str) -> PoolMetrics:
+    """Engine'in pool event'lerini metriklere bağla"""
+    metrics = get_pool_metrics(name)
+    metrics.pool = engine.pool
+
+    event.listen(engine, "checkout", metrics.on_checkout)
+    event.listen(engine, "checkin", metrics.on_checkin)
+    event.listen(engine, "connect", metrics.on_connect)
+    event.listen(engine, "invalidate", metrics.on_invalidate)
+
+    # engine.dispose() yeni pool oluşturur; referansı güncel tut
+    @event.listens_for(engine, "engine_disposed")
+    def _refresh_pool(*args):
+        metrics.pool = engine.pool
+        metrics.in_use = 0
+
+    return metrics
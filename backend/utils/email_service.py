@@ -8,8 +8,11 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 from typing import Optional
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 
 class EmailService:
     """Email gönderim servisi"""
@@ -41,7 +44,7 @@ class EmailService:
         ])
         
         if not self.enabled:
-            print("[EMAIL] SMTP ayarları eksik, email gönderimi devre dışı")
+            logger.warning("[EMAIL] SMTP ayarları eksik, email gönderimi devre dışı")
     
     def send_email(
         self,
@@ -63,7 +66,7 @@ class EmailService:
             bool: Başarılı ise True
         """
         if not self.enabled:
-            print(f"[EMAIL] Servis devre dışı, email gönderilemedi: {to_email}")
+            logger.warning(f"[EMAIL] Servis devre dışı, email gönderilemedi: {to_email}")
             return False
         
         try:
@@ -87,11 +90,11 @@ class EmailService:
                 server.login(self.smtp_user, self.smtp_password)
                 server.send_message(msg)
             
-            print(f"[EMAIL] Email başarıyla gönderildi: {to_email}")
+            logger.info(f"[EMAIL] Email başarıyla gönderildi: {to_email}")
             return True
             
         except Exception as e:
-            print(f"[EMAIL] Email gönderme hatası: {e}")
+            logger.error(f"[EMAIL] Email gönderme hatası: {e}")
             return False
     
     def send_mutabakat_approved(
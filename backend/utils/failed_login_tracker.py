@@ -6,8 +6,11 @@ from sqlalchemy.orm import Session
 from backend.models import User, FailedLoginAttempt, get_turkey_time
 from datetime import datetime, timedelta
 from typing import Optional, Dict
+import logging
 import pytz
 
+logger = logging.getLogger(__name__)
+
 # Türkiye saat dilimi
 TURKEY_TZ = pytz.timezone('Europe/Istanbul')
 
@@ -58,7 +61,7 @@ class FailedLoginTracker:
         
         db.commit()
         
-        print(f"[SECURITY] Account locked: {user.username} until {user.account_locked_until} ({reason})")
+        logger.warning(f"[SECURITY] Account locked: {user.username} until {user.account_locked_until} ({reason})")
     
     @staticmethod
     def unlock_account(db: Session, user: User, admin_user_id: Optional[int] = None):
@@ -73,7 +76,7 @@ class FailedLoginTracker:
         db.commit()
         
         unlock_by = f"by admin (ID: {admin_user_id})" if admin_user_id else "automatically"
-        print(f"[SECURITY] Account unlocked: {user.username} {unlock_by}")
+        logger.info(f"[SECURITY] Account unlocked: {user.username} {unlock_by}")
     
     @staticmethod
     def record_failed_login(
@@ -100,7 +103,7 @@ class FailedLoginTracker:
             isp=isp_info.get("isp"),
             city=isp_info.get("city"),
             country=isp_info.get("country"),
-            organization=isp_info.get("organization"),
+            organization=isp_info.get("org", isp_info.get("organization")),
             failure_reason=failure_reason,
             attempted_at=get_turkey_time()
         )
@@ -108,7 +111,7 @@ class FailedLoginTracker:
         db.add(failed_attempt)
         db.commit()
         
-        print(f"[SECURITY] Failed login attempt recorded: VKN={vkn_tckn}, IP={ip_address}, Reason={failure_reason}")
+        logger.info(f"[SECURITY] Failed login attempt recorded: VKN={vkn_tckn}, IP={ip_address}, Reason={failure_reason}")
         
         # Kullanıcı varsa, failed login counter'ı artır
         if user:
@@ -131,7 +134,7 @@ class FailedLoginTracker:
             time_since_last_failure = now - last_failed
             if time_since_last_failure > timedelta(minutes=FAILED_LOGIN_RESET_MINUTES):
                 user.failed_login_count = 0
-                print(f"[SECURITY] Failed login counter reset for {user.username} (1 hour passed)")
+                logger.info(f"[SECURITY] Failed login counter reset for {user.username} (1 hour passed)")
         
         # Counter'ı artır
         user.failed_login_count += 1
@@ -139,7 +142,7 @@ class FailedLoginTracker:
         
         db.commit()
         
-        print(f"[SECURITY] Failed login count for {user.username}: {user.failed_login_count}/{FAILED_LOGIN_LIMIT}")
+        logger.info(f"[SECURITY] Failed login count for {user.username}: {user.failed_login_count}/{FAILED_LOGIN_LIMIT}")
         
         # Limite ulaşıldı mı? Lock et
         if user.failed_login_count >= FAILED_LOGIN_LIMIT:
@@ -160,7 +163,7 @@ class FailedLoginTracker:
         
         db.commit()
         
-        print(f"[SECURITY] Failed login counter reset for {user.username} (successful login)")
+        logger.debug(f"[SECURITY] Failed login counter reset for {user.username} (successful login)")
     
     @staticmethod
     def get_failed_login_history(
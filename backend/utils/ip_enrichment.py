@@ -0,0 +1,159 @@
+"""
+Ertelenmiş ISP Zenginleştirme
+Log/delil kayıtları request sırasında sadece IP ile yazılır (isp = NULL,
+isp_pending = True). Bu modül bekleyen IP'leri toplu olarak çözer ve kayıtları
+toplu günceller. Sadece isp_pending işaretli kayıtlara bakılır: özellik öncesi
+ISP'si boş kalmış eski delil kayıtlarına bugünün ISP bilgisi yazılmaz.
+
+Çalıştırma:
+- Celery beat: backend.tasks.enrichment_tasks.enrich_pending_ips (her dakika)
+- Celery yoksa: IP_ENRICHMENT_IN_PROCESS_INTERVAL > 0 ile API process'i içinde döngü
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, true, update
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.models import (
+    ActivityLog, AuditLog, SMSVerificationLog, FailedLoginAttempt,
+    KVKKConsent, KVKKConsentDeletionLog
+)
+from backend.utils.ip_resolver import ip_info_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class EnrichmentTarget:
+    """Zenginleştirilecek tablo ve kolon eşlemesi (organization yoksa None)"""
+    model: type
+    ip: str
+    isp: str
+    city: str
+    country: str
+    organization: Optional[str] = None
+
+    @property
+    def pending(self) -> str:
+        """Bekleyen kayıt işareti kolonu (models.isp_pending_column)"""
+        return f"{self.isp}_pending"
+
+    @property
+    def name(self) -> str:
+        prefix = self.ip[:-len("ip_address")]
+        return f"{self.model.__tablename__}.{prefix}" if prefix else self.model.__tablename__
+
+
+ENRICHMENT_TARGETS: List[EnrichmentTarget] = [
+    EnrichmentTarget(ActivityLog, "ip_address", "isp", "city", "country", "organization"),
+    EnrichmentTarget(AuditLog, "ip_address", "isp", "city", "country"),
+    EnrichmentTarget(SMSVerificationLog, "ip_address", "isp", "city", "country", "organization"),
+    EnrichmentTarget(FailedLoginAttempt, "ip_address", "isp", "city", "country", "organization"),
+    EnrichmentTarget(KVKKConsent, "ip_address", "isp", "city", "country", "organization"),
+    EnrichmentTarget(
+        KVKKConsentDeletionLog, "original_ip_address", "original_isp", "original_city",
+        "original_country", "original_organization"
+    ),
+    EnrichmentTarget(
+        KVKKConsentDeletionLog, "deletion_ip_address", "deletion_isp", "deletion_city",
+        "deletion_country", "deletion_organization"
+    ),
+]
+
+
+def pending_ips_query(target: EnrichmentTarget, limit: int):
+    """Zenginleştirme bekleyen farklı IP'ler ((pending, ip) indeksinden okunur)"""
+    ip_col = getattr(target.model, target.ip)
+    pending_col = getattr(target.model, target.pending)
+    return select(ip_col).where(pending_col == true()).distinct().limit(limit)
+
+
+def _pending_ips(db: Session, target: EnrichmentTarget, limit: int) -> List[str]:
+    return list(db.scalars(pending_ips_query(target, limit)))
+
+
+def _enrich_target(db: Session, target: EnrichmentTarget, resolved: Dict[str, dict], limit: int) -> int:
+    """Tek tablo için bekleyen kayıtları IP bazında toplu güncelle"""
+    ip_col = getattr(target.model, target.ip)
+    pending_col = getattr(target.model, target.pending)
+    updated = 0
+
+    for ip in _pending_ips(db, target, limit):
+        if ip not in resolved:
+            resolved[ip] = ip_info_cache.resolve(ip)
+        info = resolved[ip]
+
+        values = {
+            target.isp: info["isp"],
+            target.city: info["city"],
+            target.country: info["country"],
+            target.pending: False,
+        }
+        if target.organization:
+            values[target.organization] = info["org"]
+
+        result = db.execute(
+            update(target.model)
+            .where(ip_col == ip, pending_col == true())
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        updated += result.rowcount or 0
+
+    return updated
+
+
+def enrich_pending_ip_rows(db: Session, batch_size: Optional[int] = None) -> Dict[str, int]:
+    """
+    Tüm hedef tablolardaki bekleyen kayıtları zenginleştir
+
+    Her tabloda en fazla batch_size farklı IP işlenir; aynı IP tablolar arasında
+    sadece bir kez çözülür. Çözülemeyen IP'ler 'Bilinmiyor' olarak işaretlenir
+    (tekrar tekrar denenmez).
+
+    Returns:
+        Tablo bazında güncellenen kayıt sayıları
+    """
+    batch_size = batch_size or settings.IP_ENRICHMENT_BATCH_SIZE
+    resolved: Dict[str, dict] = {}
+    stats: Dict[str, int] = {}
+
+    try:
+        for target in ENRICHMENT_TARGETS:
+            count = _enrich_target(db, target, resolved, batch_size)
+            if count:
+                stats[target.name] = count
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    if stats:
+        logger.info(f"[IP ENRICHMENT] {len(resolved)} IP çözüldü, güncellenen kayıtlar: {stats}")
+    return stats
+
+
+async def run_enrichment_loop(interval: int):
+    """Celery olmayan ortamlar için process içi zenginleştirme döngüsü"""
+    from backend.database import SessionLocal
+
+    def _run_once():
+        db = SessionLocal()
+        try:
+            return enrich_pending_ip_rows(db)
+        finally:
+            db.close()
+
+    logger.info(f"[IP ENRICHMENT] Process içi döngü başlatıldı ({interval} sn)")
+    while True:
+        try:
+            await asyncio.to_thread(_run_once)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception(f"[IP ENRICHMENT ERROR] {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,488 @@
+"""
+Offline IP -> ISP/Konum Çözümleyici
+Yerel IP aralık veritabanı üzerinden ISP ve konum bilgisini bulur (Yasal delil için).
+
+Veritabanı dosyası sıralı, sabit uzunluklu kayıtlardan oluşur ve memory-map ile
+açılır; arama binary search ile yapılır. Request path'inde hiçbir ağ çağrısı
+yapılmaz. Dosya değiştiğinde (mtime) otomatik olarak yeniden yüklenir.
+
+Dosya formatı:
+    Header : MAGIC (8 byte) | kayıt sayısı (uint32) | info tablosu offset (uint64)
+    Kayıt  : başlangıç IP (16 byte, big-endian) | bitiş IP (16 byte) | info index (uint32)
+    Info   : JSON liste -> [[isp, org, city, region, country], ...]
+
+IPv4 adresleri IPv4-mapped IPv6 (::ffff:a.b.c.d) olarak saklanır; böylece tek
+tabloda byte karşılaştırması ile hem IPv4 hem IPv6 aranabilir.
+
+CSV'den veritabanı oluşturma:
+    python -m backend.utils.ip_resolver kaynak.csv data/ip_ranges.bin
+
+CSV kolonları: start_ip,end_ip,isp,org,city,region,country
+(start_ip/end_ip yerine tek bir "network" kolonu da kullanılabilir, örn: 85.105.0.0/16)
+
+İç içe/çakışan aralıklar yazılırken çakışmasız parçalara bölünür; her adreste en
+dar (en spesifik) aralık geçerlidir, eşit genişlikte CSV'de sonra gelen kazanır.
+"""
+import csv
+import heapq
+import ipaddress
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Request
+
+from backend.config import settings
+from backend.middleware.request_context import get_client_context
+from backend.utils.cache_manager import cache_manager
+from backend.utils.lru_cache import TTLCache, MISSING
+from backend.utils.metrics import register_collector
+from backend.utils.request_timing import timed
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"EMIPDB01"
+HEADER_FORMAT = ">8sIQ"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+ADDRESS_SIZE = 16
+RECORD_SIZE = ADDRESS_SIZE * 2 + 4
+
+UNKNOWN = "Bilinmiyor"
+INFO_FIELDS = ("isp", "org", "city", "region", "country")
+
+
+def ip_to_key(ip: str) -> Optional[bytes]:
+    """IP adresini 16 byte'lık karşılaştırılabilir anahtara çevir (geçersizse None)"""
+    try:
+        address = ipaddress.ip_address(ip.strip())
+    except (ValueError, AttributeError):
+        return None
+    if address.version == 4:
+        address = ipaddress.IPv6Address(b"\x00" * 10 + b"\xff\xff" + address.packed)
+    return address.packed
+
+
+def empty_ip_info(ip: str) -> Dict[str, str]:
+    """Bilinmeyen IP için varsayılan bilgi sözlüğü"""
+    return {
+        "ip": ip,
+        "isp": UNKNOWN,
+        "org": UNKNOWN,
+        "city": UNKNOWN,
+        "country": UNKNOWN,
+        "region": UNKNOWN
+    }
+
+
+class IPRangeDatabase:
+    """Memory-mapped IP aralık tablosu (salt okunur)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        magic, self.record_count, info_offset = struct.unpack_from(HEADER_FORMAT, self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Geçersiz IP veritabanı dosyası: {path}")
+
+        expected_end = HEADER_SIZE + self.record_count * RECORD_SIZE
+        if info_offset < expected_end or info_offset > len(self._mmap):
+            self.close()
+            raise ValueError(f"Bozuk IP veritabanı dosyası: {path}")
+
+        # Info tablosu küçüktür (tekil ISP/konum kombinasyonları), belleğe alınır
+        self._infos: List[Tuple[str, ...]] = [
+            tuple(item) for item in json.loads(self._mmap[info_offset:].decode("utf-8"))
+        ]
+
+    def _start_key(self, index: int) -> bytes:
+        offset = HEADER_SIZE + index * RECORD_SIZE
+        return self._mmap[offset:offset + ADDRESS_SIZE]
+
+    def lookup(self, key: bytes) -> Optional[Tuple[str, ...]]:
+        """Anahtarı içeren aralığın info kaydını döndür (binary search)"""
+        low, high = 0, self.record_count
+        # start <= key olan en sağdaki kaydı bul
+        while low < high:
+            mid = (low + high) // 2
+            if self._start_key(mid) <= key:
+                low = mid + 1
+            else:
+                high = mid
+        index = low - 1
+        if index < 0:
+            return None
+
+        offset = HEADER_SIZE + index * RECORD_SIZE + ADDRESS_SIZE
+        end_key = self._mmap[offset:offset + ADDRESS_SIZE]
+        if key > end_key:
+            return None
+
+        (info_index,) = struct.unpack_from(">I", self._mmap, offset + ADDRESS_SIZE)
+        if info_index >= len(self._infos):
+            return None
+        return self._infos[info_index]
+
+    def close(self):
+        """mmap ve dosyayı kapat"""
+        try:
+            self._mmap.close()
+        finally:
+            self._file.close()
+
+
+class IPResolver:
+    """
+    Offline IP çözümleyici
+
+    Veritabanı dosyası en fazla `refresh_seconds` aralıklarla kontrol edilir;
+    dosya değişmişse (mtime/boyut) yeni sürüm açılır. Dosya yoksa tüm alanlar
+    "Bilinmiyor" döner ve request akışı etkilenmez.
+    """
+
+    def __init__(self, db_path: str, refresh_seconds: int = 300):
+        self.db_path = db_path
+        self.refresh_seconds = refresh_seconds
+        self._db: Optional[IPRangeDatabase] = None
+        self._signature: Optional[Tuple[float, int]] = None
+        self._last_check: Optional[float] = None
+        self._lock = threading.Lock()
+        self._missing_warned = False
+
+    def _file_signature(self) -> Optional[Tuple[float, int]]:
+        try:
+            stat = os.stat(self.db_path)
+        except OSError:
+            return None
+        return (stat.st_mtime, stat.st_size)
+
+    def _maybe_reload(self):
+        """Gerekirse veritabanını (yeniden) yükle"""
+        now = time.monotonic()
+        if self._last_check is not None and now - self._last_check < self.refresh_seconds:
+            return
+
+        with self._lock:
+            if self._last_check is not None and now - self._last_check < self.refresh_seconds:
+                return
+            self._last_check = now
+
+            signature = self._file_signature()
+            if signature is None:
+                if not self._missing_warned:
+                    logger.warning(f"[IP-DB] Veritabanı bulunamadı, ISP bilgisi 'Bilinmiyor' olacak: {self.db_path}")
+                    self._missing_warned = True
+                return
+            if signature == self._signature and self._db is not None:
+                return
+
+            try:
+                new_db = IPRangeDatabase(self.db_path)
+            except Exception as e:
+                logger.error(f"[IP-DB] Veritabanı yüklenemedi: {e}")
+                return
+
+            # Eski tabloyu kapatmıyoruz: eşzamanlı okuyan thread'ler olabilir,
+            # referans kalmayınca GC tarafından kapatılır.
+            self._db = new_db
+            self._signature = signature
+            self._missing_warned = False
+            logger.info(f"[IP-DB] {new_db.record_count} IP aralığı yüklendi: {self.db_path}")
+
+    def lookup(self, ip: str) -> Optional[Dict[str, str]]:
+        """IP için ISP/konum bilgisini döndür, bulunamazsa None"""
+        key = ip_to_key(ip) if ip else None
+        if key is None:
+            return None
+
+        self._maybe_reload()
+        db = self._db
+        if db is None:
+            return None
+
+        info = db.lookup(key)
+        if info is None:
+            return None
+
+        result = {"ip": ip}
+        for field, value in zip(INFO_FIELDS, info):
+            result[field] = value or UNKNOWN
+        return result
+
+    def resolve(self, ip: str) -> Dict[str, str]:
+        """IP için her zaman tam dolu bilgi sözlüğü döndür"""
+        return self.lookup(ip) or empty_ip_info(ip)
+
+
+def _flatten_ranges(records: List[Tuple[bytes, bytes, int]]) -> List[Tuple[bytes, bytes, int]]:
+    """
+    Çakışan aralıkları sıralı, çakışmasız parçalara böl (en dar aralık kazanır)
+
+    lookup() "başlangıcı <= anahtar olan en sağdaki kayıt" ile aradığından
+    dosyadaki kayıtlar çakışmamalıdır.
+    """
+    ranges = sorted(
+        (int.from_bytes(start, "big"), int.from_bytes(end, "big"), order, info)
+        for order, (start, end, info) in enumerate(records)
+    )
+    boundaries = sorted({start for start, _, _, _ in ranges} | {end + 1 for _, end, _, _ in ranges})
+
+    flat: List[List[int]] = []
+    active: List[Tuple[int, int, int, int]] = []  # (genişlik, -sıra, bitiş, info)
+    next_range = 0
+    for position, segment_end in zip(boundaries, boundaries[1:]):
+        while next_range < len(ranges) and ranges[next_range][0] == position:
+            start, end, order, info = ranges[next_range]
+            heapq.heappush(active, (end - start, -order, end, info))
+            next_range += 1
+        while active and active[0][2] < position:
+            heapq.heappop(active)
+        if not active:
+            continue
+        info = active[0][3]
+        if flat and flat[-1][2] == info and flat[-1][1] == position - 1:
+            flat[-1][1] = segment_end - 1
+        else:
+            flat.append([position, segment_end - 1, info])
+
+    return [
+        (start.to_bytes(ADDRESS_SIZE, "big"), end.to_bytes(ADDRESS_SIZE, "big"), info)
+        for start, end, info in flat
+    ]
+
+
+def build_ip_database(csv_path: str, output_path: str) -> int:
+    """
+    CSV kaynağından ikili IP veritabanı oluştur
+
+    Dosya geçici bir isimle yazılıp atomik olarak yerine taşınır; çalışan
+    process'ler bir sonraki kontrol aralığında yeni dosyayı açar.
+
+    Returns:
+        int: Yazılan (çakışmasız) aralık sayısı
+    """
+    records = []
+    info_index: Dict[Tuple[str, ...], int] = {}
+    infos: List[Tuple[str, ...]] = []
+
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if row.get("network"):
+                network = ipaddress.ip_network(row["network"].strip(), strict=False)
+                start_key = ip_to_key(str(network.network_address))
+                end_key = ip_to_key(str(network.broadcast_address))
+            else:
+                start_key = ip_to_key(row.get("start_ip", ""))
+                end_key = ip_to_key(row.get("end_ip", ""))
+
+            if start_key is None or end_key is None or start_key > end_key:
+                continue
+
+            info = tuple((row.get(field) or "").strip() for field in INFO_FIELDS)
+            if info not in info_index:
+                info_index[info] = len(infos)
+                infos.append(info)
+            records.append((start_key, end_key, info_index[info]))
+
+    records = _flatten_ranges(records)
+
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    info_offset = HEADER_SIZE + len(records) * RECORD_SIZE
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(struct.pack(HEADER_FORMAT, MAGIC, len(records), info_offset))
+        for start_key, end_key, index in records:
+            f.write(start_key)
+            f.write(end_key)
+            f.write(struct.pack(">I", index))
+        f.write(json.dumps(infos, ensure_ascii=False).encode("utf-8"))
+    os.replace(tmp_path, output_path)
+
+    return len(records)
+
+
+def get_real_ip(request: Request) -> str:
+    """Request'ten client IP adresini al (güvenilen proxy header'ları dahil)"""
+    return get_client_context(request).ip
+
+
+class IPInfoCache:
+    """
+    ISP zenginleştirme sonuçları için iki katmanlı cache
+
+    L1: Process içi LRU + TTL (boyutu sınırlı)
+    L2: Redis (CacheManager üzerinden, tüm worker'lar arasında paylaşılır)
+
+    Bulunamayan IP'ler de (negatif sonuç) daha kısa bir TTL ile hatırlanır;
+    böylece aynı bilinmeyen IP için tekrar tekrar arama yapılmaz.
+    """
+
+    KEY_PREFIX = "cache:ip_info"
+    NEGATIVE_MARKER = {"__negative__": True}
+
+    def __init__(
+        self,
+        resolver: IPResolver,
+        maxsize: int = 10000,
+        ttl: int = 86400,
+        negative_ttl: int = 600
+    ):
+        self.resolver = resolver
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+
+        # İstatistikler
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def _key(self, ip: str) -> str:
+        return f"{self.KEY_PREFIX}:{ip}"
+
+    @timed("isp")
+    def resolve(self, ip: str) -> Dict[str, str]:
+        """IP bilgisini cache üzerinden çöz (her zaman tam dolu sözlük döner)"""
+        if not ip or ip_to_key(ip) is None:
+            return empty_ip_info(ip)
+
+        # L1: process içi
+        cached = self._local.get(ip)
+        if cached is not MISSING:
+            self.local_hits += 1
+            if cached is None:
+                self.negative_hits += 1
+                return empty_ip_info(ip)
+            return dict(cached)
+
+        # L2: Redis
+        cached = cache_manager.get(self._key(ip))
+        if cached is not None:
+            self.redis_hits += 1
+            if cached == self.NEGATIVE_MARKER:
+                self.negative_hits += 1
+                self._local.set(ip, None, self.negative_ttl)
+                return empty_ip_info(ip)
+            self._local.set(ip, cached)
+            return dict(cached)
+
+        # Cache miss: veritabanından çöz
+        self.misses += 1
+        info = self.resolver.lookup(ip)
+        if info is None:
+            self._local.set(ip, None, self.negative_ttl)
+            cache_manager.set(self._key(ip), self.NEGATIVE_MARKER, self.negative_ttl)
+            return empty_ip_info(ip)
+
+        self._local.set(ip, info)
+        cache_manager.set(self._key(ip), info, self.ttl)
+        return dict(info)
+
+    def invalidate(self, ip: str):
+        """Tek bir IP'nin cache kaydını sil"""
+        self._local.delete(ip)
+        cache_manager.delete(self._key(ip))
+
+    def clear_local(self):
+        """Process içi cache'i temizle (örn. veritabanı güncellemesi sonrası)"""
+        self._local.clear()
+
+    def reset_stats(self):
+        """Sayaçları sıfırla (cache içeriğine dokunmaz)"""
+        self.local_hits = self.redis_hits = self.negative_hits = self.misses = 0
+
+    def get_stats(self) -> dict:
+        """Hit/miss sayaçları (/api/admin/metrics/cache ve Prometheus exporter)"""
+        total = self.local_hits + self.redis_hits + self.misses
+        hits = self.local_hits + self.redis_hits
+        return {
+            "lookups": total,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": round((hits / total) * 100, 2) if total else 0.0,
+            "local_cache": self._local.get_stats()
+        }
+
+    def prometheus_lines(self) -> List[str]:
+        stats = self.get_stats()
+        lines = [
+            "# HELP ip_info_cache_hits_total ISP cache hit sayısı (tier: local/redis)",
+            "# TYPE ip_info_cache_hits_total counter",
+            f'ip_info_cache_hits_total{{tier="local"}} {stats["local_hits"]}',
+            f'ip_info_cache_hits_total{{tier="redis"}} {stats["redis_hits"]}',
+        ]
+        for name, help_text, value in (
+            ("ip_info_cache_negative_hits_total", "Bulunamayan IP için negatif cache hit'i", stats["negative_hits"]),
+            ("ip_info_cache_misses_total", "IP veritabanına düşen arama sayısı", stats["misses"]),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter", f"{name} {value}"]
+        lines += [
+            "# HELP ip_info_local_cache_size Process içi ISP cache kayıt sayısı",
+            "# TYPE ip_info_local_cache_size gauge",
+            f'ip_info_local_cache_size {stats["local_cache"]["size"]}',
+        ]
+        return lines
+
+
+def pending_ip_info(ip: str) -> Dict[str, Optional[str]]:
+    """ISP alanları henüz çözülmemiş (arka planda doldurulacak) bilgi sözlüğü"""
+    return {"ip": ip, "isp": None, "org": None, "city": None, "country": None, "region": None}
+
+
+def get_real_ip_with_isp(request: Request) -> dict:
+    """Gerçek IP adresini ve ISP bilgisini al (Yasal delil için) - request başına bir kez çözülür"""
+    return get_client_context(request).ip_info
+
+
+def get_client_ip_info(request: Request) -> dict:
+    """
+    Log/delil kayıtları için IP bilgisi
+
+    IP_ENRICHMENT_MODE=deferred (varsayılan): Sadece IP döner, ISP alanları None
+    kalır ve arka plan görevi (ip_enrichment) tarafından toplu olarak doldurulur.
+    IP_ENRICHMENT_MODE=inline: ISP bilgisi request sırasında çözülür.
+    """
+    return get_client_context(request).evidence_ip_info
+
+
+# Global resolver ve cache instance'ları
+ip_resolver = IPResolver(settings.IP_DB_PATH, settings.IP_DB_REFRESH_SECONDS)
+ip_info_cache = IPInfoCache(
+    ip_resolver,
+    maxsize=settings.IP_INFO_CACHE_SIZE,
+    ttl=settings.CACHE_TTL_IP_INFO,
+    negative_ttl=settings.CACHE_TTL_IP_INFO_NEGATIVE
+)
+
+
+@register_collector
+def ip_info_metrics_collector():
+    """ISP cache hit/miss sayaçları (Prometheus exporter)"""
+    return ip_info_cache.prometheus_lines()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Kullanım: python -m backend.utils.ip_resolver <kaynak.csv> <cikti.bin>")
+        sys.exit(1)
+
+    count = build_ip_database(sys.argv[1], sys.argv[2])
+    print(f"[IP-DB] {count} IP aralığı yazıldı: {sys.argv[2]}")
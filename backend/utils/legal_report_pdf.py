@@ -12,11 +12,14 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from datetime import datetime
 import hashlib
+import logging
 import os
 from io import BytesIO
 import pytz
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 # Türkiye saat dilimi
 TURKEY_TZ = pytz.timezone('Europe/Istanbul')
 
@@ -53,18 +56,18 @@ def register_turkish_fonts():
         
         if os.path.exists(arial_path):
             pdfmetrics.registerFont(TTFont('TurkceArial', arial_path, 'UTF-8'))
-            print(f"[YASAL PDF] TurkceArial font yüklendi: {arial_path}")
+            logger.info(f"[YASAL PDF] TurkceArial font yüklendi: {arial_path}")
         if os.path.exists(arial_bold_path):
             pdfmetrics.registerFont(TTFont('TurkceArial-Bold', arial_bold_path, 'UTF-8'))
-            print(f"[YASAL PDF] TurkceArial-Bold font yüklendi: {arial_bold_path}")
+            logger.info(f"[YASAL PDF] TurkceArial-Bold font yüklendi: {arial_bold_path}")
         if os.path.exists(arial_italic_path):
             pdfmetrics.registerFont(TTFont('TurkceArial-Italic', arial_italic_path, 'UTF-8'))
-            print(f"[YASAL PDF] TurkceArial-Italic font yüklendi: {arial_italic_path}")
+            logger.info(f"[YASAL PDF] TurkceArial-Italic font yüklendi: {arial_italic_path}")
         
         FONTS_REGISTERED = True
         return True
     except Exception as e:
-        print(f"[YASAL PDF] Font yükleme uyarısı: {e}")
+        logger.warning(f"[YASAL PDF] Font yükleme uyarısı: {e}")
         return False
 
 # Fontu hemen kaydet
@@ -170,11 +173,11 @@ class LegalReportPDFGenerator:
                 logo.hAlign = 'CENTER'
                 story.append(logo)
                 story.append(Spacer(1, 0.3*cm))
-                print(f"[YASAL PDF] Logo yuklendi: {logo_path}")
+                logger.debug(f"[YASAL PDF] Logo yuklendi: {logo_path}")
             else:
-                print(f"[YASAL PDF] Logo bulunamadi: {logo_path}")
+                logger.warning(f"[YASAL PDF] Logo bulunamadi: {logo_path}")
         except Exception as e:
-            print(f"[YASAL PDF] Logo yukleme hatasi: {e}")
+            logger.warning(f"[YASAL PDF] Logo yukleme hatasi: {e}")
         
         # ŞİRKET ADI (metadata'dan)
         company_style = ParagraphStyle(
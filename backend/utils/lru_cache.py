@@ -0,0 +1,105 @@
+"""
+In-Process LRU + TTL Cache
+Process içi, boyutu sınırlı ve süre aşımlı (TTL) önbellek
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+import threading
+import time
+
+# Cache'te olmayan anahtar için sentinel (None değerleri de cache'lenebilsin diye)
+MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU + TTL cache
+
+    Kullanım:
+        cache = TTLCache(maxsize=1000, ttl=300)
+        cache.set("key", value)
+        value = cache.get("key")  # yoksa MISSING
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300,
+                 on_evict: Optional[Callable[[Hashable], None]] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # Kapasite nedeniyle atılan anahtarlar için (lock dışında çağrılır)
+        self.on_evict = on_evict
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # İstatistikler
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """Değeri al (yoksa veya süresi dolmuşsa default)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Değeri yaz (ttl verilmezse varsayılan TTL)"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        evicted = []
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                evicted.append(self._data.popitem(last=False)[0])
+                self.evictions += 1
+        if self.on_evict is not None:
+            for evicted_key in evicted:
+                self.on_evict(evicted_key)
+
+    def delete(self, key: Hashable) -> bool:
+        """Anahtarı sil"""
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def delete_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """predicate(key) True dönen anahtarları sil, silinen sayısını döndür"""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self):
+        """Tüm kayıtları sil"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_stats(self) -> dict:
+        """Cache istatistikleri"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round((self.hits / total) * 100, 2) if total else 0.0
+        }
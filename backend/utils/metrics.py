@@ -0,0 +1,146 @@
+"""
+Basit Metrik Yardımcıları
+Process içi sayaç ve histogram (admin metrik endpoint'leri için)
+
+Exporter: Modüller register_collector() ile Prometheus text formatında satır
+üreten fonksiyon kaydeder; render_prometheus() hepsini birleştirir.
+"""
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional, Sequence
+import bisect
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Varsayılan süre bucket'ları (milisaniye)
+DEFAULT_LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: Optional[Dict[str, str]]) -> str:
+    """{"prefix": "x"} -> '{prefix="x"}' (Prometheus label formatı)"""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+class Histogram:
+    """
+    Sabit bucket'lı, thread-safe histogram
+
+    Her gözlem değerinden büyük veya eşit ilk bucket'a sayılır; son bucket
+    (+Inf) tüm büyük değerleri toplar. Prometheus formatına çevrilirken
+    bucket sayıları kümülatif hale getirilir.
+
+    thread_safe=False: sadece tek thread'den (event loop) güncellenen
+    histogramlar için kilitsiz çalışır.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS_MS, thread_safe: bool = True):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._max = 0.0
+        self._lock = threading.Lock() if thread_safe else nullcontext()
+
+    def observe(self, value: float):
+        """Bir gözlem ekle"""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+            if value > self._max:
+                self._max = value
+
+    def reset(self):
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)
+            self._sum = 0.0
+            self._count = 0
+            self._max = 0.0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Yaklaşık yüzdelik (bucket üst sınırı). Gözlem yoksa None"""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+            maximum = self._max
+        if not total:
+            return None
+
+        rank = q / 100.0 * total
+        running = 0
+        for index, count in enumerate(counts):
+            running += count
+            if running >= rank and count:
+                return self.buckets[index] if index < len(self.buckets) else maximum
+        return maximum
+
+    def snapshot(self) -> Dict:
+        """JSON'a çevrilebilir özet"""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+            total_sum = self._sum
+            maximum = self._max
+
+        labels = [str(b) for b in self.buckets] + ["+Inf"]
+        return {
+            "count": total,
+            "sum": round(total_sum, 3),
+            "avg": round(total_sum / total, 3) if total else 0.0,
+            "max": round(maximum, 3),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": dict(zip(labels, counts)),
+        }
+
+    def prometheus_lines(self, name: str, labels: Optional[Dict[str, str]] = None) -> List[str]:
+        """Prometheus histogram satırları (kümülatif bucket'lar, _sum, _count)"""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+            total_sum = self._sum
+
+        labels = dict(labels or {})
+        lines = []
+        running = 0
+        for bound, count in zip([str(b) for b in self.buckets] + ["+Inf"], counts):
+            running += count
+            lines.append(f"{name}_bucket{format_labels({**labels, 'le': bound})} {running}")
+        lines.append(f"{name}_sum{format_labels(labels)} {total_sum}")
+        lines.append(f"{name}_count{format_labels(labels)} {total}")
+        return lines
+
+
+# Prometheus exporter: satır üreten collector fonksiyonları
+_collectors: List[Callable[[], List[str]]] = []
+
+
+def register_collector(collector: Callable[[], List[str]]):
+    """Exporter'a collector ekle (aynı fonksiyon bir kez eklenir)"""
+    if collector not in _collectors:
+        _collectors.append(collector)
+    return collector
+
+
+def render_prometheus() -> str:
+    """Kayıtlı collector'ların çıktısı (text exposition format)"""
+    lines = []
+    for collector in _collectors:
+        try:
+            lines.extend(collector())
+        except Exception as e:
+            logger.exception(f"[METRICS] Collector hatası ({getattr(collector, '__name__', collector)}): {e}")
+    return "\n".join(lines) + "\n"
@@ -2,10 +2,17 @@
 PDF İzin Yönetimi
 pikepdf kullanarak PDF'lere güvenlik ve izinler ekler
 """
+import logging
+
 import pikepdf
 from pathlib import Path
 
+from backend.utils.request_timing import timed
+
+logger = logging.getLogger(__name__)
+
 
+@timed("pdf_permissions")
 def apply_pdf_permissions(pdf_path: str) -> str:
     """
     PDF'e izinler uygula
@@ -28,7 +35,7 @@ def apply_pdf_permissions(pdf_path: str) -> str:
         İşlenmiş PDF dosyası yolu
     """
     try:
-        print(f"[PDF IZINLER] PDF'e izinler ekleniyor: {pdf_path}")
+        logger.debug(f"[PDF IZINLER] PDF'e izinler ekleniyor: {pdf_path}")
         
         # PDF'i aç
         with pikepdf.open(pdf_path, allow_overwriting_input=True) as pdf:
@@ -60,19 +67,13 @@ def apply_pdf_permissions(pdf_path: str) -> str:
                 )
             )
         
-        print(f"[PDF IZINLER] [OK] Izinler basariyla uygulandi (256-bit AES)")
-        print("  [+] Yazdirma: IZIN VERILDI")
-        print("  [+] Dijital Imza: IZIN VERILDI")
-        print("  [-] Icerik Kopyalama: ENGELLENDI")
-        print("  [-] Sayfa Degistirme: ENGELLENDI")
-        print("  [-] Form Doldurma: ENGELLENDI")
-        print("  [-] Belge Duzenleme: ENGELLENDI")
-        print("  [*] Sifreleme: 256-bit AES (R=6 - En Guclu)")
+        # Yazdırma ve dijital imza serbest; kopyalama, sayfa/form/belge değişikliği engelli
+        logger.debug(f"[PDF IZINLER] [OK] Izinler uygulandi (256-bit AES, R=6): {pdf_path}")
         
         return pdf_path
         
     except Exception as e:
-        print(f"[PDF IZINLER] [!] Izin ekleme hatasi: {e}")
+        logger.error(f"[PDF IZINLER] [!] Izin ekleme hatasi: {e}")
         # Hata olursa orijinal PDF'i dondur
         return pdf_path
 
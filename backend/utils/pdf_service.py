@@ -12,12 +12,16 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from datetime import datetime
 import hashlib
+import logging
 import os
 from io import BytesIO
 import qrcode
 from PIL import Image as PILImage
 import pytz
 from backend.models import UserRole
+from backend.utils.request_timing import timed
+
+logger = logging.getLogger(__name__)
 
 # Türkiye saat dilimi
 TURKEY_TZ = pytz.timezone('Europe/Istanbul')
@@ -55,18 +59,18 @@ def register_turkish_fonts():
         
         if os.path.exists(arial_path):
             pdfmetrics.registerFont(TTFont('TurkceArial', arial_path, 'UTF-8'))
-            print(f"[PDF] TurkceArial font yüklendi: {arial_path}")
+            logger.info(f"[PDF] TurkceArial font yüklendi: {arial_path}")
         if os.path.exists(arial_bold_path):
             pdfmetrics.registerFont(TTFont('TurkceArial-Bold', arial_bold_path, 'UTF-8'))
-            print(f"[PDF] TurkceArial-Bold font yüklendi: {arial_bold_path}")
+            logger.info(f"[PDF] TurkceArial-Bold font yüklendi: {arial_bold_path}")
         if os.path.exists(arial_italic_path):
             pdfmetrics.registerFont(TTFont('TurkceArial-Italic', arial_italic_path, 'UTF-8'))
-            print(f"[PDF] TurkceArial-Italic font yüklendi: {arial_italic_path}")
+            logger.info(f"[PDF] TurkceArial-Italic font yüklendi: {arial_italic_path}")
         
         FONTS_REGISTERED = True
         return True
     except Exception as e:
-        print(f"[PDF] Font yükleme uyarısı: {e}")
+        logger.warning(f"[PDF] Font yükleme uyarısı: {e}")
         return False
 
 # Fontu hemen kaydet
@@ -118,10 +122,10 @@ class MutabakatPDFGenerator:
             qr_img.save(qr_buffer, format='PNG')
             qr_buffer.seek(0)
             
-            print(f"[PDF] QR kod olusturuldu: {verify_url[:70]}...")
+            logger.debug(f"[PDF] QR kod olusturuldu: {verify_url[:70]}...")
             return qr_buffer
         except Exception as e:
-            print(f"[PDF] QR kod olusturulamadi: {e}")
+            logger.warning(f"[PDF] QR kod olusturulamadi: {e}")
             return None
         
     def _create_styles(self):
@@ -224,6 +228,7 @@ class MutabakatPDFGenerator:
         
         return hashlib.sha256(data_string.encode()).hexdigest()
     
+    @timed("pdf_render")
     def generate_mutabakat_pdf(self, mutabakat_data, action_data):
         """
         Mutabakat PDF'i oluştur
@@ -281,8 +286,7 @@ class MutabakatPDFGenerator:
             # Default Dino logosu
             logo_path = os.path.join(project_root, "frontend", "public", "dino-logo.png")
         
-        print(f"[PDF] Logo aranıyor: {logo_path}")
-        print(f"[PDF] Logo var mı? {os.path.exists(logo_path)}")
+        logger.debug(f"[PDF] Logo aranıyor: {logo_path} (var mı? {os.path.exists(logo_path)})")
         
         # Logo ve QR kod için header tablosu
         header_elements = []
@@ -292,9 +296,9 @@ class MutabakatPDFGenerator:
             try:
                 logo = Image(logo_path, width=3.5*cm, height=3.5*cm, kind='proportional')
                 header_elements.append(logo)
-                print(f"[PDF] [OK] Logo eklendi!")
+                logger.debug(f"[PDF] [OK] Logo eklendi!")
             except Exception as e:
-                print(f"[PDF] [!] Logo yükleme hatası: {e}")
+                logger.warning(f"[PDF] [!] Logo yükleme hatası: {e}")
                 # Logo yerine text-based header (şirket ismiyle)
                 company_name = mutabakat_data.get('company_info', {}).get('full_name', 'DINO GIDA')
                 logo_style = ParagraphStyle(
@@ -308,7 +312,7 @@ class MutabakatPDFGenerator:
                 logo_text = Paragraph(ensure_unicode(f"<b>{company_name}<br/>E-MUTABAKAT</b>"), logo_style)
                 header_elements.append(logo_text)
         else:
-            print(f"[PDF] [!] Logo bulunamadı, text logo kullaniliyor")
+            logger.warning(f"[PDF] [!] Logo bulunamadı, text logo kullaniliyor")
             # Logo yerine text-based header (şirket ismiyle)
             company_name = mutabakat_data.get('company_info', {}).get('full_name', 'DINO GIDA')
             logo_style = ParagraphStyle(
@@ -332,9 +336,9 @@ class MutabakatPDFGenerator:
             try:
                 qr_image = Image(qr_buffer, width=3*cm, height=3*cm)
                 header_elements.append(qr_image)
-                print(f"[PDF] [OK] QR kod eklendi!")
+                logger.debug(f"[PDF] [OK] QR kod eklendi!")
             except Exception as e:
-                print(f"[PDF] [!] QR kod yükleme hatası: {e}")
+                logger.warning(f"[PDF] [!] QR kod yükleme hatası: {e}")
                 header_elements.append(Paragraph("", styles['Normal']))
         else:
             header_elements.append(Paragraph("", styles['Normal']))
@@ -9,12 +9,17 @@ from pyhanko.sign import fields
 from pyhanko.sign.fields import MDPPerm
 from pyhanko.sign.general import SigningError
 from datetime import datetime
+import logging
 import os
 from pathlib import Path
-import traceback
 from typing import Optional
 from concurrent.futures import ThreadPoolExecutor
 
+from backend.utils.request_timing import timed
+
+logger = logging.getLogger(__name__)
+
+
 class PDFSigner:
     """PDF dijital imza yöneticisi (Multi-Company)"""
     
@@ -29,7 +34,7 @@ class PDFSigner:
         # Şirket bazlı signer cache
         self._signer_cache = {}
         
-        print(f"[DIJITAL IMZA] Sertifika dizini: {self.cert_dir}")
+        logger.debug(f"[DIJITAL IMZA] Sertifika dizini: {self.cert_dir}")
     
     def _load_certificate(self, cert_path: str, cert_password: Optional[str] = None):
         """
@@ -52,7 +57,7 @@ class PDFSigner:
         # Yol normalizasyonu: ters eğik çizgileri düzelt, sadece dosya adı ise 'certificates/' öne ekle
         norm_path_str = (cert_path or "").replace("\\", "/").strip()
         if not norm_path_str:
-            print("[DIJITAL IMZA] Sertifika yolu bos")
+            logger.warning("[DIJITAL IMZA] Sertifika yolu bos")
             return None
         # Absolute değilse ve 'certificates/' ile başlamıyorsa öne ekle
         if not Path(norm_path_str).is_absolute() and not norm_path_str.startswith("certificates/"):
@@ -68,7 +73,7 @@ class PDFSigner:
                 full_path = candidate
         
         if not full_path.exists():
-            print(f"[DIJITAL IMZA] Sertifika bulunamadi: {full_path}")
+            logger.warning(f"[DIJITAL IMZA] Sertifika bulunamadi: {full_path}")
             return None
         
         try:
@@ -88,12 +93,11 @@ class PDFSigner:
             # Cache'e kaydet
             self._signer_cache[cache_key] = signer
             
-            print(f"[DIJITAL IMZA] [OK] Sertifika yuklendi: {full_path.name}")
+            logger.info(f"[DIJITAL IMZA] [OK] Sertifika yuklendi: {full_path.name}")
             return signer
             
         except Exception as e:
-            print(f"[DIJITAL IMZA] [!] Sertifika yuklenemedi ({full_path.name}): {e}")
-            traceback.print_exc()
+            logger.exception(f"[DIJITAL IMZA] [!] Sertifika yuklenemedi ({full_path.name}): {e}")
             return None
     
     def _sign_pdf_sync(
@@ -137,6 +141,7 @@ class PDFSigner:
         except Exception as e:
             raise e
     
+    @timed("pdf_sign")
     def sign_pdf(
         self, 
         input_pdf_path: str, 
@@ -162,7 +167,7 @@ class PDFSigner:
         signer = self._load_certificate(cert_path, cert_password)
         
         if not signer:
-            print("[DIJITAL IMZA] Sertifika yuklu degil, imza atlanildi")
+            logger.warning("[DIJITAL IMZA] Sertifika yuklu degil, imza atlanildi")
             return input_pdf_path
         
         if output_pdf_path is None:
@@ -170,7 +175,7 @@ class PDFSigner:
             output_pdf_path = input_pdf_path
         
         try:
-            print(f"[DIJITAL IMZA] PDF imzalaniyor: {input_pdf_path} ({company_name})")
+            logger.debug(f"[DIJITAL IMZA] PDF imzalaniyor: {input_pdf_path} ({company_name})")
             
             # ThreadPoolExecutor ile başka bir thread'de çalıştır
             # Bu sayede mevcut event loop'u bloklamadan asyncio.run() çağrısı yapabiliriz
@@ -184,12 +189,11 @@ class PDFSigner:
                 )
                 output_path = future.result(timeout=30)  # 30 saniye timeout
             
-            print(f"[DIJITAL IMZA] [OK] PDF basariyla imzalandi: {output_path}")
+            logger.info(f"[DIJITAL IMZA] [OK] PDF basariyla imzalandi: {output_path}")
             return output_path
             
         except Exception as e:
-            print(f"[DIJITAL IMZA] [!] Imzalama hatasi: {e}")
-            traceback.print_exc()
+            logger.exception(f"[DIJITAL IMZA] [!] Imzalama hatasi: {e}")
             # Hata durumunda orijinal dosyayı döndür
             return input_pdf_path
     
@@ -0,0 +1,150 @@
+"""
+Request Bazlı SQL Sorgu Sayacı ve N+1 Tespiti
+
+Tüm engine'lere (sync ve async) before/after_cursor_execute event'leri ile
+bağlanır; aktif request'in sorgu sayısı ve toplam DB süresi tutulur.
+
+- DEBUG modunda response'a X-DB-Queries / X-DB-Time header'ları eklenir
+- Aynı sorgu şekli bir request içinde QUERY_REPEAT_THRESHOLD kez ve daha fazla
+  çalışırsa [N+1] log satırı yazılır
+- Testler count_queries() veya header'lar ile endpoint sorgu bütçesi doğrulayabilir
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from backend.config import settings
+from backend.utils.request_timing import current_timings, record_span
+
+logger = logging.getLogger(__name__)
+
+_current_query_stats: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = r"(?:\?|%\(\w+\)s|:\w+)"
+_PARAM_LIST = re.compile(rf"\(\s*{_PARAM}(?:\s*,\s*{_PARAM})+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """Sorgunun şeklini çıkar (literal'ler ve IN listeleri tek parametreye indirgenir)"""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PARAM_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """Bir request (veya count_queries bloğu) boyunca çalışan sorgular"""
+
+    def __init__(self, route: Optional[str] = None):
+        self.route = route
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, duration_ms: float):
+        shape = normalize_statement(statement)
+        with self._lock:
+            self.count += 1
+            self.total_ms += duration_ms
+            self.shapes[shape] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """threshold ve üzeri tekrar eden sorgu şekilleri (N+1 adayı)"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_query_stats.get()
+
+
+@contextmanager
+def count_queries():
+    """
+    Blok içinde çalışan sorguları say
+
+    Örnek:
+        with count_queries() as stats:
+            service_call(db)
+        assert stats.count <= 3
+    """
+    stats = QueryStats()
+    token = _current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_query_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and (_current_query_stats.get() is not None or current_timings() is not None):
+        context._query_counter_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_query_counter_start", None)
+    if start is None:
+        return
+    duration_ms = (time.perf_counter() - start) * 1000
+    stats = _current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, duration_ms)
+    record_span("db", duration_ms)
+
+
+_installed = False
+
+
+def install_query_counter():
+    """Sayaçları tüm Engine'lere bağla (bir kez)"""
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _installed = True
+
+
+def log_repeated_queries(method: str, path: str, stats: QueryStats):
+    for shape, count in stats.repeated(settings.QUERY_REPEAT_THRESHOLD):
+        logger.warning(f"[N+1] {method} {path}: {count}x {shape[:200]}")
+
+
+class QueryCounterMiddleware:
+    """Pure ASGI middleware - request başına sorgu sayacı açar"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(route=f"{scope.get('method', '')} {scope.get('path', '')}")
+        token = _current_query_stats.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and settings.DEBUG:
+                headers = MutableHeaders(scope=message)
+                headers.append("X-DB-Queries", str(stats.count))
+                headers.append("X-DB-Time", f"{stats.total_ms:.1f}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current_query_stats.reset(token)
+            log_repeated_queries(scope.get("method", ""), scope.get("path", ""), stats)
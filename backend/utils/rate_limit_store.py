@@ -0,0 +1,202 @@
+"""
+Dağıtık Rate Limit Sayaçları
+
+Sayaçlar Redis'te tutulur; tüm worker'lar aynı limiti paylaşır ve restart
+sayaçları sıfırlamaz. Algoritma sliding window counter'dır: önceki pencerenin
+sayısı, geçen süre oranında azaltılarak mevcut pencereye eklenir
+(pencere sınırında 2x patlama olmaz, key başına sadece iki sayaç tutulur).
+
+Kontrol + artırma tek bir Lua script'i ile atomik yapılır (tek round trip,
+EVALSHA). Zaman Redis TIME'dan alınır; worker saatleri arasındaki fark
+sonucu etkilemez.
+
+Redis yoksa / erişilemezse (circuit breaker açık) aynı algoritma process
+içinde uygulanır: limitler worker başına geçerli olur ama koruma kalkmaz.
+"""
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from typing import Dict, List, NamedTuple, Optional
+
+from backend.config import settings
+from backend.utils.cache_manager import (
+    REDIS_ASYNC_AVAILABLE, REDIS_CONNECTION_ERRORS, redis_connection_kwargs
+)
+from backend.utils.circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+if REDIS_ASYNC_AVAILABLE:
+    import redis.asyncio as redis_async
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float  # Mevcut pencerenin bitmesine kalan süre (saniye)
+    backend: str  # "redis" veya "local"
+
+
+# KEYS[1]: sayaç hash'i (alan = pencere no)   ARGV: limit, pencere (ms)
+# Dönüş: {izin (1/0), kalan, pencere sonuna ms}
+SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local index = math.floor(now_ms / window)
+local current = tonumber(redis.call('HGET', KEYS[1], index) or '0')
+local previous = tonumber(redis.call('HGET', KEYS[1], index - 1) or '0')
+local estimated = previous * (window - (now_ms - index * window)) / window + current
+local reset_ms = (index + 1) * window - now_ms
+if estimated + 1 > limit then
+    return {0, 0, reset_ms}
+end
+redis.call('HINCRBY', KEYS[1], index, 1)
+redis.call('HDEL', KEYS[1], index - 2)
+redis.call('PEXPIRE', KEYS[1], window * 2)
+return {1, math.floor(limit - estimated - 1), reset_ms}
+"""
+
+
+class LocalRateLimitStore:
+    """
+    Process içi sliding window counter (Redis fallback'i)
+
+    Sayaçlar key hash'ine göre shard'lara bölünür; her shard'ın kilidi sadece
+    sayaç güncellemesi süresince (await yok) tutulur. Handler hiçbir kilidin
+    içinde çalışmaz, farklı key'ler birbirini beklemez.
+    """
+
+    def __init__(self, shards: int = 16):
+        # Shard: key -> [pencere no, önceki pencere sayısı, mevcut pencere sayısı, pencere (sn)]
+        self._shards: List[Dict[str, List[float]]] = [{} for _ in range(max(1, shards))]
+        self._locks = [threading.Lock() for _ in self._shards]
+
+    def hit(self, key: str, limit: int, window_seconds: float) -> RateLimitResult:
+        now = time.time()
+        index = int(now // window_seconds)
+        elapsed = now - index * window_seconds
+        shard_index = hash(key) % len(self._shards)
+        counters = self._shards[shard_index]
+        with self._locks[shard_index]:
+            entry = counters.get(key)
+            if entry is None or entry[0] < index - 1:
+                entry = [index, 0, 0, window_seconds]
+            elif entry[0] == index - 1:
+                entry = [index, entry[2], 0, window_seconds]
+            counters[key] = entry
+
+            estimated = entry[1] * (window_seconds - elapsed) / window_seconds + entry[2]
+            if estimated + 1 > limit:
+                return RateLimitResult(False, limit, 0, window_seconds - elapsed, "local")
+            entry[2] += 1
+        return RateLimitResult(True, limit, int(limit - estimated - 1), window_seconds - elapsed, "local")
+
+    def cleanup(self) -> int:
+        """Artık sonucu etkilemeyen (son iki pencerede kullanılmamış) sayaçları sil"""
+        now = time.time()
+        removed = 0
+        for counters, lock in zip(self._shards, self._locks):
+            with lock:
+                stale = [key for key, entry in counters.items() if (entry[0] + 2) * entry[3] <= now]
+                for key in stale:
+                    del counters[key]
+            removed += len(stale)
+        return removed
+
+    def clear(self):
+        for counters, lock in zip(self._shards, self._locks):
+            with lock:
+                counters.clear()
+
+    def __len__(self):
+        return sum(len(counters) for counters in self._shards)
+
+
+class RateLimitStore:
+    """Redis (Lua) sayaçları + yerel fallback"""
+
+    def __init__(self, redis_client=None, enabled: Optional[bool] = None, prefix: Optional[str] = None):
+        """
+        Args:
+            redis_client: redis.asyncio client'ı (test/özel kurulum); verilmezse
+                          her event loop için ayarlardan bir client açılır
+            enabled: False ise sadece yerel sayaçlar kullanılır
+        """
+        if enabled is None:
+            enabled = settings.RATE_LIMIT_BACKEND == "redis" and REDIS_ASYNC_AVAILABLE
+        self.enabled = enabled or redis_client is not None
+        self.prefix = prefix or settings.RATE_LIMIT_REDIS_PREFIX
+        self.local = LocalRateLimitStore(settings.RATE_LIMIT_LOCAL_SHARDS)
+        self.breaker = CircuitBreaker(
+            "redis-rate-limit",
+            failure_threshold=settings.REDIS_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.REDIS_BREAKER_RESET_SECONDS
+        )
+        self.redis_checks = 0
+        self.local_checks = 0
+        self.rejected = 0
+        self._redis_client = redis_client
+        self._clients = weakref.WeakKeyDictionary()
+        self._scripts = weakref.WeakKeyDictionary()
+
+    def _get_script(self):
+        """Çalışan event loop'a ait client'a kayıtlı script (EVALSHA, yoksa EVAL)"""
+        if self._redis_client is not None:
+            client = self._redis_client
+        else:
+            loop = asyncio.get_running_loop()
+            client = self._clients.get(loop)
+            if client is None:
+                client = redis_async.Redis(
+                    connection_pool=redis_async.ConnectionPool(**redis_connection_kwargs())
+                )
+                self._clients[loop] = client
+        script = self._scripts.get(client)
+        if script is None:
+            script = client.register_script(SLIDING_WINDOW_SCRIPT)
+            self._scripts[client] = script
+        return script
+
+    async def hit(self, key: str, limit: int, window_seconds: float) -> RateLimitResult:
+        """İsteği say ve limit içinde mi döndür"""
+        result = None
+        if self.enabled and self.breaker.allow():
+            try:
+                allowed, remaining, reset_ms = await self._get_script()(
+                    keys=[f"{self.prefix}:{key}"], args=[limit, int(window_seconds * 1000)]
+                )
+                self.breaker.record_success()
+                self.redis_checks += 1
+                result = RateLimitResult(bool(allowed), limit, int(remaining), int(reset_ms) / 1000, "redis")
+            except REDIS_CONNECTION_ERRORS:
+                self.breaker.record_failure()
+            except Exception as e:
+                logger.warning(f"[RATE_LIMIT] Redis hatası, yerel sayaç kullanılıyor: {e}")
+
+        if result is None:
+            self.local_checks += 1
+            result = self.local.hit(key, limit, window_seconds)
+        if not result.allowed:
+            self.rejected += 1
+        return result
+
+    def clear_local(self):
+        self.local.clear()
+
+    def get_stats(self) -> Dict:
+        return {
+            "backend": "redis" if self.enabled else "local",
+            "redis_checks": self.redis_checks,
+            "local_checks": self.local_checks,
+            "rejected": self.rejected,
+            "local_keys": len(self.local),
+            "breaker": self.breaker.get_stats(),
+        }
+
+
+rate_limit_store = RateLimitStore()
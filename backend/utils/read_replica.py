@@ -0,0 +1,127 @@
+"""
+Read Replica Yönlendirme Yardımcıları
+
+- Replica sağlık durumu: Bağlantı hatasında replica belirli bir süre devre dışı
+  kalır, okuma istekleri primary'ye düşer.
+- Lag guard: Bir oturum primary'ye yazdıktan sonra READ_REPLICA_LAG_GUARD_SECONDS
+  boyunca okumaları da primary'den yapar (read-after-write tutarlılığı).
+"""
+from typing import Optional
+import logging
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from backend.config import settings
+from backend.middleware.request_context import current_client_context
+from backend.utils.cache_manager import cache_manager
+from backend.utils.lru_cache import TTLCache, MISSING
+
+logger = logging.getLogger(__name__)
+
+RECENT_WRITE_PREFIX = "db:recent_write"
+
+
+class ReadOnlySessionError(RuntimeError):
+    """Okuma session'ı üzerinden yazma denemesi"""
+
+
+class ReplicaHealth:
+    """Replica bağlantı hatalarında geçici olarak primary'ye düşme"""
+
+    def __init__(self, retry_seconds: int = 30):
+        self.retry_seconds = retry_seconds
+        self._down_until = 0.0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def mark_down(self, reason: str = ""):
+        with self._lock:
+            self.failures += 1
+            self._down_until = time.monotonic() + self.retry_seconds
+        logger.warning(f"[READ REPLICA] Replica devre dışı ({self.retry_seconds} sn), okumalar primary'ye yönleniyor: {reason[:120]}")
+
+    def mark_up(self):
+        self._down_until = 0.0
+
+    def get_stats(self) -> dict:
+        remaining = max(0.0, self._down_until - time.monotonic())
+        return {
+            "available": remaining == 0.0,
+            "retry_in_seconds": round(remaining, 1),
+            "failures": self.failures,
+        }
+
+
+replica_health = ReplicaHealth(settings.READ_REPLICA_RETRY_SECONDS)
+
+# Redis yoksa da aynı process içinde çalışsın diye yerel kopya
+_recent_writes = TTLCache(maxsize=10000, ttl=max(settings.READ_REPLICA_LAG_GUARD_SECONDS, 1))
+
+
+def mark_recent_write(session_key: str):
+    """Oturumun primary'ye yazdığını kaydet"""
+    ttl = settings.READ_REPLICA_LAG_GUARD_SECONDS
+    if ttl <= 0:
+        return
+    _recent_writes.set(session_key, True, ttl=ttl)
+    cache_manager.set(f"{RECENT_WRITE_PREFIX}:{session_key}", 1, ttl=ttl)
+
+
+def has_recent_write(session_key: Optional[str]) -> bool:
+    """Oturum lag guard süresi içinde yazma yaptı mı?"""
+    if not session_key or settings.READ_REPLICA_LAG_GUARD_SECONDS <= 0:
+        return False
+    if _recent_writes.get(session_key) is not MISSING:
+        return True
+    return cache_manager.exists(f"{RECENT_WRITE_PREFIX}:{session_key}")
+
+
+def should_read_from_primary() -> bool:
+    """Aktif request için okuma primary'den mi yapılmalı?"""
+    if not replica_health.is_available():
+        return True
+    context = current_client_context()
+    return context is not None and has_recent_write(context.session_key)
+
+
+def track_primary_writes(session_class):
+    """Primary session'larında commit edilen yazmaları lag guard için işaretle"""
+
+    @event.listens_for(session_class, "after_flush")
+    def _flagged_write(session, flush_context):
+        session.info["has_writes"] = True
+
+    @event.listens_for(session_class, "after_commit")
+    def _after_commit(session):
+        if session.info.pop("has_writes", False):
+            context = current_client_context()
+            if context is not None:
+                mark_recent_write(context.session_key)
+
+    @event.listens_for(session_class, "after_rollback")
+    def _after_rollback(session):
+        session.info.pop("has_writes", None)
+
+
+def make_read_only(session_class):
+    """Okuma session'larında flush'ı engelle (yanlışlıkla replica'ya yazma)"""
+
+    @event.listens_for(session_class, "before_flush")
+    def _block_writes(session, flush_context, instances):
+        if session.new or session.dirty or session.deleted:
+            raise ReadOnlySessionError("Okuma (replica) session'ı üzerinden yazma yapılamaz")
+
+
+def watch_replica_errors(engine: Engine):
+    """Replica bağlantı hatalarında sağlık durumunu güncelle"""
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(exception_context):
+        if exception_context.is_disconnect or exception_context.connection is None:
+            replica_health.mark_down(str(exception_context.original_exception))
@@ -0,0 +1,171 @@
+"""
+Request Bazlı Faz Süreleri (Server-Timing)
+
+Onay / PDF indirme gibi yavaş isteklerde sürenin nereye gittiğini görmek için
+alt sistemler aktif request'in RequestTimings nesnesine süre ekler:
+
+    db              SQL (query_counter cursor event'leri)
+    cache           cache_manager get/set (L1 + Redis)
+    isp             ip_info_cache.resolve
+    sms             GoldSMS.send_sms
+    pdf_render      MutabakatPDFGenerator.generate_mutabakat_pdf
+    pdf_sign        pdf_signer.sign_pdf
+    pdf_permissions apply_pdf_permissions
+
+Nesne contextvar'da tutulur; run_in_threadpool context'i kopyaladığından
+thread pool'da çalışan kod da aynı nesneye yazar. Request dışında (Celery,
+script) kayıt yapılmaz, maliyet tek bir contextvar okumasıdır.
+
+ServerTimingMiddleware fazları Server-Timing header'ına yazar ve örneklenen
+(veya yavaş) istekler için tek satırlık log yazar.
+"""
+import inspect
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, List, Optional
+
+from starlette.datastructures import MutableHeaders
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current_timings: ContextVar[Optional["RequestTimings"]] = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """Faz -> [toplam süre (ms), çağrı sayısı]"""
+
+    __slots__ = ("phases", "_lock")
+
+    def __init__(self):
+        self.phases: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, duration_ms: float):
+        with self._lock:
+            entry = self.phases.get(phase)
+            if entry is None:
+                self.phases[phase] = [duration_ms, 1]
+            else:
+                entry[0] += duration_ms
+                entry[1] += 1
+
+    def as_dict(self) -> Dict[str, Dict]:
+        with self._lock:
+            phases = {phase: tuple(entry) for phase, entry in self.phases.items()}
+        return {phase: {"ms": round(ms, 2), "count": count} for phase, (ms, count) in phases.items()}
+
+    def server_timing(self, total_ms: float) -> str:
+        """'db;dur=12.3;desc="4x", ..., total;dur=80.1' (fazlar iç içe olabilir)"""
+        parts = []
+        for phase, values in self.as_dict().items():
+            part = f"{phase};dur={values['ms']}"
+            if values["count"] > 1:
+                part += f';desc="{values["count"]}x"'
+            parts.append(part)
+        parts.append(f"total;dur={round(total_ms, 2)}")
+        return ", ".join(parts)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current_timings.get()
+
+
+def record_span(phase: str, duration_ms: float):
+    """Aktif request'e süre ekle (request yoksa bir şey yapmaz)"""
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add(phase, duration_ms)
+
+
+@contextmanager
+def span(phase: str):
+    """
+    Blok süresini faza ekle
+
+    Örnek:
+        with span("pdf_render"):
+            pdf_bytes = generator.generate_mutabakat_pdf(...)
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, (time.perf_counter() - start) * 1000)
+
+
+def timed(phase: str):
+    """Fonksiyon (sync veya async) süresini faza ekleyen decorator"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(phase):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(phase):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def log_request_timings(record: Dict):
+    """JSON log formatında kayıt 'timing' alanına olduğu gibi yazılır"""
+    logger.info(
+        f"[TIMING] {record['method']} {record['route']} {record['status']} {record['total_ms']}ms",
+        extra={"timing": record},
+    )
+
+
+class ServerTimingMiddleware:
+    """Pure ASGI middleware - request başına RequestTimings açar, header ve log üretir"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_header(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", timings.server_timing((time.perf_counter() - start) * 1000))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_header)
+        finally:
+            _current_timings.reset(token)
+            # Background task'lar (ör. SMS) dahil toplam süre
+            total_ms = (time.perf_counter() - start) * 1000
+            if total_ms >= settings.SLOW_REQUEST_THRESHOLD_MS or random.random() < settings.REQUEST_TIMING_LOG_SAMPLE_RATE:
+                log_request_timings({
+                    "method": scope["method"],
+                    "route": getattr(scope.get("route"), "path", None) or scope["path"],
+                    "status": status,
+                    "total_ms": round(total_ms, 2),
+                    "phases": timings.as_dict(),
+                })
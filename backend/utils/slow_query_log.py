@@ -0,0 +1,164 @@
+"""
+Yavaş Sorgu Kaydı (Ring Buffer)
+
+SLOW_QUERY_THRESHOLD_MS üzerindeki her SQL ifadesi process içi sınırlı bir
+buffer'a yazılır (en eski kayıt düşer). Admin endpoint'i kayıtları sorgu
+parmak izine göre gruplayıp en pahalıları döner.
+
+Kayıt: normalize SQL, parametre şekli, süre, route ve çağıran kod satırları.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from backend.config import settings
+from backend.utils.query_counter import current_query_stats, normalize_statement
+
+logger = logging.getLogger(__name__)
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def fingerprint(shape: str) -> str:
+    return hashlib.sha1(shape.encode("utf-8")).hexdigest()[:12]
+
+
+def parameters_shape(parameters, executemany: bool = False):
+    """Parametre değerleri yerine tipleri (hassas veri buffer'a girmez)"""
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameters[0] if parameters else None
+        return {"rows": len(parameters), "row": parameters_shape(first)}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__ if parameters is not None else None
+
+
+def stack_summary(limit: int = 4) -> List[str]:
+    """Sorguyu tetikleyen uygulama kodu satırları (SQLAlchemy ve bu modül hariç)"""
+    frames = []
+    for frame in traceback.extract_stack()[:-2]:
+        filename = os.path.abspath(frame.filename)
+        if filename.startswith(_BACKEND_DIR) and filename != os.path.abspath(__file__):
+            frames.append(f"{os.path.relpath(filename, _BACKEND_DIR)}:{frame.lineno} {frame.name}")
+    return frames[-limit:]
+
+
+class SlowQueryLog:
+    """Yavaş sorgular için sınırlı ring buffer"""
+
+    def __init__(self, threshold_ms: float = 200, maxlen: int = 500):
+        self.threshold_ms = threshold_ms
+        self._records = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.total_recorded = 0
+
+    def record(self, statement: str, parameters, duration_ms: float,
+               executemany: bool = False, route: Optional[str] = None):
+        shape = normalize_statement(statement)
+        entry = {
+            "fingerprint": fingerprint(shape),
+            "statement": shape,
+            "parameters": parameters_shape(parameters, executemany),
+            "duration_ms": round(duration_ms, 2),
+            "route": route,
+            "stack": stack_summary(),
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        with self._lock:
+            self._records.append(entry)
+            self.total_recorded += 1
+        logger.warning(f"[SLOW QUERY] {duration_ms:.0f} ms [{entry['fingerprint']}] {route or '-'}: {shape[:150]}")
+
+    def records(self) -> List[Dict]:
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self.total_recorded = 0
+
+    def top_offenders(self, limit: int = 20) -> List[Dict]:
+        """Parmak izine göre gruplanmış kayıtlar (toplam süreye göre azalan)"""
+        groups: Dict[str, Dict] = {}
+        for entry in self.records():
+            group = groups.get(entry["fingerprint"])
+            if group is None:
+                group = groups[entry["fingerprint"]] = {
+                    "fingerprint": entry["fingerprint"],
+                    "statement": entry["statement"],
+                    "parameters": entry["parameters"],
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "routes": {},
+                }
+            group["count"] += 1
+            group["total_ms"] += entry["duration_ms"]
+            if entry["duration_ms"] >= group["max_ms"]:
+                group["max_ms"] = entry["duration_ms"]
+                group["slowest_stack"] = entry["stack"]
+            route = entry["route"] or "-"
+            group["routes"][route] = group["routes"].get(route, 0) + 1
+            group["last_seen"] = entry["recorded_at"]
+
+        result = sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)[:limit]
+        for group in result:
+            group["total_ms"] = round(group["total_ms"], 2)
+            group["avg_ms"] = round(group["total_ms"] / group["count"], 2)
+        return result
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            buffered = len(self._records)
+        return {
+            "threshold_ms": self.threshold_ms,
+            "buffer_size": self._records.maxlen,
+            "buffered": buffered,
+            "total_recorded": self.total_recorded,
+        }
+
+
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_THRESHOLD_MS, settings.SLOW_QUERY_BUFFER_SIZE)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._slow_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_slow_query_start", None)
+    if start is None or slow_query_log.threshold_ms <= 0:
+        return
+    duration_ms = (time.perf_counter() - start) * 1000
+    if duration_ms >= slow_query_log.threshold_ms:
+        stats = current_query_stats()
+        slow_query_log.record(
+            statement, parameters, duration_ms, executemany,
+            route=stats.route if stats is not None else None
+        )
+
+
+_installed = False
+
+
+def install_slow_query_log():
+    """Yavaş sorgu kaydını tüm Engine'lere bağla (bir kez)"""
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _installed = True
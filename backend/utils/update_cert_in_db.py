@@ -7,6 +7,7 @@ Varsayılanlar:
 """
 from backend.database import SessionLocal
 from backend.models import Company
+from backend.utils.cache_manager import invalidate_company_cache
 
 
 def main() -> None:
@@ -17,6 +18,7 @@ def main() -> None:
         ("1660290656", "certificates/bermer.p12", "Bermer2025!@"),
     ]
 
+    updated_ids = []
     for vkn, path, pwd in updates:
         company = db.query(Company).filter(Company.vkn == vkn).first()
         if not company:
@@ -25,10 +27,14 @@ def main() -> None:
         company.certificate_path = path
         company.certificate_password = pwd
         db.add(company)
+        updated_ids.append(company.id)
         print(f"[DB] Güncellendi: {company.company_name} -> {path}")
 
     db.commit()
     db.close()
+    # Çalışan uygulamadaki şirket ayarları cache'i
+    for company_id in updated_ids:
+        invalidate_company_cache(company_id)
     print("[DB] Tamamlandı")
 
 
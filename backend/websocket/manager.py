@@ -5,6 +5,9 @@ Real-time bildirimler için
 from fastapi import WebSocket
 from typing import Dict, List
 import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class ConnectionManager:
@@ -30,7 +33,7 @@ class ConnectionManager:
             self.company_rooms[company_id] = []
         self.company_rooms[company_id].append(websocket)
         
-        print(f"✅ WebSocket connected: User {user_id}, Company {company_id}")
+        logger.info(f"✅ WebSocket connected: User {user_id}, Company {company_id}")
     
     def disconnect(self, websocket: WebSocket, user_id: int, company_id: int):
         """Connection kaldır"""
@@ -48,7 +51,7 @@ class ConnectionManager:
             if not self.company_rooms[company_id]:
                 del self.company_rooms[company_id]
         
-        print(f"❌ WebSocket disconnected: User {user_id}, Company {company_id}")
+        logger.info(f"❌ WebSocket disconnected: User {user_id}, Company {company_id}")
     
     async def send_personal_message(self, message: dict, user_id: int):
         """Belirli bir kullanıcıya mesaj gönder"""
@@ -57,7 +60,7 @@ class ConnectionManager:
                 try:
                     await connection.send_json(message)
                 except Exception as e:
-                    print(f"Error sending message to user {user_id}: {e}")
+                    logger.warning(f"Error sending message to user {user_id}: {e}")
     
     async def broadcast_to_company(self, message: dict, company_id: int):
         """Şirket geneline broadcast"""
@@ -66,7 +69,7 @@ class ConnectionManager:
                 try:
                     await connection.send_json(message)
                 except Exception as e:
-                    print(f"Error broadcasting to company {company_id}: {e}")
+                    logger.warning(f"Error broadcasting to company {company_id}: {e}")
     
     async def broadcast_all(self, message: dict):
         """Tüm kullanıcılara broadcast"""
@@ -75,7 +78,7 @@ class ConnectionManager:
                 try:
                     await connection.send_json(message)
                 except Exception as e:
-                    print(f"Error broadcasting: {e}")
+                    logger.warning(f"Error broadcasting: {e}")
     
     def get_active_users(self) -> List[int]:
         """Aktif kullanıcı ID'leri"""